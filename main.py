@@ -14,13 +14,24 @@ def _default_output_dir() -> str:
     return str(Path("reports") / f"report_{timestamp}")
 
 
+def _lineage_id(input_file: str) -> str:
+    input_path = Path(input_file)
+    if not input_path.is_file():
+        return hashlib.sha256(input_file.encode("utf-8")).hexdigest()
+    hasher = hashlib.sha256()
+    with input_path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
 def main():
     parser = argparse.ArgumentParser(description="CIX Alerts Graph-Lead Prototype")
     parser.add_argument(
         "input_file",
         nargs="?",
         default="samples/cix_kernel_demo_alerts.json",
-        help="Path to the input JSON file (default: samples/cix_kernel_demo_alerts.json)",
+        help="Path to the input JSON/JSONL file, optionally .gz/.zst compressed (default: samples/cix_kernel_demo_alerts.json)",
     )
     parser.add_argument(
         "--output-dir",
@@ -45,6 +56,24 @@ def main():
         default=0,
         help="Maximum number of campaign components to emit as artifacts (default: 0 = all).",
     )
+    parser.add_argument(
+        "--ledger-segment-entries",
+        type=int,
+        default=0,
+        help="Seal Stage-1/ARV ledgers into Merkle-rooted segments of this many entries (default: 0 = single file).",
+    )
+    parser.add_argument(
+        "--ledger-segment-compression",
+        choices=["none", "gzip", "zstd"],
+        default="none",
+        help="Compression for sealed ledger segments (zstd requires the zstandard package).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=0,
+        help="Stream the input through triage in chunks of this many alerts (default: 0 = one batch).",
+    )
     args = parser.parse_args()
     output_dir = args.output_dir or _default_output_dir()
 
@@ -55,19 +84,10 @@ def main():
     # 1. Ingestion (Batch)
     parser = RawParser()
     # Default input is a tracked sample batch for reproducible local runs.
-    raw_alerts = parser.parse_file(args.input_file)
-    print(f"[1] Batch Ingestion: Loaded {len(raw_alerts)} alerts from {args.input_file}.")
-    lineage_source = args.input_file
-    try:
-        input_path = Path(args.input_file)
-        if input_path.exists():
-            lineage_source = input_path.read_bytes()
-    except Exception:
-        lineage_source = args.input_file
-    if isinstance(lineage_source, bytes):
-        lineage_id = hashlib.sha256(lineage_source).hexdigest()
-    else:
-        lineage_id = hashlib.sha256(str(lineage_source).encode("utf-8")).hexdigest()
+    # Alerts are decoded lazily; the pipeline pulls them chunk by chunk.
+    raw_alerts = parser.iter_file(args.input_file)
+    print(f"[1] Batch Ingestion: Streaming alerts from {args.input_file}.")
+    lineage_id = _lineage_id(args.input_file)
     profile = profile_settings(args.profile_id)
     kernel_ledger_path = args.kernel_ledger or str(Path(output_dir) / "kernel_ledger.jsonl")
     artifacts = run_graph_pipeline(
@@ -88,6 +108,9 @@ def main():
         skip_enrichment=args.skip_enrichment,
         verbose=args.verbose,
         max_campaigns=None if args.max_campaigns == 0 else args.max_campaigns,
+        ledger_segment_entries=args.ledger_segment_entries,
+        ledger_segment_compression=args.ledger_segment_compression,
+        chunk_size=args.chunk_size,
     )
 
     if not artifacts["reports"]:
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import src.models as models  # noqa: E402
+from src.ingestion import RawParser  # noqa: E402
+from src.models import GraphReadyAlert  # noqa: E402
+
+
+def _mordor_alerts(count: int) -> List[Dict[str, Any]]:
+    """Sysmon-style process/network/file events converted the way RawParser loads Mordor data."""
+    parser = RawParser()
+    templates = [
+        {
+            "EventID": 1,
+            "Category": "Process Create (rule: ProcessCreate)",
+            "Image": "C:\\Windows\\System32\\cmd.exe",
+            "ParentImage": "C:\\Windows\\explorer.exe",
+            "CommandLine": "cmd.exe /c whoami /all",
+            "Hashes": "MD5=0A,SHA256=4F2E,IMPHASH=9C",
+            "User": "ACME\\alice",
+        },
+        {
+            "EventID": 3,
+            "Category": "Network connection detected (rule: NetworkConnect)",
+            "Image": "C:\\Windows\\System32\\WindowsPowerShell\\v1.0\\powershell.exe",
+            "SourceAddress": "10.0.0.5",
+            "DestAddress": "203.0.113.7",
+            "SourcePort": 51515,
+            "DestPort": 443,
+        },
+        {
+            "EventID": 11,
+            "Category": "File created (rule: FileCreate)",
+            "Image": "C:\\Windows\\System32\\svchost.exe",
+            "TargetFilename": "C:\\Users\\alice\\AppData\\Local\\Temp\\stage2.dll",
+        },
+    ]
+    alerts = []
+    for idx in range(count):
+        event = dict(templates[idx % len(templates)])
+        event.update(
+            {
+                "RecordNumber": idx,
+                "Hostname": f"WS-{idx % 50:02d}.corp.local",
+                "EventTime": "2026-02-06 10:00:00",
+                "SourceName": "Microsoft-Windows-Sysmon",
+                "ProcessGuid": f"{{{idx:08x}-0000-0000-0000-000000000000}}",
+                "ProcessId": 4000 + idx,
+                "UtcTime": "2026-02-06 10:00:00.000",
+            }
+        )
+        alerts.append(parser._mordor_event_to_alert(event, f"event_{idx}"))
+    return alerts
+
+
+def _measure(fn: Callable[[Dict[str, Any]], Any], items: List[Dict[str, Any]], seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for item in items:
+            fn(item)
+        count += len(items)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def _cold(alert: Dict[str, Any]) -> GraphReadyAlert:
+    models._plan_cache.clear()
+    return GraphReadyAlert.from_raw_data(alert)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-alert cost of GraphReadyAlert.from_raw_data")
+    parser.add_argument("input", nargs="?", default=None, help="Alert file to load with RawParser (default: synthetic Sysmon events)")
+    parser.add_argument("--count", type=int, default=3000, help="Synthetic alerts when no input is given")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per case")
+    args = parser.parse_args()
+
+    alerts = RawParser().parse_file(args.input) if args.input else _mordor_alerts(args.count)
+    fields = [GraphReadyAlert.from_raw_data(alert).model_dump() for alert in alerts]
+    cases = (
+        ("from_raw_data (cached plan)", GraphReadyAlert.from_raw_data, alerts),
+        ("from_raw_data (plan per alert)", _cold, alerts),
+        ("pydantic validation only", GraphReadyAlert.model_validate, fields),
+    )
+    print(f"{len(alerts)} alerts, {len(models._plan_cache)} key layouts")
+    for name, fn, items in cases:
+        print(f"{name:<32} {_measure(fn, items, args.seconds):8.2f} us/alert")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.kernel.kernel_gate import KernelGate, KernelGatePool, close_ledger_writers  # noqa: E402
+
+
+def _events(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "source_id": "siem-A",
+            "event_id": f"evt-{idx}",
+            "source_timestamp": "2026-02-06T10:00:00Z",
+            "raw_payload": {"message": f"powershell -enc SQBFAFgA {idx}", "event": {"kind": "alert"}},
+        }
+        for idx in range(count)
+    ]
+
+
+def _latencies(request: Callable[[], None], requests: int) -> List[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        request()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-request KernelGate latency: new gate per request vs KernelGatePool")
+    parser.add_argument("--requests", type=int, default=200, help="Simulated ingest requests per mode")
+    parser.add_argument("--events", type=int, default=10, help="Events per request")
+    parser.add_argument("--profile-id", default="axoden-cix-1-v0.2.0")
+    args = parser.parse_args()
+
+    events = _events(args.events)
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger_path = str(Path(tmp) / "kernel_ledger.jsonl")
+        pool = KernelGatePool()
+
+        def _evaluate(gate: KernelGate) -> None:
+            for event in events:
+                gate.append_ledger(gate.evaluate(event))
+
+        def per_request() -> None:
+            _evaluate(KernelGate(profile_id=args.profile_id, ledger_path=ledger_path))
+
+        def pooled() -> None:
+            _evaluate(pool.get(args.profile_id, ledger_path))
+
+        try:
+            per_request()
+        except FileNotFoundError as exc:
+            print(exc, file=sys.stderr)
+            return 1
+
+        print(f"{args.requests} requests x {args.events} events")
+        print(f"{'mode':<12} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+        for name, request in (("per-request", per_request), ("pooled", pooled)):
+            samples = sorted(_latencies(request, args.requests))
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            print(f"{name:<12} {statistics.median(samples):>8.3f} {p95:>8.3f} {statistics.mean(samples):>8.3f}")
+        close_ledger_writers()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
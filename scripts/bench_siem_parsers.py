@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ingest.siem_formats import parse_cef, parse_leef  # noqa: E402
+
+
+def _cef_line(msg_bytes: int) -> str:
+    payload = ("GET /index.php?id=1\\=1 HTTP/1.1 " * (msg_bytes // 32 + 1))[:msg_bytes]
+    return (
+        "CEF:0|Acme|ThreatX|1.0|100|Web Attack|7|src=10.0.0.1 spt=51515 dst=10.0.0.2 dpt=443 "
+        f"act=blocked request=https://example.test/a msg={payload} cs1Label=rule cs1=942100"
+    )
+
+
+def _leef_line(msg_bytes: int) -> str:
+    payload = ("powershell -enc SQBFAFgA " * (msg_bytes // 24 + 1))[:msg_bytes]
+    return f"LEEF:2.0|Vendor|Product|1.0|EVT123|^|cat=malware^sev=5^src=10.0.0.1^msg={payload}"
+
+
+def _measure(fn: Callable[[str], Dict], line: str, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            fn(line)
+        count += 100
+    return count / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmark the CEF/LEEF extension tokenizer")
+    parser.add_argument("--sizes", default="64,1024,16384,262144", help="Comma-separated msg= sizes in bytes")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per case")
+    args = parser.parse_args()
+
+    sizes: List[int] = [int(s) for s in args.sizes.split(",") if s]
+    print(f"{'format':<6} {'msg_bytes':>10} {'lines/s':>12} {'MB/s':>8}")
+    for name, build, fn in (("cef", _cef_line, parse_cef), ("leef", _leef_line, parse_leef)):
+        for size in sizes:
+            line = build(size)
+            rate = _measure(fn, line, args.seconds)
+            print(f"{name:<6} {size:>10} {rate:>12.0f} {rate * len(line) / 1e6:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
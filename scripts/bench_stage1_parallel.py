@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.kernel.ledger import Ledger  # noqa: E402
+from src.kernel.stage1 import FEATURE_CHUNK_SIZE, classify_batch  # noqa: E402
+
+
+def _scaled_events(sample_path: Path, total: int) -> List[Dict[str, Any]]:
+    base = json.loads(sample_path.read_text(encoding="utf-8"))["events"]
+    events: List[Dict[str, Any]] = []
+    for idx in range(total):
+        event = dict(base[idx % len(base)])
+        event["event_id"] = f"{event['event_id']}-{idx}"
+        event.pop("raw_payload_hash", None)
+        events.append(event)
+    return events
+
+
+def _run(events: List[Dict[str, Any]], workers: int, chunk_size: int, vectorized: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = Ledger(str(Path(tmp) / "ledger.jsonl"), group_commit=True)
+        start = time.perf_counter()
+        classify_batch(events, ledger=ledger, workers=workers, chunk_size=chunk_size, vectorized=vectorized)
+        return time.perf_counter() - start
+
+
+def _run_isolated(args: argparse.Namespace, mode: str) -> float:
+    """Run one mode in a fresh interpreter so no template memo or pool is inherited."""
+    cmd = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--mode",
+        mode,
+        "--sample",
+        args.sample,
+        "--events",
+        str(args.events),
+        "--workers",
+        str(args.workers),
+        "--chunk-size",
+        str(args.chunk_size),
+    ]
+    if args.vectorized:
+        cmd.append("--vectorized")
+    output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark serial vs process-pool Stage-1 classify_batch")
+    parser.add_argument(
+        "--sample",
+        default=str(ROOT / "samples" / "live_triage_100.updated.normalized.json"),
+        help="Stage-1 envelope sample to replicate",
+    )
+    parser.add_argument("--events", type=int, default=1_000_000, help="Total events after scaling (default: 1M)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Process pool size")
+    parser.add_argument("--chunk-size", type=int, default=FEATURE_CHUNK_SIZE, help="Events per worker task")
+    parser.add_argument("--vectorized", action="store_true", help="Use the NumPy entropy engine in each chunk")
+    parser.add_argument("--mode", choices=("serial", "parallel"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        events = _scaled_events(Path(args.sample), args.events)
+        workers = args.workers if args.mode == "parallel" else 0
+        print(_run(events, workers=workers, chunk_size=args.chunk_size, vectorized=args.vectorized))
+        return 0
+
+    serial_s = _run_isolated(args, "serial")
+    parallel_s = _run_isolated(args, "parallel")
+
+    print(f"events={args.events} workers={args.workers} chunk_size={args.chunk_size} vectorized={args.vectorized}")
+    print(f"serial   {serial_s:8.2f}s  {args.events / serial_s:10.0f} ev/s")
+    print(f"parallel {parallel_s:8.2f}s  {args.events / parallel_s:10.0f} ev/s")
+    print(f"speedup  {serial_s / parallel_s:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
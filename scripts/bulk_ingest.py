@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ingest.bulk import BULK_CHUNK_LINES, iter_envelopes, read_lines  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Convert mixed CEF / LEEF / syslog / JSON lines into a Stage-1 {events: [...]} batch"
+    )
+    parser.add_argument("input", help="Input file of raw lines ('-' for stdin)")
+    parser.add_argument("output", help="Output JSON file with {events: [...]} structure")
+    parser.add_argument("--source-id", dest="source_id", default=None, help="Override source_id for all events")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes (<=1 parses inline)")
+    parser.add_argument("--chunk-lines", type=int, default=BULK_CHUNK_LINES, help="Lines per worker task")
+    parser.add_argument("--strict", action="store_true", help="Exit non-zero if any line could not be parsed")
+    args = parser.parse_args()
+
+    if args.input != "-" and not Path(args.input).exists():
+        raise SystemExit(f"File not found: {args.input}")
+    source = sys.stdin.buffer if args.input == "-" else args.input
+
+    errors: List[Dict[str, Any]] = []
+    count = 0
+    with Path(args.output).open("w", encoding="utf-8") as out:
+        out.write('{"events": [')
+        for envelope in iter_envelopes(
+            read_lines(source),
+            source_id=args.source_id,
+            workers=args.workers,
+            chunk_lines=args.chunk_lines,
+            errors=errors,
+        ):
+            out.write(",\n" if count else "\n")
+            out.write(json.dumps(envelope, ensure_ascii=False))
+            count += 1
+        out.write("\n]}\n")
+
+    print(f"Wrote {count} events to {args.output}")
+    for error in errors[:20]:
+        print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+    if len(errors) > 20:
+        print(f"... {len(errors) - 20} more unparseable lines", file=sys.stderr)
+    return 1 if errors and args.strict else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
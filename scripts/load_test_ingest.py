@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+CLASSIFY_PATH = "/api/v1/ingest/classify"
+
+
+def _parse_mix(spec: str) -> List[Tuple[int, int]]:
+    """Parse "1:70,50:25,2000:5" into (events per request, weight) pairs."""
+    mix = []
+    for part in spec.split(","):
+        size, _, weight = part.partition(":")
+        mix.append((int(size), int(weight or 1)))
+    return mix
+
+
+def _batch(size: int, seq: int) -> bytes:
+    events = [
+        {
+            "source_id": "load-test",
+            "event_id": f"lt-{seq}-{idx}",
+            "source_timestamp": "2026-02-06T10:00:00Z",
+            "raw_payload": {"message": f"powershell -enc SQBFAFgA {seq} {idx}", "event": {"kind": "alert"}},
+        }
+        for idx in range(size)
+    ]
+    return json.dumps({"events": events}).encode("utf-8")
+
+
+def _request(host: str, port: int, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, float]:
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(host, port, timeout=120)
+    try:
+        conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        status = response.status
+    except OSError:
+        status = 0
+    finally:
+        conn.close()
+    return status, (time.perf_counter() - start) * 1000
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int, data_dir: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.setdefault("CIX_LEDGER_PATH", str(Path(data_dir) / "ledger.jsonl"))
+    env.setdefault("CIX_KERNEL_LEDGER_PATH", str(Path(data_dir) / "kernel_ledger.jsonl"))
+    env.setdefault("CIX_RUN_WORKERS", "0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=str(ROOT),
+        env=env,
+    )
+    for _ in range(200):
+        if _request("127.0.0.1", port, "GET", "/healthz")[0] == 200:
+            return server
+        time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError("server did not start")
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Ingest latency under mixed request sizes, with /healthz probed alongside",
+        epilog="CIX_INGEST_* variables in the environment configure the server started by this script.",
+    )
+    parser.add_argument("--url", help="Target a running API instead of starting one (e.g. http://localhost:8009)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent ingest clients")
+    parser.add_argument("--mix", default="1:70,50:25,2000:5", help="events:weight pairs for request sizes")
+    parser.add_argument("--health-interval", type=float, default=0.05, help="Seconds between /healthz probes")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    sizes, weights = [size for size, _ in mix], [weight for _, weight in mix]
+    bodies = {size: _batch(size, size) for size in sizes}
+    rng = random.Random(args.seed)
+    plan_lock = threading.Lock()
+    results: Dict[str, List[Tuple[int, float]]] = {f"{size} events": [] for size in sizes}
+    results["healthz"] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        if args.url:
+            target = urlsplit(args.url)
+            host, port = target.hostname or "localhost", target.port or 80
+        else:
+            host, port = "127.0.0.1", _free_port()
+            server = _start_server(port, tmp)
+        deadline = time.perf_counter() + args.duration
+
+        def ingest_client() -> None:
+            while time.perf_counter() < deadline:
+                with plan_lock:
+                    size = rng.choices(sizes, weights)[0]
+                # Replayed event ids keep the body fixed; Stage-1 still scores every event.
+                results[f"{size} events"].append(_request(host, port, "POST", CLASSIFY_PATH, bodies[size]))
+
+        def health_probe() -> None:
+            while time.perf_counter() < deadline:
+                results["healthz"].append(_request(host, port, "GET", "/healthz"))
+                time.sleep(args.health_interval)
+
+        threads = [threading.Thread(target=ingest_client) for _ in range(args.concurrency)]
+        threads.append(threading.Thread(target=health_probe))
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            metrics_conn = http.client.HTTPConnection(host, port, timeout=10)
+            metrics_conn.request("GET", "/v1/ingest/metrics")
+            metrics = json.loads(metrics_conn.getresponse().read() or b"{}")
+            metrics_conn.close()
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    print(f"{args.duration:g}s, {args.concurrency} clients, mix {args.mix}")
+    print(f"{'request':<14} {'count':>6} {'2xx':>6} {'429':>6} {'504':>6} {'other':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, samples in results.items():
+        statuses = [status for status, _ in samples]
+        ok = sum(1 for status in statuses if 200 <= status < 300)
+        busy, timed_out = statuses.count(429), statuses.count(504)
+        latencies = sorted(ms for status, ms in samples if 200 <= status < 300)
+        print(
+            f"{name:<14} {len(samples):>6} {ok:>6} {busy:>6} {timed_out:>6} {len(samples) - ok - busy - timed_out:>6} "
+            f"{_percentile(latencies, 0.5):>9.1f} {_percentile(latencies, 0.95):>9.1f} {_percentile(latencies, 0.99):>9.1f}"
+        )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.kernel.ledger_verify import CHUNK_BYTES_DEFAULT, verify_ledger_file  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Verify the hash chain of a Stage-1 JSONL ledger")
+    parser.add_argument("--ledger", default="data/ledger.jsonl", help="Ledger JSONL path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hashing processes (default: CPU count)")
+    parser.add_argument(
+        "--chunk-mb",
+        type=int,
+        default=CHUNK_BYTES_DEFAULT // (1024 * 1024),
+        help="Bytes per hashing task in MiB (default: 64)",
+    )
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file updated after every verified chunk")
+    parser.add_argument("--resume", action="store_true", help="Continue from --checkpoint instead of byte 0")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    try:
+        report = verify_ledger_file(
+            args.ledger,
+            workers=args.workers,
+            chunk_bytes=max(1, args.chunk_mb) * 1024 * 1024,
+            checkpoint_path=args.checkpoint,
+            resume=args.resume,
+        )
+    except ValueError as exc:
+        print(f"ERROR: {exc}")
+        return 1
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif report["ok"]:
+        print(
+            f"Ledger verified: {report['entries']} entries up to byte {report['verified_offset']} "
+            f"({report['checked']} checked in {report['elapsed_s']}s, {report['entries_per_sec']} entries/s)."
+        )
+    else:
+        where = f"byte offset {report['broken_offset']}" if report["broken_offset"] is not None else "segment manifest"
+        print(f"ERROR: chain broken at {where}: {report['reason']}")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,20 +1,84 @@
 from __future__ import annotations
 
-import hashlib
+import asyncio
 import json
 import os
+import shutil
+import threading
 import uuid
-from datetime import datetime, timezone
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
-from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Query, Response
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from pydantic import BaseModel, ConfigDict, Field
+from starlette.background import BackgroundTask
 
+from src.kernel.evidence_store import HOT_ENTRIES_DEFAULT, SEGMENT_MAX_BYTES_DEFAULT, EvidenceStore, evidence_dir_for
+from src.kernel.feature_cache import FeatureCache
+from src.kernel.hashing import DEFAULT_SEPARATORS, canonical_bytes, sha256_hex
 from src.kernel.ledger import Ledger
-from src.kernel.stage1 import classify_batch
-from src.kernel.kernel_gate import KernelGate
-from src.ingest.dedup import compute_event_hash
+from src.kernel.projection_model import flush_projection_models, stream_projection_model
+from src.kernel.segments import segment_dir_for
+from src.kernel.stage1 import classify_batch, shutdown_process_pools
+from src.kernel.kernel_gate import (
+    REGISTRY_CHECK_INTERVAL_DEFAULT,
+    KernelGatePool,
+    close_ledger_writers,
+    ledger_writer_metrics,
+)
+from src.api.idempotency import (
+    BACKEND_MEMORY,
+    CLAIM_LEASE_SECONDS_DEFAULT,
+    CLAIM_WAIT_SECONDS_DEFAULT,
+    CONFLICT,
+    HIT,
+    IN_PROGRESS,
+    IDEMPOTENCY_MAX_ENTRIES_DEFAULT,
+    IDEMPOTENCY_TTL_SECONDS_DEFAULT,
+    open_idempotency_store,
+)
+from src.api.ndjson import (
+    ENCODING_GZIP,
+    ENCODING_IDENTITY,
+    NDJSON_CONTENT_TYPES,
+    NDJSON_MEDIA_TYPE,
+    STREAM_MAX_LINE_BYTES_DEFAULT,
+    DuplexStreamingResponse,
+    iter_ndjson_lines,
+    ndjson_record,
+)
+from src.api.offload import (
+    CPU_WORKERS_DEFAULT,
+    INGEST_MAX_CONCURRENCY_DEFAULT,
+    INGEST_TIMEOUT_SECONDS_DEFAULT,
+    IO_THREADS_DEFAULT,
+    RETRY_AFTER_SECONDS_DEFAULT,
+    Offloader,
+    RequestAbandoned,
+    RequestLimiter,
+)
+from src.api.run_queue import (
+    FINISHED_STATUSES,
+    LEASE_SECONDS_DEFAULT,
+    MAX_ATTEMPTS_DEFAULT,
+    MODE_PROCESS,
+    RUN_CHUNK_SIZE_DEFAULT,
+    RUN_PENDING,
+    RUN_RUNNING,
+    RUN_WORKERS_DEFAULT,
+    RunQueue,
+    RunWorkerPool,
+    parse_concurrency_limits,
+)
+from src.ingest.dedup import (
+    DEDUP_CLAIM_WAIT_SECONDS_DEFAULT,
+    DEDUP_WINDOW_ENTRIES_DEFAULT,
+    KEY_CONTENT,
+    KEY_FUNCTIONS,
+    SlidingWindowDeduplicator,
+    compute_event_hash,
+)
 
 
 class IngestEvent(BaseModel):
@@ -78,6 +142,7 @@ class IngestBatchResponse(BaseModel):
 class GraphRunRequest(BaseModel):
     evidence_ids: List[str] = Field(..., description="Evidence IDs to graph")
     profile_id: Optional[str] = Field("axoden-cix-1-v0.2.0", description="Kernel profile id")
+    priority: int = Field(0, description="Higher priority runs are started first")
 
 
 class GraphRunResponse(BaseModel):
@@ -99,11 +164,43 @@ class ArtifactList(BaseModel):
 class GraphRunStatus(BaseModel):
     run_id: str
     status: str
+    profile_id: Optional[str] = None
+    priority: int = 0
     started_at: Optional[str] = None
     finished_at: Optional[str] = None
+    progress: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[str] = None
     metrics: Dict[str, Any] = Field(default_factory=dict)
 
 
+class LedgerLocation(BaseModel):
+    segment: int = Field(..., description="0 = active ledger file, n = sealed segment n")
+    byte_offset: int
+    length: int
+
+
+class LedgerEntryResult(BaseModel):
+    entry_id: str
+    type: str
+    timestamp: Optional[str] = None
+    batch_id: Optional[str] = None
+    location: LedgerLocation
+    evidence_pointers: Dict[str, Any] = Field(default_factory=dict)
+    payload: Dict[str, Any] = Field(default_factory=dict)
+
+
+class LedgerQueryResponse(BaseModel):
+    count: int
+    results: List[LedgerEntryResult]
+
+
+class LedgerMetricsResponse(BaseModel):
+    async_writer: bool
+    strict_durability: bool
+    stage1: Dict[str, Any] = Field(default_factory=dict)
+    kernel: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+
+
 class ErrorResponse(BaseModel):
     code: str
     message: str
@@ -111,73 +208,361 @@ class ErrorResponse(BaseModel):
     trace_id: str
 
 
+STREAM_BATCH_SIZE_DEFAULT = 1000
+# Stage-1 counters that are not summed across the micro-batches of a stream.
+_STREAM_LAST_COUNTERS = {"projection_model", "projection_total"}
+
+
+def _merge_counters(total: Dict[str, Any], counters: Dict[str, Any]) -> None:
+    for key, value in counters.items():
+        if key in _STREAM_LAST_COUNTERS or not isinstance(value, (int, float)):
+            total[key] = value
+        else:
+            total[key] = total.get(key, 0) + value
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="CIX Alerts Ingestion API", version="0.6.0")
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        run_workers.start()
+        yield
+        offloader.shutdown()
+        shutdown_process_pools()
+        run_workers.stop()
+        run_queue.close()
+        # Drain the background ledger writers so queued entries reach disk.
+        ledger.close()
+        gate_pool.clear()
+        close_ledger_writers()
+        deduplicator.save()
+        flush_projection_models()
+        idempotency_store.close()
+        evidence_store.close()
+
+    app = FastAPI(title="CIX Alerts Ingestion API", version="0.6.0", lifespan=lifespan)
 
     ledger_path = os.getenv("CIX_LEDGER_PATH", "data/ledger.jsonl")
     ledger_path_obj = Path(ledger_path)
-    ledger = Ledger(str(ledger_path_obj))
+    ledger_group_commit = os.getenv("CIX_LEDGER_GROUP_COMMIT", "").lower() in {"1", "true", "yes"}
+    ledger_durability = os.getenv("CIX_LEDGER_DURABILITY", "flush")
+    ledger_index_snapshot = os.getenv("CIX_LEDGER_INDEX_SNAPSHOT", "").lower() in {"1", "true", "yes"}
+    ledger_segment_entries = int(os.getenv("CIX_LEDGER_SEGMENT_ENTRIES", "0") or 0)
+    ledger_segment_compression = os.getenv("CIX_LEDGER_SEGMENT_COMPRESSION", "none")
+    ledger_query_index = os.getenv("CIX_LEDGER_QUERY_INDEX", "1").lower() in {"1", "true", "yes"}
+    ledger_async = os.getenv("CIX_LEDGER_ASYNC", "").lower() in {"1", "true", "yes"}
+    ledger_queue_size = int(os.getenv("CIX_LEDGER_QUEUE_SIZE", "10000") or 10000)
+    ledger_strict_durability = os.getenv("CIX_LEDGER_STRICT_DURABILITY", "").lower() in {"1", "true", "yes"}
+    stream_batch_size = int(os.getenv("CIX_STREAM_BATCH_SIZE", str(STREAM_BATCH_SIZE_DEFAULT)) or STREAM_BATCH_SIZE_DEFAULT)
+    stream_max_line_bytes = int(
+        os.getenv("CIX_STREAM_MAX_LINE_BYTES", str(STREAM_MAX_LINE_BYTES_DEFAULT)) or STREAM_MAX_LINE_BYTES_DEFAULT
+    )
+
+    def _open_ledger() -> Ledger:
+        return Ledger(
+            str(ledger_path_obj),
+            group_commit=ledger_group_commit,
+            durability=ledger_durability,
+            index_snapshot=ledger_index_snapshot,
+            segment_max_entries=ledger_segment_entries,
+            segment_compression=ledger_segment_compression,
+            query_index=ledger_query_index,
+            async_writer=ledger_async,
+            writer_queue_size=ledger_queue_size,
+        )
+
+    ledger = _open_ledger()
 
     kernel_ledger_path = os.getenv("CIX_KERNEL_LEDGER_PATH", "data/kernel_ledger.jsonl")
+    gate_pool = KernelGatePool(
+        async_ledger=ledger_async,
+        ledger_queue_size=ledger_queue_size,
+        check_interval=float(
+            os.getenv("CIX_REGISTRY_CHECK_SECONDS", str(REGISTRY_CHECK_INTERVAL_DEFAULT)) or REGISTRY_CHECK_INTERVAL_DEFAULT
+        ),
+    )
+
+    # Kernel ingest dedup window, shared across requests and persisted next to the kernel ledger.
+    dedup_key_name = os.getenv("CIX_DEDUP_KEY", KEY_CONTENT).lower()
+    if dedup_key_name not in KEY_FUNCTIONS:
+        raise ValueError(f"Unsupported CIX_DEDUP_KEY: {dedup_key_name}")
+    deduplicator = SlidingWindowDeduplicator(
+        max_entries=int(os.getenv("CIX_DEDUP_WINDOW_ENTRIES", str(DEDUP_WINDOW_ENTRIES_DEFAULT)) or DEDUP_WINDOW_ENTRIES_DEFAULT),
+        window_seconds=float(os.getenv("CIX_DEDUP_WINDOW_SECONDS", "0") or 0),
+        bloom_capacity=int(os.getenv("CIX_DEDUP_BLOOM_CAPACITY", "0") or 0),
+        key_fn=KEY_FUNCTIONS[dedup_key_name],
+        state_path=os.getenv("CIX_DEDUP_STATE_PATH") or str(Path(kernel_ledger_path).with_suffix(".dedup.json")),
+        checkpoint_every=int(os.getenv("CIX_DEDUP_CHECKPOINT_KEYS", "1000") or 0),
+    )
+    dedup_wait_seconds = float(
+        os.getenv("CIX_DEDUP_WAIT_SECONDS", str(DEDUP_CLAIM_WAIT_SECONDS_DEFAULT)) or 0
+    )
+
+    # Idempotency-Key records; the sqlite backend survives restarts and is shared by workers.
+    idempotency_backend = os.getenv("CIX_IDEMPOTENCY_BACKEND", BACKEND_MEMORY).lower()
+    idempotency_store = open_idempotency_store(
+        idempotency_backend,
+        path=os.getenv("CIX_IDEMPOTENCY_PATH") or str(Path(kernel_ledger_path).with_suffix(".idempotency.sqlite")),
+        ttl_seconds=float(
+            os.getenv("CIX_IDEMPOTENCY_TTL_SECONDS", str(IDEMPOTENCY_TTL_SECONDS_DEFAULT)) or IDEMPOTENCY_TTL_SECONDS_DEFAULT
+        ),
+        max_entries=int(
+            os.getenv("CIX_IDEMPOTENCY_MAX_ENTRIES", str(IDEMPOTENCY_MAX_ENTRIES_DEFAULT)) or IDEMPOTENCY_MAX_ENTRIES_DEFAULT
+        ),
+        claim_lease_seconds=float(
+            os.getenv("CIX_IDEMPOTENCY_CLAIM_LEASE_SECONDS", str(CLAIM_LEASE_SECONDS_DEFAULT)) or CLAIM_LEASE_SECONDS_DEFAULT
+        ),
+    )
+    idempotency_wait_seconds = float(
+        os.getenv("CIX_IDEMPOTENCY_WAIT_SECONDS", str(CLAIM_WAIT_SECONDS_DEFAULT)) or 0
+    )
+    # Admitted evidence payloads, packed on disk next to the kernel ledger and shared by workers.
+    evidence_store = EvidenceStore(
+        os.getenv("CIX_EVIDENCE_DIR") or str(evidence_dir_for(Path(kernel_ledger_path))),
+        segment_max_bytes=int(os.getenv("CIX_EVIDENCE_SEGMENT_BYTES", str(SEGMENT_MAX_BYTES_DEFAULT)) or SEGMENT_MAX_BYTES_DEFAULT),
+        hot_entries=int(os.getenv("CIX_EVIDENCE_HOT_ENTRIES", str(HOT_ENTRIES_DEFAULT)) or 0),
+    )
+    # Graph runs are queued in SQLite and executed by a pool of worker processes.
+    run_queue_path = os.getenv("CIX_RUN_QUEUE_PATH") or str(Path(kernel_ledger_path).with_suffix(".runs.sqlite"))
+    run_lease_seconds = float(os.getenv("CIX_RUN_LEASE_SECONDS", str(LEASE_SECONDS_DEFAULT)) or LEASE_SECONDS_DEFAULT)
+    run_max_attempts = int(os.getenv("CIX_RUN_MAX_ATTEMPTS", str(MAX_ATTEMPTS_DEFAULT)) or MAX_ATTEMPTS_DEFAULT)
+    run_queue = RunQueue(run_queue_path, lease_seconds=run_lease_seconds, max_attempts=run_max_attempts)
+    run_workers = RunWorkerPool(
+        run_queue_path,
+        evidence_store.directory,
+        os.getenv("CIX_RUN_OUTPUT_DIR", "data/runs"),
+        workers=int(os.getenv("CIX_RUN_WORKERS", str(RUN_WORKERS_DEFAULT)) or 0),
+        limits=parse_concurrency_limits(os.getenv("CIX_RUN_PROFILE_CONCURRENCY", "")),
+        mode=os.getenv("CIX_RUN_WORKER_MODE", MODE_PROCESS).lower(),
+        lease_seconds=run_lease_seconds,
+        max_attempts=run_max_attempts,
+        chunk_size=int(os.getenv("CIX_RUN_CHUNK_SIZE", str(RUN_CHUNK_SIZE_DEFAULT)) or 0),
+    )
 
-    idempotency_cache: Dict[str, Dict[str, Any]] = {}
-    evidence_store: Dict[str, Dict[str, Any]] = {}
-    run_store: Dict[str, Dict[str, Any]] = {}
-    artifact_store: Dict[str, List[Dict[str, Any]]] = {}
+    def _submit_run(run_id: str, evidence_ids: List[str], profile_id: Optional[str], priority: int = 0) -> None:
+        run_queue.submit(run_id, evidence_ids, profile_id or "axoden-cix-1-v0.2.0", priority)
+        run_workers.ensure_running()
+
+    # Ingest handlers run on the event loop and hand blocking work to these executors.
+    limiter = RequestLimiter(
+        max_concurrency=int(
+            os.getenv("CIX_INGEST_MAX_CONCURRENCY", str(INGEST_MAX_CONCURRENCY_DEFAULT)) or INGEST_MAX_CONCURRENCY_DEFAULT
+        ),
+        retry_after=int(os.getenv("CIX_INGEST_RETRY_AFTER_SECONDS", str(RETRY_AFTER_SECONDS_DEFAULT)) or 1),
+    )
+    offloader = Offloader(
+        io_threads=int(os.getenv("CIX_INGEST_IO_THREADS", str(IO_THREADS_DEFAULT)) or IO_THREADS_DEFAULT),
+        cpu_workers=int(os.getenv("CIX_INGEST_CPU_WORKERS", str(CPU_WORKERS_DEFAULT)) or 0),
+        timeout=float(os.getenv("CIX_INGEST_TIMEOUT_SECONDS", str(INGEST_TIMEOUT_SECONDS_DEFAULT)) or 0),
+    )
+
+    def _error(
+        code: str,
+        message: str,
+        status: int,
+        details: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        trace_id = str(uuid.uuid4())
+        raise HTTPException(
+            status_code=status,
+            detail=ErrorResponse(
+                code=code, message=message, details=details or {}, trace_id=trace_id
+            ).dict(),
+            headers=headers,
+        )
+
+    def _admit() -> None:
+        if not limiter.try_acquire():
+            _error(
+                "OVERLOADED",
+                "Too many concurrent ingest requests",
+                429,
+                {"max_concurrency": limiter.max_concurrency},
+                headers={"Retry-After": str(limiter.retry_after)},
+            )
+
+    @asynccontextmanager
+    async def _admitted():
+        _admit()
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    async def _offload(fn, *args: Any, abandoned: Optional[threading.Event] = None, **kwargs: Any) -> Any:
+        try:
+            return await offloader.run(fn, *args, abandoned=abandoned, **kwargs)
+        except asyncio.TimeoutError:
+            _error("REQUEST_TIMEOUT", f"Request did not finish within {offloader.timeout:g}s", 504)
 
     @app.get("/healthz")
-    def healthz() -> Dict[str, str]:
+    async def healthz() -> Dict[str, str]:
         return {"status": "ok"}
 
-    @app.post("/api/v1/ingest/classify")
-    def ingest_classify(
-        batch: IngestBatch,
-        reset_ledger: bool = Query(False, description="Reset ledger before processing (testing only)"),
-    ) -> Dict[str, Any]:
+    def _classify_request(batch: IngestBatch, reset_ledger: bool) -> Dict[str, Any]:
         nonlocal ledger
         try:
             if reset_ledger:
+                ledger.close()
                 if ledger_path_obj.exists():
                     ledger_path_obj.unlink()
-                ledger = Ledger(str(ledger_path_obj))
+                shutil.rmtree(segment_dir_for(ledger_path_obj), ignore_errors=True)
+                ledger = _open_ledger()
 
             events = [event.model_dump(exclude_none=True) for event in batch.events]
-            result = classify_batch(
-                events,
-                profile=batch.profile_parameters,
-                ledger=ledger,
-            )
-            return result
+            return _classify_events(events, batch.profile_parameters)
         except ValueError as exc:
             raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    def _payload_hash(payload: Dict[str, Any]) -> str:
-        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    @app.post("/api/v1/ingest/classify")
+    async def ingest_classify(
+        batch: IngestBatch,
+        reset_ledger: bool = Query(False, description="Reset ledger before processing (testing only)"),
+    ) -> Dict[str, Any]:
+        async with _admitted():
+            return await _offload(_classify_request, batch, reset_ledger)
 
-    def _error(code: str, message: str, status: int, details: Optional[Dict[str, Any]] = None):
-        trace_id = str(uuid.uuid4())
-        raise HTTPException(
-            status_code=status,
-            detail=ErrorResponse(
-                code=code, message=message, details=details or {}, trace_id=trace_id
-            ).dict(),
+    def _classify_events(
+        events: List[Dict[str, Any]],
+        profile: Optional[Dict[str, Any]],
+        projection_model: Optional[Any] = None,
+    ) -> Dict[str, Any]:
+        result = classify_batch(
+            events,
+            profile=profile,
+            ledger=ledger,
+            executor=offloader.cpu_executor,
+            projection_model=projection_model,
+        )
+        if ledger_strict_durability:
+            ledger.flush()
+        return result
+
+    async def _classify_stream(request: Request, encoding: str, batch_size: int):
+        """
+        Classify NDJSON events in micro-batches of batch_size as they arrive and
+        yield one record per event, one per rejected line and a final summary.
+        A first line of the form {"profile_parameters": {...}} sets the profile.
+        Projection counts accumulate over the micro-batches of the stream.
+        """
+        profile: Optional[Dict[str, Any]] = None
+        projection_model: Optional[Any] = None
+        pending: List[Dict[str, Any]] = []
+        summary: Dict[str, Any] = {
+            "type": "summary",
+            "received_count": 0,
+            "rejected_count": 0,
+            "batch_ids": [],
+            "batch": {},
+        }
+
+        async def _flush():
+            nonlocal projection_model
+            if projection_model is None:
+                projection_model = stream_projection_model(profile)
+            result = await offloader.run(_classify_events, list(pending), profile, projection_model)
+            pending.clear()
+            summary["batch_ids"].append(result["batch_id"])
+            _merge_counters(summary["batch"], result["batch"])
+            return b"".join(ndjson_record({"type": "event", **event}) for event in result["per_event"])
+
+        try:
+            async for line_no, line in iter_ndjson_lines(request.stream(), encoding, stream_max_line_bytes):
+                if line is None:
+                    summary["rejected_count"] += 1
+                    yield ndjson_record({"type": "error", "line": line_no, "error": "Line exceeds size limit"})
+                    continue
+                try:
+                    record = json.loads(line)
+                    if line_no == 1 and isinstance(record, dict) and set(record) == {"profile_parameters"}:
+                        profile = record["profile_parameters"]
+                        continue
+                    event = IngestEvent.model_validate(record).model_dump(exclude_none=True)
+                except ValueError as exc:  # includes pydantic.ValidationError
+                    summary["rejected_count"] += 1
+                    yield ndjson_record({"type": "error", "line": line_no, "error": str(exc)})
+                    continue
+                summary["received_count"] += 1
+                pending.append(event)
+                if len(pending) >= batch_size:
+                    yield await _flush()
+            if pending:
+                yield await _flush()
+        except ValueError as exc:
+            summary["error"] = str(exc)
+        except asyncio.TimeoutError:
+            summary["error"] = f"Micro-batch did not finish within {offloader.timeout:g}s"
+        yield ndjson_record(summary)
+
+    @app.post("/api/v1/ingest/classify/stream")
+    async def ingest_classify_stream(
+        request: Request,
+        batch_size: int = Query(0, ge=0, description="Events per classification micro-batch (0 = server default)"),
+    ) -> DuplexStreamingResponse:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type not in NDJSON_CONTENT_TYPES:
+            raise HTTPException(status_code=415, detail=f"Expected {NDJSON_MEDIA_TYPE}, got {content_type or 'none'}")
+        encoding = request.headers.get("content-encoding", ENCODING_IDENTITY).strip().lower()
+        if encoding not in {ENCODING_IDENTITY, ENCODING_GZIP}:
+            raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {encoding}")
+        # The stream holds its limiter slot until the response is finished.
+        _admit()
+
+        async def _release() -> None:
+            # async so Starlette runs it on the event loop, not in its threadpool.
+            limiter.release()
+
+        return DuplexStreamingResponse(
+            _classify_stream(request, encoding, batch_size or stream_batch_size),
+            background=BackgroundTask(_release),
         )
 
+    def _payload_hash(payload: Dict[str, Any]) -> str:
+        return sha256_hex(canonical_bytes(payload, ensure_ascii=True, separators=DEFAULT_SEPARATORS, default=str))
+
+    def _claim_idempotency(idempotency_key: str, payload_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached response for a replayed key, or None once this request holds the key's
+        claim; the caller must then put() a response or release() the key.
+        """
+        outcome, cached = idempotency_store.claim(idempotency_key, payload_hash, idempotency_wait_seconds)
+        if outcome == CONFLICT:
+            _error("IDEMPOTENCY_CONFLICT", "Idempotency key reuse with different payload", 409)
+        if outcome == IN_PROGRESS:
+            _error("IDEMPOTENCY_IN_PROGRESS", "A request with this Idempotency-Key is still being processed", 409)
+        return cached if outcome == HIT else None
+
     @app.post("/v1/ingest/events", response_model=IngestBatchResponse)
-    def ingest_events(
+    async def ingest_events(
         batch: KernelIngestBatch,
-        background_tasks: BackgroundTasks,
         idempotency_key: str = Header(..., alias="Idempotency-Key"),
+    ) -> IngestBatchResponse:
+        abandoned = threading.Event()
+        async with _admitted():
+            return await _offload(_ingest_kernel_batch, batch, idempotency_key, abandoned, abandoned=abandoned)
+
+    def _ingest_kernel_batch(
+        batch: KernelIngestBatch, idempotency_key: str, abandoned: Optional[threading.Event] = None
     ) -> IngestBatchResponse:
         payload_dict = batch.model_dump()
         payload_hash = _payload_hash(payload_dict)
-        cached = idempotency_cache.get(idempotency_key)
-        if cached:
-            if cached["payload_hash"] != payload_hash:
-                _error("IDEMPOTENCY_CONFLICT", "Idempotency key reuse with different payload", 409)
-            return cached["response"]
+        cached = _claim_idempotency(idempotency_key, payload_hash)
+        if cached is not None:
+            return IngestBatchResponse.model_validate(cached)
+        try:
+            return _gate_kernel_batch(batch, idempotency_key, payload_hash, abandoned)
+        finally:
+            # No-op once the response is stored; frees the key if the batch failed.
+            idempotency_store.release(idempotency_key)
 
-        gate = KernelGate(profile_id=batch.profile_id or "axoden-cix-1-v0.2.0", ledger_path=kernel_ledger_path)
+    def _gate_kernel_batch(
+        batch: KernelIngestBatch,
+        idempotency_key: str,
+        payload_hash: str,
+        abandoned: Optional[threading.Event] = None,
+    ) -> IngestBatchResponse:
+        feature_cache = FeatureCache()
+        gate = gate_pool.get(batch.profile_id or "axoden-cix-1-v0.2.0", kernel_ledger_path)
         from sdk import hash_evidence  # type: ignore
 
         admitted_results: List[IngestEventResult] = []
@@ -185,8 +570,12 @@ def create_app() -> FastAPI:
         gated_results = []
         halt_triggered = False
 
-        for raw_alert in batch.events:
-            result = gate.evaluate(raw_alert.model_dump(exclude_none=True))
+        # Evidence is appended once per request, gated drops first and then admitted events.
+        ledger_results = []
+        results = gate.evaluate_batch(
+            [raw_alert.model_dump(exclude_none=True) for raw_alert in batch.events], feature_cache=feature_cache
+        )
+        for result in results:
             decision = KernelDecision(
                 action_id=result.action_id,
                 reason_code=result.reason_code,
@@ -194,7 +583,7 @@ def create_app() -> FastAPI:
             evidence_id = hash_evidence(result.ingest_evidence)
 
             if result.action_id == "ARV.HALT":
-                gate.append_ledger(result)
+                ledger_results.append(result)
                 dropped_results.append(
                     IngestEventResult(
                         event_id=str(result.graph_raw.get("eventId", "unknown")),
@@ -209,7 +598,7 @@ def create_app() -> FastAPI:
             if result.action_id in {"ARV.EXECUTE", "ARV.THROTTLE"}:
                 gated_results.append((result, evidence_id, decision))
             else:
-                gate.append_ledger(result)
+                ledger_results.append(result)
                 dropped_results.append(
                     IngestEventResult(
                         event_id=str(result.graph_raw.get("eventId", "unknown")),
@@ -220,6 +609,9 @@ def create_app() -> FastAPI:
                 )
 
         if halt_triggered:
+            gate.append_ledger_batch(ledger_results)
+            if ledger_strict_durability:
+                gate.flush_ledger()
             response = IngestBatchResponse(
                 batch_id=str(uuid.uuid4()),
                 admitted=[],
@@ -227,18 +619,25 @@ def create_app() -> FastAPI:
                 dedup={"duplicates_removed": 0},
                 registry_commit=gate.registry_commit,
             )
-            idempotency_cache[idempotency_key] = {
-                "payload_hash": payload_hash,
-                "response": response,
-            }
+            idempotency_store.put(idempotency_key, payload_hash, response.model_dump(mode="json"))
             return response
 
-        seen_hashes = set()
+        event_hashes = [
+            compute_event_hash(result.graph_raw, feature_cache=feature_cache)
+            if dedup_key_name == KEY_CONTENT
+            else deduplicator.key_fn(result.graph_raw)
+            for result, _, _ in gated_results
+        ]
+        # New keys stay pending until the batch is written: overlapping requests wait
+        # for it, and a batch that fails or whose request timed out releases them.
+        duplicate_flags = deduplicator.claim(event_hashes, dedup_wait_seconds)
+        if duplicate_flags is None:
+            _error("DEDUP_IN_PROGRESS", "Events of this batch are being ingested by another request", 409)
+
         duplicates_removed = 0
         deduped_results = []
-        for result, evidence_id, decision in gated_results:
-            event_hash = compute_event_hash(result.graph_raw)
-            if event_hash in seen_hashes:
+        for (result, evidence_id, decision), event_hash, duplicate in zip(gated_results, event_hashes, duplicate_flags):
+            if duplicate:
                 duplicates_removed += 1
                 dropped_results.append(
                     IngestEventResult(
@@ -250,11 +649,10 @@ def create_app() -> FastAPI:
                     )
                 )
                 continue
-            seen_hashes.add(event_hash)
             deduped_results.append((result, evidence_id, decision, event_hash))
 
         for result, evidence_id, decision, event_hash in deduped_results:
-            gate.append_ledger(result)
+            ledger_results.append(result)
             admitted_results.append(
                 IngestEventResult(
                     event_id=str(result.graph_raw.get("eventId", "unknown")),
@@ -263,7 +661,18 @@ def create_app() -> FastAPI:
                     dedup_key=event_hash,
                 )
             )
-            evidence_store[evidence_id] = result.graph_raw
+        claimed = [event_hash for _, _, _, event_hash in deduped_results]
+        try:
+            if abandoned is not None and abandoned.is_set():
+                raise RequestAbandoned("Request timed out before its batch was committed")
+            evidence_store.put_many((evidence_id, result.graph_raw) for result, evidence_id, _, _ in deduped_results)
+            gate.append_ledger_batch(ledger_results)
+            if ledger_strict_durability:
+                gate.flush_ledger()
+        except BaseException:
+            deduplicator.release(claimed)
+            raise
+        deduplicator.commit(claimed)
 
         response = IngestBatchResponse(
             batch_id=str(uuid.uuid4()),
@@ -276,120 +685,157 @@ def create_app() -> FastAPI:
         if batch.run_graph and admitted_results:
             run_id = str(uuid.uuid4())
             response.run_id = run_id
-            run_store[run_id] = {
-                "run_id": run_id,
-                "status": "PENDING",
-            }
-
-            def _run_graph_task(run_id: str, evidence_ids: List[str]) -> None:
-                run_store[run_id]["status"] = "RUNNING"
-                run_store[run_id]["started_at"] = datetime.now(timezone.utc).isoformat()
-                raw_events = [evidence_store[eid] for eid in evidence_ids if eid in evidence_store]
-                from src.pipeline.graph_pipeline import run_graph_pipeline
-
-                output_dir = f"data/runs/{run_id}"
-                artifacts = run_graph_pipeline(raw_events, output_dir=output_dir, enable_kernel=False)
-                artifact_list: List[Dict[str, Any]] = []
-                for path in artifacts["reports"]:
-                    artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "report_md", "path": path})
-                for path in artifacts["ledgers"]:
-                    artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "ledger_json", "path": path})
-                for path in artifacts["graphs_html"]:
-                    artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "graph_html", "path": path})
-                for path in artifacts.get("snapshots_html", []):
-                    artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "snapshot_html", "path": path})
-                for path in artifacts.get("temporal_analyses_json", []):
-                    artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "temporal_analysis_json", "path": path})
-                for path in artifacts.get("verification_json", []):
-                    artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "verification_json", "path": path})
-                for path in artifacts.get("manifests_json", []):
-                    artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "reproducibility_manifest_json", "path": path})
-                artifact_store[run_id] = artifact_list
-                run_store[run_id]["status"] = "SUCCEEDED"
-                run_store[run_id]["finished_at"] = datetime.now(timezone.utc).isoformat()
-
-            background_tasks.add_task(
-                _run_graph_task, run_id, [r.evidence_id for r in admitted_results]
-            )
+            _submit_run(run_id, [r.evidence_id for r in admitted_results], batch.profile_id)
 
-        idempotency_cache[idempotency_key] = {
-            "payload_hash": payload_hash,
-            "response": response,
-        }
+        idempotency_store.put(idempotency_key, payload_hash, response.model_dump(mode="json"))
         return response
 
     @app.post("/v1/runs/graph", response_model=GraphRunResponse)
     def create_graph_run(
         request: GraphRunRequest,
-        background_tasks: BackgroundTasks,
         idempotency_key: str = Header(..., alias="Idempotency-Key"),
     ) -> GraphRunResponse:
         payload_dict = request.model_dump()
         payload_hash = _payload_hash(payload_dict)
-        cached = idempotency_cache.get(idempotency_key)
-        if cached:
-            if cached["payload_hash"] != payload_hash:
-                _error("IDEMPOTENCY_CONFLICT", "Idempotency key reuse with different payload", 409)
-            return cached["response"]
-
-        missing = [eid for eid in request.evidence_ids if eid not in evidence_store]
-        if missing:
-            _error("MISSING_EVIDENCE", "Evidence IDs not found", 422, {"missing": missing})
-
-        run_id = str(uuid.uuid4())
-        run_store[run_id] = {
-            "run_id": run_id,
-            "status": "PENDING",
+        cached = _claim_idempotency(idempotency_key, payload_hash)
+        if cached is not None:
+            return GraphRunResponse.model_validate(cached)
+        try:
+            missing = evidence_store.missing(request.evidence_ids)
+            if missing:
+                _error("MISSING_EVIDENCE", "Evidence IDs not found", 422, {"missing": missing})
+
+            run_id = str(uuid.uuid4())
+            _submit_run(run_id, request.evidence_ids, request.profile_id, request.priority)
+
+            response = GraphRunResponse(run_id=run_id, status="PENDING")
+            idempotency_store.put(idempotency_key, payload_hash, response.model_dump(mode="json"))
+            return response
+        finally:
+            idempotency_store.release(idempotency_key)
+
+    def _ledger_result(location: Dict[str, Any]) -> LedgerEntryResult:
+        entry = ledger.read_entry(location)
+        payload = entry.get("payload") or {}
+        pointers = {
+            key: payload[key]
+            for key in (
+                "source_id",
+                "event_id",
+                "ingest_timestamp",
+                "raw_payload_hash",
+                "raw_payload_hash_old",
+                "raw_payload_hash_new",
+                "decision_code",
+                "classification_features_id",
+                "original_ledger_entry_id",
+            )
+            if key in payload
         }
+        pointers.update(
+            ledger_entry_id=entry.get("entry_id"),
+            prev_hash=entry.get("prev_hash"),
+            entry_hash=entry.get("entry_hash"),
+        )
+        return LedgerEntryResult(
+            entry_id=entry.get("entry_id"),
+            type=entry.get("type"),
+            timestamp=entry.get("timestamp"),
+            batch_id=location.get("batch_id"),
+            location=LedgerLocation(**{k: location[k] for k in ("segment", "byte_offset", "length")}),
+            evidence_pointers=pointers,
+            payload=payload,
+        )
 
-        def _run_graph_task(run_id: str, evidence_ids: List[str]) -> None:
-            run_store[run_id]["status"] = "RUNNING"
-            run_store[run_id]["started_at"] = datetime.now(timezone.utc).isoformat()
-            raw_events = [evidence_store[eid] for eid in evidence_ids if eid in evidence_store]
-            from src.pipeline.graph_pipeline import run_graph_pipeline
-
-            output_dir = f"data/runs/{run_id}"
-            artifacts = run_graph_pipeline(raw_events, output_dir=output_dir, enable_kernel=False)
-            artifact_list: List[Dict[str, Any]] = []
-            for path in artifacts["reports"]:
-                artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "report_md", "path": path})
-            for path in artifacts["ledgers"]:
-                artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "ledger_json", "path": path})
-            for path in artifacts["graphs_html"]:
-                artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "graph_html", "path": path})
-            for path in artifacts.get("snapshots_html", []):
-                artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "snapshot_html", "path": path})
-            for path in artifacts.get("temporal_analyses_json", []):
-                artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "temporal_analysis_json", "path": path})
-            for path in artifacts.get("verification_json", []):
-                artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "verification_json", "path": path})
-            for path in artifacts.get("manifests_json", []):
-                artifact_list.append({"artifact_id": str(uuid.uuid4()), "type": "reproducibility_manifest_json", "path": path})
-            artifact_store[run_id] = artifact_list
-            run_store[run_id]["status"] = "SUCCEEDED"
-            run_store[run_id]["finished_at"] = datetime.now(timezone.utc).isoformat()
-
-        background_tasks.add_task(_run_graph_task, run_id, request.evidence_ids)
-
-        response = GraphRunResponse(run_id=run_id, status="PENDING")
-        idempotency_cache[idempotency_key] = {"payload_hash": payload_hash, "response": response}
-        return response
+    def _require_query_index() -> None:
+        if not ledger_query_index:
+            _error("LEDGER_INDEX_DISABLED", "Ledger query index is disabled (CIX_LEDGER_QUERY_INDEX=0)", 503)
+
+    @app.get("/v1/ledger/entries/{entry_id}", response_model=LedgerEntryResult)
+    def get_ledger_entry(entry_id: str) -> LedgerEntryResult:
+        _require_query_index()
+        matches = ledger.query(limit=1, entry_id=entry_id)
+        if not matches:
+            _error("LEDGER_ENTRY_NOT_FOUND", "Ledger entry not found", 404)
+        return _ledger_result(matches[0])
+
+    @app.get("/v1/ledger/decisions", response_model=LedgerQueryResponse)
+    def query_ledger_decisions(
+        source_id: Optional[str] = None,
+        event_id: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        band: Optional[str] = None,
+        since: Optional[str] = Query(None, description="Inclusive lower bound on entry timestamp (ISO 8601)"),
+        until: Optional[str] = Query(None, description="Exclusive upper bound on entry timestamp (ISO 8601)"),
+        entry_type: Optional[str] = Query(
+            "BAND_DECISION", alias="type", description="Entry type, e.g. BAND_DECISION or EVENT_ID_CONFLICT"
+        ),
+        limit: int = Query(100, ge=1, le=1000),
+    ) -> LedgerQueryResponse:
+        _require_query_index()
+        matches = ledger.query(
+            limit=limit,
+            source_id=source_id,
+            event_id=event_id,
+            batch_id=batch_id,
+            band=band,
+            since=since,
+            until=until,
+            entry_type=entry_type,
+        )
+        results = [_ledger_result(match) for match in matches]
+        return LedgerQueryResponse(count=len(results), results=results)
+
+    @app.get("/v1/ledger/metrics", response_model=LedgerMetricsResponse)
+    def get_ledger_metrics() -> LedgerMetricsResponse:
+        return LedgerMetricsResponse(
+            async_writer=ledger_async,
+            strict_durability=ledger_strict_durability,
+            stage1=ledger.writer_metrics(),
+            kernel=ledger_writer_metrics(),
+        )
 
-    @app.get("/v1/runs/{run_id}", response_model=GraphRunStatus)
-    def get_run(run_id: str) -> GraphRunStatus:
-        run = run_store.get(run_id)
+    @app.get("/v1/ingest/metrics")
+    async def get_ingest_metrics() -> Dict[str, Any]:
+        return {"limiter": limiter.stats(), "executors": offloader.stats()}
+
+    @app.get("/v1/idempotency/metrics")
+    def get_idempotency_metrics() -> Dict[str, Any]:
+        return idempotency_store.stats()
+
+    def _run_or_404(run_id: str) -> Dict[str, Any]:
+        run = run_queue.get(run_id)
         if not run:
             _error("RUN_NOT_FOUND", "Run not found", 404)
-        return GraphRunStatus(**run)
+        return run
+
+    def _run_status(run: Dict[str, Any]) -> GraphRunStatus:
+        return GraphRunStatus(
+            **{key: run[key] for key in ("run_id", "status", "profile_id", "priority", "started_at", "finished_at", "error")},
+            progress=run["progress"],
+        )
+
+    @app.get("/v1/runs/metrics")
+    def get_run_metrics() -> Dict[str, Any]:
+        return {"queue": run_queue.counts(), "workers": run_workers.stats()}
+
+    @app.get("/v1/runs/{run_id}", response_model=GraphRunStatus)
+    def get_run(run_id: str) -> GraphRunStatus:
+        return _run_status(_run_or_404(run_id))
+
+    @app.post("/v1/runs/{run_id}/cancel", response_model=GraphRunStatus)
+    def cancel_run(run_id: str) -> GraphRunStatus:
+        run = _run_or_404(run_id)
+        if run["status"] in FINISHED_STATUSES:
+            _error("RUN_FINISHED", "Run already finished", 409, {"status": run["status"]})
+        return _run_status(run_queue.cancel(run_id))
 
     @app.get("/v1/runs/{run_id}/artifacts", response_model=ArtifactList)
     def get_run_artifacts(run_id: str, response: Response) -> ArtifactList:
-        run = run_store.get(run_id)
-        if not run:
-            _error("RUN_NOT_FOUND", "Run not found", 404)
-        artifacts = artifact_store.get(run_id)
+        run = _run_or_404(run_id)
+        artifacts = run["artifacts"]
         if artifacts is None:
-            if run.get("status") in {"PENDING", "RUNNING"}:
+            if run["status"] in {RUN_PENDING, RUN_RUNNING}:
                 response.status_code = 202
             return ArtifactList(run_id=run_id, artifacts=[])
         return ArtifactList(run_id=run_id, artifacts=[Artifact(**a) for a in artifacts])
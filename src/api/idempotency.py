@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import abc
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+BACKEND_MEMORY = "memory"
+BACKEND_SQLITE = "sqlite"
+IDEMPOTENCY_TTL_SECONDS_DEFAULT = 24 * 3600.0
+IDEMPOTENCY_MAX_ENTRIES_DEFAULT = 10_000
+# The SQLite backend purges expired and excess rows once per this many stores.
+SQLITE_PURGE_EVERY = 64
+SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+# How long a request waits for a concurrent request holding the same key.
+CLAIM_WAIT_SECONDS_DEFAULT = 5.0
+# A claim whose owner never stored a response (crashed worker) is dropped after this.
+CLAIM_LEASE_SECONDS_DEFAULT = 300.0
+CLAIM_POLL_SECONDS = 0.05
+
+HIT = "hit"
+MISS = "miss"
+CONFLICT = "conflict"
+IN_PROGRESS = "in_progress"
+
+# A claimed key without a response yet; encode_response never produces an empty blob.
+PENDING = b""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency (
+    key TEXT PRIMARY KEY,
+    payload_hash TEXT NOT NULL,
+    response BLOB NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+_SCHEMA_INDEX = "CREATE INDEX IF NOT EXISTS idempotency_created ON idempotency (created_at)"
+
+
+def encode_response(response: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(response, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+
+
+def decode_response(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+
+class IdempotencyStore(abc.ABC):
+    """
+    Idempotency-Key records: the payload hash of the first request and its
+    serialized response, kept for ``ttl_seconds`` and at most ``max_entries``
+    keys. ``lookup`` classifies a request as a hit, miss or conflict and counts it;
+    ``claim`` does the same and also reserves a missed key for the caller.
+    """
+
+    backend = ""
+
+    def __init__(
+        self,
+        ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS_DEFAULT,
+        max_entries: int = IDEMPOTENCY_MAX_ENTRIES_DEFAULT,
+        clock: Callable[[], float] = time.time,
+        claim_lease_seconds: float = CLAIM_LEASE_SECONDS_DEFAULT,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl_seconds < 0:
+            raise ValueError("ttl_seconds must be >= 0")
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = int(max_entries)
+        self.claim_lease_seconds = float(claim_lease_seconds)
+        self._clock = clock
+        self._counts_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conflicts = 0
+        self.in_progress = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def lookup(self, key: str, payload_hash: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Return (HIT, response), (MISS, None) or (CONFLICT, None) for ``key``."""
+        record = self._get(key)
+        if record is not None and record[1] == PENDING:
+            record = None
+        return self._classify(record, payload_hash)
+
+    def claim(
+        self, key: str, payload_hash: str, wait_seconds: float = CLAIM_WAIT_SECONDS_DEFAULT
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Like ``lookup``, but a MISS also claims ``key`` with a pending marker, so a
+        concurrent request with the same key (in any process sharing the store)
+        waits up to ``wait_seconds`` for this one's response instead of redoing the
+        work, and gets (IN_PROGRESS, None) if it is still pending. The claimant
+        finishes with ``put`` (or ``release`` when it produced no response).
+        """
+        deadline = time.monotonic() + max(0.0, wait_seconds)
+        while True:
+            record = self._claim(key, payload_hash)
+            if record is None or record[1] != PENDING or record[0] != payload_hash:
+                return self._classify(record, payload_hash)
+            if time.monotonic() >= deadline:
+                with self._counts_lock:
+                    self.in_progress += 1
+                return IN_PROGRESS, None
+            time.sleep(CLAIM_POLL_SECONDS)
+
+    def _classify(
+        self, record: Optional[Tuple[str, bytes]], payload_hash: str
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        if record is None:
+            outcome, response = MISS, None
+        elif record[0] != payload_hash:
+            outcome, response = CONFLICT, None
+        else:
+            outcome, response = HIT, decode_response(record[1])
+        with self._counts_lock:
+            if outcome == HIT:
+                self.hits += 1
+            elif outcome == MISS:
+                self.misses += 1
+            else:
+                self.conflicts += 1
+        return outcome, response
+
+    def put(self, key: str, payload_hash: str, response: Dict[str, Any]) -> bool:
+        """
+        Store the response for ``key``, replacing its pending claim; returns False
+        if another writer stored a response first.
+        """
+        return self._put(key, payload_hash, encode_response(response))
+
+    def release(self, key: str) -> None:
+        """Drop the pending claim on ``key``, if any; stored responses are kept."""
+        self._release(key)
+
+    def _expired(self, created_at: float, now: float, blob: Optional[bytes] = None) -> bool:
+        if blob == PENDING:
+            return now - created_at >= self.claim_lease_seconds
+        return self.ttl_seconds > 0 and now - created_at >= self.ttl_seconds
+
+    def _count(self, evictions: int = 0, expired: int = 0) -> None:
+        with self._counts_lock:
+            self.evictions += evictions
+            self.expired += expired
+
+    def stats(self) -> Dict[str, Any]:
+        entries = len(self)
+        with self._counts_lock:
+            return {
+                "backend": self.backend,
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "conflicts": self.conflicts,
+                "in_progress": self.in_progress,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
+
+    def close(self) -> None:
+        return None
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of records, pending claims included."""
+
+    @abc.abstractmethod
+    def _get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """(payload_hash, blob) of the live record for ``key``; blob is PENDING for a claim."""
+
+    @abc.abstractmethod
+    def _claim(self, key: str, payload_hash: str) -> Optional[Tuple[str, bytes]]:
+        """Atomically insert a pending claim; return None if inserted, else the live record."""
+
+    @abc.abstractmethod
+    def _put(self, key: str, payload_hash: str, blob: bytes) -> bool:
+        """Store ``blob`` unless a response is already stored; a pending claim is replaced."""
+
+    @abc.abstractmethod
+    def _release(self, key: str) -> None:
+        """Delete ``key`` if it only holds a pending claim."""
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Per-process LRU of idempotency records."""
+
+    backend = BACKEND_MEMORY
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, bytes, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _live_entry(self, key: str, now: float) -> Optional[Tuple[str, bytes, float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[2], now, entry[1]):
+            del self._entries[key]
+            if entry[1] != PENDING:
+                self._count(expired=1)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._live_entry(key, self._clock())
+            return None if entry is None else (entry[0], entry[1])
+
+    def _claim(self, key: str, payload_hash: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            now = self._clock()
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                return entry[0], entry[1]
+            evicted = self._insert(key, (payload_hash, PENDING, now))
+        self._count(evictions=evicted)
+        return None
+
+    def _put(self, key: str, payload_hash: str, blob: bytes) -> bool:
+        with self._lock:
+            now = self._clock()
+            current = self._live_entry(key, now)
+            if current is not None and current[1] != PENDING:
+                return False
+            evicted = self._insert(key, (payload_hash, blob, now))
+        self._count(evictions=evicted)
+        return True
+
+    def _insert(self, key: str, entry: Tuple[str, bytes, float]) -> int:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == PENDING:
+                del self._entries[key]
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """
+    Idempotency records in a SQLite file (WAL mode), so they survive restarts
+    and are shared by every worker process pointed at the same path. A claim is
+    an ``INSERT OR IGNORE`` of a pending row, so exactly one worker runs a key's
+    request; the first response stored wins. Eviction is oldest-first and runs
+    every ``SQLITE_PURGE_EVERY`` stores. Hit/miss/conflict counters are per process.
+    """
+
+    backend = BACKEND_SQLITE
+
+    def __init__(self, path: str, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._puts = 0
+        conn = sqlite3.connect(str(self.path), timeout=SQLITE_BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute(_SCHEMA)
+            conn.execute(_SCHEMA_INDEX)
+        self._conn: Optional[sqlite3.Connection] = conn
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._conn is None:
+                return 0
+            return int(self._conn.execute("SELECT COUNT(*) FROM idempotency").fetchone()[0])
+
+    def _get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload_hash, response, created_at FROM idempotency WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or self._expired(float(row[2]), self._clock(), bytes(row[1])):
+            return None
+        return str(row[0]), bytes(row[1])
+
+    def _drop_expired(self, key: str, now: float) -> None:
+        # Expired responses and stale claims (owner died before put) free the key.
+        if self.ttl_seconds > 0:
+            self._conn.execute(
+                "DELETE FROM idempotency WHERE key = ? AND length(response) > 0 AND created_at <= ?",
+                (key, now - self.ttl_seconds),
+            )
+        self._conn.execute(
+            "DELETE FROM idempotency WHERE key = ? AND length(response) = 0 AND created_at <= ?",
+            (key, now - self.claim_lease_seconds),
+        )
+
+    def _claim(self, key: str, payload_hash: str) -> Optional[Tuple[str, bytes]]:
+        now = self._clock()
+        with self._lock:
+            with self._conn:
+                self._drop_expired(key, now)
+                claimed = self._conn.execute(
+                    "INSERT OR IGNORE INTO idempotency (key, payload_hash, response, created_at) VALUES (?, ?, ?, ?)",
+                    (key, payload_hash, sqlite3.Binary(PENDING), now),
+                ).rowcount
+                row = None
+                if claimed != 1:
+                    row = self._conn.execute(
+                        "SELECT payload_hash, response FROM idempotency WHERE key = ?", (key,)
+                    ).fetchone()
+        if row is None:
+            return None
+        return str(row[0]), bytes(row[1])
+
+    def _put(self, key: str, payload_hash: str, blob: bytes) -> bool:
+        now = self._clock()
+        with self._lock:
+            with self._conn:
+                # A live response belongs to the first writer; a pending claim is completed.
+                self._drop_expired(key, now)
+                stored = self._conn.execute(
+                    "UPDATE idempotency SET payload_hash = ?, response = ?, created_at = ? "
+                    "WHERE key = ? AND length(response) = 0",
+                    (payload_hash, sqlite3.Binary(blob), now, key),
+                ).rowcount
+                if stored != 1:
+                    stored = self._conn.execute(
+                        "INSERT OR IGNORE INTO idempotency (key, payload_hash, response, created_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, payload_hash, sqlite3.Binary(blob), now),
+                    ).rowcount
+            self._puts += 1
+            if self._puts % SQLITE_PURGE_EVERY == 0:
+                self._purge(now)
+        return stored == 1
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM idempotency WHERE key = ? AND length(response) = 0", (key,))
+
+    def purge(self) -> None:
+        """Drop expired rows and trim the table to ``max_entries``."""
+        with self._lock:
+            self._purge(self._clock())
+
+    def _purge(self, now: float) -> None:
+        expired = evicted = 0
+        with self._conn:
+            if self.ttl_seconds > 0:
+                expired = self._conn.execute(
+                    "DELETE FROM idempotency WHERE length(response) > 0 AND created_at <= ?", (now - self.ttl_seconds,)
+                ).rowcount
+            self._conn.execute(
+                "DELETE FROM idempotency WHERE length(response) = 0 AND created_at <= ?",
+                (now - self.claim_lease_seconds,),
+            )
+            count = int(self._conn.execute("SELECT COUNT(*) FROM idempotency").fetchone()[0])
+            if count > self.max_entries:
+                evicted = self._conn.execute(
+                    "DELETE FROM idempotency WHERE key IN "
+                    "(SELECT key FROM idempotency ORDER BY created_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+        self._count(evictions=evicted, expired=expired)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_idempotency_store(
+    backend: str = BACKEND_MEMORY,
+    path: Optional[str] = None,
+    ttl_seconds: float = IDEMPOTENCY_TTL_SECONDS_DEFAULT,
+    max_entries: int = IDEMPOTENCY_MAX_ENTRIES_DEFAULT,
+    claim_lease_seconds: float = CLAIM_LEASE_SECONDS_DEFAULT,
+) -> IdempotencyStore:
+    backend = (backend or BACKEND_MEMORY).lower()
+    options = {"ttl_seconds": ttl_seconds, "max_entries": max_entries, "claim_lease_seconds": claim_lease_seconds}
+    if backend == BACKEND_MEMORY:
+        return MemoryIdempotencyStore(**options)
+    if backend == BACKEND_SQLITE:
+        if not path:
+            raise ValueError("The sqlite idempotency backend needs a path")
+        return SQLiteIdempotencyStore(path, **options)
+    raise ValueError(f"Unsupported idempotency backend: {backend}")
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CONTENT_TYPES = {NDJSON_MEDIA_TYPE, "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+ENCODING_IDENTITY = "identity"
+ENCODING_GZIP = "gzip"
+STREAM_MAX_LINE_BYTES_DEFAULT = 1 << 20
+# Upper bound on each piece of inflated output handed to the line splitter.
+GZIP_OUTPUT_CHUNK_DEFAULT = 64 * 1024
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+# (line number, line bytes); the bytes are None for a line over the size limit.
+Line = Tuple[int, Optional[bytes]]
+
+
+class GzipStream:
+    """
+    Incremental gzip decoder that also accepts concatenated gzip members.
+    Output is produced in pieces of at most max_output bytes, so a highly
+    compressed body never inflates into memory at once.
+    """
+
+    def __init__(self, max_output: int = GZIP_OUTPUT_CHUNK_DEFAULT) -> None:
+        if max_output < 1:
+            raise ValueError("max_output must be at least 1")
+        self.max_output = int(max_output)
+        self._decompressor = zlib.decompressobj(_GZIP_WBITS)
+        self._in_member = False
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        """Inflate data lazily; each yielded piece is at most max_output bytes."""
+        full = False
+        while data or full:
+            decompressor = self._decompressor
+            try:
+                piece = decompressor.decompress(data, self.max_output)
+            except zlib.error as exc:
+                raise ValueError(f"Invalid gzip body: {exc}") from exc
+            # A full piece may leave output buffered in zlib even with no input left.
+            full = len(piece) >= self.max_output
+            if decompressor.eof:
+                data = decompressor.unused_data
+                self._decompressor = zlib.decompressobj(_GZIP_WBITS)
+                self._in_member = False
+                full = False
+            else:
+                data = decompressor.unconsumed_tail
+                self._in_member = True
+            if piece:
+                yield piece
+
+    def finish(self) -> None:
+        if self._in_member:
+            raise ValueError("Truncated gzip body")
+
+
+class LineSplitter:
+    """
+    Splits a byte stream into numbered NDJSON lines (1-based, blank lines
+    skipped). A line longer than max_line_bytes is reported once with None
+    instead of being buffered.
+    """
+
+    def __init__(self, max_line_bytes: int = STREAM_MAX_LINE_BYTES_DEFAULT) -> None:
+        if max_line_bytes < 1:
+            raise ValueError("max_line_bytes must be at least 1")
+        self.max_line_bytes = int(max_line_bytes)
+        self.line_no = 0
+        self._buffer = bytearray()
+        self._oversized = False
+
+    def feed(self, data: bytes) -> List[Line]:
+        lines: List[Line] = []
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end < 0:
+                break
+            self._take(data[start:end], lines, complete=True)
+            start = end + 1
+        self._take(data[start:], lines, complete=False)
+        return lines
+
+    def finish(self) -> List[Line]:
+        lines: List[Line] = []
+        self._take(b"", lines, complete=True)
+        return lines
+
+    def _take(self, piece: bytes, lines: List[Line], complete: bool) -> None:
+        if not self._oversized:
+            self._buffer += piece
+            if len(self._buffer) > self.max_line_bytes:
+                self._oversized = True
+                self._buffer.clear()
+                self.line_no += 1
+                lines.append((self.line_no, None))
+        if not complete:
+            return
+        if self._oversized:
+            self._oversized = False
+            return
+        line = bytes(self._buffer).strip()
+        self._buffer.clear()
+        self.line_no += 1
+        if line:
+            lines.append((self.line_no, line))
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterator[bytes],
+    encoding: str = ENCODING_IDENTITY,
+    max_line_bytes: int = STREAM_MAX_LINE_BYTES_DEFAULT,
+) -> AsyncIterator[Line]:
+    """Numbered lines of a (optionally gzip-encoded) NDJSON request body as it arrives."""
+    splitter = LineSplitter(max_line_bytes)
+    inflater = GzipStream() if encoding == ENCODING_GZIP else None
+    async for chunk in chunks:
+        pieces: Iterable[bytes] = inflater.feed(chunk) if inflater is not None else (chunk,)
+        for piece in pieces:
+            for line in splitter.feed(piece):
+                yield line
+    if inflater is not None:
+        inflater.finish()
+    for line in splitter.finish():
+        yield line
+
+
+def ndjson_record(record: Any) -> bytes:
+    return json.dumps(record, default=str, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator reads the request body while the
+    response is sent. Starlette's disconnect listener (used on ASGI servers
+    older than spec 2.4) would consume those request messages itself; here a
+    client disconnect surfaces through the generator's own reads instead. The
+    background task runs even when the stream fails, so it can release resources.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError as exc:
+            raise ClientDisconnect() from exc
+        finally:
+            if self.background is not None:
+                await self.background()
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+INGEST_MAX_CONCURRENCY_DEFAULT = 64
+INGEST_TIMEOUT_SECONDS_DEFAULT = 30.0
+RETRY_AFTER_SECONDS_DEFAULT = 1
+IO_THREADS_DEFAULT = 8
+CPU_WORKERS_DEFAULT = 0
+
+
+class RequestAbandoned(RuntimeError):
+    """Raised by offloaded work that stops because its request already timed out."""
+
+
+class RequestLimiter:
+    """
+    Caps in-flight requests. A request that finds every slot taken is turned
+    away (the API answers 429 with Retry-After) rather than queued behind the
+    others; max_concurrency 0 means unlimited. The counters have no lock:
+    try_acquire and release must both be called on the event loop (e.g. an
+    async BackgroundTask, never a sync one, which Starlette runs in a thread).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = INGEST_MAX_CONCURRENCY_DEFAULT,
+        retry_after: int = RETRY_AFTER_SECONDS_DEFAULT,
+    ) -> None:
+        if max_concurrency < 0:
+            raise ValueError("max_concurrency must be >= 0")
+        self.max_concurrency = int(max_concurrency)
+        self.retry_after = max(1, int(retry_after))
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+class Offloader:
+    """
+    Executors that keep request work off the event loop: a thread pool for
+    blocking ledger, gate and store calls, and, with cpu_workers > 0, a process
+    pool for pure CPU work such as Stage-1 feature extraction. Both are created
+    on first use. ``run`` waits at most ``timeout`` seconds (0 = no limit) for a
+    call; a timed-out call that already started is not interrupted, but one still
+    queued is skipped.
+    """
+
+    def __init__(
+        self,
+        io_threads: int = IO_THREADS_DEFAULT,
+        cpu_workers: int = CPU_WORKERS_DEFAULT,
+        timeout: float = INGEST_TIMEOUT_SECONDS_DEFAULT,
+    ) -> None:
+        if io_threads < 1:
+            raise ValueError("io_threads must be at least 1")
+        if cpu_workers < 0 or timeout < 0:
+            raise ValueError("cpu_workers and timeout must be >= 0")
+        self.io_threads = int(io_threads)
+        self.cpu_workers = int(cpu_workers)
+        self.timeout = float(timeout)
+        self._lock = threading.Lock()
+        self._io: Optional[ThreadPoolExecutor] = None
+        self._cpu: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.timed_out = 0
+
+    def _io_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._io is None:
+                self._io = ThreadPoolExecutor(max_workers=self.io_threads, thread_name_prefix="cix-io")
+            return self._io
+
+    @property
+    def cpu_executor(self) -> Optional[ProcessPoolExecutor]:
+        if not self.cpu_workers:
+            return None
+        with self._lock:
+            if self._cpu is None:
+                self._cpu = ProcessPoolExecutor(max_workers=self.cpu_workers)
+            return self._cpu
+
+    async def run(
+        self, fn: Callable[..., Any], *args: Any, abandoned: Optional[threading.Event] = None, **kwargs: Any
+    ) -> Any:
+        """
+        Run fn on the I/O thread pool; raises asyncio.TimeoutError after ``timeout``
+        seconds and sets ``abandoned``, which running work can check before it
+        commits anything (raising RequestAbandoned).
+        """
+        if abandoned is None:
+            abandoned = threading.Event()
+        call = functools.partial(fn, *args, **kwargs)
+
+        def _call() -> Any:
+            if abandoned.is_set():
+                return None  # timed out while queued: nobody waits for the result
+            return call()
+
+        future = asyncio.get_running_loop().run_in_executor(self._io_executor(), _call)
+        self.submitted += 1
+        if not self.timeout:
+            return await future
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            abandoned.set()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "io_threads": self.io_threads,
+            "cpu_workers": self.cpu_workers,
+            "timeout_seconds": self.timeout,
+            "submitted": self.submitted,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self) -> None:
+        """Wait for running I/O calls (so their ledger writes land), then stop the process pool."""
+        with self._lock:
+            io, cpu = self._io, self._cpu
+            self._io = self._cpu = None
+        if io is not None:
+            io.shutdown(wait=True)
+        if cpu is not None:
+            cpu.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,534 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+RUN_PENDING = "PENDING"
+RUN_RUNNING = "RUNNING"
+RUN_SUCCEEDED = "SUCCEEDED"
+RUN_FAILED = "FAILED"
+RUN_CANCELLED = "CANCELLED"
+FINISHED_STATUSES = (RUN_SUCCEEDED, RUN_FAILED, RUN_CANCELLED)
+
+MODE_PROCESS = "process"
+MODE_THREAD = "thread"
+RUN_WORKERS_DEFAULT = 2
+PROFILE_CONCURRENCY_DEFAULT = 1
+LEASE_SECONDS_DEFAULT = 60.0
+# A run whose lease expires this many times (its worker keeps dying) is failed, not re-queued.
+MAX_ATTEMPTS_DEFAULT = 3
+POLL_INTERVAL_DEFAULT = 0.5
+SUPERVISE_INTERVAL_DEFAULT = 5.0
+# Alerts triaged per Stage-1 chunk in a graph run, so evidence is read and triaged lazily.
+RUN_CHUNK_SIZE_DEFAULT = 10_000
+SQLITE_BUSY_TIMEOUT_SECONDS = 10.0
+# Key for the cap that applies to every profile without its own entry.
+ANY_PROFILE = "*"
+
+# run_graph_pipeline output keys, mapped to the artifact types reported by the API.
+ARTIFACT_TYPES = (
+    ("reports", "report_md"),
+    ("ledgers", "ledger_json"),
+    ("graphs_html", "graph_html"),
+    ("snapshots_html", "snapshot_html"),
+    ("temporal_analyses_json", "temporal_analysis_json"),
+    ("verification_json", "verification_json"),
+    ("manifests_json", "reproducibility_manifest_json"),
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id TEXT NOT NULL UNIQUE,
+        profile_id TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL,
+        evidence_ids TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT,
+        worker_id TEXT,
+        lease_until REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        cancel_requested INTEGER NOT NULL DEFAULT 0,
+        progress TEXT NOT NULL DEFAULT '{}',
+        artifacts TEXT,
+        error TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS runs_pending ON runs (status, priority DESC, seq)",
+)
+_COLUMNS = (
+    "run_id",
+    "profile_id",
+    "priority",
+    "status",
+    "created_at",
+    "started_at",
+    "finished_at",
+    "attempts",
+    "cancel_requested",
+    "progress",
+    "artifacts",
+    "error",
+)
+
+
+class RunCancelled(Exception):
+    """Raised inside a worker when its run was cancelled."""
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def parse_concurrency_limits(spec: str) -> Dict[str, int]:
+    """
+    Per-profile caps on concurrently running graph runs, from e.g.
+    ``"2"`` or ``"1,axoden-cix-1-v0.2.0=3"``; a bare number is the cap for
+    every other profile. 0 means unlimited.
+    """
+    limits = {ANY_PROFILE: PROFILE_CONCURRENCY_DEFAULT}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        profile, sep, value = part.rpartition("=")
+        try:
+            limit = int(value)
+        except ValueError as exc:
+            raise ValueError(f"Invalid run concurrency limit: {part}") from exc
+        if limit < 0:
+            raise ValueError(f"Invalid run concurrency limit: {part}")
+        limits[profile.strip() if sep else ANY_PROFILE] = limit
+    return limits
+
+
+def artifact_records(artifacts: Dict[str, List[str]]) -> List[Dict[str, str]]:
+    return [
+        {"artifact_id": str(uuid.uuid4()), "type": artifact_type, "path": path}
+        for key, artifact_type in ARTIFACT_TYPES
+        for path in artifacts.get(key, [])
+    ]
+
+
+class RunQueue:
+    """
+    Graph runs in a SQLite table (WAL mode) shared by the API and worker
+    processes. Workers claim the highest-priority, oldest pending run whose
+    profile is under its concurrency cap and hold it on a lease that progress
+    updates renew; runs whose lease expires (the worker died) are re-queued,
+    up to ``max_attempts`` claims, after which they are marked FAILED.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = LEASE_SECONDS_DEFAULT,
+        clock: Callable[[], float] = time.time,
+        max_attempts: int = MAX_ATTEMPTS_DEFAULT,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.path = Path(path)
+        self.lease_seconds = float(lease_seconds)
+        self.max_attempts = int(max_attempts)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        # Opened lazily so that read-only use never creates an empty queue file.
+        if self._conn is None and (create or self.path.exists()):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path),
+                timeout=SQLITE_BUSY_TIMEOUT_SECONDS,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def _row(self, row: Optional[Sequence[Any]]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        run = dict(zip(_COLUMNS, row))
+        run["cancel_requested"] = bool(run["cancel_requested"])
+        run["progress"] = json.loads(run["progress"] or "{}")
+        run["artifacts"] = json.loads(run["artifacts"]) if run["artifacts"] is not None else None
+        return run
+
+    def submit(self, run_id: str, evidence_ids: Sequence[str], profile_id: str, priority: int = 0) -> Dict[str, Any]:
+        with self._lock:
+            self._connection(create=True).execute(
+                "INSERT INTO runs (run_id, profile_id, priority, status, evidence_ids, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, profile_id, int(priority), RUN_PENDING, json.dumps(list(evidence_ids)), _utc_now()),
+            )
+        return self.get(run_id)
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._row(row)
+
+    def claim(self, worker_id: str, limits: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """Move the next eligible pending run to RUNNING for ``worker_id``; None if there is none."""
+        limits = limits or {ANY_PROFILE: 0}
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                running = dict(
+                    conn.execute("SELECT profile_id, COUNT(*) FROM runs WHERE status = ? GROUP BY profile_id", (RUN_RUNNING,))
+                )
+                claimed = None
+                for run_id, profile_id, evidence_ids in conn.execute(
+                    "SELECT run_id, profile_id, evidence_ids FROM runs WHERE status = ? ORDER BY priority DESC, seq",
+                    (RUN_PENDING,),
+                ):
+                    limit = limits.get(profile_id, limits.get(ANY_PROFILE, 0))
+                    if limit and running.get(profile_id, 0) >= limit:
+                        continue
+                    claimed = (run_id, evidence_ids)
+                    break
+                if claimed is not None:
+                    conn.execute(
+                        "UPDATE runs SET status = ?, worker_id = ?, lease_until = ?, started_at = ?, "
+                        "attempts = attempts + 1 WHERE run_id = ?",
+                        (RUN_RUNNING, worker_id, self._clock() + self.lease_seconds, _utc_now(), claimed[0]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if claimed is None:
+            return None
+        run = self.get(claimed[0])
+        run["evidence_ids"] = json.loads(claimed[1])
+        return run
+
+    def heartbeat(self, run_id: str, worker_id: str, progress: Optional[Dict[str, Any]] = None) -> bool:
+        """Renew the lease (and record progress); False once the run is cancelled or no longer held."""
+        with self._lock:
+            if progress is not None:
+                self._conn.execute(
+                    "UPDATE runs SET lease_until = ?, progress = ? WHERE run_id = ? AND worker_id = ? AND status = ?",
+                    (self._clock() + self.lease_seconds, json.dumps(progress), run_id, worker_id, RUN_RUNNING),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE runs SET lease_until = ? WHERE run_id = ? AND worker_id = ? AND status = ?",
+                    (self._clock() + self.lease_seconds, run_id, worker_id, RUN_RUNNING),
+                )
+            row = self._conn.execute(
+                "SELECT cancel_requested FROM runs WHERE run_id = ? AND worker_id = ? AND status = ?",
+                (run_id, worker_id, RUN_RUNNING),
+            ).fetchone()
+        return bool(row) and not row[0]
+
+    def _finish(self, run_id: str, worker_id: str, status: str, artifacts: Any = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ?, lease_until = NULL, artifacts = ?, error = ? "
+                "WHERE run_id = ? AND worker_id = ? AND status = ?",
+                (
+                    status,
+                    _utc_now(),
+                    json.dumps(artifacts) if artifacts is not None else None,
+                    error,
+                    run_id,
+                    worker_id,
+                    RUN_RUNNING,
+                ),
+            )
+
+    def succeed(self, run_id: str, worker_id: str, artifacts: List[Dict[str, Any]]) -> None:
+        self._finish(run_id, worker_id, RUN_SUCCEEDED, artifacts=artifacts)
+
+    def fail(self, run_id: str, worker_id: str, error: str) -> None:
+        self._finish(run_id, worker_id, RUN_FAILED, error=error)
+
+    def cancelled(self, run_id: str, worker_id: str) -> None:
+        self._finish(run_id, worker_id, RUN_CANCELLED)
+
+    def cancel(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancel a run: pending runs stop immediately, running ones are flagged
+        and stop at the worker's next progress update. Finished runs are unchanged.
+        """
+        with self._lock:
+            if self._connection() is None:
+                return None
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ? AND status = ?",
+                (RUN_CANCELLED, _utc_now(), run_id, RUN_PENDING),
+            )
+            self._conn.execute(
+                "UPDATE runs SET cancel_requested = 1 WHERE run_id = ? AND status = ?", (run_id, RUN_RUNNING)
+            )
+        return self.get(run_id)
+
+    def requeue_expired(self) -> int:
+        """
+        Put runs whose worker stopped renewing its lease back in the queue; runs
+        that already used ``max_attempts`` claims are failed instead. Returns the
+        number of runs re-queued.
+        """
+        now = self._clock()
+        with self._lock:
+            if self._connection() is None:
+                return 0
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE runs SET status = ?, worker_id = NULL, lease_until = NULL, finished_at = ? "
+                    "WHERE status = ? AND lease_until < ? AND cancel_requested",
+                    (RUN_CANCELLED, _utc_now(), RUN_RUNNING, now),
+                )
+                self._conn.execute(
+                    "UPDATE runs SET status = ?, worker_id = NULL, lease_until = NULL, finished_at = ?, "
+                    "error = 'Run abandoned after ' || attempts || ' attempts: worker lease expired' "
+                    "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                    (RUN_FAILED, _utc_now(), RUN_RUNNING, now, self.max_attempts),
+                )
+                requeued = self._conn.execute(
+                    "UPDATE runs SET status = ?, worker_id = NULL, lease_until = NULL "
+                    "WHERE status = ? AND lease_until < ?",
+                    (RUN_PENDING, RUN_RUNNING, now),
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return requeued
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            if self._connection() is None:
+                return {}
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM runs GROUP BY status"))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def execute_run(
+    queue: RunQueue,
+    run: Dict[str, Any],
+    worker_id: str,
+    evidence_store: Any,
+    output_root: str,
+    chunk_size: int = RUN_CHUNK_SIZE_DEFAULT,
+) -> str:
+    """
+    Run one claimed graph run to completion and record the outcome; returns the
+    final status. Evidence is streamed from the store and triaged chunk_size
+    alerts at a time, so only Stage-1 survivors are held in memory (chunk_size
+    0 triages the whole run as one batch and loads every payload).
+    """
+    from src.pipeline import graph_pipeline
+
+    run_id = run["run_id"]
+    stop = threading.Event()
+
+    def _renew() -> None:
+        # Keeps the lease alive through long stages that report no progress.
+        while not stop.wait(queue.lease_seconds / 3):
+            queue.heartbeat(run_id, worker_id)
+
+    def _progress(stage: str, details: Dict[str, Any]) -> None:
+        if not queue.heartbeat(run_id, worker_id, {"stage": stage, **details}):
+            raise RunCancelled(run_id)
+
+    renewer = threading.Thread(target=_renew, name=f"cix-run-lease-{run_id}", daemon=True)
+    renewer.start()
+    try:
+        _progress("started", {"events": len(run["evidence_ids"])})
+        artifacts = graph_pipeline.run_graph_pipeline(
+            evidence_store.iter_payloads(run["evidence_ids"]),
+            output_dir=str(Path(output_root) / run_id),
+            enable_kernel=False,
+            chunk_size=chunk_size,
+            progress=_progress,
+        )
+    except RunCancelled:
+        queue.cancelled(run_id, worker_id)
+        return RUN_CANCELLED
+    except Exception:
+        queue.fail(run_id, worker_id, traceback.format_exc(limit=5))
+        return RUN_FAILED
+    finally:
+        stop.set()
+        renewer.join()
+    queue.succeed(run_id, worker_id, artifact_records(artifacts))
+    return RUN_SUCCEEDED
+
+
+def worker_loop(config: Dict[str, Any], stop_event: Any) -> None:
+    """Claim and execute runs until ``stop_event`` is set."""
+    from src.kernel.evidence_store import EvidenceStore
+
+    worker_id = config.get("worker_id") or f"{os.getpid()}-{threading.get_ident()}"
+    queue = RunQueue(
+        config["queue_path"],
+        lease_seconds=config.get("lease_seconds", LEASE_SECONDS_DEFAULT),
+        max_attempts=config.get("max_attempts", MAX_ATTEMPTS_DEFAULT),
+    )
+    evidence_store = EvidenceStore(config["evidence_dir"])
+    poll_interval = config.get("poll_interval", POLL_INTERVAL_DEFAULT)
+    try:
+        while not stop_event.is_set():
+            queue.requeue_expired()
+            run = queue.claim(worker_id, config.get("limits"))
+            if run is None:
+                stop_event.wait(poll_interval)
+                continue
+            execute_run(
+                queue,
+                run,
+                worker_id,
+                evidence_store,
+                config["output_root"],
+                chunk_size=config.get("chunk_size", RUN_CHUNK_SIZE_DEFAULT),
+            )
+    finally:
+        evidence_store.close()
+        queue.close()
+
+
+class RunWorkerPool:
+    """
+    ``workers`` graph-run workers consuming a RunQueue, as separate processes
+    (default) or as threads of the current process (``mode="thread"``). A
+    supervisor thread replaces exited workers every ``supervise_interval``
+    seconds, so queued runs do not wait for the next submit to get a worker.
+    """
+
+    def __init__(
+        self,
+        queue_path: str,
+        evidence_dir: str,
+        output_root: str,
+        workers: int = RUN_WORKERS_DEFAULT,
+        limits: Optional[Dict[str, int]] = None,
+        mode: str = MODE_PROCESS,
+        lease_seconds: float = LEASE_SECONDS_DEFAULT,
+        poll_interval: float = POLL_INTERVAL_DEFAULT,
+        max_attempts: int = MAX_ATTEMPTS_DEFAULT,
+        supervise_interval: float = SUPERVISE_INTERVAL_DEFAULT,
+        chunk_size: int = RUN_CHUNK_SIZE_DEFAULT,
+    ) -> None:
+        if workers < 0:
+            raise ValueError("workers must be >= 0")
+        if mode not in {MODE_PROCESS, MODE_THREAD}:
+            raise ValueError(f"Unsupported run worker mode: {mode}")
+        self.workers = int(workers)
+        self.mode = mode
+        self._config = {
+            "queue_path": str(queue_path),
+            "evidence_dir": str(evidence_dir),
+            "output_root": str(output_root),
+            "limits": dict(limits or parse_concurrency_limits("")),
+            "lease_seconds": float(lease_seconds),
+            "poll_interval": float(poll_interval),
+            "max_attempts": int(max_attempts),
+            "chunk_size": max(0, int(chunk_size)),
+        }
+        self.supervise_interval = float(supervise_interval)
+        self._lock = threading.Lock()
+        self._workers: List[Any] = []
+        self._stop_event: Any = None
+        self._supervisor: Optional[threading.Thread] = None
+        self._supervisor_stop = threading.Event()
+        self.restarts = 0
+
+    def _spawn(self, index: int) -> Any:
+        config = dict(self._config, worker_id=f"{os.getpid()}-{self.mode}-{index}")
+        if self.mode == MODE_THREAD:
+            worker = threading.Thread(
+                target=worker_loop, args=(config, self._stop_event), name=f"cix-run-worker-{index}", daemon=True
+            )
+        else:
+            context = multiprocessing.get_context("spawn")
+            worker = context.Process(
+                target=worker_loop, args=(config, self._stop_event), name=f"cix-run-worker-{index}", daemon=True
+            )
+        worker.start()
+        return worker
+
+    def start(self) -> None:
+        with self._lock:
+            if self._workers or not self.workers:
+                return
+            if self.mode == MODE_THREAD:
+                self._stop_event = threading.Event()
+            else:
+                self._stop_event = multiprocessing.get_context("spawn").Event()
+            self._workers = [self._spawn(index) for index in range(self.workers)]
+            self._supervisor_stop.clear()
+            self._supervisor = threading.Thread(target=self._supervise, name="cix-run-supervisor", daemon=True)
+            self._supervisor.start()
+
+    def _supervise(self) -> None:
+        while not self._supervisor_stop.wait(self.supervise_interval):
+            self.ensure_running()
+
+    def ensure_running(self) -> None:
+        """Replace workers that have exited (e.g. a crashed process)."""
+        with self._lock:
+            if self._stop_event is None or self._stop_event.is_set():
+                return
+            for index, worker in enumerate(self._workers):
+                if not worker.is_alive():
+                    self._workers[index] = self._spawn(index)
+                    self.restarts += 1
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._supervisor_stop.set()
+        supervisor, self._supervisor = self._supervisor, None
+        if supervisor is not None:
+            supervisor.join(timeout)
+        with self._lock:
+            if self._stop_event is None:
+                return
+            self._stop_event.set()
+            for worker in self._workers:
+                worker.join(timeout)
+                if worker.is_alive() and self.mode == MODE_PROCESS:
+                    worker.terminate()
+                    worker.join(timeout)
+            self._workers = []
+            self._stop_event = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "alive": sum(1 for worker in self._workers if worker.is_alive()),
+                "restarts": self.restarts,
+                "limits": dict(self._config["limits"]),
+            }
@@ -7,6 +7,7 @@ import ipaddress
 from google import genai
 from dotenv import load_dotenv
 from src.canon_registry import vsr_drift, mq_m1, mq_m4, MQ_TAU_D, efi_surplus
+from src.markers import CORROBORATION_MATCHER
 
 load_dotenv()
 
@@ -33,7 +34,6 @@ class EnrichmentAgent:
         return ip_addr in {"168.63.129.16"}
 
     def _ip_has_attack_corroboration(self, graph: nx.DiGraph, ip_node_id: str) -> bool:
-        suspicious_tokens = ("powershell", "wscript", "cscript", "encodedcommand", " -enc")
         corroborating_techniques = ("MITRE:T1059", "MITRE:T1071", "MITRE:T1105", "MITRE:T1021")
 
         for upstream in graph.predecessors(ip_node_id):
@@ -47,7 +47,7 @@ class EnrichmentAgent:
                 if rel in {"OBSERVED_COMMAND", "OBSERVED_PROCESS"}:
                     dst_attrs = graph.nodes[dst] if dst in graph else {}
                     text = str(dst_attrs.get("value") or dst).lower()
-                    if any(token in text for token in suspicious_tokens):
+                    if CORROBORATION_MATCHER.search(text):
                         return True
                 if rel == "HAS_FILE_HASH":
                     for _, efi_dst, efi_edge in graph.out_edges(dst, data=True):
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.ingest.siem_formats import parse_cef, parse_leef, parse_syslog
+from src.kernel.hashing import canonical_json, sha256_hex
+
+FORMAT_CEF = "cef"
+FORMAT_LEEF = "leef"
+FORMAT_SYSLOG = "syslog"
+FORMAT_JSON = "json"
+
+BULK_CHUNK_LINES = 4096
+DEFAULT_SOURCE_TIMESTAMP = "1970-01-01T00:00:00Z"
+
+_JSON_SOURCE_KEYS = (
+    "source_id",
+    "SourceName",
+    "SourceModuleName",
+    "ProviderName",
+    "Provider",
+    "Channel",
+    "host",
+    "Hostname",
+)
+# Prefer record-level identifiers to avoid collisions (EventID is a Windows event code).
+_JSON_EVENT_ID_KEYS = ("event_id", "eventId", "RecordNumber", "EventRecordID", "EventID", "id")
+_JSON_TIMESTAMP_KEYS = ("source_timestamp", "EventTime", "@timestamp", "EventReceivedTime", "timestamp", "TimeCreated")
+
+
+def detect_format(line: str) -> Optional[str]:
+    """Classify one line by its prefix: CEF:, LEEF:, <PRI> (syslog) or { (JSON)."""
+    if line.startswith("CEF:"):
+        return FORMAT_CEF
+    if line.startswith("LEEF:"):
+        return FORMAT_LEEF
+    if line.startswith("{"):
+        return FORMAT_JSON
+    if line.startswith("<"):
+        close = line.find(">", 1, 5)
+        if close > 1 and line[1:close].isdigit():
+            return FORMAT_SYSLOG
+    return None
+
+
+def _pick_first(obj: Dict[str, Any], keys: Iterable[str]) -> Any:
+    for key in keys:
+        value = obj.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _json_envelope(line: str, source_id: Optional[str]) -> Dict[str, Any]:
+    event = json.loads(line)
+    if not isinstance(event, dict):
+        raise ValueError("Expected JSON object")
+    event_id = _pick_first(event, _JSON_EVENT_ID_KEYS)
+    if event_id is None:
+        event_id = sha256_hex(canonical_json(event))[:16]
+    return {
+        "source_id": str(source_id or _pick_first(event, _JSON_SOURCE_KEYS) or "unknown-source"),
+        "event_id": str(event_id),
+        "source_timestamp": str(_pick_first(event, _JSON_TIMESTAMP_KEYS) or DEFAULT_SOURCE_TIMESTAMP),
+        "raw_payload": event,
+    }
+
+
+def _text_envelope(line: str, fmt: str, source_id: Optional[str]) -> Dict[str, Any]:
+    if fmt == FORMAT_CEF:
+        parsed = parse_cef(line)
+        ext = parsed["extension"]
+        source = ext.get("dvchost") or ext.get("dvc") or parsed["device_product"]
+        event_id = ext.get("externalId")
+        timestamp = ext.get("rt") or ext.get("end") or ext.get("start")
+    elif fmt == FORMAT_LEEF:
+        parsed = parse_leef(line)
+        ext = parsed["extension"]
+        source = ext.get("identHostName") or ext.get("devName") or parsed["product"]
+        event_id = ext.get("externalId")
+        timestamp = ext.get("devTime")
+    else:
+        parsed = parse_syslog(line)
+        source = parsed.get("hostname")
+        event_id = None  # MSGID names a message type, not a record
+        timestamp = parsed.get("timestamp")
+    return {
+        "source_id": str(source_id or source or "unknown-source"),
+        "event_id": str(event_id or sha256_hex(line)[:16]),
+        "source_timestamp": str(timestamp or DEFAULT_SOURCE_TIMESTAMP),
+        "format": fmt,
+        "raw_payload": line,
+        # Stage-1 skips re-parsing envelopes that already carry parsed_payload.
+        "parsed_payload": parsed,
+    }
+
+
+def parse_line(line: str, source_id: Optional[str] = None) -> Dict[str, Any]:
+    """Build the Stage-1 ingest envelope for one raw line. Raises ValueError if it cannot be parsed."""
+    fmt = detect_format(line)
+    if fmt is None:
+        raise ValueError("Unrecognized line format")
+    if fmt == FORMAT_JSON:
+        return _json_envelope(line, source_id)
+    return _text_envelope(line, fmt, source_id)
+
+
+def _parse_chunk(
+    task: Tuple[int, List[str], Optional[str]]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    first_line_no, lines, source_id = task
+    envelopes: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for line_no, raw in enumerate(lines, start=first_line_no):
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            envelopes.append(parse_line(line, source_id))
+        except ValueError as exc:  # json.JSONDecodeError is a ValueError
+            errors.append({"line": line_no, "error": str(exc)})
+    return envelopes, errors
+
+
+def _chunks(lines: Iterable[str], chunk_lines: int, source_id: Optional[str]) -> Iterator[Tuple[int, List[str], Optional[str]]]:
+    chunk: List[str] = []
+    first = 1
+    for line_no, line in enumerate(lines, start=1):
+        if not chunk:
+            first = line_no
+        chunk.append(line)
+        if len(chunk) >= chunk_lines:
+            yield first, chunk, source_id
+            chunk = []
+    if chunk:
+        yield first, chunk, source_id
+
+
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+_process_pools_lock = threading.Lock()
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    with _process_pools_lock:
+        pool = _process_pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            _process_pools[workers] = pool
+        return pool
+
+
+def iter_envelopes(
+    lines: Iterable[str],
+    source_id: Optional[str] = None,
+    workers: int = 0,
+    chunk_lines: int = BULK_CHUNK_LINES,
+    errors: Optional[List[Dict[str, Any]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream Stage-1 envelopes for mixed CEF / LEEF / syslog / JSON lines, in input order.
+    With workers > 1, chunks of chunk_lines are parsed in a process pool (at most
+    2 * workers chunks in flight). Unparseable lines are skipped and appended to
+    errors as {"line": n, "error": message} when a list is given.
+    """
+    chunks = _chunks(lines, max(1, chunk_lines), source_id)
+    if workers <= 1:
+        results: Iterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = map(_parse_chunk, chunks)
+    else:
+        results = _pool_results(_process_pool(workers), chunks, 2 * workers)
+    for envelopes, chunk_errors in results:
+        if errors is not None:
+            errors.extend(chunk_errors)
+        yield from envelopes
+
+
+def _pool_results(pool: ProcessPoolExecutor, chunks: Iterator[Any], window: int) -> Iterator[Any]:
+    pending = []
+    for chunk in chunks:
+        pending.append(pool.submit(_parse_chunk, chunk))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def read_lines(source: Union[str, Path, IO[bytes]]) -> Iterator[str]:
+    """Decode a file path or binary stream line by line (undecodable bytes are dropped)."""
+    if isinstance(source, (str, Path)):
+        with Path(source).open("rb") as handle:
+            yield from read_lines(handle)
+        return
+    for raw in source:
+        yield raw.decode("utf-8", errors="ignore")
@@ -1,8 +1,28 @@
 from __future__ import annotations
 
+import base64
 import hashlib
 import json
-from typing import Any, Dict, List, Optional, Set, Tuple
+import math
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.kernel.feature_cache import FeatureCache
+from src.kernel.hashing import DEFAULT_SEPARATORS, canonical_bytes, sha256_hex
+
+KEY_CONTENT = "content"
+KEY_SEMANTIC = "semantic"
+
+DEDUP_WINDOW_ENTRIES_DEFAULT = 100_000
+BLOOM_ERROR_RATE_DEFAULT = 0.001
+BLOOM_MAX_FILTERS_DEFAULT = 8
+DEDUP_STATE_VERSION = 1
+DEDUP_CLAIM_WAIT_SECONDS_DEFAULT = 5.0
 
 
 DEFAULT_EXCLUDE_FIELDS = [
@@ -20,20 +40,32 @@ DEFAULT_EXCLUDE_FIELDS = [
 ]
 
 
-def compute_event_hash(event: Dict[str, Any], exclude_fields: Optional[List[str]] = None) -> str:
+def compute_event_hash(
+    event: Dict[str, Any],
+    exclude_fields: Optional[List[str]] = None,
+    feature_cache: Optional[FeatureCache] = None,
+) -> str:
     """
     Compute stable content hash for an event by excluding volatile identifiers.
     Mirrors axoden-sfa content hash semantics.
+    For normalized {"eventId", "data"} events the hash depends only on the
+    payload, so it is memoized in feature_cache when one is given.
     """
     if exclude_fields is None:
         exclude_fields = DEFAULT_EXCLUDE_FIELDS
+        if feature_cache is not None and event.keys() - set(exclude_fields) == {"data"}:
+            payload = event["data"]
+            return feature_cache.get(payload, "event_hash", lambda: _filtered_hash({"data": payload}))
+
+    return _filtered_hash({k: v for k, v in event.items() if k not in exclude_fields})
 
-    filtered = {k: v for k, v in event.items() if k not in exclude_fields}
+
+def _filtered_hash(filtered: Dict[str, Any]) -> str:
     try:
-        content = json.dumps(filtered, sort_keys=True, default=str)
+        content = canonical_bytes(filtered, ensure_ascii=True, separators=DEFAULT_SEPARATORS, default=str)
     except Exception:
-        content = str(sorted(filtered.items()))
-    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+        content = str(sorted(filtered.items())).encode("utf-8")
+    return sha256_hex(content)
 
 
 def deduplicate_events(
@@ -59,3 +91,344 @@ def deduplicate_events(
         deduped.append(event)
 
     return deduped, duplicates_removed
+
+
+def content_key(event: Dict[str, Any]) -> Optional[str]:
+    """Dedup key: content hash without volatile identifiers (see compute_event_hash)."""
+    return compute_event_hash(event)
+
+
+def semantic_key(alert: Dict[str, Any]) -> Optional[str]:
+    """
+    Dedup key: (EventID, process image) of a graph-ready alert.
+    Alerts without an event id return None and are never treated as duplicates.
+    """
+    raw_event = alert.get("raw_payload") or alert.get("raw_event") or {}
+    data = alert.get("data", {}) if isinstance(alert, dict) else {}
+    event_id = raw_event.get("EventID") or raw_event.get("eventId") or alert.get("eventId")
+    if not event_id:
+        return None
+    process_image = (
+        raw_event.get("Image")
+        or raw_event.get("ProcessName")
+        or raw_event.get("New Process Name")
+        or data.get("process_image")
+    )
+    return json.dumps([event_id, process_image], default=str)
+
+
+KEY_FUNCTIONS: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+    KEY_CONTENT: content_key,
+    KEY_SEMANTIC: semantic_key,
+}
+
+
+def _bloom_hashes(key: str) -> Tuple[int, int]:
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class _BloomSlice:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hashes = max(1, int(round(self.bits / self.capacity * math.log(2))))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, h1: int, h2: int):
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, h1: int, h2: int) -> None:
+        for pos in self._positions(h1, h2):
+            self.array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def contains(self, h1: int, h2: int) -> bool:
+        return all(self.array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(h1, h2))
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that adds a slice when the current one is full.
+    Slices double in capacity with halved error rates (total false-positive
+    rate stays under error_rate) up to max_filters; beyond that the oldest
+    slice is dropped for a fresh one, so memory and horizon are bounded.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int,
+        error_rate: float = BLOOM_ERROR_RATE_DEFAULT,
+        max_filters: int = BLOOM_MAX_FILTERS_DEFAULT,
+    ) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.initial_capacity = max(1, int(initial_capacity))
+        self.error_rate = error_rate
+        self.max_filters = max(1, int(max_filters))
+        self._slices: List[_BloomSlice] = []
+
+    def add(self, key: str) -> None:
+        h1, h2 = _bloom_hashes(key)
+        if not self._slices or self._slices[-1].count >= self._slices[-1].capacity:
+            self._grow()
+        self._slices[-1].add(h1, h2)
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = _bloom_hashes(key)
+        return any(bloom.contains(h1, h2) for bloom in reversed(self._slices))
+
+    def _grow(self) -> None:
+        if not self._slices:
+            self._slices.append(_BloomSlice(self.initial_capacity, self.error_rate / 2))
+            return
+        last = self._slices[-1]
+        if len(self._slices) < self.max_filters:
+            self._slices.append(_BloomSlice(last.capacity * 2, last.error_rate / 2))
+            return
+        # At the slice limit: recycle the oldest slice's budget for a fresh one.
+        self._slices.pop(0)
+        self._slices.append(_BloomSlice(last.capacity, last.error_rate))
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(bloom.array) for bloom in self._slices)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "slices": [
+                {
+                    "capacity": bloom.capacity,
+                    "error_rate": bloom.error_rate,
+                    "count": bloom.count,
+                    "bits": base64.b64encode(zlib.compress(bytes(bloom.array))).decode("ascii"),
+                }
+                for bloom in self._slices
+            ]
+        }
+
+    def load_dict(self, state: Dict[str, Any]) -> None:
+        slices = []
+        for record in state.get("slices", [])[-self.max_filters :]:
+            bloom = _BloomSlice(record["capacity"], record["error_rate"])
+            array = zlib.decompress(base64.b64decode(record["bits"]))
+            if len(array) != len(bloom.array):
+                return  # geometry changed; start empty
+            bloom.array = bytearray(array)
+            bloom.count = int(record["count"])
+            slices.append(bloom)
+        self._slices = slices
+
+
+class SlidingWindowDeduplicator:
+    """
+    Deduplicate keys over a sliding window that spans batches.
+
+    Recent keys are kept in an LRU set bounded by max_entries and, when
+    window_seconds > 0, by the time since a key was last seen. With
+    bloom_capacity > 0, keys leaving the window are added to a
+    ScalableBloomFilter so repeats are still caught over a longer horizon
+    (at up to bloom_error_rate false positives). When state_path is set the
+    window is reloaded on construction and rewritten by save() (and after
+    every checkpoint_every new keys).
+
+    seen() records a key at once. Callers that may still fail after the check
+    use claim(): new keys are held as pending, outside the window, until
+    commit() records them or release() drops them. A batch whose keys overlap
+    another batch's pending keys waits for that batch rather than dropping its
+    events as duplicates of entries that may never be written.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEDUP_WINDOW_ENTRIES_DEFAULT,
+        window_seconds: float = 0.0,
+        bloom_capacity: int = 0,
+        bloom_error_rate: float = BLOOM_ERROR_RATE_DEFAULT,
+        bloom_max_filters: int = BLOOM_MAX_FILTERS_DEFAULT,
+        key_fn: Callable[[Dict[str, Any]], Optional[str]] = content_key,
+        state_path: Optional[str] = None,
+        checkpoint_every: int = 0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = int(max_entries)
+        self.window_seconds = float(window_seconds or 0.0)
+        self.key_fn = key_fn
+        self.state_path = Path(state_path) if state_path else None
+        self.checkpoint_every = int(checkpoint_every)
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._claims_changed = threading.Condition(self._lock)
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        self._pending: Set[str] = set()
+        self._bloom = (
+            ScalableBloomFilter(bloom_capacity, bloom_error_rate, bloom_max_filters) if bloom_capacity > 0 else None
+        )
+        self._unsaved = 0
+        self.checked = 0
+        self.duplicates = 0
+        if self.state_path and self.state_path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def seen(self, key: Optional[str]) -> bool:
+        """Record key and return True if it was already inside the window (None is never a duplicate)."""
+        if key is None:
+            return False
+        now = self._clock()
+        with self._lock:
+            self.checked += 1
+            self._expire(now)
+            if key in self._recent:
+                duplicate = True
+                self._recent.move_to_end(key)
+            else:
+                duplicate = self._bloom is not None and key in self._bloom
+                self._unsaved += 1
+            self._recent[key] = now
+            while len(self._recent) > self.max_entries:
+                self._evict()
+            if duplicate:
+                self.duplicates += 1
+            checkpoint = self.checkpoint_every > 0 and self._unsaved >= self.checkpoint_every
+        if checkpoint:
+            self.save()
+        return duplicate
+
+    def claim(
+        self, keys: Sequence[Optional[str]], wait_seconds: float = DEDUP_CLAIM_WAIT_SECONDS_DEFAULT
+    ) -> Optional[List[bool]]:
+        """
+        Check keys for one uncommitted batch and hold its new keys as pending.
+        Returns a duplicate flag per key (True if inside the window or earlier in
+        keys; None keys are never duplicates). While any key is pending for
+        another batch this waits up to wait_seconds for it to commit or release,
+        then returns None without claiming anything.
+        """
+        deadline = time.monotonic() + max(0.0, wait_seconds)
+        with self._claims_changed:
+            while any(key in self._pending for key in keys if key is not None):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._claims_changed.wait(remaining)
+            now = self._clock()
+            self._expire(now)
+            claimed: Set[str] = set()
+            flags = []
+            for key in keys:
+                if key is None:
+                    flags.append(False)
+                    continue
+                self.checked += 1
+                if key in claimed:
+                    duplicate = True
+                elif key in self._recent:
+                    duplicate = True
+                    self._recent.move_to_end(key)
+                    self._recent[key] = now
+                elif self._bloom is not None and key in self._bloom:
+                    duplicate = True
+                    self._recent[key] = now
+                else:
+                    duplicate = False
+                    claimed.add(key)
+                if duplicate:
+                    self.duplicates += 1
+                flags.append(duplicate)
+            while len(self._recent) > self.max_entries:
+                self._evict()
+            self._pending |= claimed
+            return flags
+
+    def commit(self, keys: Iterable[Optional[str]]) -> None:
+        """Record claimed keys in the window once their batch is written."""
+        now = self._clock()
+        with self._claims_changed:
+            for key in keys:
+                if key is None or key not in self._pending:
+                    continue
+                self._pending.discard(key)
+                self._recent[key] = now
+                self._unsaved += 1
+            while len(self._recent) > self.max_entries:
+                self._evict()
+            self._claims_changed.notify_all()
+            checkpoint = self.checkpoint_every > 0 and self._unsaved >= self.checkpoint_every
+        if checkpoint:
+            self.save()
+
+    def release(self, keys: Iterable[Optional[str]]) -> None:
+        """Drop claimed keys of a batch that failed, so a retry sees them as new."""
+        with self._claims_changed:
+            for key in keys:
+                self._pending.discard(key)
+            self._claims_changed.notify_all()
+
+    def is_duplicate(self, event: Dict[str, Any]) -> bool:
+        return self.seen(self.key_fn(event))
+
+    def filter(self, events: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Return (events not seen within the window, duplicates_removed), preserving order."""
+        kept = [event for event in events if not self.is_duplicate(event)]
+        return kept, len(events) - len(kept)
+
+    def _evict(self) -> None:
+        key, _ = self._recent.popitem(last=False)
+        if self._bloom is not None:
+            self._bloom.add(key)
+
+    def _expire(self, now: float) -> None:
+        if self.window_seconds <= 0:
+            return
+        cutoff = now - self.window_seconds
+        while self._recent:
+            oldest = next(iter(self._recent.values()))
+            if oldest >= cutoff:
+                break
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._recent),
+                "pending": len(self._pending),
+                "max_entries": self.max_entries,
+                "window_seconds": self.window_seconds,
+                "checked": self.checked,
+                "duplicates": self.duplicates,
+                "bloom_bytes": self._bloom.size_bytes if self._bloom is not None else 0,
+            }
+
+    def save(self) -> None:
+        if not self.state_path:
+            return
+        with self._lock:
+            state = {
+                "version": DEDUP_STATE_VERSION,
+                "recent": list(self._recent.items()),
+                "bloom": self._bloom.to_dict() if self._bloom is not None else None,
+            }
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+            tmp_path.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp_path, self.state_path)
+            self._unsaved = 0
+
+    def _load(self) -> None:
+        state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        if state.get("version") != DEDUP_STATE_VERSION:
+            return
+        if self._bloom is not None and state.get("bloom"):
+            self._bloom.load_dict(state["bloom"])
+        for key, last_seen in state.get("recent", []):
+            self._recent[key] = float(last_seen)
+        while len(self._recent) > self.max_entries:
+            self._evict()
+        self._expire(self._clock())
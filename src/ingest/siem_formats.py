@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional
 
 
 CEF_HEADER_RE = re.compile(r"^CEF:(?P<version>\d+)\|(?P<vendor>[^|]*)\|(?P<product>[^|]*)\|(?P<prod_version>[^|]*)\|(?P<signature_id>[^|]*)\|(?P<name>[^|]*)\|(?P<severity>[^|]*)\|(.*)$")
@@ -28,61 +28,78 @@ RFC3164_RE = re.compile(
 )
 
 
-def _parse_kv_pairs(text: str, sep: str = " ") -> Dict[str, str]:
-    pairs = {}
+# CEF extension keys are unescaped "key=" tokens at the start or after a space;
+# values run (spaces included) up to the next key. The leading literal space lets
+# the regex engine skip ahead with a fast character search.
+CEF_EXTENSION_KEY_RE = re.compile(r" ([\w.\[\]-]+)=")
+_CEF_FIRST_KEY_RE = re.compile(r"([\w.\[\]-]+)=")
+_CEF_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_CEF_ESCAPES = {"n": "\n", "r": "\r"}
+LEEF_DELIMITER_RE = re.compile(r"0?[xX]([0-9A-Fa-f]{1,4})")
+
+
+def _cef_unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _CEF_ESCAPE_RE.sub(lambda m: _CEF_ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def _escaped(text: str, pos: int) -> bool:
+    """True when text[pos] is preceded by an odd run of backslashes."""
+    run = 0
+    pos -= 1
+    while pos >= 0 and text[pos] == "\\":
+        run += 1
+        pos -= 1
+    return run % 2 == 1
+
+
+def _parse_cef_extension(text: str) -> Dict[str, str]:
+    """
+    Parse CEF extension key=value pairs. Keys are located with one regex scan and
+    values are sliced between them, so long values (e.g. msg= payloads) cost one
+    slice each. Escapes \\=, \\\\, \\| and \\n / \\r are decoded.
+    """
+    pairs: Dict[str, str] = {}
     if not text:
         return pairs
+    keys = [m for m in CEF_EXTENSION_KEY_RE.finditer(text) if not _escaped(text, m.start())]
+    first = _CEF_FIRST_KEY_RE.match(text)
+    if first is not None:
+        keys.insert(0, first)
+    for idx, match in enumerate(keys):
+        end = keys[idx + 1].start() if idx + 1 < len(keys) else len(text)
+        pairs[match.group(1)] = _cef_unescape(text[match.end() : end].strip())
+    return pairs
 
-    if sep == "\t":
-        parts = [p for p in text.split("\t") if p]
-        for part in parts:
-            if "=" not in part:
-                continue
-            k, v = part.split("=", 1)
-            pairs[k.strip()] = v.strip()
-        return pairs
 
-    # CEF extension parsing with support for escaped spaces and equals
-    key = ""
-    value = ""
-    in_key = True
-    escape = False
-    current = ""
-    tokens: List[str] = []
-
-    for ch in text:
-        if escape:
-            current += ch
-            escape = False
-            continue
-        if ch == "\\":
-            escape = True
-            continue
-        if ch == " " and not in_key:
-            tokens.append(current)
-            current = ""
-            in_key = True
-            continue
-        current += ch
-        if in_key and ch == "=":
-            in_key = False
-    if current:
-        tokens.append(current)
-
-    for token in tokens:
-        if "=" not in token:
-            continue
-        k, v = token.split("=", 1)
-        pairs[k.strip()] = v.strip()
+def _parse_leef_extension(text: str, delimiter: str = "\t") -> Dict[str, str]:
+    pairs: Dict[str, str] = {}
+    if not text:
+        return pairs
+    for part in text.split(delimiter):
+        key, sep, value = part.partition("=")
+        if sep:
+            pairs[key.strip()] = value.strip()
     return pairs
 
 
+def _leef_delimiter(spec: str) -> Optional[str]:
+    """Decode the LEEF 2.0 delimiter field: one character or a hex code (0x09 / x09)."""
+    if not spec:
+        return "\t"
+    if len(spec) == 1:
+        return spec
+    match = LEEF_DELIMITER_RE.fullmatch(spec)
+    return chr(int(match.group(1), 16)) if match else None
+
+
 def parse_cef(line: str) -> Dict[str, Any]:
     match = CEF_HEADER_RE.match(line)
     if not match:
         raise ValueError("Invalid CEF header")
     ext_text = match.group(8)
-    extension = _parse_kv_pairs(ext_text, sep=" ")
+    extension = _parse_cef_extension(ext_text)
     return {
         "cef_version": match.group("version"),
         "device_vendor": match.group("vendor"),
@@ -100,7 +117,14 @@ def parse_leef(line: str) -> Dict[str, Any]:
     if not match:
         raise ValueError("Invalid LEEF header")
     ext_text = match.group(6)
-    extension = _parse_kv_pairs(ext_text, sep="\t")
+    delimiter = "\t"
+    if match.group("version").startswith("2"):
+        # LEEF 2.0 may carry a delimiter field before the attributes; without one it is tab-delimited.
+        spec, has_field, rest = ext_text.partition("|")
+        custom = _leef_delimiter(spec) if has_field else None
+        if custom is not None:
+            delimiter, ext_text = custom, rest
+    extension = _parse_leef_extension(ext_text, delimiter)
     return {
         "leef_version": match.group("version"),
         "vendor": match.group("vendor"),
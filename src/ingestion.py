@@ -1,9 +1,26 @@
+import gzip
+import io
 import json
 import os
+import re
 from json import JSONDecodeError
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
 from boto3.dynamodb.types import TypeDeserializer
 
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+STREAM_READ_CHARS = 1 << 20
+
+LAYOUT_ARRAY = "array"
+LAYOUT_EVENTS = "events"
+LAYOUT_JSONL = "jsonl"
+LAYOUT_DOCUMENT = "document"
+
+_DECODER = json.JSONDecoder()
+_NON_WS = re.compile(r"[^ \t\n\r]")
+_EVENTS_PREFIX = re.compile(r'\{\s*"events"\s*:\s*\[')
+_EVENTS_PREFIX_PROBE_CHARS = 4096
+
 class RawParser:
     """
     Utility to deserialize DynamoDB-style JSON structures (M, L, S, N) 
@@ -122,57 +139,211 @@ class RawParser:
 
         return None
 
-    def _load_json_or_jsonl(self, file_path: str) -> Any:
-        with open(file_path, "r", encoding="utf-8") as f:
-            raw_text = f.read()
+    def _normalize_streamed(self, record: Any, idx: int, layout: str) -> Any:
+        # Per-record form of _normalize_mordor_batch: envelopes pass through,
+        # Mordor/Windows events become graph-ready alerts.
+        if not isinstance(record, dict) or self._looks_normalized_event(record):
+            return record
+        if layout == LAYOUT_EVENTS or "EventID" in record or "RecordNumber" in record:
+            return self._mordor_event_to_alert(record, f"event_{idx}")
+        return record
 
-        try:
-            return json.loads(raw_text)
-        except JSONDecodeError:
-            events: List[Dict[str, Any]] = []
-            for line_no, line in enumerate(raw_text.splitlines(), 1):
-                stripped = line.strip()
-                if not stripped:
-                    continue
-                try:
-                    parsed = json.loads(stripped)
-                except JSONDecodeError as exc:
-                    raise ValueError(f"Invalid JSONL at line {line_no}: {exc}") from exc
-                if isinstance(parsed, dict):
-                    events.append(parsed)
-
-            if events:
-                return events
-            raise
+    def _deserialize_alert(self, alert: Any) -> Any:
+        if isinstance(alert, dict) and 'data' in alert:
+            # Check if it's DynamoDB typed (has 'M' wrapper)
+            if isinstance(alert['data'], dict) and 'M' in alert['data']:
+                alert['data'] = self.deserialize(alert['data'])
+            # If it's already a standard dict, leave it alone (mock batch case)
+        return alert
+
+    def iter_file(self, file_path: str) -> Iterator[Any]:
+        """
+        Lazily yield processed alerts from a JSON array, {"events": [...]} batch,
+        single JSON object or JSONL file (optionally gzip/zstd compressed).
+        Only one record is decoded at a time, so memory does not grow with the file.
+        """
+        with open_text(file_path) as handle:
+            layout, records = _stream_records(_TextBuffer(handle))
+            if layout == LAYOUT_DOCUMENT:
+                document = next(records)
+                alerts = self._normalize_mordor_batch(document)
+                if alerts is None:
+                    alerts = document if isinstance(document, list) else [document]
+                for alert in alerts:
+                    yield self._deserialize_alert(alert)
+                return
+            for idx, record in enumerate(records):
+                yield self._deserialize_alert(self._normalize_streamed(record, idx, layout))
 
     def parse_file(self, file_path: str) -> list:
         """
         Load a JSON file and return a list of processed alerts.
         Supports both single object and list (batch) input.
         """
-        raw_content = self._load_json_or_jsonl(file_path)
-
-        mordor_alerts = self._normalize_mordor_batch(raw_content)
-        if mordor_alerts is not None:
-            alerts = mordor_alerts
-        else:
-            # Normalize to list
-            if isinstance(raw_content, list):
-                alerts = raw_content
-            else:
-                alerts = [raw_content]
-            
-        processed_alerts = []
-        for alert in alerts:
-            if 'data' in alert:
-                # Check if it's DynamoDB typed (has 'M' wrapper)
-                if isinstance(alert['data'], dict) and 'M' in alert['data']:
-                    alert['data'] = self.deserialize(alert['data'])
-                # If it's already a standard dict, leave it alone (mock batch case)
-                
-            processed_alerts.append(alert)
-            
-        return processed_alerts
+        return list(self.iter_file(file_path))
+
+
+def open_text(file_path: str) -> IO[str]:
+    """Open an input file for UTF-8 text reading, decompressing gzip/zstd by magic bytes."""
+    with open(file_path, "rb") as probe:
+        magic = probe.read(len(ZSTD_MAGIC))
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(file_path, "rt", encoding="utf-8")
+    if magic == ZSTD_MAGIC:
+        try:
+            import zstandard  # type: ignore
+        except ImportError as exc:
+            raise RuntimeError("zstd-compressed input requires the zstandard package.") from exc
+        reader = zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), read_across_frames=True)
+        return io.TextIOWrapper(io.BufferedReader(reader), encoding="utf-8")
+    return open(file_path, "r", encoding="utf-8")
+
+
+class _TextBuffer:
+    """Sliding window over a text stream for incremental JSON decoding."""
+
+    def __init__(self, handle: IO[str]):
+        self.handle = handle
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self.line_no = 0
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        # Read at least as much as is buffered so re-decoding a large value stays linear.
+        chunk = self.handle.read(max(STREAM_READ_CHARS, len(self.text) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self, start: Optional[int] = None) -> str:
+        """Return the next non-whitespace character without consuming it ("" at EOF)."""
+        offset = (self.pos if start is None else start) - self.pos
+        while True:
+            match = _NON_WS.search(self.text, self.pos + offset)
+            if match:
+                return match.group()
+            if not self.fill():
+                return ""
+
+    def line_end(self) -> int:
+        """Index just past the current line (filling as needed, without consuming it)."""
+        while True:
+            end = self.text.find("\n", self.pos)
+            if end >= 0:
+                return end + 1
+            if not self.fill():
+                return len(self.text)
+
+    def skip_ws(self) -> str:
+        char = self.peek()
+        if char:
+            self.pos = self.text.index(char, self.pos)
+        return char
+
+    def consume(self, char: str) -> None:
+        if self.skip_ws() != char:
+            raise ValueError(f"Expected {char!r} in JSON input")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        self.skip_ws()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number may continue past the buffered text.
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def readline(self) -> str:
+        end = self.line_end()
+        line = self.text[self.pos:end]
+        self.pos = end
+        self.line_no += 1
+        return line
+
+    def has_line(self) -> bool:
+        return self.pos < len(self.text) or self.fill()
+
+
+def _iter_array(buffer: _TextBuffer) -> Iterator[Any]:
+    buffer.consume("[")
+    if buffer.peek() == "]":
+        buffer.pos += 1
+        return
+    while True:
+        yield buffer.decode()
+        separator = buffer.skip_ws()
+        buffer.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError("Expected ',' or ']' in JSON array")
+
+
+def _iter_events_batch(buffer: _TextBuffer) -> Iterator[Any]:
+    buffer.pos = _EVENTS_PREFIX.match(buffer.text, buffer.pos).end() - 1
+    yield from _iter_array(buffer)
+    # Keys after "events" are not used by the pipeline (the whole-file loader ignored them too).
+
+
+def _iter_jsonl(buffer: _TextBuffer, first: Dict[str, Any]) -> Iterator[Any]:
+    yield first
+    while buffer.has_line():
+        stripped = buffer.readline().strip()
+        if not stripped:
+            continue
+        try:
+            parsed = json.loads(stripped)
+        except JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSONL at line {buffer.line_no}: {exc}") from exc
+        if isinstance(parsed, dict):
+            yield parsed
+
+
+def _stream_records(buffer: _TextBuffer) -> Tuple[str, Iterator[Any]]:
+    """
+    Sniff the first non-whitespace character and return (layout, records):
+    "[" streams array elements, {"events": [ streams the batch, a first line
+    holding a complete object followed by more lines is JSONL, and anything
+    else is decoded as one document.
+    """
+    first_char = buffer.peek()
+    if not first_char:
+        raise ValueError("Input contains no JSON content")
+    if first_char == "[":
+        return LAYOUT_ARRAY, _iter_array(buffer)
+    if first_char == "{":
+        while len(buffer.text) - buffer.pos < _EVENTS_PREFIX_PROBE_CHARS and buffer.fill():
+            pass
+        if _EVENTS_PREFIX.match(buffer.text, buffer.pos):
+            return LAYOUT_EVENTS, _iter_events_batch(buffer)
+        buffer.line_no = buffer.text.count("\n", 0, buffer.text.index("{", buffer.pos))
+        buffer.skip_ws()
+        end = buffer.line_end()
+        try:
+            first = json.loads(buffer.text[buffer.pos:end])
+        except JSONDecodeError:
+            first = None
+        if isinstance(first, dict) and buffer.peek(end):
+            buffer.readline()
+            return LAYOUT_JSONL, _iter_jsonl(buffer, first)
+    document = buffer.decode()
+    if buffer.peek():
+        raise ValueError("Unexpected data after JSON document")
+    return LAYOUT_DOCUMENT, iter([document])
+
 
 if __name__ == "__main__":
     # Quick test
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .hashing import canonical_bytes, sha256_hex
+
+INDEX_NAME = "index.sqlite"
+SEGMENT_MAX_BYTES_DEFAULT = 64 * 1024 * 1024
+HOT_ENTRIES_DEFAULT = 1024
+SQLITE_BUSY_TIMEOUT_SECONDS = 5.0
+# SQLite caps bound parameters per statement; id lookups are chunked below it.
+_LOOKUP_CHUNK = 500
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS evidence (
+        evidence_id TEXT PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        segment INTEGER NOT NULL,
+        byte_offset INTEGER NOT NULL,
+        length INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS evidence_content ON evidence (content_hash)",
+)
+
+
+def evidence_dir_for(ledger_path: Path) -> Path:
+    return ledger_path.with_name(f"{ledger_path.stem}.evidence")
+
+
+def _segment_name(index: int) -> str:
+    return f"evidence-{index:06d}.pack"
+
+
+class EvidenceStore:
+    """
+    Evidence payloads keyed by evidence_id, stored once per distinct content.
+    Payloads are canonical JSON compressed with zlib and appended to packed
+    segment files (``evidence-NNNNNN.pack``, rolled at ``segment_max_bytes``);
+    ``index.sqlite`` maps each id to (segment, byte offset, length). Writers
+    take the SQLite write lock before appending, so several worker processes
+    can share one directory. Recently read or written payloads are kept in an
+    in-memory LRU of ``hot_entries`` items.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = SEGMENT_MAX_BYTES_DEFAULT,
+        hot_entries: int = HOT_ENTRIES_DEFAULT,
+    ) -> None:
+        if segment_max_bytes < 1:
+            raise ValueError("segment_max_bytes must be at least 1")
+        if hot_entries < 0:
+            raise ValueError("hot_entries must be >= 0")
+        self.directory = Path(directory)
+        self.segment_max_bytes = int(segment_max_bytes)
+        self.hot_entries = int(hot_entries)
+        self._lock = threading.Lock()
+        self._hot: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._readers: Dict[int, IO[bytes]] = {}
+        self.hot_hits = 0
+        self.cold_reads = 0
+        self.blobs_written = 0
+        self.blobs_shared = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        # Opened lazily so that an app that never admits evidence leaves no files behind.
+        index_path = self.directory / INDEX_NAME
+        if self._conn is None and (create or index_path.exists()):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(index_path),
+                timeout=SQLITE_BUSY_TIMEOUT_SECONDS,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def put(self, evidence_id: str, payload: Dict[str, Any]) -> None:
+        self.put_many([(evidence_id, payload)])
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Store payloads in one transaction; ids already present are left as they are. Returns ids added."""
+        encoded = []
+        for evidence_id, payload in items:
+            data = canonical_bytes(payload, default=str)
+            encoded.append((evidence_id, payload, sha256_hex(data), data))
+        if not encoded:
+            return 0
+        added = []
+        with self._lock:
+            conn = self._connection(create=True)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                segment, handle = None, None
+                for evidence_id, payload, content_hash, data in encoded:
+                    if conn.execute("SELECT 1 FROM evidence WHERE evidence_id = ?", (evidence_id,)).fetchone():
+                        continue
+                    row = conn.execute(
+                        "SELECT segment, byte_offset, length FROM evidence WHERE content_hash = ? LIMIT 1",
+                        (content_hash,),
+                    ).fetchone()
+                    if row is not None:
+                        location = (int(row[0]), int(row[1]), int(row[2]))
+                        self.blobs_shared += 1
+                    else:
+                        if handle is None:
+                            segment, handle = self._open_active(conn)
+                        blob = zlib.compress(data)
+                        offset = handle.seek(0, os.SEEK_END)
+                        if offset and offset + len(blob) > self.segment_max_bytes:
+                            handle.close()
+                            segment += 1
+                            handle = (self.directory / _segment_name(segment)).open("ab")
+                            offset = handle.seek(0, os.SEEK_END)
+                        handle.write(blob)
+                        location = (segment, offset, len(blob))
+                        self.blobs_written += 1
+                    conn.execute(
+                        "INSERT INTO evidence (evidence_id, content_hash, segment, byte_offset, length) VALUES (?, ?, ?, ?, ?)",
+                        (evidence_id, content_hash) + location,
+                    )
+                    added.append((evidence_id, payload))
+                if handle is not None:
+                    # Blobs reach the pack file before the index rows that point at them.
+                    handle.close()
+                conn.execute("COMMIT")
+            except BaseException:
+                if handle is not None:
+                    handle.close()
+                conn.execute("ROLLBACK")
+                raise
+            for evidence_id, payload in added:
+                self._remember(evidence_id, payload)
+        return len(added)
+
+    def _open_active(self, conn: sqlite3.Connection) -> Tuple[int, IO[bytes]]:
+        row = conn.execute("SELECT MAX(segment) FROM evidence").fetchone()
+        segment = int(row[0]) if row and row[0] is not None else 1
+        return segment, (self.directory / _segment_name(segment)).open("ab")
+
+    def _remember(self, evidence_id: str, payload: Dict[str, Any]) -> None:
+        if not self.hot_entries:
+            return
+        self._hot[evidence_id] = payload
+        self._hot.move_to_end(evidence_id)
+        while len(self._hot) > self.hot_entries:
+            self._hot.popitem(last=False)
+
+    def get(self, evidence_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            payload = self._hot.get(evidence_id)
+            if payload is not None:
+                self._hot.move_to_end(evidence_id)
+                self.hot_hits += 1
+                return payload
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT segment, byte_offset, length FROM evidence WHERE evidence_id = ?", (evidence_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload = json.loads(zlib.decompress(self._read(int(row[0]), int(row[1]), int(row[2]))))
+            self.cold_reads += 1
+            self._remember(evidence_id, payload)
+            return payload
+
+    def _read(self, segment: int, offset: int, length: int) -> bytes:
+        reader = self._readers.get(segment)
+        if reader is None:
+            # Unbuffered, so bytes appended by other writers after the open are visible.
+            reader = (self.directory / _segment_name(segment)).open("rb", buffering=0)
+            self._readers[segment] = reader
+        reader.seek(offset)
+        return reader.read(length)
+
+    def __contains__(self, evidence_id: object) -> bool:
+        return isinstance(evidence_id, str) and not self.missing([evidence_id])
+
+    def missing(self, evidence_ids: Sequence[str]) -> List[str]:
+        """Ids from ``evidence_ids`` that are not stored, in input order."""
+        found = set()
+        with self._lock:
+            wanted = [eid for eid in dict.fromkeys(evidence_ids) if eid not in self._hot]
+            conn = self._connection()
+            if conn is not None:
+                for start in range(0, len(wanted), _LOOKUP_CHUNK):
+                    chunk = wanted[start : start + _LOOKUP_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    found.update(
+                        row[0]
+                        for row in conn.execute(
+                            f"SELECT evidence_id FROM evidence WHERE evidence_id IN ({placeholders})", chunk
+                        )
+                    )
+        missing = set(wanted) - found
+        return [eid for eid in evidence_ids if eid in missing]
+
+    def iter_payloads(self, evidence_ids: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Lazily yield stored payloads for ``evidence_ids``; unknown ids are skipped."""
+        for evidence_id in evidence_ids:
+            payload = self.get(evidence_id)
+            if payload is not None:
+                yield payload
+
+    def __len__(self) -> int:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return 0
+            return int(conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0])
+
+    def stats(self) -> Dict[str, Any]:
+        entries = len(self)
+        with self._lock:
+            segments = sorted(self.directory.glob("evidence-*.pack"))
+            return {
+                "entries": entries,
+                "segments": len(segments),
+                "segment_bytes": sum(path.stat().st_size for path in segments),
+                "hot_entries": len(self._hot),
+                "hot_hits": self.hot_hits,
+                "cold_reads": self.cold_reads,
+                "blobs_written": self.blobs_written,
+                "blobs_shared": self.blobs_shared,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .hashing import canonical_bytes, hash_payload, sha256_hex
+
+
+def payload_hashes(payload: Any) -> Tuple[str, Optional[str]]:
+    """
+    raw_payload_hash (hashing.hash_payload) plus, when it can be read off the
+    same bytes, the KernelGate content hash. The two only differ in
+    ensure_ascii, so an ASCII serialization serves both.
+    """
+    if not isinstance(payload, (dict, list)):
+        return hash_payload(payload), None
+    data = canonical_bytes(payload)
+    digest = sha256_hex(data)
+    return f"sha256:{digest}", digest if data.isascii() else None
+
+
+class FeatureCache:
+    """
+    Per-run memo of per-event work, keyed by raw_payload_hash.
+
+    Stage-1 registers every JSON payload it scores (hash, entropy, content
+    hash); KernelGate and dedup look features up instead of recomputing them.
+    Payload objects are also indexed by identity, so a consumer holding the
+    same object finds its key without serializing it again. Only dict/list
+    payloads are cached: for them raw_payload_hash identifies the value.
+    """
+
+    def __init__(self) -> None:
+        self._features: Dict[str, Dict[str, Any]] = {}
+        # id(payload) -> (payload, key); the payload reference keeps the id stable.
+        self._keys: Dict[int, Tuple[Any, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.cleared = 0
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def register(self, payload: Any, raw_payload_hash: str, **features: Any) -> None:
+        if not isinstance(payload, (dict, list)) or not raw_payload_hash:
+            return
+        self._keys[id(payload)] = (payload, raw_payload_hash)
+        entry = self._features.setdefault(raw_payload_hash, {})
+        for name, value in features.items():
+            if value is not None:
+                entry.setdefault(name, value)
+
+    def key_for(self, payload: Any) -> Optional[str]:
+        if not isinstance(payload, (dict, list)):
+            return None
+        known = self._keys.get(id(payload))
+        if known is not None and known[0] is payload:
+            return known[1]
+        raw_payload_hash, content_hash = payload_hashes(payload)
+        self.register(payload, raw_payload_hash, content_hash=content_hash)
+        return raw_payload_hash
+
+    def get(self, payload: Any, name: str, compute: Callable[[], Any]) -> Any:
+        """Return feature `name` of payload, computing and storing it on a miss."""
+        key = self.key_for(payload)
+        if key is None:
+            return compute()
+        entry = self._features[key]
+        if name in entry:
+            self.hits += 1
+            return entry[name]
+        self.misses += 1
+        value = entry[name] = compute()
+        return value
+
+    def clear(self) -> None:
+        """Drop cached features and payload references; counters keep running."""
+        self.cleared += len(self._features)
+        self._features.clear()
+        self._keys.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._features) + self.cleared, "hits": self.hits, "misses": self.misses}
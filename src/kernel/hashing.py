@@ -2,7 +2,73 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import Any
+import math
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional: the stdlib encoder produces the same bytes
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+COMPACT_SEPARATORS = (",", ":")
+# json.dumps defaults; kept by hashes that predate canonical_json (payload / dedup hashes).
+DEFAULT_SEPARATORS = (", ", ": ")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+_SCALARS = (str, int, bool, type(None))
+
+
+def _needs_stdlib(obj: Any) -> bool:
+    """
+    True when orjson may not write obj byte-for-byte like json.dumps: a float
+    the two format differently (NaN/Infinity, which orjson writes as null, and
+    the exponent ranges abs < 1e-4 and abs >= 1e16: 1e16 vs 1e+16, 0.00009 vs
+    9e-05), or any value that is not a str/int/bool/None/float/dict/list/tuple.
+    orjson encodes Enum, UUID, ... natively where json.dumps passes them to
+    `default` or raises TypeError.
+    """
+    if isinstance(obj, float):
+        return not math.isfinite(obj) or (obj != 0.0 and not 1e-4 <= abs(obj) < 1e16)
+    if isinstance(obj, dict):
+        values: Any = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        values = obj
+    else:
+        return not isinstance(obj, _SCALARS)
+    for value in values:
+        if isinstance(value, _SCALARS):
+            continue
+        if _needs_stdlib(value):
+            return True
+    return False
+
+
+def canonical_bytes(
+    obj: Any,
+    *,
+    ensure_ascii: bool = False,
+    separators: Tuple[str, str] = COMPACT_SEPARATORS,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> bytes:
+    """
+    Sorted-key JSON as UTF-8 bytes, identical to
+    json.dumps(obj, sort_keys=True, separators=..., ensure_ascii=..., default=...).
+    Uses orjson for compact output when it is installed.
+    """
+    if orjson is not None and separators == COMPACT_SEPARATORS and not _needs_stdlib(obj):
+        try:
+            data = orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+        except TypeError:  # non-str keys, ints beyond 64 bits, lone surrogates, ...
+            data = None
+        if data is not None and (not ensure_ascii or data.isascii()):
+            return data
+    return json.dumps(
+        obj, sort_keys=True, separators=separators, ensure_ascii=ensure_ascii, default=default
+    ).encode("utf-8")
 
 
 def canonical_json(obj: Any) -> str:
@@ -13,13 +79,26 @@ def canonical_json(obj: Any) -> str:
     - UTF-8 safe
     """
     if isinstance(obj, (dict, list)):
-        return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return canonical_bytes(obj).decode("utf-8")
     return str(obj)
 
 
-def sha256_hex(data: str) -> str:
-    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+def sha256_hex(data: Union[str, bytes]) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
 
 
 def hash_payload(obj: Any) -> str:
     return f"sha256:{sha256_hex(canonical_json(obj))}"
+
+
+def canonical_digests(
+    obj: Any, algorithms: Sequence[str] = ("sha256",), **options: Any
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize obj once (canonical_bytes options) and return the bytes with a
+    hex digest per hashlib algorithm, so one serialization feeds every hash.
+    """
+    data = canonical_bytes(obj, **options)
+    return data, {name: hashlib.new(name, data).hexdigest() for name in algorithms}
@@ -1,17 +1,34 @@
 from __future__ import annotations
 
-import hashlib
-import json
+import copy
 import os
 import sys
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from src.ingest.siem_formats import parse_cef, parse_leef, parse_syslog
+from src.kernel.feature_cache import FeatureCache
+from src.kernel.hashing import canonical_bytes, sha256_hex
+from src.kernel.ledger_writer import WRITER_QUEUE_SIZE_DEFAULT, LedgerWriter
 from src.kernel.stage1 import _extract_payload_text, _miller_madow_entropy_bytes, _template_text
 
+_LEDGER_WRITERS: Dict[str, LedgerWriter] = {}
+_LEDGER_WRITERS_LOCK = threading.Lock()
+_EVIDENCE_LEDGERS: Dict[str, Tuple[Any, threading.Lock]] = {}
+_EVIDENCE_LEDGERS_LOCK = threading.Lock()
+
+GATE_POOL_SIZE_DEFAULT = 32
+
+# Kernel admission uses a constant nominal ARV input, so one decide() per gate serves every alert.
+NOMINAL_ARV_INPUT: Tuple[Tuple[str, Any], ...] = (("phi_curr", 1), ("phi_prev", 1), ("D_plus", 0.0), ("dist_2", 1.0))
+NOMINAL_VSR = "VSR.NOMINAL"
+REGISTRY_CHECK_INTERVAL_DEFAULT = 1.0
+
 
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -30,16 +47,73 @@ def _ensure_kernel_on_path() -> Path:
         raise FileNotFoundError(
             f"AxoDen kernel not found at {root}. Set AXODEN_KERNEL_PATH to override."
         )
-    sys.path.insert(0, str(root))
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
     return root
 
 
+def _shared_evidence_ledger(ledger_path: Path, ledger_factory: Any) -> Tuple[Any, threading.Lock]:
+    """
+    One EvidenceLedger and append lock per ledger file, shared by every KernelGate
+    in the process. Each EvidenceLedger tracks its own chain head, so two open on
+    the same file would fork the chain.
+    """
+    key = str(ledger_path.resolve())
+    with _EVIDENCE_LEDGERS_LOCK:
+        shared = _EVIDENCE_LEDGERS.get(key)
+        if shared is None:
+            shared = (ledger_factory(ledger_path), threading.Lock())
+            _EVIDENCE_LEDGERS[key] = shared
+        return shared
+
+
+def _shared_ledger_writer(ledger_path: Path, ledger_factory: Any, queue_size: int) -> LedgerWriter:
+    """
+    One background writer per ledger file, shared by every KernelGate in the
+    process, writing through the file's shared EvidenceLedger.
+    """
+    key = str(ledger_path.resolve())
+    with _LEDGER_WRITERS_LOCK:
+        writer = _LEDGER_WRITERS.get(key)
+        if writer is None or writer.closed:
+            ledger, ledger_lock = _shared_evidence_ledger(ledger_path, ledger_factory)
+
+            def _write(batch: List[List[Tuple[Dict[str, Any], Dict[str, Any]]]]) -> None:
+                with ledger_lock:
+                    for pairs in batch:
+                        for ingest_evidence, decision_evidence in pairs:
+                            ledger.append(ingest_evidence)
+                            ledger.append(decision_evidence)
+
+            writer = LedgerWriter(_write, max_queue=queue_size, name=f"kernel-ledger-writer:{ledger_path.name}")
+            _LEDGER_WRITERS[key] = writer
+        return writer
+
+
+def ledger_writer_metrics() -> Dict[str, Dict[str, Any]]:
+    """Queue depth and write latency of each shared kernel ledger writer, by ledger path."""
+    with _LEDGER_WRITERS_LOCK:
+        writers = dict(_LEDGER_WRITERS)
+    return {path: writer.metrics() for path, writer in writers.items()}
+
+
+def close_ledger_writers() -> None:
+    """Drain and stop every shared kernel ledger writer and drop the shared ledgers."""
+    with _LEDGER_WRITERS_LOCK:
+        writers = list(_LEDGER_WRITERS.values())
+        _LEDGER_WRITERS.clear()
+    for writer in writers:
+        writer.close()
+    with _EVIDENCE_LEDGERS_LOCK:
+        _EVIDENCE_LEDGERS.clear()
+
+
 def _content_hash(payload: Any) -> str:
     try:
-        dumped = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        dumped = canonical_bytes(payload, ensure_ascii=True, default=str)
     except Exception:
-        dumped = str(payload)
-    return hashlib.sha256(dumped.encode("utf-8")).hexdigest()
+        dumped = str(payload).encode("utf-8")
+    return sha256_hex(dumped)
 
 
 def _parse_if_needed(event: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
@@ -103,6 +177,9 @@ class KernelGate:
         profile_id: str = "axoden-cix-1-v0.2.0",
         ledger_path: str = "data/kernel_ledger.jsonl",
         enable_ledger: bool = True,
+        async_ledger: bool = False,
+        ledger_queue_size: int = WRITER_QUEUE_SIZE_DEFAULT,
+        feature_cache: Optional[FeatureCache] = None,
     ) -> None:
         kernel_root = _ensure_kernel_on_path()
         from sdk import ARVInput, EvidenceLedger, Registry, decide  # type: ignore
@@ -113,11 +190,57 @@ class KernelGate:
         self._decide = decide
         self._kernel_root = kernel_root
         self.profile_id = profile_id
+        self.feature_cache = feature_cache
         self.registry = Registry.load(kernel_root / "registry")
         self.registry_commit = self.registry.registry_commit()
-        self.ledger = EvidenceLedger(Path(ledger_path)) if enable_ledger else None
+        self.ledger = None
+        # Keeps each batch of ingest/decision pairs contiguous across every gate writing this ledger.
+        self._ledger_lock = threading.Lock()
+        self._decisions: Dict[Tuple[Tuple[Tuple[str, Any], ...], str], Any] = {}
+        self.ledger_writer: Optional[LedgerWriter] = None
+        if enable_ledger and async_ledger:
+            self.ledger_writer = _shared_ledger_writer(Path(ledger_path), EvidenceLedger, ledger_queue_size)
+        elif enable_ledger:
+            self.ledger, self._ledger_lock = _shared_evidence_ledger(Path(ledger_path), EvidenceLedger)
+
+    def reloaded(self) -> "KernelGate":
+        """Return a copy with the registry re-read from disk, sharing this gate's ledger."""
+        gate = copy.copy(self)
+        gate.registry = self._Registry.load(self._kernel_root / "registry")
+        gate.registry_commit = gate.registry.registry_commit()
+        gate._decisions = {}
+        return gate
+
+    def _decision(self, arv_inputs: Tuple[Tuple[str, Any], ...], vsr: str) -> Any:
+        """decide() for these ARV inputs, memoized per gate (the registry is fixed for its lifetime)."""
+        key = (arv_inputs, vsr)
+        decision = self._decisions.get(key)
+        if decision is None:
+            decision = self._decide(
+                self._ARVInput(**dict(arv_inputs)),
+                vsr,
+                self.registry,
+                self.profile_id,
+                strict=True,
+            )
+            self._decisions[key] = decision
+        return decision
+
+    def evaluate(self, raw_alert: Dict[str, Any], feature_cache: Optional[FeatureCache] = None) -> GateResult:
+        return self.evaluate_batch([raw_alert], feature_cache=feature_cache)[0]
 
-    def evaluate(self, raw_alert: Dict[str, Any]) -> GateResult:
+    def evaluate_batch(
+        self, raw_alerts: List[Dict[str, Any]], feature_cache: Optional[FeatureCache] = None
+    ) -> List[GateResult]:
+        """
+        Gate a batch of alerts. Admission uses the nominal ARV input, so the kernel
+        decision is taken once and shared; per-alert work is parsing and hashing.
+        """
+        decision = self._decision(NOMINAL_ARV_INPUT, NOMINAL_VSR)
+        cache = feature_cache if feature_cache is not None else self.feature_cache
+        return [self._evaluate_one(raw_alert, decision, cache) for raw_alert in raw_alerts]
+
+    def _evaluate_one(self, raw_alert: Dict[str, Any], decision: Any, cache: Optional[FeatureCache]) -> GateResult:
         event, payload = _parse_if_needed(dict(raw_alert))
         graph_raw = _normalize_graph_raw(event, payload)
 
@@ -129,7 +252,12 @@ class KernelGate:
         )
         source_id = raw_alert.get("source_id") or raw_alert.get("source") or "unknown"
         event_id = graph_raw.get("eventId", "unknown")
-        entropy = _compute_entropy(payload)
+        if cache is not None:
+            entropy = cache.get(payload, "entropy", lambda: _compute_entropy(payload))
+            content_hash = cache.get(payload, "content_hash", lambda: _content_hash(payload))
+        else:
+            entropy = _compute_entropy(payload)
+            content_hash = _content_hash(payload)
 
         ingest_evidence = {
             "evidence_id": "",
@@ -146,7 +274,7 @@ class KernelGate:
                 {
                     "ref_type": "sha256",
                     "ref": str(event_id),
-                    "content_hash": _content_hash(payload),
+                    "content_hash": content_hash,
                 }
             ],
             "features_summary": {
@@ -160,20 +288,6 @@ class KernelGate:
             "prev_hash": "",
         }
 
-        arv_input = self._ARVInput(
-            phi_curr=1,
-            phi_prev=1,
-            D_plus=0.0,
-            dist_2=1.0,
-        )
-        decision = self._decide(
-            arv_input,
-            "VSR.NOMINAL",
-            self.registry,
-            self.profile_id,
-            strict=True,
-        )
-
         decision_payload = {
             "action_id": decision.action_id,
             "reason_code": decision.reason_code,
@@ -207,7 +321,128 @@ class KernelGate:
         )
 
     def append_ledger(self, gate_result: GateResult) -> None:
+        self.append_ledger_batch([gate_result])
+
+    def append_ledger_batch(self, gate_results: List[GateResult]) -> None:
+        """
+        Append the ingest/decision evidence of every result as one contiguous run of
+        the chain. The SDK EvidenceLedger only exposes per-record append(), so this is
+        2N appends under the ledger's shared lock, not one transaction: a crash mid-batch leaves
+        a valid chain holding a prefix of the batch.
+        """
+        if not gate_results:
+            return
+        pairs = [(result.ingest_evidence, result.decision_evidence) for result in gate_results]
+        if self.ledger_writer is not None:
+            # Queued as one record so the batch stays contiguous in the chain.
+            self.ledger_writer.submit(pairs)
+            return
         if not self.ledger:
             return
-        self.ledger.append(gate_result.ingest_evidence)
-        self.ledger.append(gate_result.decision_evidence)
+        with self._ledger_lock:
+            for ingest_evidence, decision_evidence in pairs:
+                self.ledger.append(ingest_evidence)
+                self.ledger.append(decision_evidence)
+
+    def flush_ledger(self, timeout: Optional[float] = None) -> None:
+        """Wait until every evidence pair queued by append_ledger is on disk."""
+        if self.ledger_writer is not None:
+            self.ledger_writer.flush(timeout)
+
+    def ledger_metrics(self) -> Dict[str, Any]:
+        return self.ledger_writer.metrics() if self.ledger_writer is not None else {}
+
+
+def _registry_signature(registry_dir: Path) -> Tuple[Tuple[str, int, int], ...]:
+    """(path, mtime_ns, size) of every registry file; changes when the registry is edited."""
+    if not registry_dir.exists():
+        return ()
+    entries = []
+    for path in sorted(registry_dir.rglob("*")):
+        if path.is_file():
+            stat = path.stat()
+            entries.append((str(path.relative_to(registry_dir)), stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+class _PooledGate:
+    __slots__ = ("gate", "signature", "checked_at")
+
+    def __init__(self, gate: Any, signature: Tuple, checked_at: float) -> None:
+        self.gate = gate
+        self.signature = signature
+        self.checked_at = checked_at
+
+
+class KernelGatePool:
+    """
+    Reuses KernelGate instances across requests, keyed by (profile_id, ledger_path),
+    so the SDK import, Registry.load and ledger open happen once per key.
+
+    The registry directory is re-checked at most every check_interval seconds;
+    when a file's mtime or size changes the gate is swapped for gate.reloaded()
+    (same ledger, fresh registry). Requests already holding the old gate finish
+    with it. At most max_gates gates are kept (least recently used evicted).
+    """
+
+    def __init__(
+        self,
+        async_ledger: bool = False,
+        ledger_queue_size: int = WRITER_QUEUE_SIZE_DEFAULT,
+        check_interval: float = REGISTRY_CHECK_INTERVAL_DEFAULT,
+        max_gates: int = GATE_POOL_SIZE_DEFAULT,
+        gate_factory: Optional[Callable[..., Any]] = None,
+        registry_dir: Optional[Path] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.async_ledger = async_ledger
+        self.ledger_queue_size = ledger_queue_size
+        self.check_interval = float(check_interval)
+        self.max_gates = max(1, int(max_gates))
+        self._gate_factory = gate_factory or KernelGate
+        self._registry_dir = registry_dir
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._gates: "OrderedDict[Tuple[str, str], _PooledGate]" = OrderedDict()
+        self.created = 0
+        self.reloads = 0
+
+    def _registry_path(self) -> Path:
+        return self._registry_dir or (_kernel_root() / "registry")
+
+    def get(self, profile_id: str, ledger_path: str) -> Any:
+        key = (profile_id, str(Path(ledger_path).resolve()))
+        now = self._clock()
+        with self._lock:
+            entry = self._gates.get(key)
+            if entry is None:
+                gate = self._gate_factory(
+                    profile_id=profile_id,
+                    ledger_path=ledger_path,
+                    async_ledger=self.async_ledger,
+                    ledger_queue_size=self.ledger_queue_size,
+                )
+                entry = _PooledGate(gate, _registry_signature(self._registry_path()), now)
+                self._gates[key] = entry
+                self.created += 1
+                while len(self._gates) > self.max_gates:
+                    self._gates.popitem(last=False)
+            else:
+                self._gates.move_to_end(key)
+                if now - entry.checked_at >= self.check_interval:
+                    entry.checked_at = now
+                    signature = _registry_signature(self._registry_path())
+                    if signature != entry.signature:
+                        entry.gate = entry.gate.reloaded()
+                        entry.signature = signature
+                        self.reloads += 1
+            return entry.gate
+
+    def clear(self) -> None:
+        """Drop every cached gate (shared async ledger writers are closed by close_ledger_writers)."""
+        with self._lock:
+            self._gates.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"gates": len(self._gates), "created": self.created, "reloads": self.reloads}
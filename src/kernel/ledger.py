@@ -2,63 +2,329 @@ from __future__ import annotations
 
 import json
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from .hashing import canonical_json, sha256_hex
+from .hashing import canonical_bytes, sha256_hex
+from .ledger_snapshot import IndexSnapshot, snapshot_path_for
+from .ledger_writer import WRITER_QUEUE_SIZE_DEFAULT, LedgerWriter
+from .segments import COMPRESSION_NONE, VERIFY_ROOTS, SegmentManifest, segment_dir_for, verify_segmented
+
+
+DURABILITY_NONE = "none"
+DURABILITY_FLUSH = "flush"
+DURABILITY_FSYNC = "fsync"
+_DURABILITY_MODES = {DURABILITY_NONE, DURABILITY_FLUSH, DURABILITY_FSYNC}
+
+GROUP_MAX_ENTRIES_DEFAULT = 1024
+GROUP_MAX_DELAY_S_DEFAULT = 0.5
+SNAPSHOT_EVERY_DEFAULT = 10_000
+SNAPSHOT_LOOKUP_CACHE_DEFAULT = 65_536
 
 
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def compute_entry_hash(entry: Dict[str, Any]) -> str:
+    return sha256_hex(canonical_bytes({k: v for k, v in entry.items() if k != "entry_hash"}))
+
+
+def entry_hash_ending_at(path: Path, offset: int) -> Optional[str]:
+    """entry_hash of the JSONL line whose newline ends exactly at byte `offset`."""
+    try:
+        if offset <= 0 or path.stat().st_size < offset:
+            return None
+        with path.open("rb") as f:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                return None
+            start = offset - 1
+            buf = b""
+            while start > 0:
+                step = min(65536, start)
+                start -= step
+                f.seek(start)
+                buf = f.read(step) + buf
+                newline = buf.rfind(b"\n")
+                if newline >= 0:
+                    buf = buf[newline + 1 :]
+                    break
+        return json.loads(buf).get("entry_hash")
+    except (OSError, ValueError):
+        return None
+
+
 class Ledger:
     """
     Append-only ledger with hash chaining (JSONL).
     Each entry includes prev_hash and entry_hash for integrity checks.
+
+    With group_commit=True the file handle stays open and entries are buffered
+    (the hash chain is still computed eagerly). A group is written when it
+    reaches max_group_entries, when max_group_delay_s has passed since the
+    first buffered entry (a timer fires even if no further append arrives),
+    or when commit() is called at a batch boundary.
+    durability controls what happens per group: "none" (leave it in the
+    process buffer), "flush" (flush to the OS) or "fsync" (flush + fsync).
+
+    With index_snapshot=True the idempotency indexes are persisted to a SQLite
+    file next to the ledger every snapshot_every written entries (and on close).
+    The snapshot records the byte offset and chain hash it covers; on startup it
+    is checked against the entry ending at that offset and only the tail after it
+    is replayed. Every key loaded or appended by this process stays in memory;
+    only keys from before the resume point are looked up in the snapshot, behind
+    a bounded LRU of (source_id, event_id) results.
+
+    With segment_max_entries > 0 the file at file_path is only the active
+    segment: once it holds that many entries it is sealed into
+    <stem>.segments/ (Merkle root over its entry hashes, chained to the previous
+    segment's root, optionally gzip/zstd compressed) and a fresh file is started.
+
+    With query_index=True (implies index_snapshot) the snapshot also records
+    where every entry lives (segment, byte offset, length) keyed by entry_id,
+    (source_id, event_id), batch_id, band and timestamp; query() and
+    read_entry() serve lookups without scanning the JSONL.
+
+    With async_writer=True append() only computes the hash chain and indexes
+    in memory; a background LedgerWriter thread writes entries in batches from
+    a bounded queue (appends block while it is full). flush() is the barrier
+    for callers that need the entries on disk before they return.
+
+    append() is serialized by append_lock, so threads sharing a ledger cannot
+    fork the hash chain. The lock is reentrant; callers that need a run of
+    entries (and the index lookups deciding them) to be contiguous hold it
+    around the whole run.
     """
 
-    def __init__(self, file_path: str = "data/ledger.jsonl") -> None:
+    def __init__(
+        self,
+        file_path: str = "data/ledger.jsonl",
+        group_commit: bool = False,
+        durability: str = DURABILITY_FLUSH,
+        max_group_entries: int = GROUP_MAX_ENTRIES_DEFAULT,
+        max_group_delay_s: float = GROUP_MAX_DELAY_S_DEFAULT,
+        index_snapshot: bool = False,
+        snapshot_every: int = SNAPSHOT_EVERY_DEFAULT,
+        segment_max_entries: int = 0,
+        segment_compression: str = COMPRESSION_NONE,
+        query_index: bool = False,
+        async_writer: bool = False,
+        writer_queue_size: int = WRITER_QUEUE_SIZE_DEFAULT,
+    ) -> None:
+        if durability not in _DURABILITY_MODES:
+            raise ValueError(f"Unsupported ledger durability: {durability}")
         self.file_path = Path(file_path)
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
         self.last_hash = ""  # empty for genesis
+        self.group_commit = group_commit
+        self.durability = durability
+        self.max_group_entries = max(1, int(max_group_entries))
+        self.max_group_delay_s = float(max_group_delay_s)
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+        self._pending_since = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._handle = None
+        self._io_lock = threading.RLock()
+        self.append_lock = threading.RLock()
+        self._writer: Optional[LedgerWriter] = None
+        self._offset = 0
         self._idempotency_index: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
         self._event_hash_index: Dict[Tuple[str, str], str] = {}
+        self.snapshot_every = max(1, int(snapshot_every))
+        self._snapshot: Optional[IndexSnapshot] = None
+        self._snapshot_decisions: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._snapshot_event_hashes: Dict[Tuple[str, str], str] = {}
+        self._since_snapshot = 0
+        # True when startup resumed from a snapshot, i.e. older keys were never loaded.
+        self._snapshot_fallback = False
+        self._snapshot_lookups: "OrderedDict[Tuple[str, str], Optional[str]]" = OrderedDict()
+        self._snapshot_lookups_lock = threading.Lock()
+        self.query_index = query_index
+        self._snapshot_entries: List[Tuple[Any, ...]] = []
+        self._batch_id: Optional[str] = None
+        self.segment_max_entries = max(0, int(segment_max_entries))
+        self.segment_compression = segment_compression
+        self._manifest: Optional[SegmentManifest] = None
+        self._active_entries = 0
+        if self.segment_max_entries:
+            self._manifest = SegmentManifest(segment_dir_for(self.file_path))
+            self._discard_sealed_active()
+        if index_snapshot or query_index:
+            self._snapshot = IndexSnapshot(snapshot_path_for(self.file_path))
+
+        start_offset = self._verified_snapshot_offset()
+        self._snapshot_fallback = start_offset is not None
+        if start_offset is None:
+            self._replay_segments()
+            start_offset = 0
         if self.file_path.exists():
-            self._load_existing()
+            self._load_existing(start_offset)
+        self._written_hash = self.last_hash
+        if self._since_snapshot:
+            self._write_snapshot()
+        if async_writer:
+            self._writer = LedgerWriter(
+                self._write_entries,
+                max_queue=writer_queue_size,
+                max_batch=self.max_group_entries,
+                name=f"ledger-writer:{self.file_path.name}",
+            )
+
+    @property
+    def sealed_segments(self) -> int:
+        return len(self._manifest.segments) if self._manifest is not None else 0
 
-    def _load_existing(self) -> None:
+    def _discard_sealed_active(self) -> None:
+        # A crash between sealing and truncating leaves the sealed entries in the active file.
+        if not (self._manifest.segments and self.file_path.exists()):
+            return
+        with self.file_path.open("rb") as f:
+            first = next((raw for raw in f if raw.strip()), None)
+        try:
+            first_hash = json.loads(first).get("entry_hash") if first else None
+        except ValueError:
+            return
+        if first_hash == self._manifest.segments[-1]["first_hash"]:
+            self._truncate(0)
+
+    def _replay_segments(self) -> None:
+        if self._manifest is None:
+            return
+        for record in self._manifest.segments:
+            for offset, raw in self._manifest.iter_lines_with_offsets(record):
+                entry = json.loads(raw)
+                self.last_hash = entry.get("entry_hash", self.last_hash)
+                self._index_entry(entry, (record["index"], offset, len(raw)))
+                self._since_snapshot += 1
+
+    def _verified_snapshot_offset(self) -> Optional[int]:
+        """
+        Active-file offset to resume replay from, or None when everything
+        (sealed segments included) has to be replayed.
+        """
+        if self._snapshot is None:
+            return None
+        meta = self._snapshot.meta()
+        if meta is not None:
+            offset, last_hash, segments = meta
+            if segments == self.sealed_segments:
+                if offset == 0 and segments and last_hash == self._manifest.last_hash:
+                    self.last_hash = last_hash
+                    return 0
+                if offset > 0 and self._entry_hash_ending_at(offset) == last_hash:
+                    self.last_hash = last_hash
+                    return offset
+        # Ledger was rewritten or truncated behind the snapshot: rebuild from scratch.
+        self._snapshot.reset()
+        return None
+
+    def _entry_hash_ending_at(self, offset: int) -> Optional[str]:
+        return entry_hash_ending_at(self.file_path, offset)
+
+    def _load_existing(self, start_offset: int = 0) -> None:
         try:
-            with self.file_path.open("r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
+            with self.file_path.open("rb") as f:
+                if self._manifest is not None and start_offset:
+                    self._active_entries = f.read(start_offset).count(b"\n")
+                f.seek(start_offset)
+                offset = start_offset
+                for raw in f:
+                    line_start = offset
+                    offset += len(raw)
+                    if not raw.strip():
                         continue
-                    entry = json.loads(line)
+                    try:
+                        entry = json.loads(raw)
+                    except ValueError:
+                        if raw.endswith(b"\n") and f.peek(1):
+                            raise
+                        # Torn final line from a crash mid-write: drop it.
+                        self._truncate(line_start)
+                        self._offset = line_start
+                        return
+                    if not raw.endswith(b"\n"):
+                        # Complete JSON without its newline: keep the entry, restore the terminator.
+                        with self.file_path.open("ab") as out:
+                            out.write(b"\n")
+                        offset += 1
                     self.last_hash = entry.get("entry_hash", self.last_hash)
-                    self._index_entry(entry)
+                    self._index_entry(entry, (0, line_start, len(raw)))
+                    self._since_snapshot += 1
+                    self._active_entries += 1
+                self._offset = offset
         except FileNotFoundError:
             return
 
-    def _index_entry(self, entry: Dict[str, Any]) -> None:
+    def _truncate(self, size: int) -> None:
+        with self.file_path.open("r+b") as f:
+            f.truncate(size)
+
+    @staticmethod
+    def _decision_index(entry: Dict[str, Any]) -> Optional[Tuple[Tuple[str, str, str], Dict[str, Any]]]:
         if entry.get("type") != "BAND_DECISION":
-            return
+            return None
         payload = entry.get("payload", {})
         source_id = payload.get("source_id")
         event_id = payload.get("event_id")
         raw_payload_hash = payload.get("raw_payload_hash")
         if not (source_id and event_id and raw_payload_hash):
-            return
+            return None
         key = (source_id, event_id, raw_payload_hash)
-        self._idempotency_index[key] = {
+        return key, {
             "band": payload.get("band"),
             "decision_code": payload.get("decision_code"),
             "http_status": payload.get("http_status"),
             "ledger_entry_id": entry.get("entry_id"),
         }
-        self._event_hash_index[(source_id, event_id)] = raw_payload_hash
+
+    def _index_entry(self, entry: Dict[str, Any], location: Optional[Tuple[int, int, int]] = None) -> None:
+        indexed = self._decision_index(entry)
+        if indexed is not None:
+            key, value = indexed
+            self._idempotency_index[key] = value
+            self._event_hash_index[key[:2]] = key[2]
+        if location is not None:
+            self._stage_snapshot(entry, location)
+
+    def _stage_snapshot(self, entry: Dict[str, Any], location: Tuple[int, int, int]) -> None:
+        # Only entries that reached the file are staged, so a snapshot never claims unwritten keys.
+        if self._snapshot is None:
+            return
+        indexed = self._decision_index(entry)
+        if indexed is not None:
+            key, value = indexed
+            self._snapshot_decisions[key] = value
+            self._snapshot_event_hashes[key[:2]] = key[2]
+        if self.query_index:
+            self._snapshot_entries.append(self._entry_row(entry, location))
+
+    def _entry_row(self, entry: Dict[str, Any], location: Tuple[int, int, int]) -> Tuple[Any, ...]:
+        payload = entry.get("payload") or {}
+        entry_type = entry.get("type")
+        if entry_type == "BATCH_RECEIVED":
+            self._batch_id = payload.get("batch_id")
+        batch_id = payload.get("batch_id") or self._batch_id
+        if entry_type == "BATCH_COMPLETED":
+            self._batch_id = None
+        segment, offset, length = location
+        return (
+            entry.get("entry_id"),
+            entry_type,
+            entry.get("timestamp"),
+            batch_id,
+            payload.get("source_id"),
+            payload.get("event_id"),
+            payload.get("band"),
+            segment,
+            offset,
+            length,
+        )
 
     def seed_idempotency(self, already_ingested: Optional[Dict[str, Any]]) -> None:
         if not already_ingested:
@@ -78,25 +344,262 @@ class Ledger:
         self._event_hash_index[(source_id, event_id)] = raw_payload_hash
 
     def lookup_idempotent(self, source_id: str, event_id: str, raw_payload_hash: str) -> Optional[Dict[str, Any]]:
-        return self._idempotency_index.get((source_id, event_id, raw_payload_hash))
+        key = (source_id, event_id, raw_payload_hash)
+        hit = self._idempotency_index.get(key)
+        if hit is None and self._snapshot_fallback and self._snapshot is not None:
+            # Every snapshotted decision also has an event_hashes row, so an unknown
+            # (source_id, event_id) answers the decision lookup without a second query.
+            if self._snapshot_event_hash(source_id, event_id) is None:
+                return None
+            hit = self._snapshot.lookup_idempotent(source_id, event_id, raw_payload_hash)
+            if hit is not None:
+                self._idempotency_index[key] = hit
+        return hit
 
     def lookup_event_hash(self, source_id: str, event_id: str) -> Optional[str]:
-        return self._event_hash_index.get((source_id, event_id))
+        hit = self._event_hash_index.get((source_id, event_id))
+        if hit is None and self._snapshot_fallback and self._snapshot is not None:
+            hit = self._snapshot_event_hash(source_id, event_id)
+        return hit
+
+    def _snapshot_event_hash(self, source_id: str, event_id: str) -> Optional[str]:
+        # Snapshot rows for keys absent from memory never change, so misses are cached too.
+        key = (source_id, event_id)
+        cache = self._snapshot_lookups
+        with self._snapshot_lookups_lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = self._snapshot.lookup_event_hash(source_id, event_id)
+        with self._snapshot_lookups_lock:
+            cache[key] = value
+            if len(cache) > SNAPSHOT_LOOKUP_CACHE_DEFAULT:
+                cache.popitem(last=False)
+        return value
 
     def append(self, entry_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        entry = {
-            "entry_id": str(uuid.uuid4()),
-            "timestamp": _utc_now(),
-            "type": entry_type,
-            "payload": payload,
-            "prev_hash": self.last_hash,
-        }
-        entry_hash = sha256_hex(canonical_json(entry))
-        entry["entry_hash"] = entry_hash
+        with self.append_lock:
+            entry = {
+                "entry_id": str(uuid.uuid4()),
+                "timestamp": _utc_now(),
+                "type": entry_type,
+                "payload": payload,
+                "prev_hash": self.last_hash,
+            }
+            canonical = canonical_bytes(entry)
+            entry_hash = sha256_hex(canonical)
+            entry["entry_hash"] = entry_hash
+
+            # The hashed serialization doubles as the stored line, with entry_hash appended.
+            line = f'{canonical[:-1].decode("utf-8")},"entry_hash":"{entry_hash}"}}\n'
+            if self._writer is not None:
+                self.last_hash = entry_hash
+                self._index_entry(entry)
+                self._writer.submit((line, entry))
+                return entry
+
+            if not self.group_commit:
+                data = line.encode("utf-8")
+                with self.file_path.open("ab") as f:
+                    f.write(data)
+                location = (0, self._offset, len(data))
+                self._offset += len(data)
+                self._written_hash = entry_hash
+
+            self.last_hash = entry_hash
+            self._index_entry(entry, None if self.group_commit else location)
+
+            if self.group_commit:
+                with self._io_lock:
+                    if not self._pending:
+                        self._pending_since = time.monotonic()
+                        self._arm_flush_timer()
+                    self._pending.append((line, entry))
+                    if (
+                        len(self._pending) >= self.max_group_entries
+                        or time.monotonic() - self._pending_since >= self.max_group_delay_s
+                    ):
+                        self.commit()
+            else:
+                self._note_written(1)
+            return entry
+
+    def commit(self) -> None:
+        """Write buffered entries as one group and apply the durability policy."""
+        with self._io_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._pending = self._pending, []
+            self._write_entries(pending)
+
+    def _arm_flush_timer(self) -> None:
+        # Bounds the delay of the last group of a burst when no further append arrives.
+        if self.max_group_delay_s <= 0:
+            return
+        timer = threading.Timer(self.max_group_delay_s, self._flush_due)
+        timer.daemon = True
+        timer.start()
+        self._flush_timer = timer
+
+    def _flush_due(self) -> None:
+        with self._io_lock:
+            if self._pending:
+                self.commit()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Barrier: return once every appended entry has been written."""
+        if self._writer is not None:
+            self._writer.flush(timeout)
+        self.commit()
+
+    def writer_metrics(self) -> Dict[str, Any]:
+        return self._writer.metrics() if self._writer is not None else {}
+
+    def _write_entries(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        with self._io_lock:
+            while entries:
+                group = entries
+                if self._manifest is not None:
+                    # Split the group at the segment boundary so segments stay fixed-size.
+                    group = group[: max(1, self.segment_max_entries - self._active_entries)]
+                entries = entries[len(group) :]
+                self._write_group(group)
+
+    def _write_group(self, group: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if self._handle is None:
+            self._handle = self.file_path.open("ab")
+        data = "".join(line for line, _ in group).encode("utf-8")
+        self._handle.write(data)
+        offset = self._offset
+        self._offset += len(data)
+        self._written_hash = group[-1][1]["entry_hash"]
+        for line, entry in group:
+            length = len(line.encode("utf-8")) if self.query_index else 0
+            self._stage_snapshot(entry, (0, offset, length))
+            offset += length
+        if self.durability in (DURABILITY_FLUSH, DURABILITY_FSYNC):
+            self._handle.flush()
+        if self.durability == DURABILITY_FSYNC:
+            os.fsync(self._handle.fileno())
+        self._note_written(len(group))
+
+    def _note_written(self, count: int) -> None:
+        self._active_entries += count
+        if self._snapshot is not None:
+            self._since_snapshot += count
+            if self._since_snapshot >= self.snapshot_every:
+                self._write_snapshot()
+        if self._manifest is not None and self._active_entries >= self.segment_max_entries:
+            self._seal_active()
+
+    def seal_segment(self) -> Optional[Dict[str, Any]]:
+        """Seal the active file into the next segment and start a fresh one."""
+        if self._manifest is None:
+            raise ValueError("Ledger was opened without segment_max_entries")
+        self.flush()
+        with self._io_lock:
+            return self._seal_active()
+
+    def _seal_active(self) -> Optional[Dict[str, Any]]:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if not self.file_path.exists():
+            return None
+        self._write_snapshot()
+        record = self._manifest.seal(self.file_path, "entry_hash", self.segment_compression)
+        if record is None:
+            return None
+        self._truncate(0)
+        self._offset = 0
+        self._active_entries = 0
+        # Re-anchor the snapshot at the start of the new active file.
+        self._write_snapshot(sealed_segment=record["index"])
+        return record
+
+    def compress_segments(self, compression: str, keep_latest: int = 0) -> int:
+        if self._manifest is None:
+            return 0
+        return self._manifest.compress(compression, keep_latest=keep_latest)
+
+    def verify(self, mode: str = VERIFY_ROOTS) -> Dict[str, Any]:
+        """Check the hash chain; see segments.verify_segmented for the modes."""
+        self.flush()
+        with self._io_lock:
+            if self._handle is not None:
+                self._handle.flush()
+            return verify_segmented(self.file_path, segment_dir_for(self.file_path), "entry_hash", compute_entry_hash, mode)
+
+    def snapshot(self) -> None:
+        """Persist the idempotency indexes up to the current end of the ledger."""
+        self.flush()
+        with self._io_lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self, sealed_segment: Optional[int] = None) -> None:
+        if self._snapshot is None:
+            return
+        if self._handle is not None:
+            self._handle.flush()
+        decisions, self._snapshot_decisions = self._snapshot_decisions, {}
+        event_hashes, self._snapshot_event_hashes = self._snapshot_event_hashes, {}
+        entries, self._snapshot_entries = self._snapshot_entries, []
+        self._snapshot.write(
+            decisions,
+            event_hashes,
+            self._offset,
+            self._written_hash,
+            self.sealed_segments,
+            entries=entries,
+            sealed_segment=sealed_segment,
+        )
+        self._since_snapshot = 0
+
+    def query(self, limit: int = 100, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Entry locations from the query index (see IndexSnapshot.query for filters).
+        Written-but-unsnapshotted entries are flushed to the index first.
+        """
+        if self._snapshot is None or not self.query_index:
+            raise ValueError("Ledger was opened without query_index")
+        self.flush()
+        with self._io_lock:
+            if self._snapshot_entries:
+                self._write_snapshot()
+        return self._snapshot.query(limit=limit, **filters)
+
+    def read_entry(self, location: Dict[str, Any]) -> Dict[str, Any]:
+        """Read one entry by its indexed (segment, byte_offset, length)."""
+        segment = int(location["segment"])
+        if segment:
+            raw = self._manifest.read_at(segment, int(location["byte_offset"]), int(location["length"]))
+        else:
+            with self._io_lock:
+                if self._handle is not None:
+                    self._handle.flush()
+                with self.file_path.open("rb") as f:
+                    f.seek(int(location["byte_offset"]))
+                    raw = f.read(int(location["length"]))
+        return json.loads(raw)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self.commit()
+        with self._io_lock:
+            if self._snapshot is not None:
+                if self._since_snapshot:
+                    self._write_snapshot()
+                self._snapshot.close()
+                self._snapshot = None
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
 
-        with self.file_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    def __enter__(self) -> "Ledger":
+        return self
 
-        self.last_hash = entry_hash
-        self._index_entry(entry)
-        return entry
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
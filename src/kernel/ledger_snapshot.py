@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS meta (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        byte_offset INTEGER NOT NULL,
+        last_hash TEXT NOT NULL,
+        segments INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS decisions (
+        source_id TEXT NOT NULL,
+        event_id TEXT NOT NULL,
+        raw_payload_hash TEXT NOT NULL,
+        band TEXT,
+        decision_code TEXT,
+        http_status INTEGER,
+        ledger_entry_id TEXT,
+        PRIMARY KEY (source_id, event_id, raw_payload_hash)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS event_hashes (
+        source_id TEXT NOT NULL,
+        event_id TEXT NOT NULL,
+        raw_payload_hash TEXT NOT NULL,
+        PRIMARY KEY (source_id, event_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        entry_id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        timestamp TEXT,
+        batch_id TEXT,
+        source_id TEXT,
+        event_id TEXT,
+        band TEXT,
+        segment INTEGER NOT NULL,
+        byte_offset INTEGER NOT NULL,
+        length INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entries_event ON entries (source_id, event_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS entries_batch ON entries (batch_id, timestamp)",
+    "CREATE INDEX IF NOT EXISTS entries_band ON entries (band, timestamp)",
+    "CREATE INDEX IF NOT EXISTS entries_time ON entries (timestamp)",
+    "CREATE INDEX IF NOT EXISTS entries_segment ON entries (segment)",
+)
+
+ENTRY_COLUMNS = (
+    "entry_id",
+    "type",
+    "timestamp",
+    "batch_id",
+    "source_id",
+    "event_id",
+    "band",
+    "segment",
+    "byte_offset",
+    "length",
+)
+# Filters accepted by IndexSnapshot.query, mapped to their SQL condition.
+_QUERY_FILTERS = {
+    "entry_id": "entry_id = ?",
+    "entry_type": "type = ?",
+    "batch_id": "batch_id = ?",
+    "source_id": "source_id = ?",
+    "event_id": "event_id = ?",
+    "band": "band = ?",
+    "since": "timestamp >= ?",
+    "until": "timestamp < ?",
+}
+
+def snapshot_path_for(ledger_path: Path) -> Path:
+    return ledger_path.with_name(f"{ledger_path.stem}.index.sqlite")
+
+
+class IndexSnapshot:
+    """
+    SQLite snapshot of the Stage-1 ledger indexes: idempotency keys and, when
+    the query index is enabled, the location (segment, byte offset, length) of
+    every entry keyed by entry_id, (source_id, event_id), batch_id, band and time.
+    The meta row records the ledger byte offset and chain hash it covers (plus the
+    number of sealed segments before that offset), so a restart only has to
+    replay the tail written after the snapshot.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        # Opened lazily so that read-only use never creates an empty index file.
+        if self._conn is None and (create or self.path.exists()):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def meta(self) -> Optional[Tuple[int, str, int]]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute("SELECT byte_offset, last_hash, segments FROM meta WHERE id = 1").fetchone()
+        if not row:
+            return None
+        return int(row[0]), str(row[1]), int(row[2])
+
+    def lookup_idempotent(self, source_id: str, event_id: str, raw_payload_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT band, decision_code, http_status, ledger_entry_id FROM decisions "
+                "WHERE source_id = ? AND event_id = ? AND raw_payload_hash = ?",
+                (source_id, event_id, raw_payload_hash),
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "band": row[0],
+            "decision_code": row[1],
+            "http_status": row[2],
+            "ledger_entry_id": row[3],
+        }
+
+    def lookup_event_hash(self, source_id: str, event_id: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute(
+                "SELECT raw_payload_hash FROM event_hashes WHERE source_id = ? AND event_id = ?",
+                (source_id, event_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def write(
+        self,
+        decisions: Dict[Tuple[str, str, str], Dict[str, Any]],
+        event_hashes: Dict[Tuple[str, str], str],
+        byte_offset: int,
+        last_hash: str,
+        segments: int = 0,
+        entries: Sequence[Tuple[Any, ...]] = (),
+        sealed_segment: Optional[int] = None,
+    ) -> None:
+        """
+        Persist index rows and advance the covered offset in one transaction.
+        sealed_segment moves entries located in the active file (segment 0) to
+        that sealed segment; their byte offsets are unchanged by sealing.
+        """
+        with self._lock:
+            conn = self._connection(create=True)
+            with conn:
+                if sealed_segment is not None:
+                    conn.execute("UPDATE entries SET segment = ? WHERE segment = 0", (int(sealed_segment),))
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO entries ({', '.join(ENTRY_COLUMNS)}) VALUES ({', '.join('?' * len(ENTRY_COLUMNS))})",
+                    entries,
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO decisions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            key[0],
+                            key[1],
+                            key[2],
+                            value.get("band"),
+                            value.get("decision_code"),
+                            value.get("http_status"),
+                            value.get("ledger_entry_id"),
+                        )
+                        for key, value in decisions.items()
+                    ],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO event_hashes VALUES (?, ?, ?)",
+                    [(key[0], key[1], raw_payload_hash) for key, raw_payload_hash in event_hashes.items()],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (id, byte_offset, last_hash, segments) VALUES (1, ?, ?, ?)",
+                    (int(byte_offset), last_hash, int(segments)),
+                )
+
+    def query(self, limit: int = 100, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Entry locations matching all given filters, oldest first."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        for name, value in filters.items():
+            if name not in _QUERY_FILTERS:
+                raise ValueError(f"Unsupported ledger query filter: {name}")
+            if value is not None:
+                clauses.append(_QUERY_FILTERS[name])
+                params.append(value)
+        sql = f"SELECT {', '.join(ENTRY_COLUMNS)} FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp, segment, byte_offset LIMIT ?"
+        params.append(max(1, int(limit)))
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return []
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(zip(ENTRY_COLUMNS, row)) for row in rows]
+
+    def reset(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            with conn:
+                for table in ("entries", "meta", "decisions", "event_hashes"):
+                    conn.execute(f"DELETE FROM {table}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
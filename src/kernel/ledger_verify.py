@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .ledger import compute_entry_hash, entry_hash_ending_at
+from .segments import SegmentManifest, segment_dir_for, verify_segmented
+
+CHUNK_BYTES_DEFAULT = 64 * 1024 * 1024
+
+
+def _chunk_bounds(path: Path, start_offset: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split [start_offset, EOF) into ranges that end on a newline (the last may not)."""
+    size = path.stat().st_size
+    if size <= start_offset:
+        return []
+    bounds: List[Tuple[int, int]] = []
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = start_offset
+        while start < size:
+            newline = mm.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if newline < 0 else newline + 1
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _verify_chunk(task: Tuple[str, int, int]) -> Dict[str, Any]:
+    """
+    Rehash every entry in one byte range and check linkage inside it.
+    Linkage across ranges is stitched by the caller.
+    """
+    path, start, end = task
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:end]
+    result: Dict[str, Any] = {
+        "start": start,
+        "end": end,
+        "count": 0,
+        "first_offset": None,
+        "first_prev": None,
+        "last_hash": None,
+        "error": None,
+    }
+    offset = start
+    for raw in data.split(b"\n"):
+        line_offset = offset
+        offset += len(raw) + 1
+        if not raw.strip():
+            continue
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            result["error"] = {"offset": line_offset, "reason": "entry is not valid JSON"}
+            return result
+        prev_hash = entry.get("prev_hash", "")
+        if result["first_offset"] is None:
+            result["first_offset"] = line_offset
+            result["first_prev"] = prev_hash
+        elif prev_hash != result["last_hash"]:
+            result["error"] = {"offset": line_offset, "reason": "prev_hash does not link to the previous entry"}
+            return result
+        if compute_entry_hash(entry) != entry.get("entry_hash"):
+            result["error"] = {"offset": line_offset, "reason": "entry_hash does not match entry contents"}
+            return result
+        result["last_hash"] = entry["entry_hash"]
+        result["count"] += 1
+    return result
+
+
+def load_checkpoint(checkpoint_path: Path, ledger_path: Path, segments: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Load a verification checkpoint and confirm it still matches the ledger:
+    the entry ending at the checkpoint offset must carry the checkpoint hash.
+    Returns None when segments were sealed since the checkpoint was written; its
+    offset then points into an active file that no longer exists, and the caller
+    verifies the new active file from the last sealed root instead.
+    """
+    checkpoint = json.loads(Path(checkpoint_path).read_text(encoding="utf-8"))
+    if int(checkpoint.get("segments", 0)) != segments:
+        return None
+    offset = int(checkpoint.get("offset", 0))
+    if offset and entry_hash_ending_at(Path(ledger_path), offset) != checkpoint.get("last_hash"):
+        raise ValueError(f"Checkpoint {checkpoint_path} does not match ledger at offset {offset}")
+    return checkpoint
+
+
+def _write_checkpoint(
+    checkpoint_path: Path, ledger_path: Path, segments: int, offset: int, last_hash: str, entries: int
+) -> None:
+    tmp_path = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+    tmp_path.write_text(
+        json.dumps(
+            {
+                "ledger": str(ledger_path),
+                "segments": segments,
+                "offset": offset,
+                "last_hash": last_hash,
+                "entries": entries,
+            }
+        ),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, checkpoint_path)
+
+
+def verify_ledger_file(
+    ledger_path: str,
+    workers: int = 0,
+    chunk_bytes: int = CHUNK_BYTES_DEFAULT,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """
+    Verify a Stage-1 JSONL ledger.
+
+    The file is split into newline-aligned ranges read through mmap. Each range is
+    rehashed (entry_hash over canonical_json) in a process pool when workers > 1;
+    only the prev_hash links between ranges are checked in order here. A sealed
+    segment manifest next to the ledger is checked by its roots and provides the
+    chain head for the active file. With checkpoint_path the verified prefix is
+    recorded as (sealed segment count, active-file offset, hash) after every
+    range, and resume=True continues from it; a checkpoint taken before the
+    latest seal restarts at the head of the new active file.
+    """
+    path = Path(ledger_path)
+    started = time.perf_counter()
+    report: Dict[str, Any] = {
+        "ok": True,
+        "ledger": str(path),
+        "segments": 0,
+        "start_offset": 0,
+        "verified_offset": 0,
+        "entries": 0,
+        "checked": 0,
+        "last_hash": "",
+        "broken_offset": None,
+        "reason": None,
+    }
+
+    prev_hash = ""
+    segment_dir = segment_dir_for(path)
+    if (segment_dir / "manifest.json").exists():
+        seals = verify_segmented(path, segment_dir, "entry_hash", compute_entry_hash, include_tail=False)
+        report["segments"] = seals["segments"]
+        if not seals["ok"]:
+            report.update(ok=False, reason=f"segment {seals.get('segment')}: {seals['error']}")
+            return _finish(report, started)
+        prev_hash = SegmentManifest(segment_dir).last_hash
+
+    offset = 0
+    entries = 0
+    checkpoint_file = Path(checkpoint_path) if checkpoint_path else None
+    if resume and checkpoint_file and checkpoint_file.exists():
+        checkpoint = load_checkpoint(checkpoint_file, path, report["segments"]) or {}
+        offset = int(checkpoint.get("offset", 0))
+        if offset:
+            prev_hash = checkpoint.get("last_hash", prev_hash)
+            entries = int(checkpoint.get("entries", 0))
+    report.update(start_offset=offset, verified_offset=offset, last_hash=prev_hash)
+    resumed_entries = entries
+
+    tasks = [(str(path), start, end) for start, end in (_chunk_bounds(path, offset, chunk_bytes) if path.exists() else [])]
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(tasks) > 1 else None
+    results: Iterator[Dict[str, Any]] = executor.map(_verify_chunk, tasks) if executor else map(_verify_chunk, tasks)
+    try:
+        for result in results:
+            if result["count"] and result["first_prev"] != prev_hash:
+                report.update(
+                    ok=False,
+                    broken_offset=result["first_offset"],
+                    reason="prev_hash does not link to the previous entry",
+                )
+                break
+            entries += result["count"]
+            if result["error"]:
+                report.update(ok=False, broken_offset=result["error"]["offset"], reason=result["error"]["reason"])
+                break
+            if result["count"]:
+                prev_hash = result["last_hash"]
+            report.update(verified_offset=result["end"], last_hash=prev_hash)
+            if checkpoint_file:
+                _write_checkpoint(checkpoint_file, path, report["segments"], result["end"], prev_hash, entries)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+    report["entries"] = entries
+    report["checked"] = entries - resumed_entries
+    return _finish(report, started)
+
+
+def _finish(report: Dict[str, Any], started: float) -> Dict[str, Any]:
+    elapsed = time.perf_counter() - started
+    report["elapsed_s"] = round(elapsed, 3)
+    report["entries_per_sec"] = round(report["checked"] / elapsed, 1) if elapsed > 0 else 0.0
+    return report
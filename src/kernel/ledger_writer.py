@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+WRITER_QUEUE_SIZE_DEFAULT = 10_000
+WRITER_MAX_BATCH_DEFAULT = 1024
+
+_STOP = object()
+
+
+class LedgerWriter:
+    """
+    Background thread that drains a bounded queue of ledger records to disk.
+
+    Callers compute the hash chain in memory and hand records over with
+    submit(), which blocks (backpressure) while the queue is full. The thread
+    passes records to write_fn in batches of up to max_batch, in submission
+    order. flush() is a barrier: it returns once everything submitted before
+    the call has been written. A write_fn failure stops the writer and is
+    re-raised from the next submit()/flush().
+    """
+
+    def __init__(
+        self,
+        write_fn: Callable[[List[Any]], None],
+        max_queue: int = WRITER_QUEUE_SIZE_DEFAULT,
+        max_batch: int = WRITER_MAX_BATCH_DEFAULT,
+        name: str = "ledger-writer",
+    ) -> None:
+        self._write_fn = write_fn
+        self.max_queue = max(1, int(max_queue))
+        self.max_batch = max(1, int(max_batch))
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.max_queue)
+        self._cond = threading.Condition()
+        self._submitted = 0
+        self._written = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._stats = {
+            "batches": 0,
+            "blocked_submits": 0,
+            "max_queue_depth": 0,
+            "write_latency_ms_last": 0.0,
+            "write_latency_ms_max": 0.0,
+            "write_latency_ms_total": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Ledger writer failed; entries after the failure were not written") from self._error
+
+    def submit(self, record: Any, timeout: Optional[float] = None) -> None:
+        """Queue one record; blocks while the queue is full."""
+        self._raise_if_failed()
+        if self._closed:
+            raise RuntimeError("Ledger writer is closed")
+        with self._cond:
+            # Sequence numbers are taken under the lock so queue order matches them.
+            self._submitted += 1
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self._stats["blocked_submits"] += 1
+                self._cond.release()
+                try:
+                    self._queue.put(record, timeout=timeout)
+                except queue.Full:
+                    self._cond.acquire()
+                    self._submitted -= 1
+                    raise TimeoutError("Ledger writer queue is full") from None
+                self._cond.acquire()
+            depth = self._queue.qsize()
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every record submitted before this call is on disk."""
+        with self._cond:
+            target = self._submitted
+            done = self._cond.wait_for(lambda: self._written >= target or self._error is not None, timeout)
+        self._raise_if_failed()
+        if not done:
+            raise TimeoutError("Timed out waiting for the ledger writer to flush")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._error is None:
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._raise_if_failed()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            started = time.perf_counter()
+            try:
+                self._write_fn(batch)
+            except BaseException as exc:  # surfaced to callers via submit()/flush()
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            with self._cond:
+                self._written += len(batch)
+                self._stats["batches"] += 1
+                self._stats["write_latency_ms_last"] = elapsed_ms
+                self._stats["write_latency_ms_total"] += elapsed_ms
+                if elapsed_ms > self._stats["write_latency_ms_max"]:
+                    self._stats["write_latency_ms_max"] = elapsed_ms
+                self._cond.notify_all()
+            if stop:
+                return
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            batches = self._stats["batches"]
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.max_queue,
+                "max_queue_depth": self._stats["max_queue_depth"],
+                "submitted": self._submitted,
+                "written": self._written,
+                "batches": batches,
+                "blocked_submits": self._stats["blocked_submits"],
+                "write_latency_ms_last": round(self._stats["write_latency_ms_last"], 3),
+                "write_latency_ms_avg": round(self._stats["write_latency_ms_total"] / batches, 3) if batches else 0.0,
+                "write_latency_ms_max": round(self._stats["write_latency_ms_max"], 3),
+                "failed": self._error is not None,
+            }
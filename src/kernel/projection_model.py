@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None  # type: ignore[assignment]
+
+MODEL_BATCH = "batch"
+MODEL_COUNT_MIN = "count_min"
+MODEL_STREAM = "stream"
+
+COUNT_MIN_WIDTH_DEFAULT = 8192
+COUNT_MIN_DEPTH_DEFAULT = 4
+DECAY_INTERVAL_DEFAULT = 1_000_000
+SAVE_INTERVAL_SECONDS_DEFAULT = 5.0
+
+
+class BatchProjectionModel:
+    """
+    Per-batch projection frequencies (the original Stage-1 behaviour).
+    Nothing is carried over between batches.
+    """
+
+    kind = MODEL_BATCH
+
+    def __init__(self) -> None:
+        self._freq: Counter = Counter()
+        self._total = 0
+
+    def observe(self, projections: List[str]) -> None:
+        self._freq = Counter(projections)
+        self._total = len(projections)
+
+    def count(self, projection: str) -> int:
+        return int(self._freq.get(projection, 1))
+
+    @property
+    def total(self) -> int:
+        return max(1, self._total)
+
+    def save(self, force: bool = False) -> None:
+        return None
+
+
+class StreamProjectionModel(BatchProjectionModel):
+    """
+    Exact projection frequencies accumulated over the micro-batches of one
+    stream. Events are scored against the counts seen so far, so a stream
+    converges to, but does not always match, one batch of the same events.
+    """
+
+    kind = MODEL_STREAM
+
+    def observe(self, projections: List[str]) -> None:
+        self._freq.update(projections)
+        self._total += len(projections)
+
+
+def stream_projection_model(profile: Optional[Dict[str, Any]]) -> Optional[StreamProjectionModel]:
+    """
+    Model for one NDJSON stream: a StreamProjectionModel when the profile uses
+    per-batch counts, else None so classify_batch uses the shared model.
+    """
+    kind = str(_resolve_model_settings(profile).get("kind") or MODEL_BATCH).lower()
+    return StreamProjectionModel() if kind == MODEL_BATCH else None
+
+
+@lru_cache(maxsize=65536)
+def _row_hashes(projection: str, depth: int) -> Tuple[int, ...]:
+    digest = hashlib.blake2b(projection.encode("utf-8"), digest_size=8 * depth).digest()
+    return tuple(int.from_bytes(digest[i * 8 : (i + 1) * 8], "little") for i in range(depth))
+
+
+class CountMinProjectionModel:
+    """
+    Rolling projection frequencies shared across batches and source_ids.
+
+    A count-min sketch (depth x width counters) bounds memory regardless of how
+    many distinct projections are seen. Every `decay_interval` observations all
+    counters are halved so old traffic fades out. When `snapshot_path` is set
+    the sketch is reloaded on construction and save() merges the counts observed
+    since the last save into the snapshot under a file lock, so processes sharing
+    a snapshot add to each other's counts instead of overwriting them. save() is
+    a no-op until `save_interval` seconds have passed and the model is dirty.
+    """
+
+    kind = MODEL_COUNT_MIN
+
+    def __init__(
+        self,
+        width: int = COUNT_MIN_WIDTH_DEFAULT,
+        depth: int = COUNT_MIN_DEPTH_DEFAULT,
+        decay_interval: int = DECAY_INTERVAL_DEFAULT,
+        snapshot_path: Optional[str] = None,
+        save_interval: float = SAVE_INTERVAL_SECONDS_DEFAULT,
+    ) -> None:
+        import numpy as np
+
+        self._np = np
+        self.width = int(width)
+        self.depth = int(depth)
+        self.decay_interval = int(decay_interval)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.save_interval = float(save_interval)
+        self._counts = np.zeros((self.depth, self.width), dtype=np.uint64)
+        # Counts observed since the last save; merged into the snapshot on save().
+        self._pending = np.zeros((self.depth, self.width), dtype=np.uint64)
+        self._pending_total = 0
+        self._last_save = float("-inf")
+        self._lock = threading.Lock()
+        self._total = 0
+        self._since_decay = 0
+        if self.snapshot_path and self.snapshot_path.exists():
+            self._load()
+
+    @property
+    def dirty(self) -> bool:
+        return self._pending_total > 0
+
+    def _columns(self, projections: Iterable[str]) -> Any:
+        rows = [_row_hashes(p, self.depth) for p in projections]
+        return self._np.array(rows, dtype=self._np.uint64).reshape(-1, self.depth) % self.width
+
+    def observe(self, projections: List[str]) -> None:
+        if not projections:
+            return
+        np = self._np
+        columns = self._columns(projections)
+        with self._lock:
+            for row in range(self.depth):
+                np.add.at(self._counts[row], columns[:, row].astype(np.int64), 1)
+                if self.snapshot_path:
+                    np.add.at(self._pending[row], columns[:, row].astype(np.int64), 1)
+            self._total += len(projections)
+            if self.snapshot_path:
+                self._pending_total += len(projections)
+            self._since_decay += len(projections)
+            if self.decay_interval > 0 and self._since_decay >= self.decay_interval:
+                self._counts >>= np.uint64(1)
+                self._total //= 2
+                self._since_decay = 0
+
+    def count(self, projection: str) -> int:
+        columns = [h % self.width for h in _row_hashes(projection, self.depth)]
+        estimate = min(int(self._counts[row, col]) for row, col in enumerate(columns))
+        return max(1, estimate)
+
+    @property
+    def total(self) -> int:
+        return max(1, self._total)
+
+    def save(self, force: bool = False) -> None:
+        if not self.snapshot_path or not self.dirty:
+            return
+        if not force and time.monotonic() - self._last_save < self.save_interval:
+            return
+        np = self._np
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}.tmp")
+        with _snapshot_file_lock(self.snapshot_path), self._lock:
+            counts, total, since_decay = self._pending.copy(), self._pending_total, self._pending_total
+            on_disk = self._read_snapshot() if self.snapshot_path.exists() else None
+            if on_disk is not None:
+                counts += on_disk[0]
+                total += on_disk[1]
+                since_decay += on_disk[2]
+            else:
+                # No snapshot yet: local counts (pending plus any decayed history) are the state.
+                counts, total, since_decay = self._counts.copy(), self._total, self._since_decay
+            if self.decay_interval > 0 and since_decay >= self.decay_interval:
+                counts >>= np.uint64(1)
+                total //= 2
+                since_decay = 0
+            with tmp_path.open("wb") as handle:
+                np.savez(
+                    handle,
+                    counts=counts,
+                    meta=np.array([self.width, self.depth, total, since_decay], dtype=np.int64),
+                )
+            os.replace(tmp_path, self.snapshot_path)
+            self._counts, self._total, self._since_decay = counts, total, since_decay
+            self._pending[:] = 0
+            self._pending_total = 0
+            self._last_save = time.monotonic()
+
+    def _read_snapshot(self) -> Optional[Tuple[Any, int, int]]:
+        np = self._np
+        with np.load(self.snapshot_path) as snapshot:
+            width, depth, total, since_decay = (int(v) for v in snapshot["meta"])
+            if (width, depth) != (self.width, self.depth):
+                # Sketch geometry changed in the profile; start a fresh sketch.
+                return None
+            return snapshot["counts"].astype(np.uint64), total, since_decay
+
+    def _load(self) -> None:
+        loaded = self._read_snapshot()
+        if loaded is not None:
+            self._counts, self._total, self._since_decay = loaded
+
+
+@contextmanager
+def _snapshot_file_lock(snapshot_path: Path) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    lock_path = snapshot_path.with_name(snapshot_path.name + ".lock")
+    with lock_path.open("a+b") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _resolve_model_settings(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    profile = profile or {}
+    settings = profile.get("projection_model") or (profile.get("parameters") or {}).get("projection_model")
+    if not settings:
+        return {"kind": MODEL_BATCH}
+    if isinstance(settings, str):
+        return {"kind": settings}
+    return dict(settings)
+
+
+def projection_snapshot_path(ledger_path: Path) -> Path:
+    return ledger_path.with_name(f"{ledger_path.stem}.projections.npz")
+
+
+_shared_models: Dict[Tuple[str, int, int, int], CountMinProjectionModel] = {}
+_shared_lock = threading.Lock()
+
+
+def projection_model_for(profile: Optional[Dict[str, Any]], ledger_path: Path):
+    """
+    Return the projection model selected by the profile.
+    Count-min models are shared per ledger so consecutive batches accumulate.
+    """
+    settings = _resolve_model_settings(profile)
+    kind = str(settings.get("kind") or MODEL_BATCH).lower()
+    if kind == MODEL_BATCH:
+        return BatchProjectionModel()
+    if kind != MODEL_COUNT_MIN:
+        raise ValueError(f"Unsupported projection model: {kind}")
+
+    width = int(settings.get("width") or COUNT_MIN_WIDTH_DEFAULT)
+    depth = int(settings.get("depth") or COUNT_MIN_DEPTH_DEFAULT)
+    decay_interval = int(settings.get("decay_interval") or DECAY_INTERVAL_DEFAULT)
+    save_interval = settings.get("save_interval_seconds")
+    save_interval = SAVE_INTERVAL_SECONDS_DEFAULT if save_interval is None else float(save_interval)
+    snapshot_path = projection_snapshot_path(ledger_path)
+    key = (str(snapshot_path.resolve()), width, depth, decay_interval)
+    with _shared_lock:
+        model = _shared_models.get(key)
+        if model is None:
+            model = CountMinProjectionModel(
+                width=width,
+                depth=depth,
+                decay_interval=decay_interval,
+                snapshot_path=str(snapshot_path),
+                save_interval=save_interval,
+            )
+            _shared_models[key] = model
+        return model
+
+
+@atexit.register
+def flush_projection_models() -> None:
+    """Write any unsaved counts of the shared models (also called at app shutdown)."""
+    with _shared_lock:
+        models = list(_shared_models.values())
+    for model in models:
+        model.save(force=True)
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .hashing import canonical_json, sha256_hex
+
+MANIFEST_NAME = "manifest.json"
+
+COMPRESSION_NONE = "none"
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+_SUFFIXES = {COMPRESSION_NONE: "", COMPRESSION_GZIP: ".gz", COMPRESSION_ZSTD: ".zst"}
+
+VERIFY_ROOTS = "roots"
+VERIFY_FULL = "full"
+
+EntryHasher = Callable[[Dict[str, Any]], str]
+
+
+def _require_zstd():
+    try:
+        import zstandard  # type: ignore
+    except ImportError as exc:
+        raise RuntimeError("zstd segment compression requires the zstandard package.") from exc
+    return zstandard
+
+
+def merkle_root(hashes: Sequence[str]) -> str:
+    """
+    Merkle root over hex entry hashes (RFC 6962 style leaf/node prefixes).
+    An odd node at the end of a level is carried up unchanged.
+    """
+    if not hashes:
+        return hashlib.sha256(b"").hexdigest()
+    level = [hashlib.sha256(b"\x00" + bytes.fromhex(h)).digest() for h in hashes]
+    while len(level) > 1:
+        paired = [hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+def segment_root(record: Dict[str, Any]) -> str:
+    """Seal hash of a segment; it covers the previous segment's root, which chains the seals."""
+    return sha256_hex(
+        canonical_json(
+            {
+                "index": record["index"],
+                "entries": record["entries"],
+                "prev_hash": record["prev_hash"],
+                "first_hash": record["first_hash"],
+                "last_hash": record["last_hash"],
+                "merkle_root": record["merkle_root"],
+                "prev_root": record["prev_root"],
+            }
+        )
+    )
+
+
+def segment_dir_for(ledger_path: Path) -> Path:
+    return ledger_path.with_name(f"{ledger_path.stem}.segments")
+
+
+def _open_read(path: Path, compression: str) -> IO[bytes]:
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(path, "rb")
+    if compression == COMPRESSION_ZSTD:
+        reader = _require_zstd().ZstdDecompressor().stream_reader(path.open("rb"))
+        return io.BufferedReader(reader)
+    return path.open("rb")
+
+
+def _write_compressed(path: Path, data: bytes, compression: str) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    if compression == COMPRESSION_GZIP:
+        with gzip.open(tmp_path, "wb") as handle:
+            handle.write(data)
+    elif compression == COMPRESSION_ZSTD:
+        tmp_path.write_bytes(_require_zstd().ZstdCompressor().compress(data))
+    else:
+        tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class SegmentManifest:
+    """
+    Sealed segments of one JSONL ledger, in order.
+    Stored as <segment dir>/manifest.json and rewritten atomically on every seal.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.path = self.directory / MANIFEST_NAME
+        self.segments: List[Dict[str, Any]] = []
+        if self.path.exists():
+            self.segments = json.loads(self.path.read_text(encoding="utf-8")).get("segments", [])
+
+    @property
+    def last_root(self) -> str:
+        return self.segments[-1]["root"] if self.segments else ""
+
+    @property
+    def last_hash(self) -> str:
+        return self.segments[-1]["last_hash"] if self.segments else ""
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"segments": self.segments}, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def segment_path(self, record: Dict[str, Any]) -> Path:
+        return self.directory / record["file"]
+
+    def iter_lines(self, record: Dict[str, Any]) -> Iterator[bytes]:
+        for _, raw in self.iter_lines_with_offsets(record):
+            yield raw
+
+    def iter_lines_with_offsets(self, record: Dict[str, Any]) -> Iterator[Tuple[int, bytes]]:
+        """Non-empty lines with their byte offset in the uncompressed segment."""
+        offset = 0
+        with _open_read(self.segment_path(record), record.get("compression", COMPRESSION_NONE)) as handle:
+            for raw in handle:
+                if raw.strip():
+                    yield offset, raw
+                offset += len(raw)
+
+    def read_at(self, index: int, offset: int, length: int) -> bytes:
+        record = self.segments[index - 1]
+        compression = record.get("compression", COMPRESSION_NONE)
+        with _open_read(self.segment_path(record), compression) as handle:
+            if compression == COMPRESSION_NONE:
+                handle.seek(offset)
+            else:
+                # Compressed streams cannot seek; decompress up to the offset.
+                remaining = offset
+                while remaining > 0:
+                    skipped = len(handle.read(min(remaining, 1 << 20)))
+                    if not skipped:
+                        break
+                    remaining -= skipped
+            return handle.read(length)
+
+    def seal(self, active_path: Path, hash_field: str, compression: str = COMPRESSION_NONE) -> Optional[Dict[str, Any]]:
+        """
+        Move the active file into a new sealed segment and record it in the manifest.
+        The caller truncates or removes the active file afterwards.
+        """
+        if compression not in _SUFFIXES:
+            raise ValueError(f"Unsupported segment compression: {compression}")
+        data = active_path.read_bytes()
+        entries = [json.loads(raw) for raw in data.splitlines() if raw.strip()]
+        if not entries:
+            return None
+        hashes = [entry[hash_field] for entry in entries]
+        index = len(self.segments) + 1
+        record: Dict[str, Any] = {
+            "index": index,
+            "file": f"segment-{index:06d}.jsonl{_SUFFIXES[compression]}",
+            "compression": compression,
+            "entries": len(entries),
+            "bytes": len(data),
+            "prev_hash": entries[0].get("prev_hash", ""),
+            "first_hash": hashes[0],
+            "last_hash": hashes[-1],
+            "merkle_root": merkle_root(hashes),
+            "prev_root": self.last_root,
+        }
+        record["root"] = segment_root(record)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_compressed(self.segment_path(record), data, compression)
+        self.segments.append(record)
+        self.save()
+        return record
+
+    def compress(self, compression: str = COMPRESSION_GZIP, keep_latest: int = 0) -> int:
+        """
+        Recompress sealed segments (all but the newest keep_latest) in place.
+        Roots cover entry hashes, not file bytes, so verification is unaffected.
+        """
+        if compression not in _SUFFIXES:
+            raise ValueError(f"Unsupported segment compression: {compression}")
+        targets = self.segments[: max(0, len(self.segments) - keep_latest)]
+        changed = 0
+        for record in targets:
+            if record.get("compression", COMPRESSION_NONE) == compression:
+                continue
+            old_path = self.segment_path(record)
+            with _open_read(old_path, record.get("compression", COMPRESSION_NONE)) as handle:
+                data = handle.read()
+            record["file"] = f"segment-{record['index']:06d}.jsonl{_SUFFIXES[compression]}"
+            record["compression"] = compression
+            _write_compressed(self.segment_path(record), data, compression)
+            self.save()
+            if old_path != self.segment_path(record):
+                old_path.unlink()
+            changed += 1
+        return changed
+
+
+def _verify_entries(
+    lines: Iterator[bytes],
+    prev_hash: str,
+    hash_field: str,
+    hasher: EntryHasher,
+) -> Dict[str, Any]:
+    hashes: List[str] = []
+    for number, raw in enumerate(lines, start=1):
+        entry = json.loads(raw)
+        if entry.get("prev_hash", "") != prev_hash:
+            return {"ok": False, "entry": number, "error": "prev_hash does not link to the previous entry"}
+        if hasher(entry) != entry.get(hash_field):
+            return {"ok": False, "entry": number, "error": f"{hash_field} does not match entry contents"}
+        prev_hash = entry[hash_field]
+        hashes.append(prev_hash)
+    return {"ok": True, "hashes": hashes, "last_hash": prev_hash}
+
+
+def verify_segmented(
+    active_path: Path,
+    segment_dir: Path,
+    hash_field: str,
+    hasher: EntryHasher,
+    mode: str = VERIFY_ROOTS,
+    include_tail: bool = True,
+) -> Dict[str, Any]:
+    """
+    Verify a segmented ledger.
+
+    "roots" checks the manifest seal chain and rehashes only the unsealed active
+    file; "full" also reads every sealed segment and recomputes its entry hashes
+    and Merkle root. include_tail=False skips the active file.
+    """
+    if mode not in (VERIFY_ROOTS, VERIFY_FULL):
+        raise ValueError(f"Unsupported verification mode: {mode}")
+    manifest = SegmentManifest(segment_dir)
+    report: Dict[str, Any] = {
+        "ok": True,
+        "mode": mode,
+        "segments": len(manifest.segments),
+        "sealed_entries": 0,
+        "tail_entries": 0,
+        "error": None,
+    }
+
+    def _fail(error: str, **where: Any) -> Dict[str, Any]:
+        report.update(ok=False, error=error, **where)
+        return report
+
+    prev_root = ""
+    prev_hash = ""
+    for record in manifest.segments:
+        index = record["index"]
+        if record["prev_root"] != prev_root:
+            return _fail("segment is not chained to the previous root", segment=index)
+        if segment_root(record) != record["root"]:
+            return _fail("segment root does not match its seal", segment=index)
+        if record["prev_hash"] != prev_hash:
+            return _fail("segment does not continue the entry chain", segment=index)
+        if mode == VERIFY_FULL:
+            result = _verify_entries(manifest.iter_lines(record), prev_hash, hash_field, hasher)
+            if not result["ok"]:
+                return _fail(result["error"], segment=index, entry=result["entry"])
+            hashes = result["hashes"]
+            if len(hashes) != record["entries"] or merkle_root(hashes) != record["merkle_root"]:
+                return _fail("segment contents do not match its Merkle root", segment=index)
+        report["sealed_entries"] += record["entries"]
+        prev_root = record["root"]
+        prev_hash = record["last_hash"]
+
+    report["last_hash"] = prev_hash
+    if include_tail and active_path.exists():
+        with active_path.open("rb") as handle:
+            result = _verify_entries((raw for raw in handle if raw.strip()), prev_hash, hash_field, hasher)
+        if not result["ok"]:
+            return _fail(result["error"], segment=None, entry=result["entry"])
+        report["tail_entries"] = len(result["hashes"])
+        report["last_hash"] = result["last_hash"]
+    return report
@@ -1,16 +1,25 @@
 from __future__ import annotations
 
+import atexit
 import math
 import re
+import threading
 import time
 import uuid
 from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-from .hashing import canonical_json, hash_payload, sha256_hex
+from .entropy import miller_madow_entropy_batch
+from .feature_cache import FeatureCache, payload_hashes
+from .hashing import canonical_json, sha256_hex
 from .ledger import Ledger
+from .projection_model import projection_model_for
 from ..ingest.siem_formats import parse_cef, parse_leef, parse_syslog
+from ..markers import get_matcher, matcher_from_profile
 
 ENTROPY_FLOOR_DEFAULT = 2.0
 ENTROPY_CEILING = 5.2831
@@ -40,13 +49,25 @@ _DOMAIN_RE = re.compile(r"\\b(?:[a-zA-Z0-9-]{1,63}\\.)+(?:[a-zA-Z]{2,63})\\b")
 _HEX_RE = re.compile(r"\\b[a-fA-F0-9]{16,}\\b")
 _NUM_RE = re.compile(r"\\b\\d+\\b")
 
+# The substitution patterns above are written with doubled escapes, so every one
+# of them starts with a literal backslash followed by "b". Text without that
+# sequence cannot match and is returned after a single scan.
+_TEMPLATE_MARKER = "\\b"
+
+FEATURE_CHUNK_SIZE = 2048
+
+TEMPLATE_MEMO_SIZE = 65536
+TEMPLATE_MEMO_MAX_CHARS = 4096
+
 
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _template_text(s: str) -> str:
+def _template_text_uncached(s: str) -> str:
     s = (s or "").lower()
+    if _TEMPLATE_MARKER not in s:
+        return s
     s = _IP_RE.sub("<ip>", s)
     s = _DOMAIN_RE.sub("<domain>", s)
     s = _HEX_RE.sub("<hex>", s)
@@ -54,6 +75,36 @@ def _template_text(s: str) -> str:
     return s
 
 
+class _TemplateCounts(threading.local):
+    """Memo lookups and misses made by the current thread (cache_info() is process-wide)."""
+
+    def __init__(self) -> None:
+        self.lookups = 0
+        self.misses = 0
+
+
+_template_counts = _TemplateCounts()
+
+
+@lru_cache(maxsize=TEMPLATE_MEMO_SIZE)
+def _template_text_memo(s: str) -> str:
+    _template_counts.misses += 1
+    return _template_text_uncached(s)
+
+
+def _template_text(s: str) -> str:
+    if isinstance(s, str) and len(s) <= TEMPLATE_MEMO_MAX_CHARS:
+        _template_counts.lookups += 1
+        return _template_text_memo(s)
+    return _template_text_uncached(s)
+
+
+def template_cache_stats() -> Dict[str, int]:
+    """Process-wide memo totals, including lookups by concurrent batches."""
+    info = _template_text_memo.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
 def _bucket_port(port: object) -> str:
     try:
         p = int(str(port))
@@ -173,41 +224,6 @@ def _project_event(obj: object) -> str:
     return "|".join(parts) if parts else _template_text(canonical_json(obj))
 
 
-def _contains_suspicious_markers(text: str) -> bool:
-    s = (text or "").lower()
-    needles = (
-        "mimikatz",
-        "lsass",
-        "dcsync",
-        "domain admins",
-        "krbtgt",
-        "psexec",
-        "wmic",
-        "regsvr32",
-        "rundll32",
-        "certutil",
-        "t1003",
-        "t1059",
-        "t1053",
-        "4662",
-        "4698",
-        "4104",
-        "ransom",
-        "encrypt",
-        "mass rename",
-        "prompt injection",
-        "ignore all previous",
-        "twin-liar",
-        "twin liar",
-        "flow_anomaly",
-        "process_event",
-        "unrecognized protocol",
-        "tls-z",
-        "zero-latency-draft",
-    )
-    return any(n in s for n in needles)
-
-
 def _miller_madow_entropy_bytes(data: bytes) -> float:
     if not data:
         return 0.0
@@ -222,6 +238,19 @@ def _miller_madow_entropy_bytes(data: bytes) -> float:
     return float(h_raw + correction)
 
 
+def _analysis_text(event: Dict[str, Any]) -> str:
+    payload_for_analysis = event.get("parsed_payload") or event.get("raw_payload")
+    if payload_for_analysis is None:
+        payload_for_analysis = event.get("raw_payload_ref")
+    return _extract_payload_text(
+        payload_for_analysis if isinstance(payload_for_analysis, dict) else {"payload": payload_for_analysis}
+    )
+
+
+def _template_bytes(payload_text: str) -> bytes:
+    return _template_text(payload_text).encode("utf-8", errors="ignore")
+
+
 def _resolve_thresholds(profile: Optional[Dict[str, Any]]) -> Dict[str, float]:
     profile = profile or {}
     thresholds = (
@@ -244,6 +273,8 @@ def _resolve_thresholds(profile: Optional[Dict[str, Any]]) -> Dict[str, float]:
 
 
 def _parse_if_needed(event: Dict[str, Any]) -> Dict[str, Any]:
+    if isinstance(event.get("parsed_payload"), dict):
+        return event  # already parsed upstream (e.g. src.ingest.bulk envelopes)
     fmt = (event.get("format") or "").lower()
     raw_payload = event.get("raw_payload")
     raw_event = event.get("raw_event")
@@ -273,17 +304,155 @@ def _parse_by_format(fmt: str, raw: str) -> Dict[str, Any]:
     raise ValueError(f"Unsupported format: {fmt}")
 
 
+@dataclass
+class EventFeatures:
+    """Pure per-event Stage-1 features; safe to compute in a worker process."""
+
+    source_id: Any
+    event_id: Any
+    source_timestamp: Any
+    has_payload: bool
+    raw_payload_hash: Optional[str]
+    projection: str
+    entropy_raw: float
+    suspicious_markers: List[str]
+    content_hash: Optional[str] = None
+    entropy_from_payload: bool = False
+
+
+def _feature_chunk(
+    events: List[Dict[str, Any]],
+    markers: Tuple[str, ...],
+    vectorized: bool = False,
+) -> Tuple[List[EventFeatures], Dict[str, int]]:
+    """
+    Parse, project, template, entropy-score and hash a chunk of events.
+    Returns the features plus this chunk's template memo hits and misses,
+    counted on the calling thread so concurrent batches do not mix in.
+    """
+    lookups_start, misses_start = _template_counts.lookups, _template_counts.misses
+    matcher = get_matcher(markers)
+    prepared = [_parse_if_needed(dict(e)) for e in events]
+    texts = [_analysis_text(evt) for evt in prepared]
+    if vectorized:
+        entropies = miller_madow_entropy_batch([_template_bytes(t) for t in texts])
+    else:
+        entropies = [_miller_madow_entropy_bytes(_template_bytes(t)) for t in texts]
+
+    features: List[EventFeatures] = []
+    for evt, text, entropy_raw in zip(prepared, texts, entropies):
+        payload_for_projection = evt.get("parsed_payload") or evt.get("raw_payload")
+        projection_obj: Dict[str, Any] = {}
+        if isinstance(payload_for_projection, dict):
+            projection_obj.update(payload_for_projection)
+        raw_payload = evt.get("raw_payload")
+        raw_payload_ref = evt.get("raw_payload_ref")
+        has_payload = raw_payload is not None or raw_payload_ref is not None
+        raw_payload_hash = evt.get("raw_payload_hash")
+        content_hash = None
+        if not raw_payload_hash and has_payload:
+            raw_payload_hash, content_hash = payload_hashes(raw_payload if raw_payload is not None else raw_payload_ref)
+        features.append(
+            EventFeatures(
+                source_id=evt.get("source_id"),
+                event_id=evt.get("event_id"),
+                source_timestamp=evt.get("source_timestamp"),
+                has_payload=has_payload,
+                raw_payload_hash=raw_payload_hash,
+                projection=_project_event(projection_obj if projection_obj else payload_for_projection),
+                entropy_raw=entropy_raw,
+                suspicious_markers=matcher.find_all(text),
+                content_hash=content_hash,
+                entropy_from_payload=bool(raw_payload) and not evt.get("parsed_payload"),
+            )
+        )
+    misses = _template_counts.misses - misses_start
+    return features, {"hits": _template_counts.lookups - lookups_start - misses, "misses": misses}
+
+
+_process_pools: Dict[int, ProcessPoolExecutor] = {}
+_process_pools_lock = threading.Lock()
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    with _process_pools_lock:
+        pool = _process_pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            _process_pools[workers] = pool
+        return pool
+
+
+@atexit.register
+def shutdown_process_pools() -> None:
+    """Stop the shared feature-stage worker processes (also called at app shutdown)."""
+    with _process_pools_lock:
+        pools = list(_process_pools.values())
+        _process_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _compute_features(
+    events: List[Dict[str, Any]],
+    markers: Tuple[str, ...],
+    vectorized: bool,
+    workers: int,
+    chunk_size: int,
+    executor: Optional[Executor] = None,
+) -> Tuple[List[EventFeatures], Dict[str, int]]:
+    pool = executor
+    if pool is None:
+        if workers <= 1 or len(events) <= chunk_size:
+            return _feature_chunk(events, markers, vectorized)
+        pool = _process_pool(workers)
+    futures = [
+        pool.submit(_feature_chunk, events[start : start + chunk_size], markers, vectorized)
+        for start in range(0, len(events), chunk_size)
+    ]
+    features: List[EventFeatures] = []
+    stats = {"hits": 0, "misses": 0}
+    for future in futures:
+        chunk_features, chunk_stats = future.result()
+        features.extend(chunk_features)
+        stats["hits"] += chunk_stats["hits"]
+        stats["misses"] += chunk_stats["misses"]
+    return features, stats
+
+
 def classify_batch(
     events: List[Dict[str, Any]],
     profile: Optional[Dict[str, Any]] = None,
     ledger: Optional[Ledger] = None,
     precondition: Optional[Dict[str, Any]] = None,
+    vectorized: bool = False,
+    workers: int = 0,
+    chunk_size: int = FEATURE_CHUNK_SIZE,
+    feature_cache: Optional[FeatureCache] = None,
+    executor: Optional[Executor] = None,
+    projection_model: Optional[Any] = None,
 ) -> Dict[str, Any]:
+    """
+    Stage-1 admissibility classification for a batch of ingest events.
+    With vectorized=True, raw entropy is computed per chunk by the NumPy engine
+    in entropy.py (bit-identical to the per-event path). With workers > 1, the
+    pure per-event feature work is sharded across a process pool in chunks of
+    chunk_size; idempotency checks and ledger chaining stay in this process and
+    in input order, so the ledger is identical to the serial path. The ledger
+    section runs under ledger.append_lock, so concurrent batches on one ledger
+    are written one after the other. An explicit
+    executor replaces that pool and receives every chunk, even for small batches.
+    With a feature_cache, each scored payload is registered under its
+    raw_payload_hash for KernelGate and dedup to reuse later in the run.
+    An explicit projection_model replaces the one selected by the profile,
+    e.g. to carry projection counts across the micro-batches of a stream.
+    """
     ledger = ledger or Ledger()
     if precondition and isinstance(precondition, dict):
         ledger.seed_idempotency(precondition.get("already_ingested"))
 
     thresholds = _resolve_thresholds(profile)
+    marker_matcher = matcher_from_profile(profile)
     effective_profile = dict(profile or {})
     ingest_params = dict(
         (profile or {}).get("ingestion_thresholds")
@@ -311,235 +480,247 @@ def classify_batch(
 
     per_event = []
 
-    ledger.append(
-        "BATCH_RECEIVED",
-        {
-            "batch_id": batch_id,
-            "received_count": len(events),
-            "profile_parameters": effective_profile,
-        },
+    features, template_stats = _compute_features(
+        events,
+        marker_matcher.markers,
+        vectorized=vectorized,
+        workers=workers,
+        chunk_size=max(1, chunk_size),
+        executor=executor,
     )
-
-    prepared_events: List[Dict[str, Any]] = [_parse_if_needed(dict(e)) for e in events]
-    n = max(1, len(prepared_events))
-    projections: List[str] = []
-    for evt in prepared_events:
-        payload_for_projection = evt.get("parsed_payload") or evt.get("raw_payload")
-        projection_obj: Dict[str, Any] = {}
-        if isinstance(payload_for_projection, dict):
-            projection_obj.update(payload_for_projection)
-        projections.append(_project_event(projection_obj if projection_obj else payload_for_projection))
-    freq = Counter(projections)
-
-    for event, proj in zip(prepared_events, projections):
-        source_id = event.get("source_id")
-        event_id = event.get("event_id")
-        source_timestamp = event.get("source_timestamp")
-        raw_payload = event.get("raw_payload")
-        raw_payload_ref = event.get("raw_payload_ref")
-        raw_payload_hash = event.get("raw_payload_hash")
-
-        if not source_id or not event_id or not source_timestamp or (raw_payload is None and raw_payload_ref is None):
-            counters["failed_count"] += 1
-            per_event.append(
-                {
-                    "event_id": event_id,
-                    "status": STATUS_FAILED,
-                    "error_code": "INVALID_SCHEMA",
-                    "http_status": HTTP_BAD_REQUEST,
-                }
+    if feature_cache is not None:
+        for event, feature in zip(events, features):
+            if event.get("raw_payload_hash"):
+                continue  # caller-supplied hash: not derived from the payload here
+            feature_cache.register(
+                event.get("raw_payload"),
+                feature.raw_payload_hash,
+                entropy=float(feature.entropy_raw) if feature.entropy_from_payload else None,
+                content_hash=feature.content_hash,
             )
-            continue
+    projections = [f.projection for f in features]
+    if projection_model is None:
+        projection_model = projection_model_for(profile, ledger.file_path)
+    projection_model.observe(projections)
+    n = projection_model.total
+
+    # Idempotency lookups and the batch entries stay contiguous per ledger.
+    with ledger.append_lock:
+        ledger.append(
+            "BATCH_RECEIVED",
+            {
+                "batch_id": batch_id,
+                "received_count": len(events),
+                "profile_parameters": effective_profile,
+            },
+        )
 
-        if not raw_payload_hash:
-            raw_payload_hash = hash_payload(raw_payload if raw_payload is not None else raw_payload_ref)
-
-        idempotent = ledger.lookup_idempotent(source_id, event_id, raw_payload_hash)
-        if idempotent:
-            counters["replayed_count"] += 1
-            replay_entry = ledger.append(
-                "IDEMPOTENT_REPLAY",
-                {
-                    "source_id": source_id,
-                    "event_id": event_id,
-                    "raw_payload_hash": raw_payload_hash,
-                    "original_ledger_entry_id": idempotent.get("ledger_entry_id"),
-                },
-            )
-            per_event.append(
-                {
-                    "event_id": event_id,
-                    "status": STATUS_REPLAYED,
-                    "band": idempotent.get("band"),
-                    "decision_code": idempotent.get("decision_code"),
-                    "http_status": idempotent.get("http_status") or HTTP_OK,
-                    "ledger": {
-                        "replay_entry_decision_code": "IDEMPOTENT_REPLAY",
-                        "replay_entry_id": replay_entry.get("entry_id"),
-                    },
-                }
-            )
-            continue
+        for feature in features:
+            source_id = feature.source_id
+            event_id = feature.event_id
+            source_timestamp = feature.source_timestamp
+            proj = feature.projection
+
+            if not source_id or not event_id or not source_timestamp or not feature.has_payload:
+                counters["failed_count"] += 1
+                per_event.append(
+                    {
+                        "event_id": event_id,
+                        "status": STATUS_FAILED,
+                        "error_code": "INVALID_SCHEMA",
+                        "http_status": HTTP_BAD_REQUEST,
+                    }
+                )
+                continue
 
-        prior_hash = ledger.lookup_event_hash(source_id, event_id)
-        if prior_hash and prior_hash != raw_payload_hash:
-            counters["conflict_count"] += 1
-            conflict_entry = ledger.append(
-                "EVENT_ID_CONFLICT",
-                {
-                    "source_id": source_id,
-                    "event_id": event_id,
-                    "raw_payload_hash_old": prior_hash,
-                    "raw_payload_hash_new": raw_payload_hash,
-                },
-            )
-            per_event.append(
-                {
-                    "event_id": event_id,
-                    "status": STATUS_CONFLICT,
-                    "http_status": HTTP_CONFLICT,
-                    "ledger": {
-                        "conflict_entry_decision_code": "EVENT_ID_CONFLICT",
-                        "conflict_entry_id": conflict_entry.get("entry_id"),
+            raw_payload_hash = feature.raw_payload_hash
+
+            idempotent = ledger.lookup_idempotent(source_id, event_id, raw_payload_hash)
+            if idempotent:
+                counters["replayed_count"] += 1
+                replay_entry = ledger.append(
+                    "IDEMPOTENT_REPLAY",
+                    {
+                        "source_id": source_id,
+                        "event_id": event_id,
+                        "raw_payload_hash": raw_payload_hash,
+                        "original_ledger_entry_id": idempotent.get("ledger_entry_id"),
                     },
-                }
-            )
-            continue
+                )
+                per_event.append(
+                    {
+                        "event_id": event_id,
+                        "status": STATUS_REPLAYED,
+                        "band": idempotent.get("band"),
+                        "decision_code": idempotent.get("decision_code"),
+                        "http_status": idempotent.get("http_status") or HTTP_OK,
+                        "ledger": {
+                            "replay_entry_decision_code": "IDEMPOTENT_REPLAY",
+                            "replay_entry_id": replay_entry.get("entry_id"),
+                        },
+                    }
+                )
+                continue
 
-        payload_for_analysis = event.get("parsed_payload") or raw_payload
+            prior_hash = ledger.lookup_event_hash(source_id, event_id)
+            if prior_hash and prior_hash != raw_payload_hash:
+                counters["conflict_count"] += 1
+                conflict_entry = ledger.append(
+                    "EVENT_ID_CONFLICT",
+                    {
+                        "source_id": source_id,
+                        "event_id": event_id,
+                        "raw_payload_hash_old": prior_hash,
+                        "raw_payload_hash_new": raw_payload_hash,
+                    },
+                )
+                per_event.append(
+                    {
+                        "event_id": event_id,
+                        "status": STATUS_CONFLICT,
+                        "http_status": HTTP_CONFLICT,
+                        "ledger": {
+                            "conflict_entry_decision_code": "EVENT_ID_CONFLICT",
+                            "conflict_entry_id": conflict_entry.get("entry_id"),
+                        },
+                    }
+                )
+                continue
 
-        if payload_for_analysis is None:
-            payload_for_analysis = raw_payload_ref
+            projection_count = projection_model.count(proj)
+            p = max(1.0 / n, float(projection_count) / float(n))
+            entropy_projected = -math.log2(p)
 
-        p = max(1.0 / n, float(freq.get(proj, 1)) / float(n))
-        entropy_projected = -math.log2(p)
+            entropy_raw = feature.entropy_raw
+            suspicious_markers = feature.suspicious_markers
+            suspicious = bool(suspicious_markers)
 
-        payload_text = _extract_payload_text(
-            payload_for_analysis if isinstance(payload_for_analysis, dict) else {"payload": payload_for_analysis}
-        )
-        raw_text = _template_text(payload_text)
-        raw_bytes = raw_text.encode("utf-8", errors="ignore")
-        entropy_raw = _miller_madow_entropy_bytes(raw_bytes)
-
-        suspicious = _contains_suspicious_markers(payload_text)
-
-        band = BAND_MIMIC
-        decision_code = DECISION_MIMIC
-        http_status = HTTP_OK
-        reason = "Mimic Pattern: Requires triage"
-        if entropy_raw > thresholds["entropy_ceiling"]:
-            band = BAND_VACUUM
-            decision_code = DECISION_VACUUM
-            http_status = HTTP_DROP
-            reason = "Thermodynamic Limit Exceeded (High Randomness)"
-        elif entropy_projected < thresholds["entropy_floor"] and not suspicious:
-            band = BAND_LOW
-            decision_code = DECISION_LOW
+            band = BAND_MIMIC
+            decision_code = DECISION_MIMIC
             http_status = HTTP_OK
-            reason = "Deterministic Pattern / Background noise"
-
-        features = {
-            "entropy_raw": round(float(entropy_raw), 4),
-            "entropy_projected": round(float(entropy_projected), 4),
-            "entropy_ceiling": thresholds["entropy_ceiling"],
-            "entropy_floor": thresholds["entropy_floor"],
-            "projection": proj,
-            "projection_count": int(freq.get(proj, 1)),
-            "reason": reason,
-        }
-        feature_hash = sha256_hex(canonical_json(features))
-
-        if band == BAND_VACUUM:
-            counters["vacuum_count"] += 1
-            counters["drop_count"] += 1
-        elif band == BAND_LOW:
-            counters["low_entropy_count"] += 1
-            counters["suppress_count"] += 1
-        else:
-            counters["mimic_scoped_count"] += 1
-            counters["pass_count"] += 1
-
-        decision_payload = {
-            "source_id": source_id,
-            "event_id": event_id,
-            "ingest_timestamp": _utc_now(),
-            "raw_payload_hash": raw_payload_hash,
-            "band": band,
-            "decision_code": decision_code,
-            "http_status": http_status,
-            "classification_features_id": feature_hash,
-            "entropy_raw": features["entropy_raw"],
-            "entropy_projected": features["entropy_projected"],
-            "entropy_ceiling": features["entropy_ceiling"],
-            "entropy_floor": features["entropy_floor"],
-            "projection": features["projection"],
-            "projection_count": features["projection_count"],
-            "reason": features["reason"],
-        }
-
-        decision_entry = ledger.append("BAND_DECISION", decision_payload)
-
-        evidence_pointers = {
-            "source_id": source_id,
-            "event_id": event_id,
-            "ingest_timestamp": decision_payload["ingest_timestamp"],
-            "raw_payload_hash": raw_payload_hash,
-            "decision_code": decision_code,
-            "classification_features_id": feature_hash,
-            "ledger_entry_id": decision_entry.get("entry_id"),
-            "prev_hash": decision_entry.get("prev_hash"),
-            "entry_hash": decision_entry.get("entry_hash"),
-        }
-
-        response_event = {
-            "event_id": event_id,
-            "status": STATUS_PROCESSED,
-            "band": band,
-            "decision_code": decision_code,
-            "http_status": http_status,
-            "evidence_pointers": evidence_pointers,
-            "entropy_raw": features["entropy_raw"],
-            "entropy_projected": features["entropy_projected"],
-            "entropy_ceiling": features["entropy_ceiling"],
-            "entropy_floor": features["entropy_floor"],
-            "projection": features["projection"],
-            "projection_count": features["projection_count"],
-            "reason": features["reason"],
-        }
-
-        if band == BAND_LOW:
-            response_event["envelope"] = {
-                "must_store_minimal_envelope": True,
-                "must_not_include_free_text_summary": True,
+            reason = "Mimic Pattern: Requires triage"
+            if entropy_raw > thresholds["entropy_ceiling"]:
+                band = BAND_VACUUM
+                decision_code = DECISION_VACUUM
+                http_status = HTTP_DROP
+                reason = "Thermodynamic Limit Exceeded (High Randomness)"
+            elif entropy_projected < thresholds["entropy_floor"] and not suspicious:
+                band = BAND_LOW
+                decision_code = DECISION_LOW
+                http_status = HTTP_OK
+                reason = "Deterministic Pattern / Background noise"
+
+            decision_features = {
+                "entropy_raw": round(float(entropy_raw), 4),
+                "entropy_projected": round(float(entropy_projected), 4),
+                "entropy_ceiling": thresholds["entropy_ceiling"],
+                "entropy_floor": thresholds["entropy_floor"],
+                "projection": proj,
+                "projection_count": int(projection_count),
+                "suspicious_markers": suspicious_markers,
+                "reason": reason,
+            }
+            feature_hash = sha256_hex(canonical_json(decision_features))
+
+            if band == BAND_VACUUM:
+                counters["vacuum_count"] += 1
+                counters["drop_count"] += 1
+            elif band == BAND_LOW:
+                counters["low_entropy_count"] += 1
+                counters["suppress_count"] += 1
+            else:
+                counters["mimic_scoped_count"] += 1
+                counters["pass_count"] += 1
+
+            decision_payload = {
+                "source_id": source_id,
+                "event_id": event_id,
+                "ingest_timestamp": _utc_now(),
+                "raw_payload_hash": raw_payload_hash,
+                "band": band,
+                "decision_code": decision_code,
+                "http_status": http_status,
+                "classification_features_id": feature_hash,
+                "entropy_raw": decision_features["entropy_raw"],
+                "entropy_projected": decision_features["entropy_projected"],
+                "entropy_ceiling": decision_features["entropy_ceiling"],
+                "entropy_floor": decision_features["entropy_floor"],
+                "projection": decision_features["projection"],
+                "projection_count": decision_features["projection_count"],
+                "suspicious_markers": decision_features["suspicious_markers"],
+                "reason": decision_features["reason"],
             }
 
-        per_event.append(response_event)
-
-    stage1_ms = int((time.time() - start_time) * 1000)
-    counters["stage1_ms"] = stage1_ms
-
-    processed_count = sum(1 for e in per_event if e.get("status") == STATUS_PROCESSED)
-    replayed_count = counters["replayed_count"]
-    conflict_count = counters["conflict_count"]
-    failed_count = counters["failed_count"]
-
-    counters["processed_count"] = processed_count
-    counters["replayed_count"] = replayed_count
-    counters["conflict_count"] = conflict_count
-    counters["failed_count"] = failed_count
-
-    ledger.append(
-        "BATCH_COMPLETED",
-        {
-            "batch_id": batch_id,
-            "processed_count": processed_count,
-            "replayed_count": replayed_count,
-            "conflict_count": conflict_count,
-            "failed_count": failed_count,
-            "counters": counters,
-            "elapsed_ms": stage1_ms,
-        },
-    )
+            decision_entry = ledger.append("BAND_DECISION", decision_payload)
+
+            evidence_pointers = {
+                "source_id": source_id,
+                "event_id": event_id,
+                "ingest_timestamp": decision_payload["ingest_timestamp"],
+                "raw_payload_hash": raw_payload_hash,
+                "decision_code": decision_code,
+                "classification_features_id": feature_hash,
+                "ledger_entry_id": decision_entry.get("entry_id"),
+                "prev_hash": decision_entry.get("prev_hash"),
+                "entry_hash": decision_entry.get("entry_hash"),
+            }
+
+            response_event = {
+                "event_id": event_id,
+                "status": STATUS_PROCESSED,
+                "band": band,
+                "decision_code": decision_code,
+                "http_status": http_status,
+                "evidence_pointers": evidence_pointers,
+                "entropy_raw": decision_features["entropy_raw"],
+                "entropy_projected": decision_features["entropy_projected"],
+                "entropy_ceiling": decision_features["entropy_ceiling"],
+                "entropy_floor": decision_features["entropy_floor"],
+                "projection": decision_features["projection"],
+                "projection_count": decision_features["projection_count"],
+                "suspicious_markers": decision_features["suspicious_markers"],
+                "reason": decision_features["reason"],
+            }
+
+            if band == BAND_LOW:
+                response_event["envelope"] = {
+                    "must_store_minimal_envelope": True,
+                    "must_not_include_free_text_summary": True,
+                }
+
+            per_event.append(response_event)
+
+        stage1_ms = int((time.time() - start_time) * 1000)
+        counters["stage1_ms"] = stage1_ms
+        counters["template_cache_hits"] = template_stats["hits"]
+        counters["template_cache_misses"] = template_stats["misses"]
+        counters["projection_model"] = projection_model.kind
+        counters["projection_total"] = projection_model.total
+        projection_model.save()
+
+        processed_count = sum(1 for e in per_event if e.get("status") == STATUS_PROCESSED)
+        replayed_count = counters["replayed_count"]
+        conflict_count = counters["conflict_count"]
+        failed_count = counters["failed_count"]
+
+        counters["processed_count"] = processed_count
+        counters["replayed_count"] = replayed_count
+        counters["conflict_count"] = conflict_count
+        counters["failed_count"] = failed_count
+
+        ledger.append(
+            "BATCH_COMPLETED",
+            {
+                "batch_id": batch_id,
+                "processed_count": processed_count,
+                "replayed_count": replayed_count,
+                "conflict_count": conflict_count,
+                "failed_count": failed_count,
+                "counters": counters,
+                "elapsed_ms": stage1_ms,
+            },
+        )
+        ledger.commit()
 
     return {
         "batch_id": batch_id,
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Stage-1 admissibility: text markers that keep an event out of LOW_ENTROPY.
+STAGE1_SUSPICIOUS_MARKERS: Tuple[str, ...] = (
+    "mimikatz",
+    "lsass",
+    "dcsync",
+    "domain admins",
+    "krbtgt",
+    "psexec",
+    "wmic",
+    "regsvr32",
+    "rundll32",
+    "certutil",
+    "t1003",
+    "t1059",
+    "t1053",
+    "4662",
+    "4698",
+    "4104",
+    "ransom",
+    "encrypt",
+    "mass rename",
+    "prompt injection",
+    "ignore all previous",
+    "twin-liar",
+    "twin liar",
+    "flow_anomaly",
+    "process_event",
+    "unrecognized protocol",
+    "tls-z",
+    "zero-latency-draft",
+)
+
+# Graph stages: interpreter / command markers on alert command and process text.
+INTERPRETER_MARKERS: Tuple[str, ...] = (
+    "powershell",
+    "wscript",
+    "cscript",
+    "encodedcommand",
+    " -enc",
+    "whoami",
+    "rundll32",
+    "regsvr32",
+)
+CHANNEL_MARKERS: Tuple[str, ...] = ("powershell", "wscript", "cscript", "whoami", " -enc", "encodedcommand")
+CORROBORATION_MARKERS: Tuple[str, ...] = ("powershell", "wscript", "cscript", "encodedcommand", " -enc")
+
+# Up to this many markers a C-level substring scan per marker beats walking an
+# automaton in Python; larger sets (IOC lists) use the automaton.
+DIRECT_SCAN_MAX_MARKERS = 64
+
+
+class MarkerMatcher:
+    """
+    Case-insensitive multi-pattern substring matcher (Aho-Corasick).
+    Scan cost is linear in the text length regardless of how many markers are loaded.
+    """
+
+    def __init__(self, markers: Iterable[str]) -> None:
+        ordered: List[str] = []
+        seen = set()
+        for marker in markers:
+            needle = str(marker or "").lower()
+            if needle and needle not in seen:
+                seen.add(needle)
+                ordered.append(needle)
+        self.markers: Tuple[str, ...] = tuple(ordered)
+        self._direct = len(self.markers) <= DIRECT_SCAN_MAX_MARKERS
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[FrozenSet[int]] = [frozenset()]
+        if not self._direct:
+            self._build()
+
+    def __len__(self) -> int:
+        return len(self.markers)
+
+    def _build(self) -> None:
+        goto, fail = self._goto, self._fail
+        output: List[set] = [set()]
+        for idx, marker in enumerate(self.markers):
+            state = 0
+            for ch in marker:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    fail.append(0)
+                    output.append(set())
+                    nxt = len(goto) - 1
+                    goto[state][ch] = nxt
+                state = nxt
+            output[state].add(idx)
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                output[nxt] |= output[fail[nxt]]
+        self._output = [frozenset(o) for o in output]
+
+    def _scan(self, text: str, first_only: bool) -> List[int]:
+        goto, fail, output = self._goto, self._fail, self._output
+        hits: set = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                hits |= output[state]
+                if first_only:
+                    break
+        return sorted(hits)
+
+    def find_all(self, text: Optional[str]) -> List[str]:
+        """Return matched markers in declaration order."""
+        s = (text or "").lower()
+        if not s or not self.markers:
+            return []
+        if self._direct:
+            return [m for m in self.markers if m in s]
+        return [self.markers[i] for i in self._scan(s, first_only=False)]
+
+    def search(self, text: Optional[str]) -> bool:
+        s = (text or "").lower()
+        if not s or not self.markers:
+            return False
+        if self._direct:
+            return any(m in s for m in self.markers)
+        return bool(self._scan(s, first_only=True))
+
+
+@lru_cache(maxsize=32)
+def get_matcher(markers: Tuple[str, ...]) -> MarkerMatcher:
+    return MarkerMatcher(markers)
+
+
+# Marker files are re-read only when their (mtime_ns, size) changes, the same
+# signature KernelGatePool uses to detect registry edits.
+_MARKER_FILE_CACHE: Dict[str, Tuple[Tuple[int, int], Tuple[str, ...]]] = {}
+_PROFILE_MATCHER_CACHE: Dict[Tuple[Any, ...], MarkerMatcher] = {}
+_PROFILE_MATCHER_CACHE_MAX = 32
+_marker_cache_lock = threading.Lock()
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_marker_file(path: str) -> Tuple[str, ...]:
+    markers: List[str] = []
+    with Path(path).open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                markers.append(line)
+    return tuple(markers)
+
+
+def _load_marker_file(path: str, signature: Optional[Tuple[int, int]] = None) -> Tuple[str, ...]:
+    signature = signature or _file_signature(path)
+    with _marker_cache_lock:
+        cached = _MARKER_FILE_CACHE.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    markers = _read_marker_file(path)
+    with _marker_cache_lock:
+        _MARKER_FILE_CACHE[path] = (signature, markers)
+    return markers
+
+
+def clear_marker_cache() -> None:
+    with _marker_cache_lock:
+        _MARKER_FILE_CACHE.clear()
+        _PROFILE_MATCHER_CACHE.clear()
+
+
+def matcher_from_profile(
+    profile: Optional[Dict[str, Any]],
+    default: Tuple[str, ...] = STAGE1_SUSPICIOUS_MARKERS,
+) -> MarkerMatcher:
+    """
+    Build the Stage-1 marker matcher for a profile.
+    `suspicious_markers` (list) and `suspicious_markers_path` (one marker per line)
+    extend the default set; they may sit at the top level or under `parameters`.
+    Matchers are cached per (markers, path, mtime_ns, size), so an unchanged marker
+    file is neither re-read nor re-compiled.
+
+    Profiles only extend the Stage-1 set; the graph-stage interpreter, channel and
+    corroboration markers are fixed.
+    """
+    profile = profile or {}
+    params = profile.get("parameters") or {}
+    extra = profile.get("suspicious_markers") or params.get("suspicious_markers") or []
+    path = profile.get("suspicious_markers_path") or params.get("suspicious_markers_path")
+    path = str(path) if path else None
+    signature = _file_signature(path) if path else None
+    key = (tuple(default), tuple(str(m) for m in extra), path, signature)
+    with _marker_cache_lock:
+        cached = _PROFILE_MATCHER_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    markers = key[0] + key[1]
+    if path:
+        markers += _load_marker_file(path, signature)
+    matcher = MarkerMatcher(markers)
+    with _marker_cache_lock:
+        if len(_PROFILE_MATCHER_CACHE) >= _PROFILE_MATCHER_CACHE_MAX:
+            _PROFILE_MATCHER_CACHE.pop(next(iter(_PROFILE_MATCHER_CACHE)))
+        _PROFILE_MATCHER_CACHE[key] = matcher
+    return matcher
+
+
+STAGE1_MATCHER = get_matcher(STAGE1_SUSPICIOUS_MARKERS)
+INTERPRETER_MATCHER = get_matcher(INTERPRETER_MARKERS)
+CHANNEL_MATCHER = get_matcher(CHANNEL_MARKERS)
+CORROBORATION_MATCHER = get_matcher(CORROBORATION_MARKERS)
@@ -1,7 +1,7 @@
 import hashlib
 import json
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 class GraphReadyAlert(BaseModel):
     """
@@ -25,30 +25,8 @@ class GraphReadyAlert(BaseModel):
     def from_raw_data(cls, raw_data: dict):
         """
         Extract fields from the deserialized raw data dictionary.
+        Key probing follows a getter plan compiled once per key layout (see _extraction_plan).
         """
-        def _first(*values):
-            for value in values:
-                if value is None:
-                    continue
-                if isinstance(value, str) and not value.strip():
-                    continue
-                return value
-            return None
-
-        def _list_first(value):
-            if isinstance(value, list) and value:
-                return value[0]
-            return None
-
-        def _extract_sha256(hashes_field):
-            if not isinstance(hashes_field, str):
-                return None
-            for chunk in hashes_field.split(","):
-                token = chunk.strip()
-                if token.upper().startswith("SHA256="):
-                    return token.split("=", 1)[1].strip() or None
-            return None
-
         event_id = raw_data.get("eventId") or raw_data.get("event_id") or raw_data.get("id")
         if event_id is None:
             # Deterministic fallback so malformed inputs do not crash ingestion.
@@ -57,133 +35,187 @@ class GraphReadyAlert(BaseModel):
         else:
             event_id = str(event_id)
         data_m = raw_data.get("data", {}) if isinstance(raw_data, dict) else {}
+        if not isinstance(data_m, dict):
+            data_m = {}
         raw_event = raw_data.get("raw_payload") or raw_data.get("raw_event") or {}
         if not isinstance(raw_event, dict):
             raw_event = {}
-        payload_m = raw_event if raw_event else (data_m if isinstance(data_m, dict) else {})
 
-        # Support both normalized `data.*` events and raw Sysmon/security payloads.
-        file_sha256 = _first(
-            data_m.get("file_hash_sha256"),
-            data_m.get("sha256"),
-            raw_event.get("SHA256"),
-            payload_m.get("SHA256"),
-            _extract_sha256(raw_event.get("Hashes")),
-            _extract_sha256(payload_m.get("Hashes")),
-        )
-        file_path = _first(
-            data_m.get("file_path"),
-            raw_event.get("TargetFilename"),
-            raw_event.get("Image"),
-            raw_event.get("ImageLoaded"),
-            raw_event.get("FilePath"),
-            payload_m.get("TargetFilename"),
-            payload_m.get("Image"),
-            payload_m.get("ImageLoaded"),
-            payload_m.get("FilePath"),
-        )
-        file_name = _first(
-            data_m.get("file_name"),
-            raw_event.get("FileName"),
-            raw_event.get("Image"),
-            raw_event.get("TargetFilename"),
-            payload_m.get("FileName"),
-            payload_m.get("Image"),
-            payload_m.get("TargetFilename"),
-        )
+        sources = (data_m, raw_event)
+        fields = {"event_id": event_id}
+        for name, getters in _extraction_plan(tuple(data_m), tuple(raw_event)):
+            value = None
+            for source, key, transform in getters:
+                value = sources[source][key]
+                if transform is not None:
+                    value = transform(value)
+                if value is not None and (not isinstance(value, str) or value.strip()):
+                    break
+                value = None
+            fields[name] = value
+
+        file_name = fields["file_name"]
         if isinstance(file_name, str):
-            file_name = file_name.replace("\\", "/").split("/")[-1]
+            fields["file_name"] = file_name.replace("\\", "/").split("/")[-1]
+        # model_validate on a dict avoids keyword-argument overhead in __init__.
+        return cls.model_validate(fields)
+
+
+def _list_first(value):
+    if isinstance(value, list) and value:
+        return value[0]
+    return None
+
+
+def _extract_sha256(hashes_field):
+    if not isinstance(hashes_field, str):
+        return None
+    for chunk in hashes_field.split(","):
+        token = chunk.strip()
+        if token.upper().startswith("SHA256="):
+            return token.split("=", 1)[1].strip() or None
+    return None
+
+
+# Candidate sources: normalized `data.*`, the raw Sysmon/security event
+# (raw_payload/raw_event), and the payload (raw event if present, else data).
+_DATA, _RAW, _PAYLOAD = 0, 1, 2
+
+# Field -> ordered (source, key, transform) candidates; the first non-blank value wins.
+FIELD_CANDIDATES: Tuple[Tuple[str, Tuple[Tuple[int, str, Optional[Callable[[Any], Any]]], ...]], ...] = (
+    ("file_hash_sha256", (
+        (_DATA, "file_hash_sha256", None),
+        (_DATA, "sha256", None),
+        (_RAW, "SHA256", None),
+        (_PAYLOAD, "SHA256", None),
+        (_RAW, "Hashes", _extract_sha256),
+        (_PAYLOAD, "Hashes", _extract_sha256),
+    )),
+    ("file_path", (
+        (_DATA, "file_path", None),
+        (_RAW, "TargetFilename", None),
+        (_RAW, "Image", None),
+        (_RAW, "ImageLoaded", None),
+        (_RAW, "FilePath", None),
+        (_PAYLOAD, "TargetFilename", None),
+        (_PAYLOAD, "Image", None),
+        (_PAYLOAD, "ImageLoaded", None),
+        (_PAYLOAD, "FilePath", None),
+    )),
+    ("file_name", (
+        (_DATA, "file_name", None),
+        (_RAW, "FileName", None),
+        (_RAW, "Image", None),
+        (_RAW, "TargetFilename", None),
+        (_PAYLOAD, "FileName", None),
+        (_PAYLOAD, "Image", None),
+        (_PAYLOAD, "TargetFilename", None),
+    )),
+    ("rule_intent", (
+        (_DATA, "rule_intent", None),
+        (_RAW, "RuleName", None),
+        (_RAW, "Category", None),
+        (_RAW, "EventType", None),
+        (_PAYLOAD, "RuleName", None),
+        (_PAYLOAD, "Category", None),
+        (_PAYLOAD, "EventType", None),
+    )),
+    ("hostname", (
+        (_DATA, "hostname", None),
+        (_RAW, "Hostname", None),
+        (_RAW, "host", None),
+        (_RAW, "ComputerName", None),
+        (_PAYLOAD, "Hostname", None),
+        (_PAYLOAD, "host", None),
+        (_PAYLOAD, "ComputerName", None),
+    )),
+    ("user", (
+        (_DATA, "user", None),
+        (_RAW, "User", None),
+        (_RAW, "AccountName", None),
+        (_RAW, "UserID", None),
+        (_RAW, "SubjectUserName", None),
+        (_PAYLOAD, "User", None),
+        (_PAYLOAD, "AccountName", None),
+        (_PAYLOAD, "UserID", None),
+        (_PAYLOAD, "SubjectUserName", None),
+    )),
+    ("process_image", (
+        (_DATA, "process_image", None),
+        (_RAW, "Image", None),
+        (_RAW, "ProcessName", None),
+        (_RAW, "SourceImage", None),
+        (_RAW, "New Process Name", None),
+        (_PAYLOAD, "Image", None),
+        (_PAYLOAD, "ProcessName", None),
+        (_PAYLOAD, "SourceImage", None),
+        (_PAYLOAD, "New Process Name", None),
+    )),
+    ("parent_process", (
+        (_DATA, "parent_process", None),
+        (_RAW, "ParentImage", None),
+        (_RAW, "ParentProcessName", None),
+        (_PAYLOAD, "ParentImage", None),
+        (_PAYLOAD, "ParentProcessName", None),
+    )),
+    ("command_line", (
+        (_DATA, "command_line", None),
+        (_RAW, "CommandLine", None),
+        (_PAYLOAD, "CommandLine", None),
+    )),
+    ("source_ip", (
+        (_DATA, "alarm_source_ips", _list_first),
+        (_RAW, "SourceAddress", None),
+        (_RAW, "src_ip", None),
+        (_RAW, "source_ip", None),
+        (_PAYLOAD, "SourceAddress", None),
+        (_PAYLOAD, "src_ip", None),
+        (_PAYLOAD, "source_ip", None),
+    )),
+    ("destination_ip", (
+        (_DATA, "alarm_destination_ips", _list_first),
+        (_RAW, "DestAddress", None),
+        (_RAW, "DestinationIp", None),
+        (_RAW, "destination_ip", None),
+        (_PAYLOAD, "DestAddress", None),
+        (_PAYLOAD, "DestinationIp", None),
+        (_PAYLOAD, "destination_ip", None),
+    )),
+    ("malware_family", (
+        (_DATA, "malware_family", None),
+        (_RAW, "MalwareFamily", None),
+        (_PAYLOAD, "MalwareFamily", None),
+    )),
+)
+
+PLAN_CACHE_MAX = 4096
+_plan_cache: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Tuple] = {}
+
 
-        rule_intent = _first(
-            data_m.get("rule_intent"),
-            raw_event.get("RuleName"),
-            raw_event.get("Category"),
-            raw_event.get("EventType"),
-            payload_m.get("RuleName"),
-            payload_m.get("Category"),
-            payload_m.get("EventType"),
-        )
-        hostname = _first(
-            data_m.get("hostname"),
-            raw_event.get("Hostname"),
-            raw_event.get("host"),
-            raw_event.get("ComputerName"),
-            payload_m.get("Hostname"),
-            payload_m.get("host"),
-            payload_m.get("ComputerName"),
-        )
-        user = _first(
-            data_m.get("user"),
-            raw_event.get("User"),
-            raw_event.get("AccountName"),
-            raw_event.get("UserID"),
-            raw_event.get("SubjectUserName"),
-            payload_m.get("User"),
-            payload_m.get("AccountName"),
-            payload_m.get("UserID"),
-            payload_m.get("SubjectUserName"),
-        )
-        process_image = _first(
-            data_m.get("process_image"),
-            raw_event.get("Image"),
-            raw_event.get("ProcessName"),
-            raw_event.get("SourceImage"),
-            raw_event.get("New Process Name"),
-            payload_m.get("Image"),
-            payload_m.get("ProcessName"),
-            payload_m.get("SourceImage"),
-            payload_m.get("New Process Name"),
-        )
-        parent_process = _first(
-            data_m.get("parent_process"),
-            raw_event.get("ParentImage"),
-            raw_event.get("ParentProcessName"),
-            payload_m.get("ParentImage"),
-            payload_m.get("ParentProcessName"),
-        )
-        command_line = _first(
-            data_m.get("command_line"),
-            raw_event.get("CommandLine"),
-            payload_m.get("CommandLine"),
-        )
+def _compile_plan(data_keys: Tuple[str, ...], raw_keys: Tuple[str, ...]) -> Tuple:
+    present = (frozenset(data_keys), frozenset(raw_keys))
+    # The payload is the raw event when there is one, otherwise data.
+    payload_source = _RAW if raw_keys else _DATA
+    plan = []
+    for name, candidates in FIELD_CANDIDATES:
+        getters = []
+        for source, key, transform in candidates:
+            if source == _PAYLOAD:
+                source = payload_source
+            getter = (source, key, transform)
+            # Absent keys can never win; a repeated getter yields the same rejected value.
+            if key in present[source] and getter not in getters:
+                getters.append(getter)
+        plan.append((name, tuple(getters)))
+    return tuple(plan)
 
-        source_ip = _first(
-            _list_first(data_m.get("alarm_source_ips")),
-            raw_event.get("SourceAddress"),
-            raw_event.get("src_ip"),
-            raw_event.get("source_ip"),
-            payload_m.get("SourceAddress"),
-            payload_m.get("src_ip"),
-            payload_m.get("source_ip"),
-        )
-        dest_ip = _first(
-            _list_first(data_m.get("alarm_destination_ips")),
-            raw_event.get("DestAddress"),
-            raw_event.get("DestinationIp"),
-            raw_event.get("destination_ip"),
-            payload_m.get("DestAddress"),
-            payload_m.get("DestinationIp"),
-            payload_m.get("destination_ip"),
-        )
 
-        malware_family = _first(
-            data_m.get("malware_family"),
-            raw_event.get("MalwareFamily"),
-            payload_m.get("MalwareFamily"),
-        )
-        
-        return cls(
-            event_id=event_id,
-            file_hash_sha256=file_sha256,
-            source_ip=source_ip,
-            destination_ip=dest_ip,
-            malware_family=malware_family,
-            file_name=file_name,
-            file_path=file_path,
-            rule_intent=rule_intent,
-            hostname=hostname,
-            user=user,
-            process_image=process_image,
-            parent_process=parent_process,
-            command_line=command_line,
-        )
+def _extraction_plan(data_keys: Tuple[str, ...], raw_keys: Tuple[str, ...]) -> Tuple:
+    """Return the getter plan for this key layout, compiling it on first sight."""
+    signature = (data_keys, raw_keys)
+    plan = _plan_cache.get(signature)
+    if plan is None:
+        if len(_plan_cache) >= PLAN_CACHE_MAX:
+            _plan_cache.clear()
+        plan = _plan_cache[signature] = _compile_plan(data_keys, raw_keys)
+    return plan
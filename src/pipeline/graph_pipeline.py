@@ -6,11 +6,13 @@ import json
 import os
 import platform
 import re
+import shutil
 from collections import Counter
 from datetime import datetime, timezone
 from html import escape
 from pathlib import Path
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List
 
 import networkx as nx
 
@@ -25,9 +27,12 @@ from src.visualize import GraphVisualizer
 from src.pipeline.traversal import analyze_campaign_traversal, build_alert_meta
 from src.pipeline.verification import verify_channel_independence
 from src.canon_registry import ARV_BETA, ARV_PHI_LIMIT, ARV_TAU, arv_evaluate, arv_phi, profile_settings
-from src.ingest.dedup import compute_event_hash
+from src.ingest.dedup import DEDUP_WINDOW_ENTRIES_DEFAULT, SlidingWindowDeduplicator, compute_event_hash, semantic_key
+from src.kernel.feature_cache import FeatureCache
+from src.kernel.hashing import canonical_bytes, canonical_json, sha256_hex
 from src.kernel.kernel_gate import KernelGate
 from src.kernel.ledger import Ledger
+from src.kernel.segments import COMPRESSION_NONE, VERIFY_ROOTS, SegmentManifest, segment_dir_for, verify_segmented
 from src.kernel.stage1 import BAND_LOW, BAND_MIMIC, BAND_VACUUM, classify_batch
 
 _PLATFORM_SERVICE_IPS = {"168.63.129.16"}
@@ -63,20 +68,32 @@ def _cleanup_previous_pipeline_artifacts(output_root: Path) -> None:
         target = output_root / name
         if target.exists() and target.is_file():
             target.unlink()
+    for name in ("ledger.jsonl", "arv_gate_ledger.jsonl"):
+        segment_dir = segment_dir_for(output_root / name)
+        if segment_dir.is_dir():
+            shutil.rmtree(segment_dir)
 
 
-def _utc_now() -> str:
-    return datetime.now(timezone.utc).isoformat()
+def _iter_alert_chunks(alerts: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    if chunk_size <= 0:
+        yield alerts if isinstance(alerts, list) else list(alerts)
+        return
+    iterator = iter(alerts)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
 
 
-def _canonical_json(data: Dict) -> str:
-    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
 
 
 def _hash_evidence(evidence: Dict) -> str:
     payload = dict(evidence)
     payload["evidence_id"] = ""
-    return hashlib.sha256(_canonical_json(payload).encode("utf-8")).hexdigest()
+    return sha256_hex(canonical_bytes(payload))
 
 
 def _append_evidence(ledger_path: Path, evidence: Dict, prev_hash: str) -> str:
@@ -84,11 +101,21 @@ def _append_evidence(ledger_path: Path, evidence: Dict, prev_hash: str) -> str:
     evidence_id = _hash_evidence(evidence)
     evidence["evidence_id"] = evidence_id
     with ledger_path.open("a", encoding="utf-8") as handle:
-        handle.write(_canonical_json(evidence))
+        handle.write(canonical_json(evidence))
         handle.write("\n")
     return evidence_id
 
 
+def _seal_evidence_segment(ledger_path: Path, compression: str = COMPRESSION_NONE) -> None:
+    SegmentManifest(segment_dir_for(ledger_path)).seal(ledger_path, "evidence_id", compression)
+    ledger_path.unlink()
+
+
+def verify_evidence_ledger(ledger_path: Path, mode: str = VERIFY_ROOTS) -> Dict[str, Any]:
+    """Verify the (optionally segmented) ARV gate evidence chain."""
+    return verify_segmented(Path(ledger_path), segment_dir_for(Path(ledger_path)), "evidence_id", _hash_evidence, mode)
+
+
 def _sha256_file(path: Path) -> str:
     hasher = hashlib.sha256()
     with path.open("rb") as handle:
@@ -726,7 +753,7 @@ def _render_campaign_snapshot(
 
 
 def run_graph_pipeline(
-    raw_alerts: List[Dict],
+    raw_alerts: Iterable[Dict],
     output_dir: str = "data",
     enable_kernel: bool = True,
     kernel_ledger_path: str = "data/kernel_ledger.jsonl",
@@ -743,10 +770,24 @@ def run_graph_pipeline(
     skip_enrichment: bool = False,
     verbose: bool = False,
     max_campaigns: int | None = None,
+    ledger_segment_entries: int = 0,
+    ledger_segment_compression: str = COMPRESSION_NONE,
+    chunk_size: int = 0,
+    dedup_window_entries: int = DEDUP_WINDOW_ENTRIES_DEFAULT,
+    progress: Callable[[str, Dict[str, Any]], None] | None = None,
 ) -> Dict[str, List[str]]:
     """
     Execute the CIX graph pipeline and return artifact paths.
     When enable_kernel=True, apply kernel gating + dedup before graph build.
+    ledger_segment_entries > 0 rotates the Stage-1 and ARV gate ledgers into
+    sealed segments of that many entries.
+    raw_alerts may be any iterable (e.g. RawParser.iter_file). chunk_size > 0
+    triages it in chunks of that many alerts so memory is bounded by the
+    survivors; Stage-1 projection frequencies are then per chunk, as for
+    consecutive ingest batches. chunk_size=0 triages everything as one batch.
+    (EventID, Image) dedup remembers the last dedup_window_entries keys.
+    progress(stage, details) is called at stage boundaries ("triage", "graph",
+    "campaigns"); an exception it raises aborts the run.
     """
     output_root = Path(output_dir)
     _ensure_dir(output_root)
@@ -754,10 +795,10 @@ def run_graph_pipeline(
     stage1_ledger_path = output_root / "ledger.jsonl"
     arv_ledger_path = output_root / "arv_gate_ledger.jsonl"
     arv_prev_hash = ""
+    arv_active_entries = 0
 
-    admitted_alerts = raw_alerts
     triage_counts = {
-        "total_ingested": len(raw_alerts),
+        "total_ingested": 0,
         "background_low_entropy": 0,
         "background_semantic": 0,
         "red_zone_high_entropy": 0,
@@ -781,105 +822,125 @@ def run_graph_pipeline(
     profile_id = profile.get("profile_id") or profile_id
     registry_commit = registry_commit or profile.get("registry_commit")
 
-    # Stage 1 entropic triage (low/high/mimic)
-    stage1_events = []
-    for raw_alert in raw_alerts:
-        raw_payload = (
-            raw_alert.get("raw_payload")
-            or raw_alert.get("raw_event")
-            or raw_alert.get("data", raw_alert)
-        )
-        data = raw_alert.get("data", {}) if isinstance(raw_alert, dict) else {}
-        payload_timestamp = None
-        if isinstance(raw_payload, dict):
-            payload_timestamp = (
-                raw_payload.get("@timestamp")
-                or raw_payload.get("EventTime")
-                or raw_payload.get("EventReceivedTime")
-                or raw_payload.get("UtcTime")
-                or raw_payload.get("TimeCreated")
-                or raw_payload.get("TimeGenerated")
-                or raw_payload.get("Timestamp")
-            )
-        stage1_events.append(
-            {
-                "event_id": raw_alert.get("eventId") or raw_alert.get("event_id") or "unknown",
-                "raw_payload": raw_payload,
-                "source_id": raw_alert.get("source_id") or raw_alert.get("source") or "unknown",
-                "source_timestamp": raw_alert.get("timestamp")
-                or raw_alert.get("source_timestamp")
-                or data.get("event_time")
-                or data.get("timestamp")
-                or payload_timestamp,
-            }
-        )
-    stage1_result = classify_batch(stage1_events, ledger=Ledger(str(stage1_ledger_path)))
-    per_event = stage1_result.get("per_event", [])
-    batch_counts = stage1_result.get("batch", {}) if isinstance(stage1_result, dict) else {}
-    triage_counts["stage1_failed"] = int(batch_counts.get("failed_count", 0) or 0)
-    mimic_indices = []
-    for idx, entry in enumerate(per_event):
-        band = entry.get("band")
-        if band == BAND_LOW:
-            triage_counts["background_low_entropy"] += 1
-        elif band == BAND_VACUUM:
-            triage_counts["red_zone_high_entropy"] += 1
-        elif band == BAND_MIMIC:
-            mimic_indices.append(idx)
-
-    # Semantic background filter (low-risk categories)
-    semantic_exclude_indices: set[int] = set()
-    for idx in mimic_indices:
-        raw_alert = raw_alerts[idx]
-        raw_event = raw_alert.get("raw_payload") or raw_alert.get("raw_event") or {}
-        data = raw_alert.get("data", {}) if isinstance(raw_alert, dict) else {}
-        event_id = raw_event.get("EventID") or raw_event.get("eventId") or raw_alert.get("eventId") or ""
-        category = (
-            raw_event.get("Category")
-            or raw_event.get("EventType")
-            or data.get("rule_intent")
-            or ""
-        )
-        if str(event_id) in semantic_background_event_ids:
-            semantic_exclude_indices.add(idx)
-            continue
-        category_lc = str(category).lower()
-        if category_lc and category_lc in semantic_background_category_exact:
-            semantic_exclude_indices.add(idx)
-
-    if semantic_exclude_indices:
-        triage_counts["background_semantic"] = len(semantic_exclude_indices)
-
-    filtered_indices = [i for i in mimic_indices if i not in semantic_exclude_indices]
-    filtered_alerts = [raw_alerts[i] for i in filtered_indices]
-
-    # Deduplicate after entropic filtering using (EventID, Image)
-    deduped_alerts = []
-    seen_keys = set()
-    for idx in filtered_indices:
-        raw_alert = raw_alerts[idx]
-        raw_event = raw_alert.get("raw_payload") or raw_alert.get("raw_event") or {}
-        data = raw_alert.get("data", {}) if isinstance(raw_alert, dict) else {}
-        event_id = raw_event.get("EventID") or raw_event.get("eventId") or raw_alert.get("eventId") or f"event_{idx}"
-        process_image = raw_event.get("Image") or raw_event.get("ProcessName") or raw_event.get("New Process Name") or data.get("process_image")
-        dedup_key = (event_id, process_image)
-        if dedup_key in seen_keys:
-            triage_counts["dedup_removed"] += 1
-            continue
-        seen_keys.add(dedup_key)
-        deduped_alerts.append(raw_alert)
-
+    # Stage 1 entropic triage (low/high/mimic); its per-payload features are reused by the kernel gate.
+    # Triage runs per chunk so only survivors are retained; the dataset hash is
+    # accumulated as the canonical encoding of the whole alert list.
+    feature_cache = FeatureCache()
+    dataset_digest = hashlib.sha256(b"[")
+    gate = None
     if enable_kernel:
-        gate = KernelGate(profile_id=profile_id or "axoden-cix-1-v0.2.0", ledger_path=kernel_ledger_path)
-        gated_results = []
-        for raw_alert in deduped_alerts:
-            result = gate.evaluate(raw_alert)
-            gate.append_ledger(result)
-            if result.action_id in {"ARV.EXECUTE", "ARV.THROTTLE"}:
-                gated_results.append(result)
-        admitted_alerts = [r.graph_raw for r in gated_results]
-    else:
-        admitted_alerts = deduped_alerts
+        gate = KernelGate(
+            profile_id=profile_id or "axoden-cix-1-v0.2.0",
+            ledger_path=kernel_ledger_path,
+            feature_cache=feature_cache,
+        )
+    admitted_alerts = []
+    deduplicator = SlidingWindowDeduplicator(max_entries=dedup_window_entries, key_fn=semantic_key)
+    with Ledger(
+        str(stage1_ledger_path),
+        group_commit=True,
+        segment_max_entries=ledger_segment_entries,
+        segment_compression=ledger_segment_compression,
+    ) as stage1_ledger:
+        for chunk in _iter_alert_chunks(raw_alerts, chunk_size):
+            for raw_alert in chunk:
+                if triage_counts["total_ingested"]:
+                    dataset_digest.update(b",")
+                dataset_digest.update(canonical_bytes(raw_alert, ensure_ascii=True, default=str))
+                triage_counts["total_ingested"] += 1
+
+            stage1_events = []
+            for raw_alert in chunk:
+                raw_payload = (
+                    raw_alert.get("raw_payload")
+                    or raw_alert.get("raw_event")
+                    or raw_alert.get("data", raw_alert)
+                )
+                data = raw_alert.get("data", {}) if isinstance(raw_alert, dict) else {}
+                payload_timestamp = None
+                if isinstance(raw_payload, dict):
+                    payload_timestamp = (
+                        raw_payload.get("@timestamp")
+                        or raw_payload.get("EventTime")
+                        or raw_payload.get("EventReceivedTime")
+                        or raw_payload.get("UtcTime")
+                        or raw_payload.get("TimeCreated")
+                        or raw_payload.get("TimeGenerated")
+                        or raw_payload.get("Timestamp")
+                    )
+                stage1_events.append(
+                    {
+                        "event_id": raw_alert.get("eventId") or raw_alert.get("event_id") or "unknown",
+                        "raw_payload": raw_payload,
+                        "source_id": raw_alert.get("source_id") or raw_alert.get("source") or "unknown",
+                        "source_timestamp": raw_alert.get("timestamp")
+                        or raw_alert.get("source_timestamp")
+                        or data.get("event_time")
+                        or data.get("timestamp")
+                        or payload_timestamp,
+                    }
+                )
+            stage1_result = classify_batch(stage1_events, ledger=stage1_ledger, feature_cache=feature_cache)
+            per_event = stage1_result.get("per_event", [])
+            batch_counts = stage1_result.get("batch", {}) if isinstance(stage1_result, dict) else {}
+            triage_counts["stage1_failed"] += int(batch_counts.get("failed_count", 0) or 0)
+            mimic_indices = []
+            for idx, entry in enumerate(per_event):
+                band = entry.get("band")
+                if band == BAND_LOW:
+                    triage_counts["background_low_entropy"] += 1
+                elif band == BAND_VACUUM:
+                    triage_counts["red_zone_high_entropy"] += 1
+                elif band == BAND_MIMIC:
+                    mimic_indices.append(idx)
+
+            # Semantic background filter (low-risk categories)
+            semantic_exclude_indices: set[int] = set()
+            for idx in mimic_indices:
+                raw_alert = chunk[idx]
+                raw_event = raw_alert.get("raw_payload") or raw_alert.get("raw_event") or {}
+                data = raw_alert.get("data", {}) if isinstance(raw_alert, dict) else {}
+                event_id = raw_event.get("EventID") or raw_event.get("eventId") or raw_alert.get("eventId") or ""
+                category = (
+                    raw_event.get("Category")
+                    or raw_event.get("EventType")
+                    or data.get("rule_intent")
+                    or ""
+                )
+                if str(event_id) in semantic_background_event_ids:
+                    semantic_exclude_indices.add(idx)
+                    continue
+                category_lc = str(category).lower()
+                if category_lc and category_lc in semantic_background_category_exact:
+                    semantic_exclude_indices.add(idx)
+
+            triage_counts["background_semantic"] += len(semantic_exclude_indices)
+
+            filtered_indices = [i for i in mimic_indices if i not in semantic_exclude_indices]
+
+            # Deduplicate after entropic filtering using (EventID, Image)
+            candidates = []
+            for idx in filtered_indices:
+                raw_alert = chunk[idx]
+                if deduplicator.is_duplicate(raw_alert):
+                    triage_counts["dedup_removed"] += 1
+                    continue
+                candidates.append(raw_alert)
+            triage_counts["active_candidates"] += len(candidates)
+            if gate is None:
+                admitted_alerts.extend(candidates)
+            else:
+                gated_results = gate.evaluate_batch(candidates)
+                gate.append_ledger_batch(gated_results)
+                admitted_alerts.extend(
+                    r.graph_raw for r in gated_results if r.action_id in {"ARV.EXECUTE", "ARV.THROTTLE"}
+                )
+            if chunk_size > 0:
+                feature_cache.clear()
+    dataset_digest.update(b"]")
+    dataset_hash = dataset_digest.hexdigest()
+    if progress:
+        progress("triage", dict(triage_counts))
 
     # Build world graph
     alert_meta = build_alert_meta(admitted_alerts)
@@ -889,8 +950,6 @@ def run_graph_pipeline(
         alert_model = GraphReadyAlert.from_raw_data(raw_alert)
         constructor.add_to_graph(world_graph, alert_model)
 
-    triage_counts["active_candidates"] = len(deduped_alerts)
-
     # Findings (unique MITRE techniques)
     mitre_nodes = {
         node
@@ -898,6 +957,8 @@ def run_graph_pipeline(
         if data.get("type") == "MITRE_Technique"
     }
     triage_counts["findings"] = len(mitre_nodes)
+    if progress:
+        progress("graph", {"nodes": world_graph.number_of_nodes(), "edges": world_graph.number_of_edges()})
 
     print("TRIAGE INPUT - TOTAL INGESTED", triage_counts["total_ingested"])
     print(f"BACKGROUND -{triage_counts['background_low_entropy']} (Low entropy)")
@@ -907,9 +968,13 @@ def run_graph_pipeline(
     print(f"DEDUPED -{triage_counts['dedup_removed']}")
     print(f"ACTIVE TRIAGE CANDIDATES {triage_counts['active_candidates']}")
     print(f"FINDINGS {triage_counts['findings']}")
+    cache_stats = feature_cache.stats()
+    print(f"FEATURE CACHE {cache_stats['hits']} reused / {cache_stats['misses']} computed")
 
     triage_summary_path = output_root / "triage_summary.json"
-    triage_summary_path.write_text(json.dumps(triage_counts, indent=2), encoding="utf-8")
+    triage_summary_path.write_text(
+        json.dumps({**triage_counts, "feature_cache": cache_stats}, indent=2), encoding="utf-8"
+    )
 
     if triage_only:
         return {
@@ -930,7 +995,7 @@ def run_graph_pipeline(
         metrics: Dict[str, Any],
         root_id: str | None = None,
     ) -> None:
-        nonlocal arv_prev_hash
+        nonlocal arv_prev_hash, arv_active_entries
         evidence = {
             "evidence_id": "",
             "schema_version": profile.get("schema_version"),
@@ -960,6 +1025,10 @@ def run_graph_pipeline(
             evidence["root_id"] = root_id
             evidence["inputs"].append({"ref_type": "root", "ref": root_id})
         arv_prev_hash = _append_evidence(arv_ledger_path, evidence, arv_prev_hash)
+        arv_active_entries += 1
+        if ledger_segment_entries and arv_active_entries >= ledger_segment_entries:
+            _seal_evidence_segment(arv_ledger_path, ledger_segment_compression)
+            arv_active_entries = 0
 
     # ARV gate 1 (post-triage admission)
     arv_state = {
@@ -1164,6 +1233,8 @@ def run_graph_pipeline(
     ground_truth_campaign_rows: List[Dict[str, Any]] = []
 
     for idx, comp_nodes in enumerate(components):
+        if progress:
+            progress("campaigns", {"done": idx, "total": len(components)})
         subgraph = world_graph.subgraph(comp_nodes).copy()
         summary = narrator.summarize(subgraph)
         assessment_report = narrator.generate_assessment_report(subgraph, triage_summary=triage_counts)
@@ -1289,13 +1360,10 @@ def run_graph_pipeline(
                 }
             )
 
-    dataset_hash = hashlib.sha256(
-        json.dumps(raw_alerts, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
-    ).hexdigest()
     manifest = {
         "generated_at": _utc_now(),
         "dataset": {
-            "event_count": len(raw_alerts),
+            "event_count": triage_counts["total_ingested"],
             "sha256": dataset_hash,
         },
         "profile": {
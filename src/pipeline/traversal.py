@@ -7,17 +7,10 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 
 import networkx as nx
 
+from src.markers import INTERPRETER_MARKERS, INTERPRETER_MATCHER
 
-SUSPICIOUS_TOKENS = (
-    "powershell",
-    "wscript",
-    "cscript",
-    "encodedcommand",
-    " -enc",
-    "whoami",
-    "rundll32",
-    "regsvr32",
-)
+
+SUSPICIOUS_TOKENS = INTERPRETER_MARKERS
 
 
 def _parse_timestamp(value: Any) -> Optional[datetime]:
@@ -119,7 +112,7 @@ def _alert_score(subgraph: nx.DiGraph, alert_node: str, alert_meta: Dict[str, Di
     if local_meta.get("process"):
         cmd_parts.append(str(local_meta["process"]))
     cmd_blob = " ".join(cmd_parts).lower()
-    if any(token in cmd_blob for token in SUSPICIOUS_TOKENS):
+    if INTERPRETER_MATCHER.search(cmd_blob):
         score += 20
         reasons.append("suspicious interpreter/command marker")
 
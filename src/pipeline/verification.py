@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Sequence, Tuple
 
 import networkx as nx
 
+from src.markers import CHANNEL_MATCHER
+
 
 def _quantile(values: List[float], q: float) -> float:
     if not values:
@@ -187,9 +189,7 @@ def _is_suspicious(subgraph: nx.DiGraph, node: str, alert_meta: Dict[str, Dict[s
             str(node),
         ]
     ).lower()
-    token_suspicious = any(
-        token in text for token in ("powershell", "wscript", "cscript", "whoami", " -enc", "encodedcommand")
-    )
+    token_suspicious = CHANNEL_MATCHER.search(text)
     return rel_suspicious or token_suspicious
 
 
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
+import json
+import sys
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi.testclient import TestClient
 
+import src.api.app as api_app
 from src.api.app import create_app
+from src.api.offload import RequestLimiter
+from src.kernel.kernel_gate import KernelGatePool
 
 
 def test_api_ingest_classify_basic(tmp_path, monkeypatch):
@@ -49,3 +60,281 @@ def test_api_ingest_classify_cef(tmp_path, monkeypatch):
     body = resp.json()
     assert body["per_event"][0]["event_id"] == "evt-api-2"
     assert "entropy_raw" in body["per_event"][0]
+
+
+def test_api_ledger_query_endpoints(tmp_path, monkeypatch):
+    monkeypatch.setenv("CIX_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    client = TestClient(create_app())
+    payload = {
+        "events": [
+            {
+                "source_id": "siem-Q",
+                "event_id": "evt-q-1",
+                "source_timestamp": "2026-02-06T10:00:00Z",
+                "raw_payload": {"message": "hello"},
+            }
+        ]
+    }
+    classified = client.post("/api/v1/ingest/classify", json=payload).json()
+    pointers = classified["per_event"][0]["evidence_pointers"]
+
+    resp = client.get("/v1/ledger/decisions", params={"source_id": "siem-Q", "event_id": "evt-q-1"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == 1
+    result = body["results"][0]
+    assert result["batch_id"] == classified["batch_id"]
+    assert result["evidence_pointers"]["entry_hash"] == pointers["entry_hash"]
+
+    entry = client.get(f"/v1/ledger/entries/{pointers['ledger_entry_id']}")
+    assert entry.status_code == 200
+    assert entry.json()["payload"]["band"] == classified["per_event"][0]["band"]
+    assert client.get("/v1/ledger/entries/missing").status_code == 404
+
+
+def _ndjson_events(count: int) -> bytes:
+    lines = [
+        json.dumps(
+            {
+                "source_id": "siem-S",
+                "event_id": f"evt-stream-{idx}",
+                "source_timestamp": "2026-02-06T10:00:00Z",
+                "raw_payload": {"message": f"stream {idx}", "event": {"kind": "alert"}},
+            }
+        )
+        for idx in range(count)
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def test_api_ingest_classify_stream(tmp_path, monkeypatch):
+    monkeypatch.setenv("CIX_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    client = TestClient(create_app())
+    body = json.dumps({"profile_parameters": {}}).encode() + b"\n" + _ndjson_events(5) + b"{broken\n"
+    resp = client.post(
+        "/api/v1/ingest/classify/stream?batch_size=2",
+        content=gzip.compress(body),
+        headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in resp.text.splitlines()]
+
+    events = [r for r in records if r["type"] == "event"]
+    assert [r["event_id"] for r in events] == [f"evt-stream-{idx}" for idx in range(5)]
+    assert all("band" in r for r in events)
+    errors = [r for r in records if r["type"] == "error"]
+    assert [r["line"] for r in errors] == [7]
+    summary = records[-1]
+    assert summary["type"] == "summary"
+    assert (summary["received_count"], summary["rejected_count"], len(summary["batch_ids"])) == (5, 1, 3)
+    assert summary["batch"]["processed_count"] == 5
+
+    replay = client.post(
+        "/api/v1/ingest/classify/stream", content=_ndjson_events(5), headers={"Content-Type": "application/x-ndjson"}
+    )
+    summary = json.loads(replay.text.splitlines()[-1])
+    assert summary["batch"]["replayed_count"] == 5
+
+
+def test_api_ingest_classify_stream_releases_slot_on_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("CIX_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    monkeypatch.setenv("CIX_KERNEL_LEDGER_PATH", str(tmp_path / "kernel_ledger.jsonl"))
+    threads = {}
+    acquire, release = RequestLimiter.try_acquire, RequestLimiter.release
+
+    def _acquire(self):
+        threads["acquire"] = threading.get_ident()
+        return acquire(self)
+
+    def _release(self):
+        threads["release"] = threading.get_ident()
+        release(self)
+
+    monkeypatch.setattr(RequestLimiter, "try_acquire", _acquire)
+    monkeypatch.setattr(RequestLimiter, "release", _release)
+    with TestClient(create_app()) as client:
+        resp = client.post(
+            "/api/v1/ingest/classify/stream", content=_ndjson_events(2), headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert resp.status_code == 200
+        assert threads["release"] == threads["acquire"]
+        assert client.get("/v1/ingest/metrics").json()["limiter"]["in_flight"] == 0
+
+
+def test_api_ingest_classify_stream_rejects_other_media_types(tmp_path, monkeypatch):
+    monkeypatch.setenv("CIX_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    client = TestClient(create_app())
+    assert client.post("/api/v1/ingest/classify/stream", json={"events": []}).status_code == 415
+    resp = client.post(
+        "/api/v1/ingest/classify/stream",
+        content=b"",
+        headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "br"},
+    )
+    assert resp.status_code == 415
+
+
+def test_api_ingest_overload_and_timeout(tmp_path, monkeypatch):
+    monkeypatch.setenv("CIX_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    monkeypatch.setenv("CIX_KERNEL_LEDGER_PATH", str(tmp_path / "kernel_ledger.jsonl"))
+    monkeypatch.setenv("CIX_INGEST_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("CIX_INGEST_RETRY_AFTER_SECONDS", "3")
+    monkeypatch.setenv("CIX_INGEST_TIMEOUT_SECONDS", "0.5")
+    entered, release = threading.Event(), threading.Event()
+
+    def _blocking_classify(events, **kwargs):
+        entered.set()
+        release.wait(5)
+        return {"batch_id": "b", "batch": {}, "per_event": []}
+
+    monkeypatch.setattr(api_app, "classify_batch", _blocking_classify)
+    payload = {"events": []}
+    with TestClient(create_app()) as client:
+        first = ThreadPoolExecutor(max_workers=1).submit(client.post, "/api/v1/ingest/classify", json=payload)
+        assert entered.wait(5)
+
+        busy = client.post("/api/v1/ingest/classify", json=payload)
+        assert busy.status_code == 429
+        assert busy.headers["retry-after"] == "3"
+        assert busy.json()["detail"]["code"] == "OVERLOADED"
+        assert client.get("/healthz").status_code == 200
+
+        timed_out = first.result(5)
+        assert timed_out.status_code == 504
+        assert timed_out.json()["detail"]["code"] == "REQUEST_TIMEOUT"
+        release.set()
+
+        assert client.post("/api/v1/ingest/classify", json=payload).status_code == 200
+        limiter = client.get("/v1/ingest/metrics").json()["limiter"]
+        assert (limiter["in_flight"], limiter["admitted"], limiter["rejected"]) == (0, 2, 1)
+
+
+class _SlowFirstGate:
+    """Admits every alert; the first evaluate_batch blocks until released."""
+
+    registry_commit = "commit-1"
+
+    def __init__(self) -> None:
+        self.entered, self.release = threading.Event(), threading.Event()
+        self.evaluations = 0
+        self.appended = []
+
+    def evaluate_batch(self, alerts, feature_cache=None):
+        self.evaluations += 1
+        if self.evaluations == 1:
+            self.entered.set()
+            self.release.wait(5)
+        return [
+            types.SimpleNamespace(
+                action_id="ARV.EXECUTE",
+                reason_code="OK",
+                graph_raw={"eventId": alert["event_id"], "message": alert["raw_payload"]["message"]},
+                ingest_evidence={"event_id": alert["event_id"]},
+            )
+            for alert in alerts
+        ]
+
+    def append_ledger_batch(self, results):
+        self.appended.append(len(results))
+
+    def flush_ledger(self):
+        pass
+
+
+def test_api_ingest_events_retry_after_timeout_is_not_deduplicated(tmp_path, monkeypatch):
+    monkeypatch.setenv("CIX_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    monkeypatch.setenv("CIX_KERNEL_LEDGER_PATH", str(tmp_path / "kernel_ledger.jsonl"))
+    monkeypatch.setenv("CIX_INGEST_TIMEOUT_SECONDS", "0.5")
+    sdk = types.ModuleType("sdk")
+    sdk.hash_evidence = lambda evidence: hashlib.sha256(json.dumps(evidence, sort_keys=True).encode()).hexdigest()
+    monkeypatch.setitem(sys.modules, "sdk", sdk)
+    gate = _SlowFirstGate()
+    monkeypatch.setattr(KernelGatePool, "get", lambda self, *args, **kwargs: gate)
+    payload = {
+        "events": [
+            {
+                "source_id": "siem-A",
+                "event_id": f"evt-{i}",
+                "source_timestamp": "2026-02-06T10:00:00Z",
+                "raw_payload": {"message": f"login {i}"},
+            }
+            for i in range(3)
+        ]
+    }
+    headers = {"Idempotency-Key": "retry-after-timeout"}
+    with TestClient(create_app()) as client:
+        timed_out = client.post("/v1/ingest/events", json=payload, headers=headers)
+        assert timed_out.status_code == 504
+        assert gate.entered.is_set()
+        gate.release.set()
+
+        # Waits for the abandoned attempt to give up its claims, then processes the batch.
+        retry = client.post("/v1/ingest/events", json=payload, headers=headers)
+        assert retry.status_code == 200
+        assert [e["event_id"] for e in retry.json()["admitted"]] == ["evt-0", "evt-1", "evt-2"]
+        assert retry.json()["dedup"] == {"duplicates_removed": 0}
+        assert (gate.evaluations, gate.appended) == (2, [3])
+
+        again = client.post("/v1/ingest/events", json=payload, headers={"Idempotency-Key": "new-key"})
+        assert again.json()["dedup"] == {"duplicates_removed": 3}
+
+
+class _FailingFirstAppendGate(_SlowFirstGate):
+    """The first ledger append blocks until released and then fails."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.appending = threading.Event()
+
+    def evaluate_batch(self, alerts, feature_cache=None):
+        self.evaluations += 1
+        return [
+            types.SimpleNamespace(
+                action_id="ARV.EXECUTE",
+                reason_code="OK",
+                graph_raw={"eventId": alert["event_id"], "message": alert["raw_payload"]["message"]},
+                ingest_evidence={"event_id": alert["event_id"]},
+            )
+            for alert in alerts
+        ]
+
+    def append_ledger_batch(self, results):
+        if not self.appending.is_set():
+            self.appending.set()
+            self.release.wait(5)
+            raise OSError("kernel ledger unavailable")
+        super().append_ledger_batch(results)
+
+
+def test_api_ingest_events_overlapping_request_waits_for_pending_dedup_keys(tmp_path, monkeypatch):
+    monkeypatch.setenv("CIX_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    monkeypatch.setenv("CIX_KERNEL_LEDGER_PATH", str(tmp_path / "kernel_ledger.jsonl"))
+    sdk = types.ModuleType("sdk")
+    sdk.hash_evidence = lambda evidence: hashlib.sha256(json.dumps(evidence, sort_keys=True).encode()).hexdigest()
+    monkeypatch.setitem(sys.modules, "sdk", sdk)
+    gate = _FailingFirstAppendGate()
+    monkeypatch.setattr(KernelGatePool, "get", lambda self, *args, **kwargs: gate)
+    payload = {
+        "events": [
+            {
+                "source_id": "siem-A",
+                "event_id": "evt-0",
+                "source_timestamp": "2026-02-06T10:00:00Z",
+                "raw_payload": {"message": "login 0"},
+            }
+        ]
+    }
+    with TestClient(create_app(), raise_server_exceptions=False) as client, ThreadPoolExecutor(2) as pool:
+        first = pool.submit(client.post, "/v1/ingest/events", json=payload, headers={"Idempotency-Key": "a"})
+        assert gate.appending.wait(5)
+        second = pool.submit(client.post, "/v1/ingest/events", json=payload, headers={"Idempotency-Key": "b"})
+        while gate.evaluations < 2:
+            threading.Event().wait(0.01)
+        assert not second.done()  # waiting on the first request's pending key
+        gate.release.set()
+
+        assert first.result(5).status_code == 500
+        retried = second.result(5)
+        assert retried.status_code == 200
+        assert [e["event_id"] for e in retried.json()["admitted"]] == ["evt-0"]
+        assert gate.appended == [1]
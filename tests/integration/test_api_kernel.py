@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import time
 from pathlib import Path
 
 import pytest
@@ -61,13 +62,15 @@ def test_kernel_ingest_events_basic(tmp_path, monkeypatch):
 def test_kernel_graph_run(tmp_path, monkeypatch):
     monkeypatch.setenv("AXODEN_KERNEL_PATH", _kernel_path_or_skip())
     monkeypatch.setenv("CIX_KERNEL_LEDGER_PATH", str(tmp_path / "kernel_ledger.jsonl"))
+    monkeypatch.setenv("CIX_RUN_WORKER_MODE", "thread")
+    monkeypatch.setenv("CIX_RUN_OUTPUT_DIR", str(tmp_path / "runs"))
 
     import src.pipeline.graph_pipeline as graph_pipeline
 
     monkeypatch.setattr(
         graph_pipeline,
         "run_graph_pipeline",
-        lambda raw_events, output_dir, enable_kernel=False: {
+        lambda raw_events, output_dir, enable_kernel=False, **kwargs: {
             "reports": [f"{output_dir}/Forensic_Assessment_Campaign_1.md"],
             "ledgers": [f"{output_dir}/forensic_ledger_campaign_1.json"],
             "graphs_html": [f"{output_dir}/investigation_graph_campaign_1.html"],
@@ -79,28 +82,56 @@ def test_kernel_graph_run(tmp_path, monkeypatch):
         },
     )
 
-    client = TestClient(create_app())
-    payload = _payload()
-    ingest_headers = {"Idempotency-Key": "ingest-graph-1"}
-
-    ingest_resp = client.post("/v1/ingest/events", json=payload, headers=ingest_headers)
-    assert ingest_resp.status_code == 200
-    ingest_body = ingest_resp.json()
-    assert ingest_body["admitted"]
-
-    evidence_ids = [item["evidence_id"] for item in ingest_body["admitted"]]
-    run_headers = {"Idempotency-Key": "run-graph-1"}
-    run_resp = client.post("/v1/runs/graph", json={"evidence_ids": evidence_ids}, headers=run_headers)
-    assert run_resp.status_code == 200
-    run_body = run_resp.json()
-    assert run_body["run_id"]
-
-    status_resp = client.get(f"/v1/runs/{run_body['run_id']}")
-    assert status_resp.status_code == 200
-
-    artifacts_resp = client.get(f"/v1/runs/{run_body['run_id']}/artifacts")
-    assert artifacts_resp.status_code == 200
-    artifact_types = {item["type"] for item in artifacts_resp.json().get("artifacts", [])}
-    assert "temporal_analysis_json" in artifact_types
-    assert "verification_json" in artifact_types
-    assert "reproducibility_manifest_json" in artifact_types
+    with TestClient(create_app()) as client:
+        payload = _payload()
+        ingest_headers = {"Idempotency-Key": "ingest-graph-1"}
+
+        ingest_resp = client.post("/v1/ingest/events", json=payload, headers=ingest_headers)
+        assert ingest_resp.status_code == 200
+        ingest_body = ingest_resp.json()
+        assert ingest_body["admitted"]
+
+        evidence_ids = [item["evidence_id"] for item in ingest_body["admitted"]]
+        run_headers = {"Idempotency-Key": "run-graph-1"}
+        run_resp = client.post("/v1/runs/graph", json={"evidence_ids": evidence_ids}, headers=run_headers)
+        assert run_resp.status_code == 200
+        run_body = run_resp.json()
+        assert run_body["run_id"]
+
+        for _ in range(200):
+            status_resp = client.get(f"/v1/runs/{run_body['run_id']}")
+            assert status_resp.status_code == 200
+            if status_resp.json()["status"] == "SUCCEEDED":
+                break
+            time.sleep(0.05)
+        assert status_resp.json()["status"] == "SUCCEEDED"
+
+        artifacts_resp = client.get(f"/v1/runs/{run_body['run_id']}/artifacts")
+        assert artifacts_resp.status_code == 200
+        artifact_types = {item["type"] for item in artifacts_resp.json().get("artifacts", [])}
+        assert "temporal_analysis_json" in artifact_types
+        assert "verification_json" in artifact_types
+        assert "reproducibility_manifest_json" in artifact_types
+
+
+def test_kernel_gate_evaluate_batch_matches_single(tmp_path, monkeypatch):
+    monkeypatch.setenv("AXODEN_KERNEL_PATH", _kernel_path_or_skip())
+    from src.kernel.kernel_gate import KernelGate
+
+    gate = KernelGate(ledger_path=str(tmp_path / "kernel_ledger.jsonl"))
+    calls = []
+    decide = gate._decide
+    gate._decide = lambda *args, **kwargs: calls.append(args) or decide(*args, **kwargs)
+
+    events = [dict(_payload()["events"][0], event_id=f"evt-{i}") for i in range(5)]
+    batch = gate.evaluate_batch(events)
+    single = [gate.evaluate(event) for event in events]
+    assert len(calls) == 1
+    assert [(r.action_id, r.reason_code, r.graph_raw) for r in batch] == [
+        (r.action_id, r.reason_code, r.graph_raw) for r in single
+    ]
+    assert [r.ingest_evidence["inputs"] for r in batch] == [r.ingest_evidence["inputs"] for r in single]
+
+    gate.append_ledger_batch(batch)
+    lines = (tmp_path / "kernel_ledger.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2 * len(events)
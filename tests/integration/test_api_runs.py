@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import time
+
+from fastapi.testclient import TestClient
+
+import src.pipeline.graph_pipeline as graph_pipeline
+from src.api.app import create_app
+from src.kernel.evidence_store import EvidenceStore
+
+
+def _wait_for(client: TestClient, run_id: str, status: str) -> dict:
+    for _ in range(200):
+        body = client.get(f"/v1/runs/{run_id}").json()
+        if body["status"] == status:
+            return body
+        time.sleep(0.05)
+    raise AssertionError(f"run {run_id} did not reach {status}: {body}")
+
+
+def test_api_graph_runs_are_queued_and_cancellable(tmp_path, monkeypatch):
+    monkeypatch.setenv("CIX_LEDGER_PATH", str(tmp_path / "ledger.jsonl"))
+    monkeypatch.setenv("CIX_KERNEL_LEDGER_PATH", str(tmp_path / "kernel_ledger.jsonl"))
+    monkeypatch.setenv("CIX_RUN_WORKER_MODE", "thread")
+    monkeypatch.setenv("CIX_RUN_WORKERS", "1")
+    monkeypatch.setenv("CIX_RUN_OUTPUT_DIR", str(tmp_path / "runs"))
+    store = EvidenceStore(str(tmp_path / "kernel_ledger.evidence"))
+    store.put("ev-1", {"eventId": "evt-1"})
+    store.close()
+
+    def _pipeline(raw_events, output_dir, enable_kernel=False, chunk_size=0, progress=None):
+        progress("triage", {"total_ingested": len(list(raw_events))})
+        return {"reports": [f"{output_dir}/report.md"]}
+
+    monkeypatch.setattr(graph_pipeline, "run_graph_pipeline", _pipeline)
+
+    with TestClient(create_app()) as client:
+        missing = client.post("/v1/runs/graph", json={"evidence_ids": ["nope"]}, headers={"Idempotency-Key": "r0"})
+        assert missing.status_code == 422
+
+        run_id = client.post(
+            "/v1/runs/graph", json={"evidence_ids": ["ev-1"], "priority": 3}, headers={"Idempotency-Key": "r1"}
+        ).json()["run_id"]
+        body = _wait_for(client, run_id, "SUCCEEDED")
+        assert body["priority"] == 3
+        assert body["progress"] == {"stage": "triage", "total_ingested": 1}
+        artifacts = client.get(f"/v1/runs/{run_id}/artifacts").json()["artifacts"]
+        assert [a["type"] for a in artifacts] == ["report_md"]
+
+        cancel = client.post(f"/v1/runs/{run_id}/cancel")
+        assert cancel.status_code == 409
+        assert client.get("/v1/runs/unknown").status_code == 404
+        assert client.get("/v1/runs/metrics").json()["queue"] == {"SUCCEEDED": 1}
+
+    # Run state lives in the queue file, so a new app instance still serves it.
+    monkeypatch.setenv("CIX_RUN_WORKERS", "0")
+    client = TestClient(create_app())
+    assert client.get(f"/v1/runs/{run_id}").json()["status"] == "SUCCEEDED"
+    pending_id = client.post(
+        "/v1/runs/graph", json={"evidence_ids": ["ev-1"]}, headers={"Idempotency-Key": "r2"}
+    ).json()["run_id"]
+    assert client.get(f"/v1/runs/{pending_id}/artifacts").status_code == 202
+    assert client.post(f"/v1/runs/{pending_id}/cancel").json()["status"] == "CANCELLED"
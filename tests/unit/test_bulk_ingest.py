@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import importlib.util
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from src.ingest.bulk import detect_format, iter_envelopes, read_lines
+from src.kernel.ledger import Ledger
+from src.kernel.stage1 import classify_batch
+
+ROOT = Path(__file__).resolve().parents[2]
+
+LINES = [
+    "CEF:0|Acme|ThreatX|1.0|100|Test Event|5|src=10.0.0.1 dst=10.0.0.2 msg=hello world externalId=cef-1",
+    "LEEF:2.0|Vendor|Product|1.0|EVT123|^|cat=malware^sev=5^devTime=2026-02-06T12:01:00Z",
+    '<34>1 2026-02-06T10:00:00Z host app 1234 ID47 - An application event',
+    "<34>Oct 11 22:14:15 mymachine su[123]: 'su root' failed",
+    '{"EventRecordID": 77, "Hostname": "ws1", "EventTime": "2026-02-06T09:00:00Z", "Message": "logon"}',
+    "",
+    "garbage line",
+    '{"broken": ',
+]
+
+
+def _normalize_jsonl():
+    spec = importlib.util.spec_from_file_location("normalize_jsonl", ROOT / "scripts" / "normalize_jsonl.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    "line, fmt",
+    [(LINES[0], "cef"), (LINES[1], "leef"), (LINES[2], "syslog"), (LINES[3], "syslog"), (LINES[4], "json"), ("<abc> x", None), ("hello", None)],
+)
+def test_detect_format_by_prefix(line, fmt):
+    assert detect_format(line) == fmt
+
+
+def test_mixed_lines_produce_envelopes_in_order():
+    errors = []
+    envelopes = list(iter_envelopes(LINES, errors=errors))
+    assert [e.get("format", "json") for e in envelopes] == ["cef", "leef", "syslog", "syslog", "json"]
+    assert envelopes[0]["event_id"] == "cef-1"
+    assert envelopes[0]["parsed_payload"]["extension"]["msg"] == "hello world"
+    assert envelopes[1]["source_timestamp"] == "2026-02-06T12:01:00Z"
+    assert envelopes[2]["source_id"] == "host"
+    assert [e["line"] for e in errors] == [7, 8]
+
+
+def test_worker_pool_matches_inline_parsing():
+    lines = LINES * 50
+    inline = list(iter_envelopes(lines, chunk_lines=7))
+    pooled = list(iter_envelopes(lines, workers=2, chunk_lines=7))
+    assert pooled == inline
+
+
+def test_json_envelopes_match_normalize_jsonl():
+    normalize = _normalize_jsonl()
+    event = json.loads(LINES[4])
+    expected = normalize.normalize_event(event, None)
+    expected.pop("raw_payload_hash")
+    assert list(iter_envelopes([LINES[4]])) == [expected]
+
+
+def test_read_lines_from_binary_stream():
+    stream = io.BytesIO("\n".join(LINES[:2]).encode("utf-8") + b"\xff\n")
+    assert [e["format"] for e in iter_envelopes(read_lines(stream))] == ["cef", "leef"]
+
+
+def test_stage1_classifies_bulk_envelopes_like_wrapped_events(tmp_path):
+    envelopes = list(iter_envelopes(LINES[:4]))
+    wrapped = [{k: v for k, v in e.items() if k != "parsed_payload"} for e in envelopes]
+    bulk = classify_batch(envelopes, ledger=Ledger(str(tmp_path / "bulk.jsonl")))
+    plain = classify_batch(wrapped, ledger=Ledger(str(tmp_path / "plain.jsonl")))
+    keys = ("event_id", "band", "entropy_raw", "projection", "suspicious_markers")
+    assert [{k: e[k] for k in keys} for e in bulk["per_event"]] == [{k: e[k] for k in keys} for e in plain["per_event"]]
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from src.ingest.dedup import (
+    ScalableBloomFilter,
+    SlidingWindowDeduplicator,
+    compute_event_hash,
+    content_key,
+    semantic_key,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_count_window_forgets_least_recently_seen_keys():
+    dedup = SlidingWindowDeduplicator(max_entries=2)
+    assert [dedup.seen(k) for k in ["a", "b", "a", "c"]] == [False, False, True, False]
+    # "b" was least recently seen when "c" arrived.
+    assert dedup.seen("a") is True
+    assert dedup.seen("b") is False
+    assert len(dedup) == 2
+
+
+def test_claimed_keys_are_recorded_only_on_commit():
+    dedup = SlidingWindowDeduplicator(max_entries=10)
+    assert dedup.seen("old") is False
+    assert dedup.claim(["a", "old", "a", None, "b"]) == [False, True, True, False, False]
+    assert (len(dedup), dedup.stats()["pending"]) == (1, 2)
+    dedup.release(["b"])
+    dedup.commit(["a", "b"])
+    assert dedup.claim(["a", "b"], wait_seconds=0) == [True, False]
+
+
+def test_overlapping_claims_wait_for_the_pending_batch():
+    dedup = SlidingWindowDeduplicator(max_entries=10)
+    assert dedup.claim(["k"]) == [False]
+    assert dedup.claim(["k", "other"], wait_seconds=0) is None
+    assert dedup.stats()["pending"] == 1
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(dedup.claim(["k"], wait_seconds=5)))
+    waiter.start()
+    time.sleep(0.05)
+    dedup.release(["k"])  # the first batch failed: its event must not count as seen
+    waiter.join(5)
+    assert results == [[False]]
+
+    committed = threading.Thread(target=lambda: results.append(dedup.claim(["k"], wait_seconds=5)))
+    committed.start()
+    time.sleep(0.05)
+    dedup.commit(["k"])
+    committed.join(5)
+    assert results[-1] == [True]
+
+
+def test_time_window_expires_keys():
+    clock = FakeClock()
+    dedup = SlidingWindowDeduplicator(window_seconds=60, clock=clock)
+    assert dedup.seen("a") is False
+    clock.now += 30
+    assert dedup.seen("a") is True
+    clock.now += 61
+    assert dedup.seen("a") is False
+
+
+def test_bloom_filter_extends_the_horizon():
+    dedup = SlidingWindowDeduplicator(max_entries=10, bloom_capacity=1000)
+    keys = [f"key-{i}" for i in range(500)]
+    assert not any(dedup.seen(k) for k in keys)
+    assert len(dedup) == 10
+    assert all(dedup.seen(k) for k in keys[:100])
+    assert dedup.stats()["duplicates"] == 100
+
+
+def test_bloom_memory_is_bounded():
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01, max_filters=3)
+    for i in range(5_000):
+        bloom.add(f"k{i}")
+    size = bloom.size_bytes
+    for i in range(5_000):
+        bloom.add(f"later-{i}")
+    assert bloom.size_bytes == size
+    assert "later-4999" in bloom
+    assert "k0" not in bloom  # oldest slices dropped
+
+
+def test_none_keys_are_never_duplicates():
+    dedup = SlidingWindowDeduplicator(key_fn=semantic_key)
+    alert = {"data": {"process_image": "cmd.exe"}}
+    assert dedup.is_duplicate(alert) is False
+    assert dedup.is_duplicate(alert) is False
+    assert len(dedup) == 0
+
+
+def test_semantic_and_content_keys():
+    first = {"eventId": "e1", "raw_payload": {"EventID": 1, "Image": "cmd.exe", "Hostname": "a"}}
+    second = {"eventId": "e2", "raw_payload": {"EventID": 1, "Image": "cmd.exe", "Hostname": "b"}}
+    assert semantic_key(first) == semantic_key(second)
+    assert semantic_key({"eventId": "x", "raw_payload": {"EventID": "1", "Image": "cmd.exe"}}) != semantic_key(first)
+    assert content_key(first) == compute_event_hash(first) != content_key(second)
+
+    dedup = SlidingWindowDeduplicator(key_fn=semantic_key)
+    assert dedup.filter([first, second, first]) == ([first], 2)
+
+
+def test_state_persists_across_restarts(tmp_path):
+    path = tmp_path / "dedup.json"
+    clock = FakeClock()
+    dedup = SlidingWindowDeduplicator(max_entries=5, window_seconds=100, bloom_capacity=100, state_path=str(path), clock=clock)
+    for i in range(8):
+        dedup.seen(f"k{i}")
+    dedup.save()
+
+    restored = SlidingWindowDeduplicator(max_entries=5, window_seconds=100, bloom_capacity=100, state_path=str(path), clock=clock)
+    assert len(restored) == 5
+    assert restored.seen("k7") is True
+    assert restored.seen("k0") is True  # evicted to the Bloom filter before saving
+
+    clock.now += 500
+    expired = SlidingWindowDeduplicator(max_entries=5, window_seconds=100, state_path=str(path), clock=clock)
+    assert len(expired) == 0
+
+
+def test_checkpoint_saves_after_new_keys(tmp_path):
+    path = tmp_path / "dedup.json"
+    dedup = SlidingWindowDeduplicator(state_path=str(path), checkpoint_every=3)
+    dedup.seen("a")
+    dedup.seen("a")
+    dedup.seen("b")
+    assert not path.exists()
+    dedup.seen("c")
+    assert path.exists()
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        SlidingWindowDeduplicator(max_entries=0)
+    with pytest.raises(ValueError):
+        ScalableBloomFilter(10, error_rate=1.5)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import random
+
+from src.kernel.entropy import miller_madow_entropy_batch, pack_payloads
+from src.kernel.stage1 import (
+    _analysis_text,
+    _miller_madow_entropy_bytes,
+    _parse_if_needed,
+    _template_bytes,
+    classify_batch,
+)
+from src.kernel.ledger import Ledger
+
+
+def _vector_payloads(test_vectors):
+    payloads = []
+    for vector in test_vectors.get("vectors", []):
+        for event in (vector.get("input") or {}).get("events", []):
+            if isinstance(event, dict):
+                payloads.append(_template_bytes(_analysis_text(_parse_if_needed(dict(event)))))
+    return payloads
+
+
+def test_pack_payloads_offsets():
+    buffer, offsets = pack_payloads([b"ab", b"", b"xyz"])
+    assert offsets.tolist() == [0, 2, 2, 5]
+    assert bytes(buffer[offsets[2] : offsets[3]]) == b"xyz"
+
+
+def test_batch_entropy_bit_identical_on_test_vectors(test_vectors):
+    payloads = _vector_payloads(test_vectors)
+    assert payloads
+    expected = [_miller_madow_entropy_bytes(p) for p in payloads]
+    assert miller_madow_entropy_batch(payloads) == expected
+
+
+def test_batch_entropy_bit_identical_on_random_payloads():
+    rng = random.Random(7)
+    payloads = [b"", b"a", b"aaaa"]
+    for _ in range(300):
+        alphabet = bytes(rng.sample(range(256), rng.randint(1, 256)))
+        payloads.append(bytes(rng.choice(alphabet) for _ in range(rng.randint(0, 600))))
+    expected = [_miller_madow_entropy_bytes(p) for p in payloads]
+    assert miller_madow_entropy_batch(payloads) == expected
+
+
+def test_classify_batch_vectorized_parity(test_vectors, tmp_path):
+    for vector in test_vectors.get("vectors", []):
+        events = (vector.get("input") or {}).get("events")
+        if not events:
+            continue
+        serial = classify_batch(
+            events,
+            ledger=Ledger(str(tmp_path / f"{vector['id']}_serial.jsonl")),
+            precondition=vector.get("precondition"),
+        )
+        batched = classify_batch(
+            events,
+            ledger=Ledger(str(tmp_path / f"{vector['id']}_vectorized.jsonl")),
+            precondition=vector.get("precondition"),
+            vectorized=True,
+        )
+        for a, b in zip(serial["per_event"], batched["per_event"]):
+            assert a.get("band") == b.get("band")
+            assert a.get("entropy_raw") == b.get("entropy_raw")
+            assert (a.get("evidence_pointers") or {}).get("classification_features_id") == (
+                b.get("evidence_pointers") or {}
+            ).get("classification_features_id")
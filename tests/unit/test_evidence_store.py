@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+
+from src.kernel.evidence_store import EvidenceStore
+
+
+def _payload(idx: int):
+    return {"eventId": f"evt-{idx}", "raw_payload": {"message": f"powershell -enc {idx}" * 4}}
+
+
+def test_round_trip_and_persistence(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence"), hot_entries=0)
+    assert store.put_many((f"ev-{i}", _payload(i)) for i in range(5)) == 5
+    assert store.put_many([("ev-0", _payload(99))]) == 0  # ids are write-once
+    assert store.get("ev-3") == _payload(3)
+    assert store.get("ev-0") == _payload(0)
+    assert store.get("nope") is None
+    store.close()
+
+    reopened = EvidenceStore(str(tmp_path / "evidence"))
+    assert len(reopened) == 5
+    assert "ev-4" in reopened
+    assert reopened.get("ev-4") == _payload(4)
+    reopened.close()
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence"))
+    store.put_many([("a", _payload(1)), ("b", _payload(1)), ("c", _payload(2))])
+    stats = store.stats()
+    assert (stats["entries"], stats["blobs_written"], stats["blobs_shared"]) == (3, 2, 1)
+    assert store.get("b") == _payload(1)
+
+
+def test_segments_roll_over(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence"), segment_max_bytes=200, hot_entries=0)
+    for idx in range(20):
+        store.put(f"ev-{idx}", _payload(idx))
+    assert store.stats()["segments"] > 1
+    assert [p["eventId"] for p in store.iter_payloads(f"ev-{i}" for i in range(20))] == [
+        f"evt-{i}" for i in range(20)
+    ]
+
+
+def test_hot_tier_is_bounded_lru(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence"), hot_entries=2)
+    store.put_many((f"ev-{i}", _payload(i)) for i in range(3))
+    store.get("ev-2")
+    store.get("ev-0")  # evicted on write, so read from the pack
+    stats = store.stats()
+    assert (stats["hot_entries"], stats["hot_hits"], stats["cold_reads"]) == (2, 1, 1)
+
+
+def test_missing_and_lazy_iteration(tmp_path):
+    store = EvidenceStore(str(tmp_path / "evidence"), hot_entries=0)
+    store.put_many((f"ev-{i}", _payload(i)) for i in range(3))
+    assert store.missing(["ev-0", "x", "ev-2", "y", "x"]) == ["x", "y", "x"]
+
+    payloads = store.iter_payloads(["ev-2", "x", "ev-0"])
+    assert store.stats()["cold_reads"] == 0
+    assert next(payloads) == _payload(2)
+    assert store.stats()["cold_reads"] == 1
+    assert list(payloads) == [_payload(0)]
+
+
+def test_two_stores_share_a_directory(tmp_path):
+    first = EvidenceStore(str(tmp_path / "evidence"))
+    second = EvidenceStore(str(tmp_path / "evidence"))
+    first.put("a", _payload(1))
+    second.put("b", _payload(2))
+    first.put("c", _payload(3))
+    assert second.get("a") == _payload(1)
+    assert second.get("c") == _payload(3)
+    assert first.get("b") == _payload(2)
+
+
+def test_invalid_configuration(tmp_path):
+    with pytest.raises(ValueError):
+        EvidenceStore(str(tmp_path / "evidence"), segment_max_bytes=0)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import pytest
+
+from src.ingest.dedup import compute_event_hash
+from src.kernel.feature_cache import FeatureCache, payload_hashes
+from src.kernel.hashing import hash_payload
+from src.kernel.kernel_gate import _compute_entropy, _content_hash
+from src.kernel.ledger import Ledger
+from src.kernel.stage1 import classify_batch
+
+
+def _fail():
+    raise AssertionError("feature should have been served from the cache")
+
+
+def _events():
+    return [
+        {
+            "source_id": "siem-A",
+            "event_id": f"evt-{i}",
+            "source_timestamp": "2026-02-06T10:00:00Z",
+            "raw_payload": {"message": f"login ok user{i}", "command_line": "whoami"},
+        }
+        for i in range(4)
+    ]
+
+
+@pytest.mark.parametrize("payload", [{"msg": "ok", "n": 1}, {"msg": "Größe"}, ["a", 1], "plain text", 7])
+def test_payload_hashes_match_the_individual_hashes(payload):
+    raw_payload_hash, content_hash = payload_hashes(payload)
+    assert raw_payload_hash == hash_payload(payload)
+    assert content_hash in (None, _content_hash(payload))
+    if isinstance(payload, dict) and payload.get("msg") == "ok":
+        assert content_hash == _content_hash(payload)
+
+
+def test_stage1_features_are_reused_by_the_kernel_gate(tmp_path):
+    cache = FeatureCache()
+    events = _events()
+    result = classify_batch(events, ledger=Ledger(str(tmp_path / "ledger.jsonl")), feature_cache=cache)
+    assert len(cache) == 4
+
+    for event, decision in zip(events, result["per_event"]):
+        payload = event["raw_payload"]
+        assert cache.get(payload, "entropy", _fail) == _compute_entropy(payload)
+        assert round(_compute_entropy(payload), 4) == decision["entropy_raw"]
+        assert cache.get(payload, "content_hash", _fail) == _content_hash(payload)
+    assert cache.stats() == {"entries": 4, "hits": 8, "misses": 0}
+
+
+def test_equal_payloads_share_one_entry():
+    cache = FeatureCache()
+    first = {"message": "same"}
+    assert cache.get(first, "entropy", lambda: _compute_entropy(first)) == _compute_entropy(first)
+    assert cache.get(dict(first), "entropy", _fail) == _compute_entropy(first)
+    assert cache.stats()["hits"] == 1
+
+
+def test_caller_supplied_hashes_are_not_cached(tmp_path):
+    events = _events()[:1]
+    events[0]["raw_payload_hash"] = "sha256:client-value"
+    cache = FeatureCache()
+    classify_batch(events, ledger=Ledger(str(tmp_path / "ledger.jsonl")), feature_cache=cache)
+    assert len(cache) == 0
+
+
+def test_dedup_hash_is_memoized_per_payload():
+    cache = FeatureCache()
+    payload = {"Image": "cmd.exe"}
+    event = {"eventId": "e1", "data": payload}
+    expected = compute_event_hash(event)
+    assert compute_event_hash(event, feature_cache=cache) == expected
+    assert compute_event_hash({"eventId": "e2", "data": payload}, feature_cache=cache) == expected
+    assert cache.stats()["hits"] == 1
+    # Extra fields take part in the hash, so those events bypass the cache.
+    assert compute_event_hash({"eventId": "e3", "data": payload, "host": "h"}, feature_cache=cache) != expected
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pydantic
+import pytest
+
+import src.models as models
+from src.models import GraphReadyAlert
+
+
+def test_normalized_data_wins_over_raw_event():
+    alert = GraphReadyAlert.from_raw_data(
+        {
+            "eventId": 7,
+            "data": {"hostname": "ws1", "process_image": " ", "alarm_source_ips": ["10.0.0.1"]},
+            "raw_payload": {"Hostname": "ignored", "Image": "C:\\Windows\\cmd.exe", "Hashes": "MD5=aa,SHA256=bb"},
+        }
+    )
+    assert alert.event_id == "7"
+    assert alert.hostname == "ws1"
+    assert alert.process_image == "C:\\Windows\\cmd.exe"  # blank data value falls through
+    assert alert.file_name == "cmd.exe"
+    assert alert.file_hash_sha256 == "bb"
+    assert alert.source_ip == "10.0.0.1"
+
+
+def test_payload_falls_back_to_data_without_raw_event():
+    alert = GraphReadyAlert.from_raw_data({"event_id": "e1", "data": {"Image": "/usr/bin/curl", "src_ip": "10.1.1.1"}})
+    assert alert.process_image == "/usr/bin/curl"
+    assert alert.file_path == "/usr/bin/curl"
+    assert alert.source_ip == "10.1.1.1"
+
+
+def test_missing_event_id_gets_deterministic_fallback():
+    first = GraphReadyAlert.from_raw_data({"data": {"user": "bob"}})
+    second = GraphReadyAlert.from_raw_data({"data": {"user": "bob"}})
+    assert first.event_id.startswith("auto-")
+    assert first == second
+
+
+def test_non_string_values_are_still_validated():
+    with pytest.raises(pydantic.ValidationError):
+        GraphReadyAlert.from_raw_data({"eventId": "e1", "raw_payload": {"Hostname": 42}})
+
+
+def test_plans_are_compiled_once_per_key_layout(monkeypatch):
+    monkeypatch.setattr(models, "_plan_cache", {})
+    compiled = []
+    compile_plan = models._compile_plan
+    monkeypatch.setattr(models, "_compile_plan", lambda *keys: compiled.append(keys) or compile_plan(*keys))
+
+    for idx in range(5):
+        GraphReadyAlert.from_raw_data({"eventId": f"a{idx}", "data": {"hostname": f"h{idx}"}})
+        GraphReadyAlert.from_raw_data({"eventId": f"b{idx}", "raw_event": {"Hostname": f"h{idx}", "User": "u"}})
+    assert compiled == [(("hostname",), ()), ((), ("Hostname", "User"))]
+
+    plan = dict(models._plan_cache[((), ("Hostname", "User"))])
+    assert plan["hostname"] == ((models._RAW, "Hostname", None),)
+    assert plan["command_line"] == ()
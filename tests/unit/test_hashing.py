@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import datetime
+import enum
+import hashlib
+import json
+import uuid
+
+import pytest
+
+from src.ingest.dedup import compute_event_hash
+from src.kernel import hashing
+from src.kernel.hashing import canonical_bytes, canonical_digests, canonical_json, hash_payload
+from src.kernel.kernel_gate import _content_hash
+from src.kernel.ledger import Ledger, compute_entry_hash
+
+# sha256 of json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+GOLDEN = {
+    "event": (
+        {"source_id": "fw-01", "event_id": "e1", "raw_payload": {"message": "Accepted password for root", "port": 22, "ok": True, "tags": None}},
+        "ed938de00ed30d5c782b9f4c585d86411c0afdc9c7ee3ab76a246ab884a8bf87",
+    ),
+    "unicode": (
+        {"user": "Jürgen", "emoji": "\U0001F512", "ctl": "a\tb\x1f\x7f", "quote": "\"\\/", "ls": " "},
+        "48c6d0ea884850a792472747f291f59ac35a333f305675006de1f7c94a60e820",
+    ),
+    "floats": (
+        {"entropy": 3.4567, "tiny": 1e-05, "huge": 1e16, "neg": -0.0, "nan": float("nan"), "inf": float("inf")},
+        "269afa4f0bcb4f4e8311dd520dcee018e7948d94ceb49c1004c775be8d95ed84",
+    ),
+    "ints": (
+        {"big": 2**70, "neg": -(2**63), "zero": 0},
+        "1fe07676fb62190682d775ac7629c90b9f2258304424b7f70403130b6a4a3d79",
+    ),
+    "key_order": (
+        {"b": 1, "a": {"z": [3, 2, 1], "é": 1, "E": 2, "\U0001F512": 3, "": 4}},
+        "70aa0565d778ba9d3b7496d84498ee66b0bb87c39464e3633e79f3c77173e854",
+    ),
+    "empty": (
+        {"d": {}, "l": [], "s": ""},
+        "7258cfb0cf2f129792d914aa59202e3abf72f6b50f75836247810a386efe3bff",
+    ),
+}
+
+
+@pytest.fixture(params=["native", "json"])
+def backend(request, monkeypatch):
+    if request.param == "native":
+        if hashing.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(hashing, "orjson", None)
+    return request.param
+
+
+@pytest.mark.parametrize("name", sorted(GOLDEN))
+def test_canonical_json_golden_vectors(backend, name):
+    value, expected = GOLDEN[name]
+    assert hashlib.sha256(canonical_bytes(value)).hexdigest() == expected
+    assert canonical_json(value).encode("utf-8") == canonical_bytes(value)
+
+
+@pytest.mark.parametrize("name", sorted(GOLDEN))
+@pytest.mark.parametrize("ensure_ascii", [False, True])
+@pytest.mark.parametrize("separators", [hashing.COMPACT_SEPARATORS, hashing.DEFAULT_SEPARATORS])
+def test_canonical_bytes_matches_stdlib(backend, name, ensure_ascii, separators):
+    value = GOLDEN[name][0]
+    expected = json.dumps(value, sort_keys=True, separators=separators, ensure_ascii=ensure_ascii)
+    assert canonical_bytes(value, ensure_ascii=ensure_ascii, separators=separators) == expected.encode("utf-8")
+
+
+def test_legacy_hash_settings_are_preserved(backend):
+    event = {"eventId": "x1", "timestamp": "2026-01-01T00:00:00Z", "data": {"msg": "Größe", "n": 1.5e-7}}
+    assert compute_event_hash(event) == "70683c021435eec7f9a2ad4bd1e9da25060f6f5c5919ad1cd80ede9746deea13"
+    assert (
+        _content_hash({"msg": "Größe", "when": datetime.datetime(2026, 1, 1)})
+        == "49de1a9cba9b11eb470b8b638edf28e99263817c134ae714394bd89965ed0182"
+    )
+    assert hash_payload({"message": "test"}) == "sha256:4144005e3e781532fa967b3a15d3ccf5881c1da5ff6be0dc0db4a399631d187a"
+    with pytest.raises(TypeError):
+        canonical_bytes({"when": datetime.datetime(2026, 1, 1)})
+
+
+class _Color(enum.Enum):
+    RED = "red"
+
+
+class _Level(str, enum.Enum):
+    HIGH = "high"
+
+
+NON_PLAIN = {
+    "enum": _Color.RED,
+    "str_enum": _Level.HIGH,
+    "uuid": uuid.UUID(int=1),
+    "when": datetime.datetime(2026, 1, 1, 12, 30),
+    "nested": [{"color": _Color.RED}],
+}
+
+
+def test_non_plain_types_with_default_str_match_stdlib(backend):
+    assert canonical_bytes(NON_PLAIN, default=str) == (
+        b'{"enum":"_Color.RED","nested":[{"color":"_Color.RED"}],"str_enum":"high",'
+        b'"uuid":"00000000-0000-0000-0000-000000000001","when":"2026-01-01 12:30:00"}'
+    )
+    assert compute_event_hash({"eventId": "e1", "color": _Color.RED}) == compute_event_hash(
+        {"eventId": "e1", "color": "_Color.RED"}
+    )
+
+
+@pytest.mark.parametrize("value", [_Color.RED, uuid.UUID(int=1), datetime.date(2026, 1, 1)])
+def test_non_plain_types_without_default_raise_like_stdlib(backend, value):
+    with pytest.raises(TypeError):
+        canonical_bytes({"value": [value]})
+
+
+def test_canonical_digests_share_one_serialization():
+    data, digests = canonical_digests({"b": 1, "a": "x"}, algorithms=("sha256", "blake2b"))
+    assert data == b'{"a":"x","b":1}'
+    assert digests == {"sha256": hashlib.sha256(data).hexdigest(), "blake2b": hashlib.blake2b(data).hexdigest()}
+
+
+def test_ledger_line_is_the_hashed_serialization(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    entry = Ledger(str(path)).append("BAND_DECISION", {"event_id": "é", "score": 1e-9})
+    stored = json.loads(path.read_text(encoding="utf-8"))
+    assert stored == entry
+    assert compute_entry_hash(stored) == entry["entry_hash"]
+
+
+def _orjson_only():
+    if hashing.orjson is None:
+        pytest.skip("orjson not installed")
+
+
+def test_orjson_fast_path_matches_stdlib_on_random_payloads():
+    _orjson_only()
+    import random
+
+    rng = random.Random(12)
+    specials = [None, float("nan"), float("inf"), -0.0, 1e16, 9e-05, 0.0001, 5e-324, 2**63 - 1, "null", "4144005e3e78"]
+    for _ in range(2000):
+        value = {
+            "raw_payload_hash": f"sha256:{rng.getrandbits(256):064x}",
+            "message": rng.choice(["null pointer", "ok", "0.00001 s", "Größe"]),
+            "score": rng.uniform(1, 10) * 10 ** rng.randint(-8, 20) * rng.choice([1, -1]),
+            "items": [rng.choice(specials) for _ in range(rng.randint(0, 4))],
+            "nested": {"tags": None, "n": rng.randint(-(2**40), 2**40)},
+        }
+        expected = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        assert canonical_bytes(value) == expected
+
+
+def test_orjson_fast_path_keeps_none_values(monkeypatch):
+    _orjson_only()
+    payload = {"event_id": "e1", "tags": None, "message": "null byte", "hash": "ab5e3f", "ratio": 0.25}
+    expected = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def _no_stdlib(*args, **kwargs):
+        raise AssertionError("payload without divergent floats fell back to json.dumps")
+
+    monkeypatch.setattr(hashing.json, "dumps", _no_stdlib)
+    assert canonical_bytes(payload) == expected
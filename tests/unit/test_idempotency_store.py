@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from src.api.idempotency import (
+    CONFLICT,
+    HIT,
+    IN_PROGRESS,
+    MISS,
+    SQLITE_PURGE_EVERY,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+    SQLiteIdempotencyStore,
+    open_idempotency_store,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+RESPONSE = {"batch_id": "b1", "admitted": [{"event_id": "e1", "evidence_id": "x"}], "dropped": []}
+
+
+def _stores(tmp_path, clock, **kwargs):
+    return [
+        MemoryIdempotencyStore(clock=clock, **kwargs),
+        SQLiteIdempotencyStore(str(tmp_path / "idem.sqlite"), clock=clock, **kwargs),
+    ]
+
+
+def test_hit_miss_and_conflict_are_counted(tmp_path):
+    for store in _stores(tmp_path, FakeClock()):
+        assert store.lookup("k1", "h1") == (MISS, None)
+        assert store.put("k1", "h1", RESPONSE) is True
+        assert store.lookup("k1", "h1") == (HIT, RESPONSE)
+        assert store.lookup("k1", "h2") == (CONFLICT, None)
+        stats = store.stats()
+        assert (stats["hits"], stats["misses"], stats["conflicts"], stats["entries"]) == (1, 1, 1, 1)
+        store.close()
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    clock = FakeClock()
+    for store in _stores(tmp_path, clock, ttl_seconds=60):
+        store.put("k1", "h1", RESPONSE)
+        clock.now += 30
+        assert store.lookup("k1", "h1")[0] == HIT
+        clock.now += 31
+        assert store.lookup("k1", "h1")[0] == MISS
+        assert store.put("k1", "h2", RESPONSE) is True  # expired keys can be reused
+        assert store.lookup("k1", "h2")[0] == HIT
+        store.close()
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryIdempotencyStore(max_entries=2)
+    store.put("a", "h", RESPONSE)
+    store.put("b", "h", RESPONSE)
+    store.lookup("a", "h")
+    store.put("c", "h", RESPONSE)
+    assert store.lookup("b", "h")[0] == MISS
+    assert store.lookup("a", "h")[0] == HIT
+    assert store.stats()["evictions"] == 1
+
+
+def test_sqlite_store_is_bounded_and_persistent(tmp_path):
+    path = str(tmp_path / "idem.sqlite")
+    clock = FakeClock()
+    store = SQLiteIdempotencyStore(path, max_entries=10, clock=clock)
+    for idx in range(SQLITE_PURGE_EVERY):
+        clock.now += 1
+        store.put(f"k{idx}", "h", RESPONSE)
+    assert len(store) == 10
+    assert store.stats()["evictions"] == SQLITE_PURGE_EVERY - 10
+    store.close()
+
+    reopened = SQLiteIdempotencyStore(path, max_entries=10, clock=clock)
+    assert reopened.lookup(f"k{SQLITE_PURGE_EVERY - 1}", "h") == (HIT, RESPONSE)
+    assert reopened.lookup("k0", "h")[0] == MISS
+    reopened.close()
+
+
+def test_sqlite_first_writer_wins_across_connections(tmp_path):
+    path = str(tmp_path / "idem.sqlite")
+    first = SQLiteIdempotencyStore(path)
+    second = SQLiteIdempotencyStore(path)
+    assert first.put("k1", "h1", {"batch_id": "first"}) is True
+    assert second.put("k1", "h1", {"batch_id": "second"}) is False
+    assert second.lookup("k1", "h1") == (HIT, {"batch_id": "first"})
+    first.close()
+    second.close()
+
+
+def test_claim_reserves_key_until_put_or_release(tmp_path):
+    clock = FakeClock()
+    for store in _stores(tmp_path, clock):
+        assert store.claim("k1", "h1", wait_seconds=0) == (MISS, None)
+        assert store.claim("k1", "h1", wait_seconds=0) == (IN_PROGRESS, None)
+        assert store.claim("k1", "h2", wait_seconds=0) == (CONFLICT, None)
+        assert store.lookup("k1", "h1") == (MISS, None)
+        assert store.put("k1", "h1", RESPONSE) is True
+        assert store.claim("k1", "h1", wait_seconds=0) == (HIT, RESPONSE)
+        store.release("k1")  # stored responses survive release
+        assert store.lookup("k1", "h1") == (HIT, RESPONSE)
+
+        assert store.claim("k2", "h1", wait_seconds=0) == (MISS, None)
+        store.release("k2")
+        assert store.claim("k2", "h1", wait_seconds=0) == (MISS, None)
+        assert store.stats()["in_progress"] == 1
+        store.close()
+
+
+def test_stale_claims_expire_after_lease(tmp_path):
+    clock = FakeClock()
+    for store in _stores(tmp_path, clock, claim_lease_seconds=10):
+        assert store.claim("k1", "h1", wait_seconds=0) == (MISS, None)
+        clock.now += 11
+        assert store.claim("k1", "h1", wait_seconds=0) == (MISS, None)
+        store.close()
+
+
+def test_waiting_claim_returns_the_first_response(tmp_path):
+    for store in _stores(tmp_path, FakeClock()):
+        assert store.claim("k1", "h1", wait_seconds=0)[0] == MISS
+        timer = threading.Timer(0.1, store.put, args=("k1", "h1", RESPONSE))
+        timer.start()
+        assert store.claim("k1", "h1", wait_seconds=5) == (HIT, RESPONSE)
+        timer.join()
+        store.close()
+
+
+def test_sqlite_concurrent_claims_admit_one_owner(tmp_path):
+    path = str(tmp_path / "idem.sqlite")
+    stores = [SQLiteIdempotencyStore(path) for _ in range(4)]
+    barrier = threading.Barrier(len(stores))
+    outcomes = []
+
+    def worker(store):
+        barrier.wait()
+        outcomes.append(store.claim("k1", "h1", wait_seconds=0)[0])
+
+    threads = [threading.Thread(target=worker, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(outcomes) == [IN_PROGRESS] * 3 + [MISS]
+    for store in stores:
+        store.close()
+
+
+def test_open_idempotency_store_validates_backend(tmp_path):
+    assert open_idempotency_store("memory").backend == "memory"
+    assert open_idempotency_store("SQLITE", path=str(tmp_path / "idem.sqlite")).backend == "sqlite"
+    with pytest.raises(ValueError):
+        open_idempotency_store("redis")
+    with pytest.raises(ValueError):
+        open_idempotency_store("sqlite")
+    with pytest.raises(ValueError):
+        MemoryIdempotencyStore(max_entries=0)
+    with pytest.raises(TypeError):
+        IdempotencyStore()
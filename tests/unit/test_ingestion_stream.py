@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+import src.ingestion as ingestion
+from src.ingestion import RawParser
+from src.kernel.hashing import canonical_bytes
+from src.pipeline.graph_pipeline import _iter_alert_chunks, run_graph_pipeline
+
+ROOT = Path(__file__).resolve().parents[2]
+
+MORDOR = [
+    {"EventID": 1, "Image": "C:\\Windows\\cmd.exe", "Hostname": "ws1", "CommandLine": "cmd /c whoami"},
+    {"EventID": 4688, "NewProcessName": "powershell.exe", "Hostname": "ws1", "Hashes": "MD5=aa,SHA256=bb"},
+]
+DYNAMO = {"eventId": "e-3", "data": {"M": {"hostname": {"S": "ws2"}, "count": {"N": "2"}}}}
+
+
+@pytest.fixture(autouse=True)
+def small_reads(monkeypatch):
+    # Force many buffer refills so values straddle read boundaries.
+    monkeypatch.setattr(ingestion, "STREAM_READ_CHARS", 16)
+
+
+def _write(path: Path, text: str) -> str:
+    if path.suffix == ".gz":
+        with gzip.open(path, "wt", encoding="utf-8") as handle:
+            handle.write(text)
+    else:
+        path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "name, text",
+    [
+        ("array.json", json.dumps(MORDOR + [DYNAMO], indent=2)),
+        ("batch.json", json.dumps({"events": MORDOR + [DYNAMO], "meta": {"n": 3}})),
+        ("alerts.jsonl", "\n" + "\n".join(json.dumps(e) for e in MORDOR + [DYNAMO]) + "\n\n"),
+        ("alerts.jsonl.gz", "\n".join(json.dumps(e) for e in MORDOR + [DYNAMO])),
+    ],
+)
+def test_layouts_yield_the_same_alerts(tmp_path, name, text):
+    alerts = list(RawParser().iter_file(_write(tmp_path / name, text)))
+    assert [a["eventId"] for a in alerts] == ["1", "4688", "e-3"]
+    assert alerts[0]["data"]["process_image"] == "C:\\Windows\\cmd.exe"
+    assert alerts[1]["data"]["file_hash_sha256"] == "bb"
+    assert alerts[2]["data"] == {"hostname": "ws2", "count": 2}
+
+
+def test_zstd_input(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "alerts.json.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(json.dumps(MORDOR).encode("utf-8")))
+    assert [a["eventId"] for a in RawParser().iter_file(str(path))] == ["1", "4688"]
+
+
+def test_single_documents(tmp_path):
+    parser = RawParser()
+    alert = {"alert_id": "A-1", "data": {"M": {"user": {"S": "bob"}}}}
+    assert parser.parse_file(_write(tmp_path / "one.json", json.dumps(alert, indent=2))) == [
+        {"alert_id": "A-1", "data": {"user": "bob"}}
+    ]
+    batch = {"source": "demo", "events": MORDOR}
+    assert len(parser.parse_file(_write(tmp_path / "batch.json", json.dumps(batch)))) == 2
+    assert parser.parse_file(_write(tmp_path / "nums.json", "[1, 23456789012345]")) == [1, 23456789012345]
+
+
+def test_jsonl_errors_are_lazy_and_carry_line_numbers(tmp_path):
+    path = _write(tmp_path / "bad.jsonl", "\n".join([json.dumps(MORDOR[0]), json.dumps(MORDOR[1]), '{"EventID": ']))
+    alerts = RawParser().iter_file(path)
+    assert next(alerts)["eventId"] == "1"
+    assert next(alerts)["eventId"] == "4688"
+    with pytest.raises(ValueError, match="line 3"):
+        next(alerts)
+
+
+def test_samples_round_trip():
+    for sample in sorted((ROOT / "samples").glob("*.json")):
+        raw = json.loads(sample.read_text(encoding="utf-8"))
+        alerts = RawParser().parse_file(str(sample))
+        assert alerts, sample.name
+        if isinstance(raw, list):
+            assert len(alerts) == len(raw)
+
+
+def test_alert_chunks():
+    assert [len(c) for c in _iter_alert_chunks(iter(range(7)), 3)] == [3, 3, 1]
+    assert list(_iter_alert_chunks(iter(range(3)), 0)) == [[0, 1, 2]]
+
+
+def test_streamed_dataset_hash_matches_whole_list_encoding():
+    # run_graph_pipeline hashes "[" + ",".join(alerts) + "]" incrementally.
+    alerts = MORDOR + [DYNAMO, {"msg": "Größe"}]
+    streamed = b"[" + b",".join(canonical_bytes(a, ensure_ascii=True, default=str) for a in alerts) + b"]"
+    assert streamed == canonical_bytes(alerts, ensure_ascii=True, default=str)
+
+
+def test_pipeline_accepts_streamed_alerts(tmp_path):
+    sample = str(ROOT / "samples" / "triage_100_expected.json")
+    counts = []
+    for name, alerts in (("list", RawParser().parse_file(sample)), ("stream", RawParser().iter_file(sample))):
+        out = tmp_path / name
+        run_graph_pipeline(alerts, output_dir=str(out), enable_kernel=False, triage_only=True)
+        counts.append(json.loads((out / "triage_summary.json").read_text(encoding="utf-8")))
+    assert counts[0] == counts[1]
+    assert counts[0]["total_ingested"] == 100
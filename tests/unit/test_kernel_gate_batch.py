@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import sys
+import threading
+import types
+from dataclasses import dataclass
+
+import pytest
+
+from src.kernel.kernel_gate import KernelGate, close_ledger_writers
+
+
+@dataclass
+class FakeDecision:
+    action_id: str
+    reason_code: str
+
+
+class FakeRegistry:
+    loads = 0
+
+    def __init__(self, commit):
+        self._commit = commit
+
+    @classmethod
+    def load(cls, path):
+        cls.loads += 1
+        return cls(f"commit-{cls.loads}")
+
+    def registry_commit(self):
+        return self._commit
+
+
+class FakeEvidenceLedger:
+    instances = []
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        FakeEvidenceLedger.instances.append(self)
+
+    def append(self, evidence):
+        self.records.append(evidence)
+
+
+@pytest.fixture
+def fake_sdk(tmp_path, monkeypatch):
+    (tmp_path / "kernel" / "registry").mkdir(parents=True)
+    monkeypatch.setenv("AXODEN_KERNEL_PATH", str(tmp_path / "kernel"))
+    calls = []
+
+    def decide(arv, vsr, registry, profile_id, strict=False):
+        calls.append((arv, vsr, registry.registry_commit()))
+        return FakeDecision("ADMIT", f"OK:{registry.registry_commit()}")
+
+    sdk = types.ModuleType("sdk")
+    sdk.ARVInput = lambda **kwargs: tuple(sorted(kwargs.items()))
+    sdk.EvidenceLedger = FakeEvidenceLedger
+    sdk.Registry = FakeRegistry
+    sdk.decide = decide
+    monkeypatch.setitem(sys.modules, "sdk", sdk)
+    FakeEvidenceLedger.instances = []
+    yield calls
+    close_ledger_writers()
+
+
+def _alerts(count):
+    return [
+        {"source_id": "siem-A", "event_id": f"evt-{i}", "raw_payload": {"message": f"login {i}"}}
+        for i in range(count)
+    ]
+
+
+def test_evaluate_batch_decides_once_and_matches_single(fake_sdk, tmp_path):
+    gate = KernelGate(ledger_path=str(tmp_path / "kernel_ledger.jsonl"))
+    batch = gate.evaluate_batch(_alerts(5))
+    single = [gate.evaluate(alert) for alert in _alerts(5)]
+    assert len(fake_sdk) == 1
+    assert [(r.action_id, r.reason_code, r.graph_raw) for r in batch] == [
+        (r.action_id, r.reason_code, r.graph_raw) for r in single
+    ]
+    assert [r.ingest_evidence["inputs"] for r in batch] == [r.ingest_evidence["inputs"] for r in single]
+
+
+def test_reloaded_gate_resets_decision_memo_and_shares_ledger(fake_sdk, tmp_path):
+    gate = KernelGate(ledger_path=str(tmp_path / "kernel_ledger.jsonl"))
+    gate.evaluate_batch(_alerts(2))
+    fresh = gate.reloaded()
+    result = fresh.evaluate(_alerts(1)[0])
+    assert len(fake_sdk) == 2
+    assert fake_sdk[1][2] == fresh.registry_commit != gate.registry_commit
+    assert result.reason_code == f"OK:{fresh.registry_commit}"
+    assert fresh.ledger is gate.ledger
+    gate.evaluate(_alerts(1)[0])
+    assert len(fake_sdk) == 2
+
+
+def test_append_ledger_batch_keeps_concurrent_batches_contiguous(fake_sdk, tmp_path):
+    gate = KernelGate(ledger_path=str(tmp_path / "kernel_ledger.jsonl"))
+
+    def worker(tag):
+        results = gate.evaluate_batch([dict(alert, source_id=tag) for alert in _alerts(20)])
+        gate.append_ledger_batch(results)
+
+    threads = [threading.Thread(target=worker, args=(f"siem-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    records = gate.ledger.records
+    assert len(records) == 4 * 2 * 20
+    for start in range(0, len(records), 40):
+        run = records[start : start + 40]
+        assert len({r["source"]["sensor"] for r in run}) == 1
+        assert [r["kind"] for r in run] == ["ingest_event", "decision"] * 20
+
+
+def test_async_ledger_writes_batches_through_shared_writer(fake_sdk, tmp_path):
+    path = str(tmp_path / "kernel_ledger.jsonl")
+    first = KernelGate(ledger_path=path, async_ledger=True)
+    second = KernelGate(ledger_path=path, async_ledger=True)
+    assert first.ledger_writer is second.ledger_writer
+    first.append_ledger_batch(first.evaluate_batch(_alerts(3)))
+    second.append_ledger(second.evaluate(_alerts(1)[0]))
+    first.flush_ledger(timeout=5)
+    (ledger,) = FakeEvidenceLedger.instances
+    assert [r["kind"] for r in ledger.records] == ["ingest_event", "decision"] * 4
+
+
+class ChainedFakeLedger:
+    """Reads the chain head when opened and appends records linked to it, like the SDK ledger."""
+
+    files = {}
+
+    def __init__(self, path):
+        self.records = ChainedFakeLedger.files.setdefault(str(path), [])
+        self.head = self.records[-1]["hash"] if self.records else ""
+
+    def append(self, evidence):
+        record = {"prev": self.head, "hash": f"h{len(self.records)}-{self.head}", "evidence": evidence}
+        self.records.append(record)
+        self.head = record["hash"]
+
+
+def test_profiles_sharing_a_ledger_keep_one_chain(fake_sdk, tmp_path, monkeypatch):
+    monkeypatch.setattr(sys.modules["sdk"], "EvidenceLedger", ChainedFakeLedger)
+    ChainedFakeLedger.files = {}
+    path = str(tmp_path / "kernel_ledger.jsonl")
+    gates = [KernelGate(profile_id=profile_id, ledger_path=path) for profile_id in ("profile-a", "profile-b")]
+    assert gates[0].ledger is gates[1].ledger
+
+    def worker(gate):
+        for _ in range(10):
+            gate.append_ledger_batch(gate.evaluate_batch(_alerts(3)))
+
+    threads = [threading.Thread(target=worker, args=(gate,)) for gate in gates]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    (records,) = ChainedFakeLedger.files.values()
+    assert len(records) == 2 * 10 * 3 * 2
+    assert [r["prev"] for r in records] == [""] + [r["hash"] for r in records[:-1]]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import threading
+
+from src.kernel.kernel_gate import KernelGatePool
+
+
+class FakeGate:
+    def __init__(self, profile_id, ledger_path, async_ledger, ledger_queue_size, generation=0):
+        self.profile_id = profile_id
+        self.ledger_path = ledger_path
+        self.generation = generation
+
+    def reloaded(self):
+        return FakeGate(self.profile_id, self.ledger_path, False, 0, self.generation + 1)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _pool(tmp_path, **kwargs):
+    registry = tmp_path / "registry"
+    registry.mkdir(exist_ok=True)
+    (registry / "profiles.yaml").write_text("v1", encoding="utf-8")
+    clock = FakeClock()
+    pool = KernelGatePool(gate_factory=FakeGate, registry_dir=registry, clock=clock, **kwargs)
+    return pool, registry, clock
+
+
+def test_gates_are_reused_per_profile_and_ledger(tmp_path):
+    pool, _, _ = _pool(tmp_path)
+    ledger = str(tmp_path / "kernel_ledger.jsonl")
+    first = pool.get("profile-a", ledger)
+    assert pool.get("profile-a", ledger) is first
+    assert pool.get("profile-b", ledger) is not first
+    assert pool.get("profile-a", str(tmp_path / "other.jsonl")) is not first
+    assert pool.stats() == {"gates": 3, "created": 3, "reloads": 0}
+
+
+def test_registry_changes_swap_in_a_reloaded_gate(tmp_path):
+    pool, registry, clock = _pool(tmp_path, check_interval=5)
+    ledger = str(tmp_path / "kernel_ledger.jsonl")
+    first = pool.get("profile-a", ledger)
+
+    (registry / "profiles.yaml").write_text("v2 with more bytes", encoding="utf-8")
+    assert pool.get("profile-a", ledger) is first  # not re-checked before the interval
+    clock.now = 5
+    second = pool.get("profile-a", ledger)
+    assert second.generation == 1
+    clock.now = 10
+    assert pool.get("profile-a", ledger) is second  # unchanged registry keeps the gate
+
+    stat = os.stat(registry / "profiles.yaml")
+    os.utime(registry / "profiles.yaml", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    clock.now = 15
+    assert pool.get("profile-a", ledger).generation == 2
+    assert pool.stats()["reloads"] == 2
+
+
+def test_least_recently_used_gates_are_evicted(tmp_path):
+    pool, _, _ = _pool(tmp_path, max_gates=2)
+    ledger = str(tmp_path / "kernel_ledger.jsonl")
+    a = pool.get("a", ledger)
+    pool.get("b", ledger)
+    pool.get("a", ledger)
+    pool.get("c", ledger)
+    assert pool.get("a", ledger) is a
+    assert pool.stats() == {"gates": 2, "created": 3, "reloads": 0}
+    pool.get("b", ledger)  # evicted, so rebuilt
+    assert pool.stats()["created"] == 4
+
+
+def test_concurrent_gets_build_one_gate(tmp_path):
+    pool, _, _ = _pool(tmp_path)
+    ledger = str(tmp_path / "kernel_ledger.jsonl")
+    gates = []
+
+    def worker():
+        for _ in range(50):
+            gates.append(pool.get("profile-a", ledger))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(g) for g in gates}) == 1
+    assert pool.stats()["created"] == 1
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.kernel.ledger import Ledger
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_group_commit_buffers_until_commit(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(str(path), group_commit=True, max_group_entries=100, max_group_delay_s=60)
+    first = ledger.append("BATCH_RECEIVED", {"batch_id": "b1"})
+    second = ledger.append("BATCH_COMPLETED", {"batch_id": "b1"})
+    assert second["prev_hash"] == first["entry_hash"]
+    assert not path.exists() or path.read_text(encoding="utf-8") == ""
+
+    ledger.commit()
+    assert [e["entry_hash"] for e in _lines(path)] == [first["entry_hash"], second["entry_hash"]]
+    ledger.close()
+
+
+def test_group_commit_flushes_on_size_threshold(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), group_commit=True, durability="fsync", max_group_entries=2, max_group_delay_s=60) as ledger:
+        ledger.append("A", {})
+        ledger.append("B", {})
+        assert len(_lines(path)) == 2
+        ledger.append("C", {})
+    assert [e["type"] for e in _lines(path)] == ["A", "B", "C"]
+
+
+def test_group_commit_flushes_idle_tail_after_max_delay(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), group_commit=True, max_group_entries=100, max_group_delay_s=0.05) as ledger:
+        ledger.append("A", {})
+        ledger.append("B", {})
+        deadline = time.monotonic() + 5
+        while not (path.exists() and len(_lines(path)) == 2) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [e["type"] for e in _lines(path)] == ["A", "B"]
+        ledger.append("C", {})
+    assert [e["type"] for e in _lines(path)] == ["A", "B", "C"]
+
+
+def test_reload_chains_from_group_committed_file(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), group_commit=True) as ledger:
+        last = ledger.append("A", {})
+    assert Ledger(str(path)).last_hash == last["entry_hash"]
+
+
+def test_torn_final_line_is_truncated_on_load(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(str(path))
+    good = ledger.append("A", {"x": 1})
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"entry_id": "torn", "payl')
+
+    recovered = Ledger(str(path))
+    assert recovered.last_hash == good["entry_hash"]
+    assert path.read_text(encoding="utf-8").endswith("\n")
+    assert len(_lines(path)) == 1
+    nxt = recovered.append("B", {})
+    assert nxt["prev_hash"] == good["entry_hash"]
+
+
+def test_corrupt_middle_line_still_raises(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(str(path))
+    ledger.append("A", {})
+    with path.open("a", encoding="utf-8") as f:
+        f.write("not-json\n")
+    ledger.append("B", {})
+    with pytest.raises(ValueError):
+        Ledger(str(path))
+
+
+def test_unknown_durability_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Ledger(str(tmp_path / "ledger.jsonl"), durability="sometimes")
+
+
+def _decision(event_id, raw_hash="h"):
+    return {
+        "source_id": "src",
+        "event_id": event_id,
+        "raw_payload_hash": raw_hash,
+        "band": "VACUUM",
+        "decision_code": "OK",
+        "http_status": 200,
+    }
+
+
+def test_index_snapshot_replays_only_tail(tmp_path, monkeypatch):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), index_snapshot=True, snapshot_every=2) as ledger:
+        first = ledger.append("BAND_DECISION", _decision("e1"))
+        ledger.append("BAND_DECISION", _decision("e2"))
+    covered = path.stat().st_size
+    tail = Ledger(str(path)).append("BAND_DECISION", _decision("e3", "h3"))
+
+    replayed_from = []
+    original = Ledger._load_existing
+
+    def _spy(self, start_offset=0):
+        replayed_from.append(start_offset)
+        return original(self, start_offset)
+
+    monkeypatch.setattr(Ledger, "_load_existing", _spy)
+    reopened = Ledger(str(path), index_snapshot=True)
+    assert replayed_from == [covered]
+    assert reopened.last_hash == tail["entry_hash"]
+    assert reopened.lookup_idempotent("src", "e1", "h")["ledger_entry_id"] == first["entry_id"]
+    assert reopened.lookup_event_hash("src", "e3") == "h3"
+    assert reopened.lookup_idempotent("src", "missing", "h") is None
+    reopened.close()
+
+
+def test_index_snapshot_keeps_memory_index_hot(tmp_path, monkeypatch):
+    from src.kernel.ledger_snapshot import IndexSnapshot
+
+    path = tmp_path / "ledger.jsonl"
+    calls = []
+    for name in ("lookup_idempotent", "lookup_event_hash"):
+        original = getattr(IndexSnapshot, name)
+        monkeypatch.setattr(
+            IndexSnapshot, name, lambda self, *a, _name=name, _orig=original: calls.append(_name) or _orig(self, *a)
+        )
+
+    with Ledger(str(path), index_snapshot=True, snapshot_every=2) as ledger:
+        for i in range(4):
+            ledger.append("BAND_DECISION", _decision(f"e{i}"))
+        assert ledger.lookup_idempotent("src", "e0", "h") is not None
+        assert ledger.lookup_idempotent("src", "new", "h") is None
+        assert ledger.lookup_event_hash("src", "new") is None
+    assert calls == []
+
+    reopened = Ledger(str(path), index_snapshot=True)
+    assert reopened.lookup_idempotent("src", "new", "h") is None
+    assert reopened.lookup_event_hash("src", "new") is None
+    assert calls == ["lookup_event_hash"]
+    assert reopened.lookup_idempotent("src", "e1", "h") is not None
+    assert reopened.lookup_idempotent("src", "e1", "h") is not None
+    assert calls == ["lookup_event_hash", "lookup_event_hash", "lookup_idempotent"]
+    reopened.close()
+
+
+def test_index_snapshot_discarded_when_chain_does_not_match(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), index_snapshot=True) as ledger:
+        ledger.append("BAND_DECISION", _decision("old"))
+    path.unlink()
+    with Ledger(str(path)) as rewritten:
+        rewritten.append("BAND_DECISION", _decision("new"))
+        rewritten.append("BAND_DECISION", _decision("newer"))
+
+    reopened = Ledger(str(path), index_snapshot=True)
+    assert reopened.lookup_idempotent("src", "old", "h") is None
+    assert reopened.lookup_idempotent("src", "new", "h") is not None
+    reopened.close()
+
+
+def test_index_snapshot_with_group_commit(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), group_commit=True, index_snapshot=True, snapshot_every=3, max_group_entries=2) as ledger:
+        for i in range(5):
+            last = ledger.append("BAND_DECISION", _decision(f"e{i}"))
+    reopened = Ledger(str(path), index_snapshot=True)
+    assert reopened.last_hash == last["entry_hash"]
+    assert all(reopened.lookup_idempotent("src", f"e{i}", "h") for i in range(5))
+    nxt = reopened.append("A", {})
+    assert nxt["prev_hash"] == last["entry_hash"]
+    reopened.close()
+
+
+def test_concurrent_appends_keep_a_single_chain(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(str(path))
+
+    def _append(worker):
+        for i in range(200):
+            ledger.append("BAND_DECISION", {"worker": worker, "i": i})
+
+    threads = [threading.Thread(target=_append, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    entries = _lines(path)
+    assert len(entries) == 1600
+    assert [e["prev_hash"] for e in entries[1:]] == [e["entry_hash"] for e in entries[:-1]]
+    assert ledger.last_hash == entries[-1]["entry_hash"]
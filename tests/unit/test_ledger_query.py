@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from src.kernel.ledger import Ledger
+
+
+def _batch(ledger, batch_id, decisions):
+    ledger.append("BATCH_RECEIVED", {"batch_id": batch_id})
+    entries = [
+        ledger.append(
+            "BAND_DECISION",
+            {"source_id": "siem", "event_id": event_id, "raw_payload_hash": f"h-{event_id}", "band": band},
+        )
+        for event_id, band in decisions
+    ]
+    ledger.append("BATCH_COMPLETED", {"batch_id": batch_id})
+    return entries
+
+
+@pytest.mark.parametrize("group_commit", [False, True])
+def test_query_by_keys_and_read_back(tmp_path, group_commit):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(str(path), group_commit=group_commit, query_index=True)
+    first = _batch(ledger, "b1", [("e1", "VACUUM"), ("e2", "LOW_ENTROPY")])
+    _batch(ledger, "b2", [("e3", "LOW_ENTROPY")])
+
+    by_event = ledger.query(source_id="siem", event_id="e2")
+    assert [row["entry_id"] for row in by_event] == [first[1]["entry_id"]]
+    assert ledger.read_entry(by_event[0]) == first[1]
+
+    assert [row["event_id"] for row in ledger.query(band="LOW_ENTROPY")] == ["e2", "e3"]
+    assert {row["type"] for row in ledger.query(batch_id="b1")} == {"BATCH_RECEIVED", "BAND_DECISION", "BATCH_COMPLETED"}
+    assert len(ledger.query(batch_id="b1", entry_type="BAND_DECISION")) == 2
+    assert ledger.query(since="9999") == []
+    with pytest.raises(ValueError):
+        ledger.query(color="red")
+    ledger.close()
+
+
+def test_query_index_survives_restart_and_sealing(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), query_index=True, segment_max_entries=4, segment_compression="gzip") as ledger:
+        entries = _batch(ledger, "b1", [("e1", "VACUUM"), ("e2", "VACUUM"), ("e3", "MIMIC_SCOPED")])
+
+    reopened = Ledger(str(path), query_index=True, segment_max_entries=4)
+    rows = reopened.query(entry_type="BAND_DECISION")
+    assert [row["segment"] for row in rows] == [1, 1, 1]
+    assert [reopened.read_entry(row) for row in rows] == entries
+    assert reopened.query(event_id="e3")[0]["batch_id"] == "b1"
+    reopened.close()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.kernel.ledger import Ledger
+from src.kernel.segments import SegmentManifest, merkle_root, segment_dir_for
+
+
+def _decision(event_id):
+    return {"source_id": "src", "event_id": event_id, "raw_payload_hash": "h", "band": "VACUUM"}
+
+
+def _fill(path, count, **kwargs):
+    with Ledger(str(path), segment_max_entries=3, **kwargs) as ledger:
+        entries = [ledger.append("BAND_DECISION", _decision(f"e{i}")) for i in range(count)]
+    return entries
+
+
+def test_merkle_root_is_order_sensitive():
+    hashes = ["00" * 32, "11" * 32, "22" * 32]
+    assert merkle_root(hashes) != merkle_root(list(reversed(hashes)))
+    assert merkle_root(hashes[:1]) != hashes[0]
+
+
+def test_segments_rotate_and_chain(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    entries = _fill(path, 7)
+    manifest = SegmentManifest(segment_dir_for(path))
+    assert [s["entries"] for s in manifest.segments] == [3, 3]
+    assert manifest.segments[1]["prev_root"] == manifest.segments[0]["root"]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 1
+
+    reopened = Ledger(str(path), segment_max_entries=3)
+    assert reopened.last_hash == entries[-1]["entry_hash"]
+    assert reopened.lookup_idempotent("src", "e0", "h") is not None
+    for mode in ("roots", "full"):
+        report = reopened.verify(mode)
+        assert report["ok"], report
+        assert (report["sealed_entries"], report["tail_entries"]) == (6, 1)
+
+
+def test_compressed_segments_still_verify(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    _fill(path, 6, segment_compression="gzip")
+    ledger = Ledger(str(path), segment_max_entries=3, index_snapshot=True)
+    zstd = pytest.importorskip("zstandard") and "zstd"
+    assert ledger.compress_segments(zstd) == 2
+    assert all(s["file"].endswith(".zst") for s in SegmentManifest(segment_dir_for(path)).segments)
+    assert ledger.verify("full")["ok"]
+    ledger.close()
+
+
+def test_roots_mode_catches_tampered_manifest_and_full_mode_catches_contents(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    _fill(path, 6)
+    segment_dir = segment_dir_for(path)
+    segment = segment_dir / "segment-000001.jsonl"
+    lines = segment.read_text(encoding="utf-8").splitlines()
+    entry = json.loads(lines[1])
+    entry["payload"]["band"] = "LOW_ENTROPY"
+    lines[1] = json.dumps(entry)
+    segment.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    ledger = Ledger(str(path), segment_max_entries=3)
+    assert ledger.verify("roots")["ok"]
+    report = ledger.verify("full")
+    assert not report["ok"] and report["segment"] == 1 and report["entry"] == 2
+
+    manifest_path = segment_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest["segments"][0]["merkle_root"] = "00" * 32
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    assert not ledger.verify("roots")["ok"]
+
+
+def test_snapshot_covers_sealed_segments(tmp_path, monkeypatch):
+    path = tmp_path / "ledger.jsonl"
+    entries = _fill(path, 6, index_snapshot=True)
+    monkeypatch.setattr(Ledger, "_replay_segments", lambda self: pytest.fail("sealed segments replayed"))
+    reopened = Ledger(str(path), segment_max_entries=3, index_snapshot=True)
+    assert reopened.lookup_idempotent("src", "e1", "h") is not None
+    assert reopened.append("A", {})["prev_hash"] == entries[-1]["entry_hash"]
+    assert reopened.verify()["ok"]
+    reopened.close()
+
+
+def test_arv_evidence_ledger_segments_verify(tmp_path):
+    from src.pipeline.graph_pipeline import _append_evidence, _seal_evidence_segment, verify_evidence_ledger
+
+    path = tmp_path / "arv_gate_ledger.jsonl"
+    prev = ""
+    for i in range(5):
+        prev = _append_evidence(path, {"evidence_id": "", "kind": "decision", "seq": i}, prev)
+        if i == 2:
+            _seal_evidence_segment(path, "gzip")
+    report = verify_evidence_ledger(path, mode="full")
+    assert report["ok"], report
+    assert (report["segments"], report["sealed_entries"], report["tail_entries"]) == (1, 3, 2)
+
+
+def test_group_commit_splits_groups_at_segment_boundary(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), group_commit=True, segment_max_entries=3, index_snapshot=True) as ledger:
+        for i in range(8):
+            ledger.append("BAND_DECISION", _decision(f"e{i}"))
+    assert [s["entries"] for s in SegmentManifest(segment_dir_for(path)).segments] == [3, 3]
+    reopened = Ledger(str(path), segment_max_entries=3, index_snapshot=True)
+    assert all(reopened.lookup_idempotent("src", f"e{i}", "h") for i in range(8))
+    assert reopened.verify("full")["ok"]
+    reopened.close()
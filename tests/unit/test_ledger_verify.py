@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.kernel.ledger import Ledger
+from src.kernel.ledger_verify import verify_ledger_file
+
+
+def _write_ledger(path, count, **kwargs):
+    with Ledger(str(path), group_commit=True, **kwargs) as ledger:
+        return [ledger.append("BAND_DECISION", {"event_id": f"e{i}", "band": "VACUUM"}) for i in range(count)]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_verify_clean_ledger_across_chunks(tmp_path, workers):
+    path = tmp_path / "ledger.jsonl"
+    entries = _write_ledger(path, 50)
+    report = verify_ledger_file(str(path), workers=workers, chunk_bytes=1024)
+    assert report["ok"], report
+    assert report["entries"] == 50
+    assert report["last_hash"] == entries[-1]["entry_hash"]
+    assert report["verified_offset"] == path.stat().st_size
+
+
+def test_verify_reports_first_broken_offset(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    _write_ledger(path, 20)
+    lines = path.read_bytes().splitlines(keepends=True)
+    tampered = json.loads(lines[7])
+    tampered["payload"]["band"] = "LOW_ENTROPY"
+    lines[7] = (json.dumps(tampered) + "\n").encode("utf-8")
+    path.write_bytes(b"".join(lines))
+
+    report = verify_ledger_file(str(path), chunk_bytes=512)
+    assert not report["ok"]
+    assert report["broken_offset"] == sum(len(line) for line in lines[:7])
+    assert report["entries"] == 7
+
+
+def test_verify_resumes_from_checkpoint(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    checkpoint = tmp_path / "verify.checkpoint.json"
+    _write_ledger(path, 10)
+    first = verify_ledger_file(str(path), checkpoint_path=str(checkpoint))
+    assert first["ok"]
+
+    _write_ledger(path, 5)
+    resumed = verify_ledger_file(str(path), checkpoint_path=str(checkpoint), resume=True)
+    assert resumed["ok"], resumed
+    assert resumed["start_offset"] == first["verified_offset"]
+    assert (resumed["checked"], resumed["entries"]) == (5, 15)
+
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        verify_ledger_file(str(path), checkpoint_path=str(checkpoint), resume=True)
+
+
+def test_verify_segmented_ledger_uses_manifest_head(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    _write_ledger(path, 7, segment_max_entries=3)
+    report = verify_ledger_file(str(path))
+    assert report["ok"], report
+    assert (report["segments"], report["entries"]) == (2, 1)
+
+
+def test_verify_resume_survives_segment_seal(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    checkpoint = tmp_path / "verify.checkpoint.json"
+    _write_ledger(path, 4, segment_max_entries=3)
+    first = verify_ledger_file(str(path), checkpoint_path=str(checkpoint))
+    assert first["ok"] and first["segments"] == 1
+    assert json.loads(checkpoint.read_text(encoding="utf-8"))["segments"] == 1
+
+    entries = _write_ledger(path, 3, segment_max_entries=3)
+    for _ in range(2):
+        resumed = verify_ledger_file(str(path), checkpoint_path=str(checkpoint), resume=True)
+        assert resumed["ok"], resumed
+        assert resumed["segments"] == 2
+        assert resumed["last_hash"] == entries[-1]["entry_hash"]
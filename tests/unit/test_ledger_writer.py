@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from src.kernel.ledger import Ledger
+from src.kernel.ledger_writer import LedgerWriter
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_writer_preserves_order_and_flush_is_a_barrier():
+    written = []
+    writer = LedgerWriter(written.extend, max_queue=4, max_batch=3)
+    for i in range(50):
+        writer.submit(i)
+    writer.flush(timeout=5)
+    assert written == list(range(50))
+    metrics = writer.metrics()
+    assert metrics["submitted"] == metrics["written"] == 50
+    assert metrics["queue_depth"] == 0
+    assert metrics["queue_capacity"] == 4
+    assert metrics["batches"] >= 50 // 3
+    writer.close()
+    assert writer.closed
+
+
+def test_writer_applies_backpressure_when_queue_is_full():
+    started = threading.Event()
+    release = threading.Event()
+    written = []
+
+    def _slow_write(batch):
+        started.set()
+        release.wait(5)
+        written.extend(batch)
+
+    writer = LedgerWriter(_slow_write, max_queue=2, max_batch=1)
+    writer.submit("a")
+    assert started.wait(5)  # the writer thread holds "a" and blocks
+    writer.submit("b")
+    writer.submit("c")
+    with pytest.raises(TimeoutError):
+        writer.submit("d", timeout=0.05)
+    assert writer.metrics()["blocked_submits"] == 1
+    release.set()
+    writer.submit("d", timeout=5)
+    writer.close()
+    assert written == ["a", "b", "c", "d"]
+
+
+def test_writer_failure_is_raised_to_callers():
+    def _broken(batch):
+        raise OSError("disk full")
+
+    writer = LedgerWriter(_broken)
+    writer.submit("a")
+    with pytest.raises(RuntimeError) as excinfo:
+        writer.flush(timeout=5)
+    assert isinstance(excinfo.value.__cause__, OSError)
+    assert writer.metrics()["failed"] is True
+    with pytest.raises(RuntimeError):
+        writer.submit("b")
+
+
+def test_async_ledger_returns_chained_entries_and_writes_them(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(str(path), async_writer=True, writer_queue_size=8, query_index=True)
+    entries = [ledger.append("BAND_DECISION", {"source_id": "src", "event_id": f"e{i}"}) for i in range(20)]
+    assert all(b["prev_hash"] == a["entry_hash"] for a, b in zip(entries, entries[1:]))
+
+    ledger.flush()
+    assert [e["entry_hash"] for e in _lines(path)] == [e["entry_hash"] for e in entries]
+    assert ledger.writer_metrics()["written"] == 20
+    assert ledger.query(event_id="e7")[0]["entry_id"] == entries[7]["entry_id"]
+    ledger.close()
+
+    reopened = Ledger(str(path))
+    assert reopened.last_hash == entries[-1]["entry_hash"]
+    assert reopened.verify()["ok"]
+
+
+def test_async_ledger_seals_segments(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    with Ledger(str(path), async_writer=True, segment_max_entries=4) as ledger:
+        for i in range(10):
+            last = ledger.append("A", {"i": i})
+    reopened = Ledger(str(path), segment_max_entries=4)
+    assert reopened.last_hash == last["entry_hash"]
+    report = reopened.verify(mode="full")
+    assert report["ok"] and report["segments"] == 2 and report["tail_entries"] == 2
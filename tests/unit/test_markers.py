@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import random
+import string
+
+from src.kernel.stage1 import classify_batch
+from src.markers import (
+    DIRECT_SCAN_MAX_MARKERS,
+    STAGE1_SUSPICIOUS_MARKERS,
+    MarkerMatcher,
+    matcher_from_profile,
+)
+
+
+def _naive(markers, text):
+    s = text.lower()
+    return [m for m in markers if m in s]
+
+
+def test_automaton_matches_naive_scan_on_large_marker_set():
+    rng = random.Random(3)
+    markers = list(STAGE1_SUSPICIOUS_MARKERS)
+    markers += ["".join(rng.choice("abc12") for _ in range(rng.randint(2, 6))) for _ in range(500)]
+    matcher = MarkerMatcher(markers)
+    assert len(matcher) > DIRECT_SCAN_MAX_MARKERS
+    for _ in range(300):
+        text = "".join(rng.choice("abc12 " + string.ascii_uppercase[:3]) for _ in range(rng.randint(0, 80)))
+        assert matcher.find_all(text) == _naive(matcher.markers, text)
+        assert matcher.search(text) == bool(_naive(matcher.markers, text))
+
+
+def test_overlapping_and_nested_markers():
+    matcher = MarkerMatcher(["he", "she", "his", "hers"] + [f"ioc-{i}" for i in range(100)])
+    assert matcher.find_all("USHERS") == ["he", "she", "hers"]
+    assert matcher.find_all("") == []
+
+
+def test_profile_markers_extend_defaults(tmp_path):
+    ioc_file = tmp_path / "iocs.txt"
+    ioc_file.write_text("# comment\nbadhost.example\n\nevil-loader\n", encoding="utf-8")
+    matcher = matcher_from_profile(
+        {"parameters": {"suspicious_markers": ["Cobalt"], "suspicious_markers_path": str(ioc_file)}}
+    )
+    assert "mimikatz" in matcher.markers
+    assert matcher.find_all("cobalt beacon via evil-loader") == ["cobalt", "evil-loader"]
+
+
+def test_band_decision_records_matched_markers(temp_ledger):
+    events = [
+        {
+            "source_id": "siem-A",
+            "event_id": "evt-marker-1",
+            "source_timestamp": "2026-02-06T10:00:00Z",
+            "raw_payload": {"command_line": "rundll32.exe comsvcs.dll MiniDump lsass"},
+        }
+    ]
+    result = classify_batch(events, ledger=temp_ledger)
+    event = result["per_event"][0]
+    assert event["suspicious_markers"] == ["lsass", "rundll32"]
+
+
+def test_profile_matcher_cached_until_marker_file_changes(tmp_path, monkeypatch):
+    import os
+
+    from src import markers as markers_mod
+
+    ioc_file = tmp_path / "iocs.txt"
+    ioc_file.write_text("evil-loader\n", encoding="utf-8")
+    profile = {"suspicious_markers_path": str(ioc_file)}
+    reads = []
+    original = markers_mod._read_marker_file
+    monkeypatch.setattr(markers_mod, "_read_marker_file", lambda path: reads.append(path) or original(path))
+    markers_mod.clear_marker_cache()
+
+    first = matcher_from_profile(profile)
+    assert matcher_from_profile(profile) is first
+    assert len(reads) == 1
+
+    ioc_file.write_text("evil-loader\nbadhost.example\n", encoding="utf-8")
+    stat = ioc_file.stat()
+    os.utime(ioc_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = matcher_from_profile(profile)
+    assert second is not first
+    assert "badhost.example" in second.markers
+    assert len(reads) == 2
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+
+import pytest
+
+from src.api.ndjson import GzipStream, LineSplitter, iter_ndjson_lines
+
+
+def _split(chunks, max_line_bytes=1 << 20):
+    splitter = LineSplitter(max_line_bytes)
+    lines = [line for chunk in chunks for line in splitter.feed(chunk)]
+    return lines + splitter.finish()
+
+
+def test_lines_are_numbered_across_chunk_boundaries():
+    assert _split([b'{"a":1}\n{"b"', b":2}\n\n", b'{"c":3}']) == [(1, b'{"a":1}'), (2, b'{"b":2}'), (4, b'{"c":3}')]
+    assert _split([b"x\r\n", b"y\n"]) == [(1, b"x"), (2, b"y")]
+
+
+def test_oversized_lines_are_reported_without_buffering():
+    lines = _split([b"short\n", b"0123456789", b"0123456789\nok\n"], max_line_bytes=8)
+    assert lines == [(1, b"short"), (2, None), (3, b"ok")]
+
+
+def test_gzip_stream_handles_split_and_concatenated_members():
+    body = gzip.compress(b'{"a":1}\n') + gzip.compress(b'{"b":2}\n')
+    inflater = GzipStream()
+    out = b"".join(piece for i in range(0, len(body), 7) for piece in inflater.feed(body[i : i + 7]))
+    inflater.finish()
+    assert out == b'{"a":1}\n{"b":2}\n'
+
+    truncated = GzipStream()
+    list(truncated.feed(body[:10]))
+    with pytest.raises(ValueError):
+        truncated.finish()
+    with pytest.raises(ValueError):
+        list(GzipStream().feed(b"not gzip at all"))
+
+
+def test_gzip_stream_bounds_inflated_output():
+    raw = b'{"msg":"' + b"A" * (8 << 20) + b'"}\n' + b'{"ok":1}\n' * 50_000
+    body = gzip.compress(raw, compresslevel=9) + gzip.compress(b'{"tail":1}\n')
+    assert len(body) < len(raw) // 100
+    inflater = GzipStream(max_output=4096)
+    sizes = []
+    out = bytearray()
+    for start in range(0, len(body), 1 << 16):
+        for piece in inflater.feed(body[start : start + (1 << 16)]):
+            sizes.append(len(piece))
+            out += piece
+    inflater.finish()
+    assert max(sizes) <= 4096
+    assert bytes(out) == raw + b'{"tail":1}\n'
+
+    splitter = LineSplitter(max_line_bytes=1024)
+    lines = [line for piece in GzipStream(max_output=4096).feed(body) for line in splitter.feed(piece)]
+    assert lines[0] == (1, None)
+    assert lines[1] == (2, b'{"ok":1}')
+
+
+def test_iter_ndjson_lines_decodes_gzip_body():
+    async def chunks():
+        body = gzip.compress(b'{"a":1}\n{"b":2}')
+        for i in range(0, len(body), 5):
+            yield body[i : i + 5]
+
+    async def collect():
+        return [line async for line in iter_ndjson_lines(chunks(), "gzip")]
+
+    assert asyncio.run(collect()) == [(1, b'{"a":1}'), (2, b'{"b":2}')]
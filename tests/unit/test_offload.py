@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from src.api.offload import Offloader, RequestLimiter
+
+
+def test_limiter_rejects_when_saturated():
+    limiter = RequestLimiter(max_concurrency=2, retry_after=0)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+    assert limiter.stats() == {
+        "max_concurrency": 2,
+        "in_flight": 2,
+        "max_in_flight": 2,
+        "admitted": 3,
+        "rejected": 1,
+    }
+    assert limiter.retry_after == 1  # Retry-After is whole seconds
+
+    unlimited = RequestLimiter(max_concurrency=0)
+    assert all(unlimited.try_acquire() for _ in range(1000))
+    with pytest.raises(ValueError):
+        RequestLimiter(max_concurrency=-1)
+
+
+def test_offloader_runs_off_the_event_loop_and_times_out():
+    offloader = Offloader(io_threads=2, timeout=0.1)
+    release = threading.Event()
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        assert await offloader.run(threading.get_ident) != loop_thread
+        assert await offloader.run(lambda a, b=0: a + b, 1, b=2) == 3
+        with pytest.raises(asyncio.TimeoutError):
+            await offloader.run(release.wait, 5)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        offloader.shutdown()
+    assert (offloader.stats()["submitted"], offloader.stats()["timed_out"]) == (3, 1)
+    assert offloader.cpu_executor is None
+
+
+def test_offloader_skips_queued_calls_after_timeout():
+    offloader = Offloader(io_threads=1, timeout=0.1)
+    release = threading.Event()
+    ran = []
+    abandoned = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(offloader.run(release.wait, 5))
+        await asyncio.sleep(0)  # let the blocking call take the only thread
+        with pytest.raises(asyncio.TimeoutError):
+            await offloader.run(ran.append, "queued", abandoned=abandoned)
+        with pytest.raises(asyncio.TimeoutError):
+            await blocked
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        offloader.shutdown()
+    assert abandoned.is_set()
+    assert ran == []
+
+
+def test_offloader_process_pool_is_created_once():
+    offloader = Offloader(cpu_workers=1)
+    try:
+        executor = offloader.cpu_executor
+        assert executor is offloader.cpu_executor
+        assert executor.submit(pow, 2, 10).result() == 1024
+    finally:
+        offloader.shutdown()
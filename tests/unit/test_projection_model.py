@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from src.kernel.ledger import Ledger
+from src.kernel.projection_model import (
+    BatchProjectionModel,
+    CountMinProjectionModel,
+    StreamProjectionModel,
+    projection_model_for,
+    projection_snapshot_path,
+    stream_projection_model,
+)
+from src.kernel.stage1 import classify_batch
+
+
+def _events(prefix: str, count: int):
+    return [
+        {
+            "source_id": f"siem-{i % 2}",
+            "event_id": f"{prefix}-{i}",
+            "source_timestamp": "2026-02-06T10:00:00Z",
+            "raw_payload": {"event_id": "4624", "message": "an account was successfully logged on"},
+        }
+        for i in range(count)
+    ]
+
+
+def test_batch_model_matches_per_batch_counts():
+    model = BatchProjectionModel()
+    model.observe(["a", "a", "b"])
+    assert model.total == 3
+    assert model.count("a") == 2
+    assert model.count("missing") == 1
+
+
+def test_count_min_accumulates_and_decays(tmp_path):
+    model = CountMinProjectionModel(width=256, depth=3, decay_interval=8)
+    model.observe(["a"] * 5 + ["b"])
+    assert model.count("a") >= 5
+    assert model.total == 6
+    model.observe(["a", "a"])
+    assert model.total == 4
+    assert model.count("a") >= 3
+
+
+def test_count_min_snapshot_roundtrip(tmp_path):
+    path = tmp_path / "ledger.projections.npz"
+    model = CountMinProjectionModel(width=128, depth=2, snapshot_path=str(path))
+    model.observe(["x"] * 7)
+    model.save()
+    reloaded = CountMinProjectionModel(width=128, depth=2, snapshot_path=str(path))
+    assert reloaded.total == 7
+    assert reloaded.count("x") == 7
+
+
+def test_rolling_model_shared_across_small_batches(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger.jsonl"))
+    profile = {"parameters": {"projection_model": {"kind": "count_min", "width": 1024}}}
+    classify_batch(_events("warm", 50), profile=profile, ledger=ledger)
+    result = classify_batch(_events("small", 1), profile=profile, ledger=ledger)
+
+    event = result["per_event"][0]
+    assert event["projection_count"] >= 51
+    assert result["batch"]["projection_model"] == "count_min"
+    assert result["batch"]["projection_total"] == 51
+    assert projection_snapshot_path(Path(ledger.file_path)).exists()
+
+
+def test_unknown_projection_model_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        projection_model_for({"projection_model": "bogus"}, tmp_path / "ledger.jsonl")
+
+
+def test_count_min_save_is_interval_gated(tmp_path):
+    path = tmp_path / "ledger.projections.npz"
+    model = CountMinProjectionModel(width=128, depth=2, snapshot_path=str(path), save_interval=3600)
+    model.save()
+    assert not path.exists()
+    model.observe(["x"])
+    model.save()
+    first_mtime = path.stat().st_mtime_ns
+    model.observe(["x"])
+    model.save()
+    assert path.stat().st_mtime_ns == first_mtime
+    assert model.dirty
+    model.save(force=True)
+    assert not model.dirty
+    assert CountMinProjectionModel(width=128, depth=2, snapshot_path=str(path)).count("x") == 2
+
+
+def test_count_min_snapshot_merges_concurrent_writers(tmp_path):
+    path = tmp_path / "ledger.projections.npz"
+    first = CountMinProjectionModel(width=128, depth=2, snapshot_path=str(path))
+    second = CountMinProjectionModel(width=128, depth=2, snapshot_path=str(path))
+    first.observe(["x"] * 3)
+    second.observe(["x"] * 4 + ["y"])
+    first.save()
+    second.save()
+    assert second.total == 8
+    assert second.count("x") == 7
+    reloaded = CountMinProjectionModel(width=128, depth=2, snapshot_path=str(path))
+    assert reloaded.total == 8
+    assert reloaded.count("x") == 7
+    assert reloaded.count("y") == 1
+
+
+def test_stream_model_carries_counts_across_micro_batches(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger.jsonl"))
+    model = stream_projection_model(None)
+    assert isinstance(model, StreamProjectionModel)
+    assert stream_projection_model({"projection_model": "count_min"}) is None
+
+    classify_batch(_events("first", 30), ledger=ledger, projection_model=model)
+    result = classify_batch(_events("second", 20), ledger=ledger, projection_model=model)
+    one_shot = classify_batch(_events("all", 50), ledger=Ledger(str(tmp_path / "other.jsonl")))
+
+    assert result["batch"]["projection_model"] == "stream"
+    assert result["batch"]["projection_total"] == 50
+    assert result["per_event"][-1]["projection_count"] == one_shot["per_event"][-1]["projection_count"]
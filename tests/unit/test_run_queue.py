@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+import src.api.run_queue as run_queue_module
+import src.pipeline.graph_pipeline as graph_pipeline
+from src.api.run_queue import (
+    MODE_THREAD,
+    RUN_CANCELLED,
+    RUN_FAILED,
+    RUN_PENDING,
+    RUN_RUNNING,
+    RUN_SUCCEEDED,
+    RunQueue,
+    RunWorkerPool,
+    execute_run,
+    parse_concurrency_limits,
+)
+from src.kernel.evidence_store import EvidenceStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fake_pipeline(raw_events, output_dir, enable_kernel=False, chunk_size=0, progress=None):
+    events = list(raw_events)
+    progress("triage", {"total_ingested": len(events)})
+    return {"reports": [f"{output_dir}/report.md"], "manifests_json": [f"{output_dir}/manifest.json"]}
+
+
+def test_claims_follow_priority_then_submission_order(tmp_path):
+    queue = RunQueue(str(tmp_path / "runs.sqlite"))
+    queue.submit("low", ["e"], "p")
+    queue.submit("high", ["e"], "p", priority=5)
+    queue.submit("low-2", ["e"], "p")
+    assert [queue.claim("w")["run_id"] for _ in range(3)] == ["high", "low", "low-2"]
+    assert queue.claim("w") is None
+    assert queue.counts() == {RUN_RUNNING: 3}
+
+
+def test_per_profile_concurrency_caps(tmp_path):
+    queue = RunQueue(str(tmp_path / "runs.sqlite"))
+    for run_id, profile in [("a1", "a"), ("a2", "a"), ("b1", "b"), ("c1", "c"), ("c2", "c")]:
+        queue.submit(run_id, ["e"], profile)
+    limits = parse_concurrency_limits("1,c=2")
+    claimed = [queue.claim("w", limits)["run_id"] for _ in range(4)]
+    assert claimed == ["a1", "b1", "c1", "c2"]
+    assert queue.claim("w", limits) is None  # a2 waits for a1
+    queue.succeed("a1", "w", [])
+    assert queue.claim("w", limits)["run_id"] == "a2"
+
+
+def test_parse_concurrency_limits():
+    assert parse_concurrency_limits("") == {"*": 1}
+    assert parse_concurrency_limits("0, axoden=3") == {"*": 0, "axoden": 3}
+    with pytest.raises(ValueError):
+        parse_concurrency_limits("axoden=many")
+
+
+def test_cancel_pending_and_running_runs(tmp_path):
+    queue = RunQueue(str(tmp_path / "runs.sqlite"))
+    queue.submit("pending", ["e"], "p")
+    assert queue.cancel("pending")["status"] == RUN_CANCELLED
+    assert queue.claim("w") is None
+
+    queue.submit("running", ["e"], "p")
+    queue.claim("w")
+    assert queue.heartbeat("running", "w") is True
+    run = queue.cancel("running")
+    assert (run["status"], run["cancel_requested"]) == (RUN_RUNNING, True)
+    assert queue.heartbeat("running", "w", {"stage": "graph"}) is False
+    assert queue.cancel("missing") is None
+
+
+def test_expired_leases_are_requeued_and_survive_restart(tmp_path):
+    path = str(tmp_path / "runs.sqlite")
+    clock = FakeClock()
+    queue = RunQueue(path, lease_seconds=30, clock=clock)
+    queue.submit("r1", ["e1", "e2"], "p")
+    queue.claim("dead-worker")
+    queue.close()
+
+    clock.now += 31
+    restarted = RunQueue(path, lease_seconds=30, clock=clock)
+    assert restarted.requeue_expired() == 1
+    run = restarted.claim("w2")
+    assert (run["run_id"], run["attempts"], run["evidence_ids"]) == ("r1", 2, ["e1", "e2"])
+    restarted.succeed("r1", "dead-worker", [])  # a stale worker cannot finish the run
+    assert restarted.get("r1")["status"] == RUN_RUNNING
+
+
+def test_runs_are_failed_after_max_attempts(tmp_path):
+    clock = FakeClock()
+    queue = RunQueue(str(tmp_path / "runs.sqlite"), lease_seconds=30, clock=clock, max_attempts=2)
+    queue.submit("r1", ["e1"], "p")
+    queue.submit("r2", ["e2"], "p")
+    queue.claim("w1")
+    clock.now += 31
+    assert queue.requeue_expired() == 1
+    queue.claim("w2")
+    queue.claim("w3")
+    queue.cancel("r2")
+    clock.now += 31
+    assert queue.requeue_expired() == 0
+    failed, cancelled = queue.get("r1"), queue.get("r2")
+    assert (failed["status"], failed["attempts"]) == (RUN_FAILED, 2)
+    assert "after 2 attempts" in failed["error"]
+    assert cancelled["status"] == RUN_CANCELLED
+    assert queue.claim("w4") is None
+    with pytest.raises(ValueError):
+        RunQueue(str(tmp_path / "other.sqlite"), max_attempts=0)
+
+
+def test_execute_run_records_progress_artifacts_and_failures(tmp_path, monkeypatch):
+    queue = RunQueue(str(tmp_path / "runs.sqlite"))
+    store = EvidenceStore(str(tmp_path / "evidence"))
+    store.put_many([("e1", {"eventId": "1"}), ("e2", {"eventId": "2"})])
+
+    monkeypatch.setattr(graph_pipeline, "run_graph_pipeline", _fake_pipeline)
+    queue.submit("ok", ["e1", "e2", "gone"], "p")
+    assert execute_run(queue, queue.claim("w"), "w", store, str(tmp_path / "out")) == RUN_SUCCEEDED
+    run = queue.get("ok")
+    assert run["progress"] == {"stage": "triage", "total_ingested": 2}
+    assert [a["type"] for a in run["artifacts"]] == ["report_md", "reproducibility_manifest_json"]
+    assert run["artifacts"][0]["path"].endswith("ok/report.md")
+
+    def _broken(*args, **kwargs):
+        raise RuntimeError("graph exploded")
+
+    monkeypatch.setattr(graph_pipeline, "run_graph_pipeline", _broken)
+    queue.submit("bad", ["e1"], "p")
+    assert execute_run(queue, queue.claim("w"), "w", store, str(tmp_path / "out")) == RUN_FAILED
+    assert "graph exploded" in queue.get("bad")["error"]
+
+
+def test_execute_run_streams_evidence_in_bounded_chunks(tmp_path, monkeypatch):
+    queue = RunQueue(str(tmp_path / "runs.sqlite"))
+    store = EvidenceStore(str(tmp_path / "evidence"))
+    store.put_many([(f"e{i}", {"eventId": str(i)}) for i in range(5)])
+    seen = {}
+
+    def _chunked(raw_events, output_dir, enable_kernel=False, chunk_size=0, progress=None):
+        chunks = list(graph_pipeline._iter_alert_chunks(raw_events, chunk_size))
+        seen.update(lazy=not isinstance(raw_events, list), chunks=[len(chunk) for chunk in chunks])
+        return {}
+
+    monkeypatch.setattr(graph_pipeline, "run_graph_pipeline", _chunked)
+    queue.submit("r1", [f"e{i}" for i in range(5)], "p")
+    assert execute_run(queue, queue.claim("w"), "w", store, str(tmp_path / "out"), chunk_size=2) == RUN_SUCCEEDED
+    assert seen == {"lazy": True, "chunks": [2, 2, 1]}
+
+
+def test_execute_run_stops_at_next_progress_after_cancel(tmp_path, monkeypatch):
+    queue = RunQueue(str(tmp_path / "runs.sqlite"))
+    store = EvidenceStore(str(tmp_path / "evidence"))
+
+    def _slow(raw_events, output_dir, enable_kernel=False, chunk_size=0, progress=None):
+        queue.cancel("r1")
+        progress("graph", {})
+        raise AssertionError("not reached")
+
+    monkeypatch.setattr(graph_pipeline, "run_graph_pipeline", _slow)
+    queue.submit("r1", [], "p")
+    assert execute_run(queue, queue.claim("w"), "w", store, str(tmp_path / "out")) == RUN_CANCELLED
+    assert queue.get("r1")["status"] == RUN_CANCELLED
+
+
+def test_thread_pool_drains_the_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_pipeline, "run_graph_pipeline", _fake_pipeline)
+    path = str(tmp_path / "runs.sqlite")
+    queue = RunQueue(path)
+    for idx in range(4):
+        queue.submit(f"r{idx}", [], f"profile-{idx % 2}")
+    pool = RunWorkerPool(
+        path, str(tmp_path / "evidence"), str(tmp_path / "out"), workers=2, mode=MODE_THREAD, poll_interval=0.01
+    )
+    pool.start()
+    try:
+        deadline = time.time() + 10
+        while queue.counts().get(RUN_SUCCEEDED, 0) < 4 and time.time() < deadline:
+            time.sleep(0.02)
+        assert queue.counts() == {RUN_SUCCEEDED: 4}
+        assert pool.stats()["alive"] == 2
+    finally:
+        pool.stop()
+    assert pool.stats()["alive"] == 0
+    assert not any(t.name.startswith("cix-run-worker") for t in threading.enumerate())
+    assert RUN_PENDING not in queue.counts()
+
+
+def test_supervisor_replaces_crashed_workers_without_a_submit(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_pipeline, "run_graph_pipeline", _fake_pipeline)
+    real_loop = run_queue_module.worker_loop
+    crashes = []
+
+    def flaky_loop(config, stop_event):
+        if not crashes:
+            crashes.append(config["worker_id"])
+            return  # the first worker dies straight away
+        real_loop(config, stop_event)
+
+    monkeypatch.setattr(run_queue_module, "worker_loop", flaky_loop)
+    path = str(tmp_path / "runs.sqlite")
+    queue = RunQueue(path)
+    queue.submit("r1", [], "p")
+    pool = RunWorkerPool(
+        path,
+        str(tmp_path / "evidence"),
+        str(tmp_path / "out"),
+        workers=1,
+        mode=MODE_THREAD,
+        poll_interval=0.01,
+        supervise_interval=0.02,
+    )
+    pool.start()
+    try:
+        deadline = time.time() + 10
+        while queue.counts().get(RUN_SUCCEEDED, 0) < 1 and time.time() < deadline:
+            time.sleep(0.02)
+        assert queue.counts() == {RUN_SUCCEEDED: 1}
+        assert pool.stats()["restarts"] == 1
+    finally:
+        pool.stop()
+    assert not any(t.name == "cix-run-supervisor" for t in threading.enumerate())
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import json
+import random
+from pathlib import Path
+
 import pytest
 
 from src.ingest.siem_formats import parse_cef, parse_leef, parse_syslog
@@ -47,3 +51,99 @@ def test_parse_syslog_rfc3164():
     assert parsed["hostname"] == "mymachine"
     assert parsed["app"] == "su"
     assert parsed["pid"] == "123"
+
+
+def _legacy_cef_extension(text):
+    """Character-walking parser this module used before the regex tokenizer (parity oracle)."""
+    current, tokens, in_key, escape = "", [], True, False
+    for ch in text:
+        if escape:
+            current += ch
+            escape = False
+            continue
+        if ch == "\\":
+            escape = True
+            continue
+        if ch == " " and not in_key:
+            tokens.append(current)
+            current, in_key = "", True
+            continue
+        current += ch
+        if in_key and ch == "=":
+            in_key = False
+    if current:
+        tokens.append(current)
+    pairs = {}
+    for token in tokens:
+        if "=" in token:
+            k, v = token.split("=", 1)
+            pairs[k.strip()] = v.strip()
+    return pairs
+
+
+def _legacy_leef_extension(text):
+    pairs = {}
+    for part in [p for p in text.split("\t") if p]:
+        if "=" in part:
+            k, v = part.split("=", 1)
+            pairs[k.strip()] = v.strip()
+    return pairs
+
+
+def _sample_line(name):
+    return json.loads((Path(__file__).resolve().parents[2] / "samples" / name).read_text())["events"][0]["raw_event"]
+
+
+def test_samples_match_legacy_parser():
+    cef = _sample_line("cef_event.json")
+    assert parse_cef(cef)["extension"] == _legacy_cef_extension(cef.split("|", 7)[7])
+    leef = _sample_line("leef_event.json")
+    assert parse_leef(leef)["extension"] == _legacy_leef_extension(leef.split("|", 5)[5])
+
+
+def test_cef_extension_fuzz_parity_with_legacy_parser():
+    # Inputs both parsers agree on: no spaces inside values, only \= and \\ escapes.
+    rng = random.Random(1234)
+    alphabet = "abcXYZ019.:/-_=" + "\u00e9"
+    for _ in range(500):
+        tokens = []
+        for _ in range(rng.randint(0, 8)):
+            key = rng.choice(["src", "dst", "msg", "cs1", "cs1Label", "deviceCustomString1", "ad.x", "k[0]"])
+            value = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            value = value.replace("\\", "").replace("=", rng.choice(["\\=", "="]))
+            if rng.random() < 0.2:
+                value += "\\\\"
+            tokens.append(f"{key}={value}")
+        text = rng.choice([" ", "  "]).join(tokens)
+        assert parse_cef(f"CEF:0|V|P|1|1|N|5|{text}")["extension"] == _legacy_cef_extension(text), text
+
+
+def test_cef_extension_values_with_spaces_and_escapes():
+    line = r"CEF:0|V|P|1|1|N|5|msg=line one\nline two \= done act=blocked path=C:\\Temp\\a b.exe note=x\ y=z"
+    ext = parse_cef(line)["extension"]
+    assert ext["msg"] == "line one\nline two = done"
+    assert ext["act"] == "blocked"
+    assert ext["path"] == "C:\\Temp\\a b.exe"
+    assert ext["note"] == "x y=z"
+
+
+def test_cef_long_extension_value():
+    payload = "A" * 200_000
+    ext = parse_cef(f"CEF:0|V|P|1|1|N|5|src=10.0.0.1 msg={payload} dst=10.0.0.2")["extension"]
+    assert ext["msg"] == payload
+    assert ext["dst"] == "10.0.0.2"
+
+
+@pytest.mark.parametrize(
+    "spec, delimiter",
+    [("^", "^"), ("0x5E", "^"), ("x5e", "^"), ("", "\t")],
+)
+def test_parse_leef2_custom_delimiter(spec, delimiter):
+    line = f"LEEF:2.0|Lancope|StealthWatch|1.0|41|{spec}|src=10.0.1.8{delimiter}dst=10.0.0.5{delimiter}msg=a|b"
+    ext = parse_leef(line)["extension"]
+    assert ext == {"src": "10.0.1.8", "dst": "10.0.0.5", "msg": "a|b"}
+
+
+def test_parse_leef1_ignores_pipes_in_values():
+    ext = parse_leef("LEEF:1.0|V|P|1.0|E|cat=x\tmsg=a|b")["extension"]
+    assert ext == {"cat": "x", "msg": "a|b"}
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.kernel.ledger import Ledger
+from src.kernel import stage1
+from src.kernel.stage1 import classify_batch, shutdown_process_pools
+
+
+def _events():
+    events = []
+    for i in range(12):
+        events.append(
+            {
+                "source_id": "siem-A",
+                "event_id": f"evt-par-{i}",
+                "source_timestamp": "2026-02-06T10:00:00Z",
+                "raw_payload": {"message": f"login ok user{i % 3}", "command_line": "whoami" if i == 4 else ""},
+            }
+        )
+    events.append(
+        {
+            "source_id": "siem-B",
+            "event_id": "evt-par-cef",
+            "source_timestamp": "2026-02-06T10:01:00Z",
+            "format": "cef",
+            "raw_event": "CEF:0|Acme|ThreatX|1.0|100|Test Event|5|src=10.0.0.1 msg=mimikatz",
+        }
+    )
+    events.append({"source_timestamp": "2026-02-06T10:00:01Z", "raw_payload": {"x": 1}})
+    events.append(dict(events[0]))
+    return events
+
+
+def _ledger_view(path):
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        entry = json.loads(line)
+        payload = dict(entry["payload"])
+        for volatile in ("batch_id", "ingest_timestamp", "original_ledger_entry_id", "counters", "elapsed_ms"):
+            payload.pop(volatile, None)
+        rows.append((entry["type"], payload))
+    return rows
+
+
+def _decisions(result):
+    keys = ("event_id", "status", "band", "decision_code", "entropy_raw", "projection_count", "suspicious_markers")
+    return [{k: e.get(k) for k in keys} for e in result["per_event"]]
+
+
+def test_process_pool_matches_serial(tmp_path):
+    serial_path = tmp_path / "serial.jsonl"
+    parallel_path = tmp_path / "parallel.jsonl"
+    serial = classify_batch(_events(), ledger=Ledger(str(serial_path)))
+    parallel = classify_batch(_events(), ledger=Ledger(str(parallel_path)), workers=2, chunk_size=4, vectorized=True)
+
+    assert _decisions(parallel) == _decisions(serial)
+    assert _ledger_view(parallel_path) == _ledger_view(serial_path)
+    assert parallel["batch"]["replayed_count"] == 1
+    assert parallel["batch"]["failed_count"] == 1
+
+
+def test_explicit_executor_receives_small_batches(tmp_path):
+    serial_path = tmp_path / "serial.jsonl"
+    pooled_path = tmp_path / "pooled.jsonl"
+    serial = classify_batch(_events(), ledger=Ledger(str(serial_path)))
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        pooled = classify_batch(_events(), ledger=Ledger(str(pooled_path)), executor=executor)
+
+    assert _decisions(pooled) == _decisions(serial)
+    assert _ledger_view(pooled_path) == _ledger_view(serial_path)
+
+
+def test_shutdown_process_pools_closes_shared_pool(tmp_path):
+    classify_batch(_events(), ledger=Ledger(str(tmp_path / "ledger.jsonl")), workers=2, chunk_size=4)
+    assert stage1._process_pools
+    shutdown_process_pools()
+    assert not stage1._process_pools
+    result = classify_batch(_events(), ledger=Ledger(str(tmp_path / "again.jsonl")), workers=2, chunk_size=4)
+    assert result["batch"]["failed_count"] == 1
+    shutdown_process_pools()
+
+
+def test_concurrent_batches_on_one_ledger_keep_one_chain(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    ledger = Ledger(str(path))
+
+    def _batch(n):
+        events = [dict(event, event_id=f"{event.get('event_id')}-{n}") for event in _events()]
+        return classify_batch(events, ledger=ledger)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(_batch, range(16)))
+
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [e["prev_hash"] for e in entries[1:]] == [e["entry_hash"] for e in entries[:-1]]
+    batch_order = [e["payload"]["batch_id"] for e in entries if e["type"] in ("BATCH_RECEIVED", "BATCH_COMPLETED")]
+    assert batch_order == [batch_id for batch_id in batch_order[::2] for _ in range(2)]
+    assert sorted(set(batch_order)) == sorted(r["batch_id"] for r in results)
+    assert Ledger(str(path)).last_hash == entries[-1]["entry_hash"]
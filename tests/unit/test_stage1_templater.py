@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import random
+import threading
+
+from src.kernel.ledger import Ledger
+from src.kernel.stage1 import (
+    _DOMAIN_RE,
+    _HEX_RE,
+    _IP_RE,
+    _NUM_RE,
+    _template_text,
+    classify_batch,
+)
+
+
+def _chained_template(s: str) -> str:
+    s = (s or "").lower()
+    s = _IP_RE.sub("<ip>", s)
+    s = _DOMAIN_RE.sub("<domain>", s)
+    s = _HEX_RE.sub("<hex>", s)
+    s = _NUM_RE.sub("<num>", s)
+    return s
+
+
+def test_template_matches_chained_substitutions():
+    rng = random.Random(11)
+    alphabet = ["\\", "b", "B", "d", ".", "1", "2", "5", "a", "f", "0", "-", " ", "x", "<", ">"]
+    samples = [
+        "",
+        "powershell -enc AAAA 10.0.0.1 evil.example.com",
+        "C:\\Backup\\bin\\b25\\x1\\x2\\x3\\b",
+        "\\b0123456789abcdef0123\\b \\b\\ddd\\b",
+        "\\bab\\.cd\\b",
+    ]
+    for _ in range(2000):
+        samples.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))))
+    for sample in samples:
+        assert _template_text(sample) == _chained_template(sample)
+    assert _template_text(None) == ""
+
+
+def test_template_long_text_bypasses_memo():
+    text = "x" * 10000 + "\\B\\dd\\b"
+    assert _template_text(text) == _chained_template(text)
+
+
+def test_batch_counters_report_template_cache(temp_ledger):
+    events = [
+        {
+            "source_id": "syslog-A",
+            "event_id": f"evt-tpl-{i}",
+            "source_timestamp": "2026-02-06T10:00:00Z",
+            "raw_payload": {"message": "connection reset by peer"},
+        }
+        for i in range(5)
+    ]
+    result = classify_batch(events, ledger=temp_ledger)
+    batch = result["batch"]
+    assert batch["template_cache_hits"] >= 4
+    assert "template_cache_misses" in batch
+
+
+def test_batch_template_counts_exclude_other_threads(tmp_path):
+    events = [
+        {
+            "source_id": "syslog-A",
+            "event_id": f"evt-iso-{i}",
+            "source_timestamp": "2026-02-06T10:00:00Z",
+            "raw_payload": {"message": f"session {i % 7} closed for 10.0.0.{i % 5}"},
+        }
+        for i in range(300)
+    ]
+
+    def _lookups(name):
+        batch = classify_batch(events, ledger=Ledger(str(tmp_path / f"{name}.jsonl")))["batch"]
+        return batch["template_cache_hits"] + batch["template_cache_misses"]
+
+    alone = _lookups("alone")
+    stop = threading.Event()
+
+    def _noise():
+        i = 0
+        while not stop.is_set():
+            _template_text(f"noise {i % 50} from 10.1.1.1")
+            i += 1
+
+    noise = threading.Thread(target=_noise)
+    noise.start()
+    try:
+        concurrent = [_lookups(f"busy{n}") for n in range(3)]
+    finally:
+        stop.set()
+        noise.join()
+    assert concurrent == [alone] * 3